@@ -1,5 +1,6 @@
 #!/usr/bin/python
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.facts_parse_utils import parse_bgp_neighbors
 import re
 
 DOCUMENTATION = '''
@@ -118,136 +119,8 @@ class BgpModule(object):
             self.facts['bgp_localasn'] = regex_asn.match(self.out).group(1)
 
     def parse_neighbors(self):
-        regex_ipv4 = re.compile(
-            r'^BGP neighbor is \*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
-        regex_confed_link = re.compile(r'^BGP neighbor is .*(confed-(?:internal|external) link)')
-        regex_ipv6 = re.compile(r'^BGP neighbor is \*?([0-9a-fA-F:]+)')
-        regex_remote_as = re.compile(r'.*remote AS (\d+)')
-        regex_local_as = re.compile(r'.*local AS (\d+)')
-        regex_desc = re.compile(r'.*Description: (.*)')
-        regex_admin_down = re.compile(r'.*Administratively shut down')
-        regex_routerid = re.compile(
-            r'.*remote router ID (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
-        regex_state = re.compile(r'.*BGP state = (\w+)')
-        regex_stats = re.compile(
-            r'.*(Opens|Notifications|Updates|Keepalives|Route Refresh|Capability|Total):.*')
-        regex_mrai = re.compile(
-            r'.*Minimum time between advertisement runs is (\d{1,4})')
-        regex_accepted = re.compile(r'.*(\d+) accepted')
-        regex_conn_est = re.compile(r'.*Connections established (\d+)')
-        regex_conn_dropped = re.compile(
-            r'.*Connections established \d+; dropped (\d+)')
-        regex_peer_group = re.compile(
-            r'.*Member of peer-group (.*) for session parameters')
-        regex_subnet = re.compile(
-            r'.*subnet range group: (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\/\d{1,2})')
-        regex_cap_gr = re.compile(r'.*Graceful Restart Capabilty: (\w+)')
-        regex_cap_gr_peer_restart_time = re.compile(
-            r'.*Remote Restart timer is (\d+)')
-        regex_cap_gr_peer_af_ip4 = re.compile(r'.*IPv4 Unicast\((.*)\)')
-        regex_cap_gr_peer_af_ip6 = re.compile(r'.*IPv6 Unicast\((.*)\)')
-
-        neighbors = {}
-
         try:
-            split_output = self.out.split("BGP neighbor is")
-
-            for n in split_output:
-
-                # ignore empty rows
-                if 'BGP' in n:
-                    neighbor = {}
-                    capabilities = {}
-                    message_stats = {}
-                    n = "BGP neighbor is" + n
-                    lines = n.splitlines()
-                    neighbor['admin'] = 'up'
-                    neighbor['accepted prefixes'] = 0
-                    neighbor_ip = None
-
-                    for line in lines:
-                        if regex_confed_link.match(line):
-                            neighbor['confed_peer'] = True
-                            confed_peer_type = regex_confed_link.match(line).group(1)
-                            neighbor['confed_peer_type'] = 'external' if confed_peer_type == 'confed-external link' else 'internal'  # noqa: E501
-                        if regex_ipv4.match(line):
-                            neighbor_ip = regex_ipv4.match(line).group(1)
-                            neighbor['ip_version'] = 4
-                        elif regex_ipv6.match(line):
-                            neighbor_ip = regex_ipv6.match(
-                                line).group(1).lower()
-                            neighbor['ip_version'] = 6
-                        if regex_remote_as.match(line):
-                            neighbor['remote AS'] = int(
-                                regex_remote_as.match(line).group(1))
-                        if regex_local_as.match(line):
-                            neighbor['local AS'] = int(
-                                regex_local_as.match(line).group(1))
-                        if regex_desc.match(line):
-                            neighbor['description'] = regex_desc.match(
-                                line).group(1)
-                        if regex_admin_down.match(line):
-                            neighbor['admin'] = 'down'
-                        if regex_routerid.match(line):
-                            neighbor['remote routerid'] = regex_routerid.match(
-                                line).group(1)
-                        if regex_state.match(line):
-                            neighbor['state'] = regex_state.match(
-                                line).group(1).lower()
-                        if regex_mrai.match(line):
-                            neighbor['mrai'] = int(
-                                regex_mrai.match(line).group(1))
-                        if regex_accepted.match(line):
-                            neighbor['accepted prefixes'] += int(
-                                regex_accepted.match(line).group(1))
-                        if regex_conn_est.match(line):
-                            neighbor['connections established'] = int(
-                                regex_conn_est.match(line).group(1))
-                        if regex_conn_dropped.match(line):
-                            neighbor['connections dropped'] = int(
-                                regex_conn_dropped.match(line).group(1))
-                        if regex_peer_group.match(line):
-                            neighbor['peer group'] = regex_peer_group.match(
-                                line).group(1)
-                        if regex_subnet.match(line):
-                            neighbor['subnet'] = regex_subnet.match(
-                                line).group(1)
-
-                        if regex_cap_gr.match(line):
-                            capabilities['graceful restart'] = regex_cap_gr.match(
-                                line).group(1).lower()
-                        if regex_cap_gr_peer_restart_time.match(line):
-                            capabilities['peer restart timer'] = int(
-                                regex_cap_gr_peer_restart_time.match(line).group(1))
-                        if regex_cap_gr_peer_af_ip4.match(line):
-                            capabilities['peer af ipv4 unicast'] = regex_cap_gr_peer_af_ip4.match(
-                                line).group(1).lower()
-                        if regex_cap_gr_peer_af_ip6.match(line):
-                            capabilities['peer af ipv6 unicast'] = regex_cap_gr_peer_af_ip6.match(
-                                line).group(1).lower()
-
-                        if regex_stats.match(line):
-                            try:
-                                key, values = line.split(':')
-                                key = key.lstrip()
-                                sent, rcvd = values.split()
-                                value_dict = {}
-                                value_dict['sent'] = int(sent)
-                                value_dict['rcvd'] = int(rcvd)
-                                message_stats[key] = value_dict
-                            except Exception:
-                                print(
-                                    "NonFatal: line:'{}' should not have matched for sent/rcvd count".format(line))
-
-                        if capabilities:
-                            neighbor['capabilities'] = capabilities
-
-                        if message_stats:
-                            neighbor['message statistics'] = message_stats
-
-                    if neighbor_ip:
-                        neighbors[neighbor_ip] = neighbor
-
+            neighbors = parse_bgp_neighbors(self.out)
         except Exception as e:
             self.module.fail_json(msg=str(e))
 
@@ -5,6 +5,7 @@ import traceback
 from collections import defaultdict
 from natsort import natsorted
 from ansible.module_utils.port_utils import get_port_indices_for_asic
+from ansible.module_utils.facts_parse_utils import format_config
 
 try:
     from sonic_py_common import multi_asic
@@ -32,45 +33,6 @@ options:
 '''
 
 PERSISTENT_CONFIG_PATH = "/etc/sonic/config_db{}.json"
-TABLE_NAME_SEPARATOR = '|'
-
-
-def format_config(json_data):
-    """Format config data.
-    Returns:
-        Config data in a dictionary form of TABLE, KEY, [ ENTRY ], FV
-    Example:
-    {
-    "VLAN_MEMBER": {
-        "Vlan1000|Ethernet2": {
-            "tagging_mode": "untagged"
-        },
-        "Vlan1000|Ethernet4": {
-            "tagging_mode": "untagged"
-        }
-    }
-    Is converted into
-     'VLAN_MEMBER': {'Vlan1000': {'Ethernet10': {'tagging_mode': 'untagged'},
-                                  'Ethernet12': {'tagging_mode': 'untagged'}
-                    }
-    """
-    res = {}
-    for table, item in json_data.items():
-        data = {}
-        for key, entry in item.items():
-            try:
-                (key_l1, key_l2) = key.split(TABLE_NAME_SEPARATOR, 1)
-                data.setdefault(key_l1, {})[key_l2] = entry
-            except ValueError:
-                # This is a single level key
-                if key not in data:
-                    data[key] = entry
-                else:
-                    data[key].update(entry)
-
-        res.setdefault(table, data)
-
-    return res
 
 
 def create_maps(config, namespace):
@@ -4,17 +4,18 @@ from ansible.module_utils.basic import AnsibleModule
 import yaml
 import os
 import logging
+import time
 import traceback
 
 try:
     from ansible.module_utils.debug_utils import config_module_logging
-    from ansible.module_utils.graph_utils import LabGraph
+    from ansible.module_utils.graph_utils import LabGraph, get_graph_hostnames, load_lab_graph
 except ImportError:
     # Add parent dir for using outside Ansible
     import sys
     sys.path.append('..')
     from module_utils.debug_utils import config_module_logging
-    from module_utils.graph_utils import LabGraph
+    from module_utils.graph_utils import LabGraph, get_graph_hostnames, load_lab_graph
 
 config_module_logging('conn_graph_facts')
 
@@ -55,6 +56,12 @@ options:
         device entry in graph facts.
         required: False
 
+    use_cache:
+        Use the hostname to group index and the prebuilt graph facts of the groups cached under
+        ~/.ansible/conn_graph. They are rebuilt when the csv files change.
+        required: False
+        default: True
+
     Mutually exclusive options: host, hosts, anchor
 
 Ansible_facts:
@@ -116,13 +123,14 @@ LAB_GRAPHFILE_PATH = "files/"
 LAB_GRAPH_GROUPS_FILE = "graph_groups.yml"
 
 
-def find_graph(hostnames, part=False, forced_mgmt_routes=None):
+def find_graph(hostnames, part=False, forced_mgmt_routes=None, use_cache=True):
     """Find the graph file for the target device
 
     Args:
         hostnames (list): List of hostnames
         part (bool, optional): Select the graph file if over 80% of hosts are found in conn_graph when part is True.
                                Defaults to False.
+        use_cache (bool, optional): Use the cached hostname index and prebuilt graph facts. Defaults to True.
 
     Returns:
         obj: Instance of LabGraph or None if no graph file is found.
@@ -131,31 +139,91 @@ def find_graph(hostnames, part=False, forced_mgmt_routes=None):
     with open(graph_group_file) as fd:
         graph_groups = yaml.safe_load(fd)
 
-    target_graph = None
+    # Only the devices csv file is needed to find the group, the graph is built for the matching group only
+    groups_hostnames = get_graph_hostnames(LAB_GRAPHFILE_PATH, graph_groups, use_cache=use_cache)
+
     target_group = None
     for group in graph_groups:
         logging.debug("Looking at graph files of group {} for hosts {}".format(group, hostnames))
-        lab_graph = LabGraph(LAB_GRAPHFILE_PATH, group, forced_mgmt_routes=forced_mgmt_routes)
-        graph_hostnames = set(lab_graph.graph_facts["devices"].keys())
+        graph_hostnames = set(groups_hostnames[group])
         logging.debug("For graph group {}, got hostnames {}".format(group, graph_hostnames))
 
         if not part:
             if set(hostnames) <= graph_hostnames:
-                target_graph = lab_graph
                 target_group = group
                 break
         else:
             THRESHOLD = 0.8
             in_graph_hostnames = set(hostnames).intersection(graph_hostnames)
             if len(in_graph_hostnames) * 1.0 / len(hostnames) >= THRESHOLD:
-                target_graph = lab_graph
                 target_group = group
                 break
 
-    if target_graph is not None:
-        logging.debug("Returning lab graph of group {} for hosts {}".format(target_group, hostnames))
+    if target_group is None:
+        return None
+
+    logging.debug("Returning lab graph of group {} for hosts {}".format(target_group, hostnames))
+    return load_lab_graph(LAB_GRAPHFILE_PATH, target_group, forced_mgmt_routes=forced_mgmt_routes,
+                          use_cache=use_cache)
+
 
-    return target_graph
+def benchmark_find_graph(groups=50, devices=40, links=48, iterations=5):
+    """
+    Compare the time to find the graph of the hosts of the last group of a large synthetic lab:
+    building the graph of every group, and using the hostname index and the prebuilt graph facts.
+
+    Run from ansible/library:
+        python -c "import conn_graph_facts as m; print(m.benchmark_find_graph())"
+    """
+    import shutil
+    import tempfile
+
+    global LAB_GRAPHFILE_PATH
+    saved_path = LAB_GRAPHFILE_PATH
+    LAB_GRAPHFILE_PATH = tempfile.mkdtemp()
+    try:
+        group_names = ["group{}".format(g) for g in range(groups)]
+        with open(os.path.join(LAB_GRAPHFILE_PATH, LAB_GRAPH_GROUPS_FILE), "w") as f:
+            yaml.safe_dump(group_names, f)
+        for group in group_names:
+            with open(os.path.join(LAB_GRAPHFILE_PATH, "sonic_{}_devices.csv".format(group)), "w") as f:
+                f.write("Hostname,ManagementIp,HwSku,Type,Protocol,Os,AuthType\n")
+                f.write("{}-fanout,10.0.0.1/24,Arista-7260QX-64,FanoutLeaf,,eos,\n".format(group))
+                for d in range(devices):
+                    f.write("{}-dut{},10.0.{}.{}/24,HwSku,DevSonic,,eos,\n".format(group, d, d, d + 2))
+            with open(os.path.join(LAB_GRAPHFILE_PATH, "sonic_{}_links.csv".format(group)), "w") as f:
+                f.write("StartDevice,StartPort,EndDevice,EndPort,BandWidth,VlanID,VlanMode,AutoNeg\n")
+                for d in range(devices):
+                    for p in range(links):
+                        f.write("{}-dut{},Ethernet{},{}-fanout,Ethernet{},100000,{},Access,on\n".format(
+                            group, d, p * 4, group, d * links + p, 100 + d * links + p))
+        hostnames = ["{}-dut0".format(group_names[-1])]
+
+        def _time(func, count=iterations):
+            start = time.time()
+            for _ in range(count):
+                lab_graph = func()
+            assert hostnames[0] in lab_graph.graph_facts["devices"]
+            return (time.time() - start) / count
+
+        def _find_graph_all_groups():
+            # The behavior before the index: build the graph of every group until the hosts are found
+            for group in group_names:
+                lab_graph = LabGraph(LAB_GRAPHFILE_PATH, group)
+                if set(hostnames) <= set(lab_graph.graph_facts["devices"].keys()):
+                    return lab_graph
+
+        timings = {
+            "all_groups": _time(_find_graph_all_groups),
+            "no_cache": _time(lambda: find_graph(hostnames, use_cache=False)),
+        }
+        # The first cached run builds the index and the graph cache, the following runs only load them
+        timings["cache_first"] = _time(lambda: find_graph(hostnames), 1)
+        timings["cached"] = _time(lambda: find_graph(hostnames))
+        return timings
+    finally:
+        shutil.rmtree(LAB_GRAPHFILE_PATH, ignore_errors=True)
+        LAB_GRAPHFILE_PATH = saved_path
 
 
 def main():
@@ -168,6 +236,7 @@ def main():
             anchor=dict(required=False, type='list'),
             ignore_errors=dict(required=False, type='bool', default=False),
             forced_mgmt_routes=dict(required=False, type='list'),
+            use_cache=dict(required=False, type='bool', default=True),
         ),
         mutually_exclusive=[['host', 'hosts', 'anchor']],
         supports_check_mode=True
@@ -191,10 +260,11 @@ def main():
             LAB_GRAPHFILE_PATH = m_args['filepath']
 
         if m_args["group"]:
-            lab_graph = LabGraph(
+            lab_graph = load_lab_graph(
                 LAB_GRAPHFILE_PATH,
                 m_args["group"],
-                forced_mgmt_routes=m_args.get("forced_mgmt_routes")
+                forced_mgmt_routes=m_args.get("forced_mgmt_routes"),
+                use_cache=m_args["use_cache"]
             )
         else:
             # When calling passed in anchor instead of hostnames,
@@ -203,7 +273,8 @@ def main():
             target = anchor if anchor else hostnames
             lab_graph = find_graph(
                 target,
-                forced_mgmt_routes=m_args.get("forced_mgmt_routes")
+                forced_mgmt_routes=m_args.get("forced_mgmt_routes"),
+                use_cache=m_args["use_cache"]
             )
 
         if not lab_graph:
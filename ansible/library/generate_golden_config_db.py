@@ -11,6 +11,9 @@ import logging
 import json
 import re
 import ipaddress
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 
 from ansible.module_utils.basic import AnsibleModule
 from sonic_py_common import device_info, multi_asic
@@ -36,6 +39,7 @@ MACSEC_PROFILE_PATH = '/tmp/profile.json'
 GOLDEN_CONFIG_TEMPLATE = 'golden_config_db_t2.j2'
 GOLDEN_CONFIG_TEMPLATE_PATH = '/tmp/golden_config_db_t2.j2'
 DNS_CONFIG_PATH = '/tmp/dns_config.json'
+MINIGRAPH_CONFIG_CMD = "sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data"
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +88,34 @@ class GenerateGoldenConfigDBModule(object):
         self.dut_loopbacks = self.module.params['dut_loopbacks']
         self.console_ports = self.module.params['console_ports']
 
+        # sonic-cfggen output of each namespace, the minigraph is parsed once per namespace in a module run
+        self.cfggen_results = {}
+        self.cfggen_lock = threading.Lock()
+        self.namespace_gen_time = {}
+
+    def run_cfggen(self, ns=None):
+        """Get the config generated from minigraph for a namespace, by running sonic-cfggen once per module run.
+
+        Args:
+            ns: The ASIC namespace, e.g. "asic0", or None for the host.
+
+        Returns:
+            Tuple of rc, stdout and stderr of sonic-cfggen.
+        """
+        with self.cfggen_lock:
+            if ns in self.cfggen_results:
+                return self.cfggen_results[ns]
+        cmd = MINIGRAPH_CONFIG_CMD
+        if ns is not None:
+            cmd = "{} -n {} -p {}".format(cmd, ns, self.get_port_config_path(int(ns[len("asic"):])))
+        start = time.time()
+        result = self.module.run_command(cmd)
+        with self.cfggen_lock:
+            self.namespace_gen_time[ns or "localhost"] = round(time.time() - start, 3)
+            if result[0] == 0:
+                self.cfggen_results[ns] = result
+        return result
+
     def _update_config_db_in_ns(self, config, table, value, namespaces_to_update='asic'):
         """Update a table entry across all ASIC namespaces for multi-ASIC platforms.
 
@@ -133,7 +165,7 @@ class GenerateGoldenConfigDBModule(object):
             return Template(template_file.read()).render(profile)
 
     def generate_mgfx_golden_config_db(self):
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -156,7 +188,7 @@ class GenerateGoldenConfigDBModule(object):
         If FEATURE table in init_cfg.json contains dhcp_server, enable it.
         And add dhcp_server related configuration
         """
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -190,7 +222,7 @@ class GenerateGoldenConfigDBModule(object):
         return gold_config_db
 
     def generate_full_lossy_golden_config_db(self):
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -244,27 +276,24 @@ class GenerateGoldenConfigDBModule(object):
 
     def get_config_from_minigraph_multiasic(self):
         full_config = {}
-        cmd = "sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data"
-        # get the config for the host
-        rc, out, err = self.module.run_command(cmd)
-        if rc != 0:
-            self.module.fail_json(
-                msg="Failed to get config from minigraph for namespace {}: {}".format("localhost", err))
-        full_config["localhost"] = json.loads(out)
-
-        # get the config for asic namespaces
-        for asic_id in range(self.num_asics):
-            ns = "asic{}".format(asic_id)
-            port_config_path = self.get_port_config_path(asic_id)
-            asic_cmd = f"{cmd} -n {ns} -p {port_config_path}"
-            rc, out, err = self.module.run_command(asic_cmd)
+        # get the config for the host and the asic namespaces concurrently
+        namespaces = [None] + ["asic{}".format(asic_id) for asic_id in range(self.num_asics)]
+        pool = ThreadPool(processes=len(namespaces))
+        try:
+            results = pool.map(self.run_cfggen, namespaces)
+        finally:
+            pool.close()
+            pool.join()
+
+        for ns, (rc, out, err) in zip(namespaces, results):
+            ns = ns or "localhost"
             if rc != 0:
                 self.module.fail_json(msg="Failed to get config from minigraph for namespace {}: {}".format(ns, err))
             full_config[ns] = json.loads(out)
         return full_config
 
     def get_config_from_minigraph(self):
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
         return out
@@ -448,7 +477,7 @@ class GenerateGoldenConfigDBModule(object):
         return bgp_neighbors
 
     def generate_filterleaf_golden_config_db(self):
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -496,7 +525,7 @@ class GenerateGoldenConfigDBModule(object):
         return json.dumps(gold_config_db, indent=4)
 
     def generate_smartswitch_golden_config_db(self):
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -837,7 +866,7 @@ class GenerateGoldenConfigDBModule(object):
             return config
 
     def generate_default_init_config_db(self):
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -1005,7 +1034,7 @@ class GenerateGoldenConfigDBModule(object):
         Add CONSOLE_PORT and CONSOLE_SWITCH config based on serial_links data
         passed via the console_ports parameter from device_serial_link fact.
         """
-        rc, out, err = self.module.run_command("sonic-cfggen -H -m -j /etc/sonic/init_cfg.json --print-data")
+        rc, out, err = self.run_cfggen()
         if rc != 0:
             self.module.fail_json(msg="Failed to get config from minigraph: {}".format(err))
 
@@ -1105,7 +1134,7 @@ class GenerateGoldenConfigDBModule(object):
             temp_file.write(config)
         with open(GOLDEN_CONFIG_DB_PATH_ORI, "w") as temp_file:
             temp_file.write(config)
-        self.module.exit_json(change=True, msg=module_msg)
+        self.module.exit_json(change=True, msg=module_msg, namespace_gen_time=self.namespace_gen_time)
 
 
 def main():
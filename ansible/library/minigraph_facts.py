@@ -2,6 +2,9 @@
 from __future__ import print_function
 from ansible.module_utils.basic import AnsibleModule
 import calendar
+import fcntl
+import glob
+import hashlib
 import os
 import sys
 import traceback
@@ -29,12 +32,42 @@ options:
         description:
             - Set to target snmp server (normally {{inventory_hostname}})
         required: true
+    filename:
+        description:
+            - Path of the minigraph file to parse
+        required: false
+    namespace:
+        description:
+            - ASIC namespace (e.g. asic0) to retrieve the facts of
+        required: false
+    namespaces:
+        description:
+            - List of ASIC namespaces to retrieve the facts of in one pass over the minigraph. The
+              facts of each namespace are returned in minigraph_namespace_facts, keyed by namespace.
+        required: false
+    use_cache:
+        description:
+            - Reuse the facts from the fact bundle cached on the device for the same minigraph content,
+              and store the newly parsed facts in it. The bundle is keyed by the hash of the minigraph
+              file, and the facts of each namespace by the hash of the port table and HwSKU of the device,
+              so they are invalidated whenever the minigraph changes or after a breakout. Bundles older
+              than 24 hours are removed. Set to false to always parse the minigraph.
+        required: false
+        default: true
 '''
 
 EXAMPLES = '''
 # Gather minigraph facts
 - name: Gathering minigraph facts about the device
   minigraph_facts: host={{ hostname }}
+
+# Gather minigraph facts of all the ASICs of a multi-ASIC device, reusing the cached fact bundle
+- name: Gathering minigraph facts about the ASICs of the device
+  minigraph_facts: host={{ hostname }} namespaces={{ asic_namespaces }}
+
+# Gather minigraph facts without the cached fact bundle
+- name: Gathering minigraph facts about the device
+  minigraph_facts: host={{ hostname }} use_cache=false
 '''
 
 ns = "Microsoft.Search.Autopilot.Evolution"
@@ -48,6 +81,9 @@ ANSIBLE_USER_MINIGRAPH_MAX_AGE = 86400  # 24-hours (in seconds)
 backend_device_types = ['BackEndToRRouter', 'BackEndLeafRouter']
 VLAN_SUB_INTERFACE_VLAN_ID = '10'
 VLAN_SUB_INTERFACE_SEPARATOR = '.'
+MINIGRAPH_BUNDLE_FILE = '{}.facts.json'
+MINIGRAPH_BUNDLE_LOCK_FILE = 'facts.lock'
+MINIGRAPH_BUNDLE_VERSION = 2
 
 
 class minigraph_encoder(json.JSONEncoder):
@@ -621,13 +657,8 @@ def reconcile_mini_graph_locations(filename, hostname):
     :param hostname: the hostname to load (required)
     :return: tuple(the absolute filepath of the {cached,loaded} mini-graph, the root node of the loaded graph)
     """
-    if filename is not None:
-        # literal filename specified. read directly from the file.
-        mini_graph_path = filename
-    else:
-        # only the hostname was specified, determine the output path
-        mini_graph_path = '/etc/sonic/minigraph.xml'
-
+    # literal filename if specified, the minigraph of the device otherwise
+    mini_graph_path = get_minigraph_path(filename)
     root = ET.parse(mini_graph_path).getroot()
     return mini_graph_path, root
 
@@ -680,7 +711,23 @@ def parse_linkmeta(meta, hname):
 
 def parse_xml(filename, hostname, asic_name=None):
     mini_graph_path, root = reconcile_mini_graph_locations(filename, hostname)
+    return parse_xml_root(mini_graph_path, root, asic_name)
+
+
+def parse_xml_namespaces(filename, hostname, asic_names):
+    """
+    Parse the facts of several ASIC namespaces, loading the minigraph only once.
+
+    :param filename: the filename to load (may be None)
+    :param hostname: the hostname to load
+    :param asic_names: list of ASIC names, None for the facts of the whole device
+    :return: dict of ASIC name to facts
+    """
+    mini_graph_path, root = reconcile_mini_graph_locations(filename, hostname)
+    return {asic_name: parse_xml_root(mini_graph_path, root, asic_name) for asic_name in asic_names}
+
 
+def parse_xml_root(mini_graph_path, root, asic_name=None):
     u_neighbors = None
     u_devices = None
     hwsku = None
@@ -728,6 +775,11 @@ def parse_xml(filename, hostname, asic_name=None):
     global port_alias_asic_map
     global port_alias_to_port_asic_alias_map
     global port_name_to_index_map
+    global ports
+
+    # Start from empty maps, the same minigraph may be parsed for several namespaces in one run
+    ports = {}
+    port_alias_to_port_asic_alias_map = {}
 
     port_alias_to_name_map, port_alias_asic_map, port_name_to_index_map = get_port_alias_to_name_map(
         hwsku, asic_name)
@@ -920,12 +972,147 @@ port_name_to_index_map = {}
 port_alias_to_port_asic_alias_map = {}
 
 
+def get_minigraph_path(filename):
+    return filename if filename is not None else '/etc/sonic/minigraph.xml'
+
+
+def get_bundle_key(hostname, asic_name):
+    return '{}|{}'.format(hostname, asic_name or '')
+
+
+def get_device_state_digest(asic_name):
+    """
+    Besides the minigraph, the facts depend on the port table, the HwSKU and the namespaces of the device,
+    which change with a breakout or a new port_config.
+
+    :param asic_name: ASIC name, None for the whole device
+    :return: digest of the device state the facts of the ASIC are built from, empty off the device
+    """
+    try:
+        from sonic_py_common import device_info, multi_asic
+        from ansible.module_utils.multi_asic_utils import load_db_config
+    except ImportError:
+        return ''
+    load_db_config()
+    state = [device_info.get_hwsku(), multi_asic.get_namespace_list(), multi_asic.get_port_table(namespace=asic_name)]
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def get_bundle_path(mini_graph_path):
+    """
+    :param mini_graph_path: path of the minigraph file
+    :return: path of the fact bundle of the current content of the minigraph file
+    """
+    digest = hashlib.sha1()
+    digest.update(os.path.abspath(mini_graph_path).encode('utf-8'))
+    with open(mini_graph_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return os.path.join(ANSIBLE_USER_MINIGRAPH_PATH, MINIGRAPH_BUNDLE_FILE.format(digest.hexdigest()))
+
+
+def load_bundle(bundle_path):
+    """
+    :param bundle_path: path of the fact bundle
+    :return: dict of bundle key to device state digest and facts, empty if the bundle does not exist or is not usable
+    """
+    try:
+        with open(bundle_path) as f:
+            bundle = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if bundle.get('version') != MINIGRAPH_BUNDLE_VERSION:
+        return {}
+    return bundle.get('facts', {})
+
+
+def save_bundle(bundle_path, facts):
+    """
+    Write the fact bundle atomically, concurrent module runs read either the old or the new bundle.
+    """
+    tmp_path = '{}.{}.tmp'.format(bundle_path, os.getpid())
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MINIGRAPH_BUNDLE_VERSION, 'facts': facts}, f, cls=minigraph_encoder)
+        os.rename(tmp_path, bundle_path)
+    except (IOError, OSError):
+        # The bundle is only a cache, the parsed facts are returned anyway
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def prune_bundles(keep_path):
+    """
+    Remove the fact bundles not updated for ANSIBLE_USER_MINIGRAPH_MAX_AGE, they belong to previous minigraphs.
+    """
+    for bundle_path in glob.glob(os.path.join(ANSIBLE_USER_MINIGRAPH_PATH, MINIGRAPH_BUNDLE_FILE.format('*'))):
+        try:
+            age = time.time() - os.path.getmtime(bundle_path)
+            if bundle_path != keep_path and age > ANSIBLE_USER_MINIGRAPH_MAX_AGE:
+                os.remove(bundle_path)
+        except OSError:
+            pass
+
+
+def update_bundle(bundle_path, new_facts):
+    """
+    Merge the newly parsed facts into the fact bundle. The per-ASIC module runs of a multi-ASIC device
+    update the same bundle concurrently, the read-modify-write is serialized with a lock file.
+    """
+    with open(os.path.join(ANSIBLE_USER_MINIGRAPH_PATH, MINIGRAPH_BUNDLE_LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            bundle = load_bundle(bundle_path)
+            bundle.update(new_facts)
+            save_bundle(bundle_path, bundle)
+            prune_bundles(bundle_path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def get_facts(filename, hostname, asic_names, use_cache=True):
+    """
+    Get the minigraph facts of several ASIC namespaces, from the cached fact bundle if enabled.
+
+    :param filename: the filename to load (may be None)
+    :param hostname: the hostname to load
+    :param asic_names: list of ASIC names, None for the facts of the whole device
+    :param use_cache: whether to reuse and update the fact bundle cached on the device
+    :return: dict of ASIC name to JSON serializable facts
+    """
+    if not use_cache:
+        results = parse_xml_namespaces(filename, hostname, asic_names)
+        return {asic_name: json.loads(json.dumps(facts, cls=minigraph_encoder))
+                for asic_name, facts in results.items()}
+
+    bundle_path = get_bundle_path(get_minigraph_path(filename))
+    bundle = load_bundle(bundle_path)
+    states = {asic_name: get_device_state_digest(asic_name) for asic_name in asic_names}
+    facts = {}
+    for asic_name in asic_names:
+        entry = bundle.get(get_bundle_key(hostname, asic_name))
+        if entry and entry['state'] == states[asic_name]:
+            facts[asic_name] = entry['facts']
+    missing = [asic_name for asic_name in asic_names if asic_name not in facts]
+    if missing:
+        # Parse outside of the lock, the module runs of the other ASICs parse concurrently
+        results = parse_xml_namespaces(filename, hostname, missing)
+        new_facts = {}
+        for asic_name, asic_facts in results.items():
+            facts[asic_name] = json.loads(json.dumps(asic_facts, cls=minigraph_encoder))
+            new_facts[get_bundle_key(hostname, asic_name)] = {'state': states[asic_name], 'facts': facts[asic_name]}
+        update_bundle(bundle_path, new_facts)
+    return facts
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
             host=dict(required=True),
             filename=dict(),
             namespace=dict(required=False, default=None),
+            namespaces=dict(required=False, type='list', default=None),
+            use_cache=dict(required=False, type='bool', default=True),
         ),
         supports_check_mode=True
     )
@@ -952,10 +1139,14 @@ def main():
         filename = None
 
     namespace = m_args['namespace']
+    namespaces = m_args['namespaces'] or []
 
     try:
-        results = parse_xml(filename, m_args['host'], namespace)
-        results_clean = json.loads(json.dumps(results, cls=minigraph_encoder))
+        asic_names = [namespace] + [asic_name for asic_name in namespaces if asic_name != namespace]
+        results = get_facts(filename, m_args['host'], asic_names, m_args['use_cache'])
+        results_clean = dict(results[namespace])
+        if namespaces:
+            results_clean['minigraph_namespace_facts'] = {asic_name: results[asic_name] for asic_name in namespaces}
         module.exit_json(ansible_facts=results_clean)
     except Exception as e:
         tb = traceback.format_exc()
@@ -969,5 +1160,43 @@ def print_parse_xml(hostname):
     print(json.dumps(results, indent=3, cls=minigraph_encoder))
 
 
+def benchmark_parse_xml(filename, hostname, asic_names, iterations=5):
+    """
+    Compare the time to get the facts of several ASIC namespaces of a large (e.g. T2) minigraph:
+    parsing the minigraph once per namespace, once for all the namespaces, and from the fact bundle.
+
+    Run from ansible/library:
+        python -c "import minigraph_facts as m; m.benchmark_parse_xml('t2.xml', 'dut', ['asic0', 'asic1'])"
+    """
+    def _time(func):
+        start = time.time()
+        for _ in range(iterations):
+            func()
+        return (time.time() - start) / iterations
+
+    try:
+        os.makedirs(ANSIBLE_USER_MINIGRAPH_PATH)
+    except OSError:
+        pass
+    bundle_path = get_bundle_path(filename)
+    if os.path.exists(bundle_path):
+        os.remove(bundle_path)
+
+    # The first cached run parses the minigraph and writes the bundle, the following runs only load it
+    start = time.time()
+    get_facts(filename, hostname, asic_names, use_cache=True)
+    first_cached = time.time() - start
+
+    timings = [
+        ('parse per namespace', _time(lambda: [parse_xml(filename, hostname, asic_name) for asic_name in asic_names])),
+        ('parse once for all namespaces', _time(lambda: parse_xml_namespaces(filename, hostname, asic_names))),
+        ('cache miss', first_cached),
+        ('cache hit', _time(lambda: get_facts(filename, hostname, asic_names, use_cache=True))),
+    ]
+    for name, seconds in timings:
+        print("{:<32}{:.3f}s".format(name, seconds))
+    return timings
+
+
 if __name__ == "__main__":
     main()
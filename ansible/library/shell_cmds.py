@@ -6,6 +6,10 @@
 # enhancement can reduce some overhead of establishing connection with the remote host when we want to run multiple
 # commands.
 #
+# The commands can also be run concurrently by a pool of workers with the "concurrency" option. A list of commands in
+# place of a command is a group of dependent commands, which are always run in sequence by the same worker. The results
+# are returned in the order of the commands, the "start" and "end" of each result show the overlap achieved.
+#
 # Example of module output:
 # {
 #   "end": "2020-09-23 09:18:58.252273",
@@ -58,6 +62,8 @@
 # }
 
 import datetime
+import threading
+from multiprocessing.pool import ThreadPool
 
 from ansible.module_utils.basic import AnsibleModule
 
@@ -70,9 +76,13 @@ short_description: Run multiple commands on remote host.
 description:
     - Run multiple commands by /bin/sh on remote host.
 options:
-    cmds: List of commands. Each command should be a string.
+    cmds: List of commands. Each command should be a string, or a list of strings for a group of commands which
+          must be run in sequence when running concurrently.
     continue_on_fail: Bool. Specify whether to continue running rest of the commands if any of the command failed.
+                      When running concurrently, the commands already started are not interrupted.
     timeout: Integer. Specify time limit (in second) for each command. 0 means no limit. Default value is 0.
+    concurrency: Integer. Max number of commands or groups of commands run at the same time. Default value is 1,
+                 which runs all the commands in sequence.
 '''
 
 EXAMPLES = r'''
@@ -84,6 +94,16 @@ EXAMPLES = r'''
         - pwd
     continue_on_fail: False
     timeout: 30
+
+# Run independent commands concurrently, the commands of the group are run in sequence
+- name: Run multiple commands on remote host concurrently
+  shell_cmds:
+    cmds:
+        - show interfaces counters -n asic0
+        - show interfaces counters -n asic1
+        - - config feature state lldp disabled
+          - systemctl is-active lldp
+    concurrency: 4
 '''
 
 
@@ -119,31 +139,60 @@ def run_cmd(module, cmd, timeout):
     return result
 
 
+def get_groups(cmds):
+    return [cmd if isinstance(cmd, list) else [cmd] for cmd in cmds]
+
+
+def run_group(module, group, timeout, continue_on_fail, stop_event):
+    results = []
+    for cmd in group:
+        if stop_event.is_set():
+            break
+        result = run_cmd(module, cmd, timeout)
+        results.append(result)
+        if result['rc'] != 0 and not continue_on_fail:
+            stop_event.set()
+            break
+    return results
+
+
+def run_cmds(module, cmds, timeout, continue_on_fail, concurrency):
+    groups = get_groups(cmds)
+    stop_event = threading.Event()
+    if concurrency <= 1 or len(groups) <= 1:
+        return run_group(module, [cmd for group in groups for cmd in group], timeout, continue_on_fail,
+                         stop_event)
+
+    pool = ThreadPool(processes=min(concurrency, len(groups)))
+    try:
+        group_results = pool.map(lambda group: run_group(module, group, timeout, continue_on_fail, stop_event),
+                                 groups)
+    finally:
+        pool.close()
+        pool.join()
+    return [result for results in group_results for result in results]
+
+
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
             cmds=dict(type='list', required=True),
             continue_on_fail=dict(type='bool', default=True),
-            timeout=dict(type='int', default=0)
+            timeout=dict(type='int', default=0),
+            concurrency=dict(type='int', default=1)
         )
     )
 
     cmds = module.params['cmds']
     continue_on_fail = module.params['continue_on_fail']
     timeout = module.params['timeout']
+    concurrency = module.params['concurrency']
 
     startd = datetime.datetime.now()
 
-    results = []
-    failed_cmds = []
-    for cmd in cmds:
-        result = run_cmd(module, cmd, timeout)
-        results.append(result)
-        if result['rc'] != 0:
-            failed_cmds.append(cmd)
-            if not continue_on_fail:
-                break
+    results = run_cmds(module, cmds, timeout, continue_on_fail, concurrency)
+    failed_cmds = [result['cmd'] for result in results if result['rc'] != 0]
 
     endd = datetime.datetime.now()
     delta = endd - startd
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.facts_parse_utils import parse_interface_status
 import re
 
 DOCUMENTATION = '''
@@ -101,28 +102,7 @@ class ShowInterfaceModule(object):
             self.collect_interface_counter(namespace, include_internal_intfs)
         self.module.exit_json(ansible_facts=self.facts)
 
-    def _fetch_interface_type(self, line):
-        """
-            Fetch the type from the line
-            There can be spaces in type field so we can not match it via using regular expression
-            The logic is to split the line into a list by spaces and the remove all the leading and tail elements,
-            and then piece the rest together
-            Eg. for output "Ethernet48  192,193,194,195  100G  9100  N/A  etp49  routed  up  up  QSFP28 or later  N/A"
-            the list is ['Ethernet48', '192,193,194,195', '100G', '9100', 'N/A', 'etp49',
-                         'routed', 'up', 'up'  'QSFP28', 'or', 'later', 'N/A']
-            There is no space in the rest elements, so we can remove the first 9 and the last 1 elements,
-            and piece 'QSFP28', 'or', 'later' together.
-            This function should be called on if regex_int_fec is matched.
-        """
-        return ' '.join(line.split()[9:-1])
-
     def collect_interface_status(self, namespace=None, include_internal_intfs=False, include_inband_intfs=False):
-        regex_int_fec = re.compile(
-            r'(\S+)\s+[\d,N\/A]+\s+(\w+)\s+(\d+)\s+(rs|fc|N\/A|none)\s+([\w\/]+)\s+(\w+)\s+(\w+)\s+(\w+)')
-        regex_int = re.compile(
-            r'(\S+)\s+[\d,N\/A]+\s+(\w+)\s+(\d+)\s+([\w\/]+)\s+(\w+)\s+(\w+)\s+(\w+)')
-        regex_int_internal = re.compile(
-            r'(\S+)\s+[\d,N\/A]+\s+(\w+)\s+(\d+)\s+(rs|N\/A)\s+([\w\-]+)\s+(\w+)\s+(\w+)\s+(\w+)')
         self.int_status = {}
         if self.m_args['interfaces'] is not None:
             for interface in self.m_args['interfaces']:
@@ -131,34 +111,8 @@ class ShowInterfaceModule(object):
                 try:
                     rc, self.out, err = self.module.run_command(
                         command, executable='/bin/bash', use_unsafe_shell=True)
-                    for line in self.out.split("\n"):
-                        line = line.strip()
-                        fec = regex_int_fec.match(line)
-                        old = regex_int.match(line)
-                        if fec and interface == fec.group(1):
-                            self.int_status[interface]['name'] = fec.group(1)
-                            self.int_status[interface]['speed'] = fec.group(2)
-                            self.int_status[interface]['fec'] = fec.group(4)
-                            self.int_status[interface]['alias'] = fec.group(5)
-                            self.int_status[interface]['vlan'] = fec.group(6)
-                            self.int_status[interface]['oper_state'] = fec.group(
-                                7)
-                            self.int_status[interface]['admin_state'] = fec.group(
-                                8)
-                            self.int_status[interface]['type'] = self._fetch_interface_type(
-                                line)
-                        elif old and interface == old.group(1):
-                            self.int_status[interface]['name'] = old.group(1)
-                            self.int_status[interface]['speed'] = old.group(2)
-                            self.int_status[interface]['fec'] = 'Unknown'
-                            self.int_status[interface]['alias'] = old.group(4)
-                            self.int_status[interface]['vlan'] = old.group(5)
-                            self.int_status[interface]['oper_state'] = old.group(
-                                6)
-                            self.int_status[interface]['admin_state'] = old.group(
-                                7)
-                            self.int_status[interface]['type'] = 'N/A'
-                        self.facts['int_status'] = self.int_status
+                    self.int_status[interface] = parse_interface_status(self.out.split("\n")).get(interface, {})
+                    self.facts['int_status'] = self.int_status
                 except Exception as e:
                     self.module.fail_json(msg=str(e))
                 if rc != 0:
@@ -175,50 +129,8 @@ class ShowInterfaceModule(object):
                 intf_status_cmd = "show interface status{}".format(cli_options)
                 rc, self.out, err = self.module.run_command(
                     intf_status_cmd, executable='/bin/bash', use_unsafe_shell=True)
-                for line in self.out.split("\n"):
-                    line = line.strip()
-                    fec = regex_int_fec.match(line)
-                    old = regex_int.match(line)
-                    internal = regex_int_internal.match(line)
-                    if fec:
-                        interface = fec.group(1)
-                        self.int_status[interface] = {}
-                        self.int_status[interface]['name'] = interface
-                        self.int_status[interface]['speed'] = fec.group(2)
-                        self.int_status[interface]['fec'] = fec.group(4)
-                        self.int_status[interface]['alias'] = fec.group(5)
-                        self.int_status[interface]['vlan'] = fec.group(6)
-                        self.int_status[interface]['oper_state'] = fec.group(7)
-                        self.int_status[interface]['admin_state'] = fec.group(
-                            8)
-                        self.int_status[interface]['type'] = self._fetch_interface_type(
-                            line)
-                    elif old:
-                        interface = old.group(1)
-                        self.int_status[interface] = {}
-                        self.int_status[interface]['name'] = interface
-                        self.int_status[interface]['speed'] = old.group(2)
-                        self.int_status[interface]['fec'] = 'Unknown'
-                        self.int_status[interface]['alias'] = old.group(4)
-                        self.int_status[interface]['vlan'] = old.group(5)
-                        self.int_status[interface]['oper_state'] = old.group(6)
-                        self.int_status[interface]['admin_state'] = old.group(
-                            7)
-                        self.int_status[interface]['type'] = 'N/A'
-                    elif internal and include_internal_intfs:
-                        interface = internal.group(1)
-                        self.int_status[interface] = {}
-                        self.int_status[interface]['name'] = interface
-                        self.int_status[interface]['speed'] = internal.group(2)
-                        self.int_status[interface]['fec'] = internal.group(4)
-                        self.int_status[interface]['alias'] = internal.group(5)
-                        self.int_status[interface]['vlan'] = internal.group(6)
-                        self.int_status[interface]['oper_state'] = internal.group(
-                            7)
-                        self.int_status[interface]['admin_state'] = internal.group(
-                            8)
-                        self.int_status[interface]['type'] = 'N/A'
-                    self.facts['int_status'] = self.int_status
+                self.int_status = parse_interface_status(self.out.split("\n"), include_internal_intfs)
+                self.facts['int_status'] = self.int_status
             except Exception as e:
                 self.module.fail_json(msg=str(e))
             if rc != 0:
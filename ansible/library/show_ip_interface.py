@@ -1,7 +1,7 @@
 #!/usr/bin/python
 
 from ansible.module_utils.basic import AnsibleModule
-import re
+from ansible.module_utils.facts_parse_utils import parse_ip_interfaces
 
 DOCUMENTATION = '''
 module: show_ip_interface.py
@@ -46,20 +46,6 @@ class ShowIpInterfaceModule(object):
         """
             Main method of the class
         """
-        regex_int = re.compile(
-            r"\s*(\S+)\s+"                                    # interface name
-            r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\/(\d{1,2})\s*"  # IPv4
-            r"(up|down)\/(up|down)\s*"                        # oper/admin state
-            r"(\S+)\s*"                                       # neighbor name
-            r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|N\/A)\s*"   # peer IPv4
-        )
-
-        regex_old = re.compile(
-            r"\s*(\S+)\s+"                                    # interface name
-            r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\/(\d{1,2})\s*"  # IPv4
-            r"(up|down)\/(up|down)\s*"                        # oper/admin state
-        )
-
         self.ip_int = {}
         try:
             rc, self.out, err = self.module.run_command(
@@ -67,24 +53,7 @@ class ShowIpInterfaceModule(object):
                 executable='/bin/bash',
                 use_unsafe_shell=True
             )
-            for line in self.out.split("\n"):
-                line = line.strip()
-                m = re.match(regex_int, line)
-                om = re.match(regex_old, line)
-                if m:
-                    self.ip_int[m.group(1)] = {}
-                    self.ip_int[m.group(1)]["ipv4"] = m.group(2)
-                    self.ip_int[m.group(1)]["prefix_len"] = m.group(3)
-                    self.ip_int[m.group(1)]["admin"] = m.group(4)
-                    self.ip_int[m.group(1)]["oper_state"] = m.group(5)
-                    self.ip_int[m.group(1)]["bgp_neighbor"] = m.group(6)
-                    self.ip_int[m.group(1)]["peer_ipv4"] = m.group(7)
-                elif om:
-                    self.ip_int[om.group(1)] = {}
-                    self.ip_int[om.group(1)]["ipv4"] = om.group(2)
-                    self.ip_int[om.group(1)]["prefix_len"] = om.group(3)
-                    self.ip_int[om.group(1)]["admin"] = om.group(4)
-                    self.ip_int[om.group(1)]["oper_state"] = om.group(5)
+            self.ip_int = parse_ip_interfaces(self.out.split("\n"), 4)
             self.facts['ip_interfaces'] = self.ip_int
         except Exception as e:
             self.module.fail_json(msg=str(e))
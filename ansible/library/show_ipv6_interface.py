@@ -1,7 +1,7 @@
 #!/usr/bin/python
 
 from ansible.module_utils.basic import AnsibleModule
-import re
+from ansible.module_utils.facts_parse_utils import parse_ip_interfaces
 
 DOCUMENTATION = '''
 module: show_ipv6_interface.py
@@ -46,20 +46,6 @@ class ShowIpv6InterfaceModule(object):
         """
             Main method of the class
         """
-        regex_int = re.compile(
-            r"\s*(\S+)\s+"                                    # interface name
-            r"([0-9a-fA-F:]+)\/(\d{1,3})\s*"                 # IPv6 address/prefix
-            r"(up|down)\/(up|down)\s*"                        # oper/admin state
-            r"(\S+)\s*"                                       # neighbor name
-            r"([0-9a-fA-F:]+|N\/A)\s*"                       # peer IPv6
-        )
-
-        regex_old = re.compile(
-            r"\s*(\S+)\s+"                                    # interface name
-            r"([0-9a-fA-F:]+)\/(\d{1,3})\s*"                 # IPv6 address/prefix
-            r"(up|down)\/(up|down)\s*"                        # oper/admin state
-        )
-
         self.ipv6_int = {}
         try:
             rc, self.out, err = self.module.run_command(
@@ -67,24 +53,7 @@ class ShowIpv6InterfaceModule(object):
                 executable='/bin/bash',
                 use_unsafe_shell=True
             )
-            for line in self.out.split("\n"):
-                line = line.strip()
-                m = re.match(regex_int, line)
-                om = re.match(regex_old, line)
-                if m:
-                    self.ipv6_int[m.group(1)] = {}
-                    self.ipv6_int[m.group(1)]["ipv6"] = m.group(2)
-                    self.ipv6_int[m.group(1)]["prefix_len"] = m.group(3)
-                    self.ipv6_int[m.group(1)]["admin"] = m.group(4)
-                    self.ipv6_int[m.group(1)]["oper_state"] = m.group(5)
-                    self.ipv6_int[m.group(1)]["bgp_neighbor"] = m.group(6)
-                    self.ipv6_int[m.group(1)]["peer_ipv6"] = m.group(7)
-                elif om:
-                    self.ipv6_int[om.group(1)] = {}
-                    self.ipv6_int[om.group(1)]["ipv6"] = om.group(2)
-                    self.ipv6_int[om.group(1)]["prefix_len"] = om.group(3)
-                    self.ipv6_int[om.group(1)]["admin"] = om.group(4)
-                    self.ipv6_int[om.group(1)]["oper_state"] = om.group(5)
+            self.ipv6_int = parse_ip_interfaces(self.out.split("\n"), 6)
             self.facts['ipv6_interfaces'] = self.ipv6_int
         except Exception as e:
             self.module.fail_json(msg=str(e))
@@ -0,0 +1,286 @@
+"""
+Parsers of the command outputs of the facts modules (show_interface, show_ip_interface, show_ipv6_interface,
+bgp_facts and config_facts). They are also loaded by the sanity check health snapshot, which runs the same
+commands in one script, so keep them free of ansible dependencies.
+"""
+import re
+
+TABLE_NAME_SEPARATOR = '|'
+
+REGEX_INT_STATUS_FEC = re.compile(
+    r'(\S+)\s+[\d,N\/A]+\s+(\w+)\s+(\d+)\s+(rs|fc|N\/A|none)\s+([\w\/]+)\s+(\w+)\s+(\w+)\s+(\w+)')
+REGEX_INT_STATUS = re.compile(
+    r'(\S+)\s+[\d,N\/A]+\s+(\w+)\s+(\d+)\s+([\w\/]+)\s+(\w+)\s+(\w+)\s+(\w+)')
+REGEX_INT_STATUS_INTERNAL = re.compile(
+    r'(\S+)\s+[\d,N\/A]+\s+(\w+)\s+(\d+)\s+(rs|N\/A)\s+([\w\-]+)\s+(\w+)\s+(\w+)\s+(\w+)')
+
+REGEX_IP_INTERFACE = {
+    4: re.compile(
+        r"\s*(\S+)\s+"                                    # interface name
+        r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\/(\d{1,2})\s*"  # IPv4
+        r"(up|down)\/(up|down)\s*"                        # oper/admin state
+        r"(\S+)\s*"                                       # neighbor name
+        r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|N\/A)\s*"   # peer IPv4
+    ),
+    6: re.compile(
+        r"\s*(\S+)\s+"                                    # interface name
+        r"([0-9a-fA-F:]+)\/(\d{1,3})\s*"                 # IPv6 address/prefix
+        r"(up|down)\/(up|down)\s*"                        # oper/admin state
+        r"(\S+)\s*"                                       # neighbor name
+        r"([0-9a-fA-F:]+|N\/A)\s*"                       # peer IPv6
+    ),
+}
+REGEX_IP_INTERFACE_OLD = {
+    4: re.compile(
+        r"\s*(\S+)\s+"                                    # interface name
+        r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\/(\d{1,2})\s*"  # IPv4
+        r"(up|down)\/(up|down)\s*"                        # oper/admin state
+    ),
+    6: re.compile(
+        r"\s*(\S+)\s+"                                    # interface name
+        r"([0-9a-fA-F:]+)\/(\d{1,3})\s*"                 # IPv6 address/prefix
+        r"(up|down)\/(up|down)\s*"                        # oper/admin state
+    ),
+}
+
+REGEX_BGP_IPV4 = re.compile(r'^BGP neighbor is \*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
+REGEX_BGP_CONFED_LINK = re.compile(r'^BGP neighbor is .*(confed-(?:internal|external) link)')
+REGEX_BGP_IPV6 = re.compile(r'^BGP neighbor is \*?([0-9a-fA-F:]+)')
+REGEX_BGP_REMOTE_AS = re.compile(r'.*remote AS (\d+)')
+REGEX_BGP_LOCAL_AS = re.compile(r'.*local AS (\d+)')
+REGEX_BGP_DESC = re.compile(r'.*Description: (.*)')
+REGEX_BGP_ADMIN_DOWN = re.compile(r'.*Administratively shut down')
+REGEX_BGP_ROUTERID = re.compile(r'.*remote router ID (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
+REGEX_BGP_STATE = re.compile(r'.*BGP state = (\w+)')
+REGEX_BGP_STATS = re.compile(r'.*(Opens|Notifications|Updates|Keepalives|Route Refresh|Capability|Total):.*')
+REGEX_BGP_MRAI = re.compile(r'.*Minimum time between advertisement runs is (\d{1,4})')
+REGEX_BGP_ACCEPTED = re.compile(r'.*(\d+) accepted')
+REGEX_BGP_CONN_EST = re.compile(r'.*Connections established (\d+)')
+REGEX_BGP_CONN_DROPPED = re.compile(r'.*Connections established \d+; dropped (\d+)')
+REGEX_BGP_PEER_GROUP = re.compile(r'.*Member of peer-group (.*) for session parameters')
+REGEX_BGP_SUBNET = re.compile(r'.*subnet range group: (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\/\d{1,2})')
+REGEX_BGP_CAP_GR = re.compile(r'.*Graceful Restart Capabilty: (\w+)')
+REGEX_BGP_CAP_GR_PEER_RESTART_TIME = re.compile(r'.*Remote Restart timer is (\d+)')
+REGEX_BGP_CAP_GR_PEER_AF_IP4 = re.compile(r'.*IPv4 Unicast\((.*)\)')
+REGEX_BGP_CAP_GR_PEER_AF_IP6 = re.compile(r'.*IPv6 Unicast\((.*)\)')
+
+
+def _fetch_interface_type(line):
+    """
+        Fetch the type from the line
+        There can be spaces in type field so we can not match it via using regular expression
+        The logic is to split the line into a list by spaces and the remove all the leading and tail elements,
+        and then piece the rest together
+        Eg. for output "Ethernet48  192,193,194,195  100G  9100  N/A  etp49  routed  up  up  QSFP28 or later  N/A"
+        the list is ['Ethernet48', '192,193,194,195', '100G', '9100', 'N/A', 'etp49',
+                     'routed', 'up', 'up'  'QSFP28', 'or', 'later', 'N/A']
+        There is no space in the rest elements, so we can remove the first 9 and the last 1 elements,
+        and piece 'QSFP28', 'or', 'later' together.
+        This function should be called on if REGEX_INT_STATUS_FEC is matched.
+    """
+    return ' '.join(line.split()[9:-1])
+
+
+def parse_interface_status(output_lines, include_internal_intfs=False):
+    """Parse the output of 'show interface status'.
+
+    Returns:
+        Dictionary of interface name to its 'name', 'speed', 'fec', 'alias', 'vlan', 'oper_state', 'admin_state'
+        and 'type'
+    """
+    int_status = {}
+    for line in output_lines:
+        line = line.strip()
+        fec = REGEX_INT_STATUS_FEC.match(line)
+        old = REGEX_INT_STATUS.match(line)
+        internal = REGEX_INT_STATUS_INTERNAL.match(line)
+        if fec:
+            int_status[fec.group(1)] = {
+                'name': fec.group(1),
+                'speed': fec.group(2),
+                'fec': fec.group(4),
+                'alias': fec.group(5),
+                'vlan': fec.group(6),
+                'oper_state': fec.group(7),
+                'admin_state': fec.group(8),
+                'type': _fetch_interface_type(line),
+            }
+        elif old:
+            int_status[old.group(1)] = {
+                'name': old.group(1),
+                'speed': old.group(2),
+                'fec': 'Unknown',
+                'alias': old.group(4),
+                'vlan': old.group(5),
+                'oper_state': old.group(6),
+                'admin_state': old.group(7),
+                'type': 'N/A',
+            }
+        elif internal and include_internal_intfs:
+            int_status[internal.group(1)] = {
+                'name': internal.group(1),
+                'speed': internal.group(2),
+                'fec': internal.group(4),
+                'alias': internal.group(5),
+                'vlan': internal.group(6),
+                'oper_state': internal.group(7),
+                'admin_state': internal.group(8),
+                'type': 'N/A',
+            }
+    return int_status
+
+
+def parse_ip_interfaces(output_lines, version=4):
+    """Parse the output of 'show ip interfaces' (version 4) or 'show ipv6 interfaces' (version 6).
+
+    Returns:
+        Dictionary of interface name to its 'ipv4' or 'ipv6', 'prefix_len', 'admin', 'oper_state',
+        and when present 'bgp_neighbor' and 'peer_ipv4' or 'peer_ipv6'
+    """
+    ip_key = 'ipv{}'.format(version)
+    ip_int = {}
+    for line in output_lines:
+        line = line.strip()
+        m = REGEX_IP_INTERFACE[version].match(line)
+        om = REGEX_IP_INTERFACE_OLD[version].match(line)
+        if m:
+            ip_int[m.group(1)] = {
+                ip_key: m.group(2),
+                'prefix_len': m.group(3),
+                'admin': m.group(4),
+                'oper_state': m.group(5),
+                'bgp_neighbor': m.group(6),
+                'peer_' + ip_key: m.group(7),
+            }
+        elif om:
+            ip_int[om.group(1)] = {
+                ip_key: om.group(2),
+                'prefix_len': om.group(3),
+                'admin': om.group(4),
+                'oper_state': om.group(5),
+            }
+    return ip_int
+
+
+def parse_bgp_neighbors(output):
+    """Parse the output of 'show ip bgp neighbor' in vtysh.
+
+    Returns:
+        Dictionary of neighbor address to its facts
+    """
+    neighbors = {}
+    for n in output.split("BGP neighbor is"):
+
+        # ignore empty rows
+        if 'BGP' not in n:
+            continue
+
+        neighbor = {}
+        capabilities = {}
+        message_stats = {}
+        neighbor['admin'] = 'up'
+        neighbor['accepted prefixes'] = 0
+        neighbor_ip = None
+
+        for line in ("BGP neighbor is" + n).splitlines():
+            if REGEX_BGP_CONFED_LINK.match(line):
+                neighbor['confed_peer'] = True
+                confed_peer_type = REGEX_BGP_CONFED_LINK.match(line).group(1)
+                neighbor['confed_peer_type'] = 'external' if confed_peer_type == 'confed-external link' else 'internal'
+            if REGEX_BGP_IPV4.match(line):
+                neighbor_ip = REGEX_BGP_IPV4.match(line).group(1)
+                neighbor['ip_version'] = 4
+            elif REGEX_BGP_IPV6.match(line):
+                neighbor_ip = REGEX_BGP_IPV6.match(line).group(1).lower()
+                neighbor['ip_version'] = 6
+            if REGEX_BGP_REMOTE_AS.match(line):
+                neighbor['remote AS'] = int(REGEX_BGP_REMOTE_AS.match(line).group(1))
+            if REGEX_BGP_LOCAL_AS.match(line):
+                neighbor['local AS'] = int(REGEX_BGP_LOCAL_AS.match(line).group(1))
+            if REGEX_BGP_DESC.match(line):
+                neighbor['description'] = REGEX_BGP_DESC.match(line).group(1)
+            if REGEX_BGP_ADMIN_DOWN.match(line):
+                neighbor['admin'] = 'down'
+            if REGEX_BGP_ROUTERID.match(line):
+                neighbor['remote routerid'] = REGEX_BGP_ROUTERID.match(line).group(1)
+            if REGEX_BGP_STATE.match(line):
+                neighbor['state'] = REGEX_BGP_STATE.match(line).group(1).lower()
+            if REGEX_BGP_MRAI.match(line):
+                neighbor['mrai'] = int(REGEX_BGP_MRAI.match(line).group(1))
+            if REGEX_BGP_ACCEPTED.match(line):
+                neighbor['accepted prefixes'] += int(REGEX_BGP_ACCEPTED.match(line).group(1))
+            if REGEX_BGP_CONN_EST.match(line):
+                neighbor['connections established'] = int(REGEX_BGP_CONN_EST.match(line).group(1))
+            if REGEX_BGP_CONN_DROPPED.match(line):
+                neighbor['connections dropped'] = int(REGEX_BGP_CONN_DROPPED.match(line).group(1))
+            if REGEX_BGP_PEER_GROUP.match(line):
+                neighbor['peer group'] = REGEX_BGP_PEER_GROUP.match(line).group(1)
+            if REGEX_BGP_SUBNET.match(line):
+                neighbor['subnet'] = REGEX_BGP_SUBNET.match(line).group(1)
+
+            if REGEX_BGP_CAP_GR.match(line):
+                capabilities['graceful restart'] = REGEX_BGP_CAP_GR.match(line).group(1).lower()
+            if REGEX_BGP_CAP_GR_PEER_RESTART_TIME.match(line):
+                capabilities['peer restart timer'] = int(REGEX_BGP_CAP_GR_PEER_RESTART_TIME.match(line).group(1))
+            if REGEX_BGP_CAP_GR_PEER_AF_IP4.match(line):
+                capabilities['peer af ipv4 unicast'] = REGEX_BGP_CAP_GR_PEER_AF_IP4.match(line).group(1).lower()
+            if REGEX_BGP_CAP_GR_PEER_AF_IP6.match(line):
+                capabilities['peer af ipv6 unicast'] = REGEX_BGP_CAP_GR_PEER_AF_IP6.match(line).group(1).lower()
+
+            if REGEX_BGP_STATS.match(line):
+                try:
+                    key, values = line.split(':')
+                    key = key.lstrip()
+                    sent, rcvd = values.split()
+                    message_stats[key] = {'sent': int(sent), 'rcvd': int(rcvd)}
+                except Exception:
+                    print("NonFatal: line:'{}' should not have matched for sent/rcvd count".format(line))
+
+            if capabilities:
+                neighbor['capabilities'] = capabilities
+
+            if message_stats:
+                neighbor['message statistics'] = message_stats
+
+        if neighbor_ip:
+            neighbors[neighbor_ip] = neighbor
+
+    return neighbors
+
+
+def format_config(json_data):
+    """Format config data.
+    Returns:
+        Config data in a dictionary form of TABLE, KEY, [ ENTRY ], FV
+    Example:
+    {
+    "VLAN_MEMBER": {
+        "Vlan1000|Ethernet2": {
+            "tagging_mode": "untagged"
+        },
+        "Vlan1000|Ethernet4": {
+            "tagging_mode": "untagged"
+        }
+    }
+    Is converted into
+     'VLAN_MEMBER': {'Vlan1000': {'Ethernet10': {'tagging_mode': 'untagged'},
+                                  'Ethernet12': {'tagging_mode': 'untagged'}
+                    }
+    """
+    res = {}
+    for table, item in json_data.items():
+        data = {}
+        for key, entry in item.items():
+            try:
+                (key_l1, key_l2) = key.split(TABLE_NAME_SEPARATOR, 1)
+                data.setdefault(key_l1, {})[key_l2] = entry
+            except ValueError:
+                # This is a single level key
+                if key not in data:
+                    data[key] = entry
+                else:
+                    data[key].update(entry)
+
+        res.setdefault(table, data)
+
+    return res
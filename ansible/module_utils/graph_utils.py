@@ -1,6 +1,9 @@
 import csv
 import os
+import hashlib
+import json
 import logging
+import pickle
 import ipaddress
 import six
 from operator import itemgetter
@@ -12,6 +15,11 @@ try:
 except ImportError:
     from module_utils.port_utils import get_port_alias_to_name_map
 
+GRAPH_CACHE_PATH = os.path.expanduser('~/.ansible/conn_graph')
+GRAPH_CACHE_VERSION = 1
+GRAPH_CACHE_FILE = '{}.graph.pickle'
+GRAPH_INDEX_FILE = '{}.index.json'
+
 
 class LabGraph(object):
 
@@ -25,7 +33,7 @@ class LabGraph(object):
         "serial_links": "sonic_{}_serial_links.csv",
     }
 
-    def __init__(self, path, group, forced_mgmt_routes=None):
+    def __init__(self, path, group, forced_mgmt_routes=None, graph_facts=None):
         self.path = path
         self.group = group
         self.csv_files = {k: os.path.join(self.path, v.format(group)) for k, v in self.SUPPORTED_CSV_FILES.items()}
@@ -39,10 +47,13 @@ class LabGraph(object):
         self._cache_port_name_to_alias = {}
 
         self.csv_facts = {}
-        self.read_csv_files()
-
         self.graph_facts = {}
-        self.csv_to_graph_facts()
+        if graph_facts is not None:
+            # Prebuilt facts of the current csv files, see load_lab_graph
+            self.graph_facts = graph_facts
+        else:
+            self.read_csv_files()
+            self.csv_to_graph_facts()
 
     def read_csv_files(self):
         for k, v in self.csv_files.items():
@@ -669,3 +680,107 @@ class LabGraph(object):
                     l1_cross_connects[l1_start_device][l1_port_pair[0]] = l1_port_pair[1]
 
         return l1_cross_connects
+
+
+def get_file_state(filename):
+    try:
+        st = os.stat(filename)
+    except (IOError, OSError):
+        return None
+    return [int(st.st_mtime * 1000000), st.st_size]
+
+
+def _save_cache_file(cache_file, data, dump, mode):
+    """
+    Write a cache file atomically, concurrent module runs read either the old or the new file.
+    """
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        if not os.path.exists(GRAPH_CACHE_PATH):
+            os.makedirs(GRAPH_CACHE_PATH)
+        with open(tmp_file, mode) as f:
+            dump(data, f)
+        os.rename(tmp_file, cache_file)
+    except (IOError, OSError) as e:
+        logging.warning("Failed to save graph cache file {}: {}".format(cache_file, e))
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def get_graph_cache_key(path, group, forced_mgmt_routes=None):
+    """
+    Get the key of the prebuilt graph facts of a group. It changes when any csv file of the group,
+    the forced management routes or the code building the facts change.
+    """
+    csv_files = sorted(LabGraph.SUPPORTED_CSV_FILES.items())
+    state = [GRAPH_CACHE_VERSION, os.path.abspath(path), group, repr(forced_mgmt_routes)]
+    state.extend([k, get_file_state(os.path.join(path, v.format(group)))] for k, v in csv_files)
+    state.append(get_file_state(__file__))
+    state.append(get_file_state(get_port_alias_to_name_map.__code__.co_filename))
+    return hashlib.sha1(json.dumps(state).encode('utf-8')).hexdigest()
+
+
+def load_lab_graph(path, group, forced_mgmt_routes=None, use_cache=True):
+    """
+    Get the LabGraph of a group, from its prebuilt graph facts if the csv files did not change.
+
+    Returns:
+        obj: Instance of LabGraph
+    """
+    if not use_cache:
+        return LabGraph(path, group, forced_mgmt_routes=forced_mgmt_routes)
+
+    cache_file = os.path.join(GRAPH_CACHE_PATH, GRAPH_CACHE_FILE.format(
+        get_graph_cache_key(path, group, forced_mgmt_routes)))
+    try:
+        with open(cache_file, 'rb') as f:
+            graph_facts = pickle.load(f)
+        logging.debug("Loaded prebuilt graph facts of group {} from {}".format(group, cache_file))
+        return LabGraph(path, group, forced_mgmt_routes=forced_mgmt_routes, graph_facts=graph_facts)
+    except Exception:
+        pass
+
+    lab_graph = LabGraph(path, group, forced_mgmt_routes=forced_mgmt_routes)
+    _save_cache_file(cache_file, lab_graph.graph_facts, pickle.dump, 'wb')
+    return lab_graph
+
+
+def get_graph_hostnames(path, groups, use_cache=True):
+    """
+    Get the hostnames of the devices of each group. Only the devices csv file of the groups
+    that changed since the index was saved is read.
+
+    Returns:
+        dict: group name to list of hostnames
+    """
+    index_file = os.path.join(GRAPH_CACHE_PATH, GRAPH_INDEX_FILE.format(
+        hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()))
+    index = {}
+    if use_cache:
+        try:
+            with open(index_file) as f:
+                index = json.load(f)
+        except (IOError, OSError, ValueError):
+            index = {}
+        if index.get('version') != GRAPH_CACHE_VERSION:
+            index = {}
+    cached_groups = index.get('groups', {})
+
+    changed = False
+    groups_hostnames = {}
+    for group in groups:
+        devices_file = os.path.join(path, LabGraph.SUPPORTED_CSV_FILES["devices"].format(group))
+        state = get_file_state(devices_file)
+        cached = cached_groups.get(group)
+        if not cached or cached['state'] != state:
+            hostnames = []
+            if state is not None:
+                with open(devices_file) as csvfile:
+                    hostnames = [row["Hostname"] for row in csv.DictReader(csvfile)]
+            cached = cached_groups[group] = {'state': state, 'hostnames': hostnames}
+            changed = True
+        groups_hostnames[group] = cached['hostnames']
+
+    if use_cache and changed:
+        _save_cache_file(index_file, {'version': GRAPH_CACHE_VERSION, 'groups': cached_groups}, json.dump, 'w')
+    return groups_hostnames
@@ -25,6 +25,7 @@ import time
 import json
 import itertools
 import fib
+from pipelined_verify import PipelinedVerifier
 
 import ptf
 import ptf.packet as scapy
@@ -179,6 +180,8 @@ class FibTest(BaseTest):
         self.single_fib = self.test_params.get(
             'single_fib_for_duts', "multiple-fib")
         self.topo_type = self.test_params.get('topo_type', None)
+        # Number of packets in flight when checking balancing, 0 to send and verify the packets one by one
+        self.pipeline_window = int(self.test_params.get('pipeline_window', 0))
 
     def check_ip_ranges(self, ipv4=True):
         for dut_index, dut_fib in enumerate(self.fibs):
@@ -297,11 +300,15 @@ class FibTest(BaseTest):
                 # Change balancing_test_times according to number of next hop groups
                 logging.info('Checking ip range balancing {}, src_port={}, exp_ports={}, dst_ip={}, dut_index={}'
                              .format(ip_range, src_port, exp_port_lists, dst_ip, dut_index))
-                for i in range(0, self.balancing_test_times*len(list(itertools.chain(*exp_port_lists)))):
-                    (matched_port, _) = self.check_ip_route(
-                        src_port, dst_ip, exp_port_lists, ipv4)
-                    hit_count_map[matched_port] = hit_count_map.get(
-                        matched_port, 0) + 1
+                count = self.balancing_test_times*len(list(itertools.chain(*exp_port_lists)))
+                if self.pipeline_window:
+                    hit_count_map = self.check_ip_route_pipelined(count, src_port, dst_ip, exp_port_lists, ipv4)
+                else:
+                    for i in range(0, count):
+                        (matched_port, _) = self.check_ip_route(
+                            src_port, dst_ip, exp_port_lists, ipv4)
+                        hit_count_map[matched_port] = hit_count_map.get(
+                            matched_port, 0) + 1
                 for next_hop in next_hops:
                     # only check balance on a DUT
                     self.check_hit_count_map(
@@ -328,6 +335,54 @@ class FibTest(BaseTest):
 
         return (matched_port, received)
 
+    def check_ip_route_pipelined(self, count, src_port, dst_ip_addr, dst_port_lists, ipv4=True):
+        '''
+        @summary: Send count packets to a route in windows of pipeline_window packets, and verify
+                  each one is received on one of the expected ports.
+        @return: dict of port to number of packets received on it
+        '''
+        logging.info('Checking route {} with {} packets, pipeline window {}'.format(
+            dst_ip_addr, count, self.pipeline_window))
+        # Same as check_ipv4_route/check_ipv6_route, a packet not received is sent again 5 times
+        pipeline = PipelinedVerifier(self, window=self.pipeline_window, timeout=self.PTF_TIMEOUT,
+                                     tries=2, resend_count=5)
+        dst_ports = list(itertools.chain(*dst_port_lists))
+        for _ in range(0, count):
+            if ipv4:
+                pkt, masked_exp_pkt, ip_src = self.create_ipv4_packets(src_port, dst_ip_addr)
+            else:
+                pkt, masked_exp_pkt, ip_src = self.create_ipv6_packets(src_port, dst_ip_addr)
+            pipeline.add(src_port, pkt, masked_exp_pkt, dst_ports, context=ip_src)
+
+        hit_count_map = {}
+        for sent in pipeline.run():
+            self.validate_rcvd_src_mac(sent.rcvd_port, sent.rcvd_pkt, dst_port_lists, sent.context, dst_ip_addr,
+                                       src_port)
+            hit_count_map[sent.rcvd_port] = hit_count_map.get(sent.rcvd_port, 0) + 1
+        return hit_count_map
+
+    def validate_rcvd_src_mac(self, rcvd_port, rcvd_pkt, dst_port_lists, ip_src, ip_dst, src_port):
+        '''
+        @summary: Check the src mac of a packet received on one of the expected ports is the router mac of the DUT.
+        '''
+        exp_src_mac = None
+        if len(self.ptf_test_port_map[str(rcvd_port)]["target_src_mac"]) > 1:
+            # active-active dualtor, the packet could be received from either ToR, so use the received
+            # port to find the corresponding ToR
+            for dut_index, port_list in enumerate(dst_port_lists):
+                if rcvd_port in port_list:
+                    exp_src_mac = self.ptf_test_port_map[str(
+                        rcvd_port)]["target_src_mac"][dut_index]
+        else:
+            exp_src_mac = self.ptf_test_port_map[str(
+                rcvd_port)]["target_src_mac"][0]
+        actual_src_mac = scapy.Ether(rcvd_pkt).src
+        if exp_src_mac != actual_src_mac:
+            raise Exception(
+                "Pkt sent from {} to {} on port {} was rcvd pkt on {} which is one of the expected ports, "
+                "but the src mac doesn't match, expected {}, got {}".
+                format(ip_src, ip_dst, src_port, rcvd_port, exp_src_mac, actual_src_mac))
+
     def check_ipv4_route(self, src_port, dst_ip_addr, dst_port_lists):
         '''
         @summary: Check IPv4 route works.
@@ -335,45 +390,10 @@ class FibTest(BaseTest):
         @param dest_ip_addr: destination IP to build packet with.
         @param dst_port_lists: list of ports on which to expect packet to come back from the switch
         '''
-        sport = random.randint(0, 65535)
-        dport = random.randint(0, 65535)
-        ip_src = "30.0.0.1"
+        pkt, masked_exp_pkt, ip_src = self.create_ipv4_packets(src_port, dst_ip_addr)
         ip_dst = dst_ip_addr
-        src_mac = self.dataplane.get_mac(0, src_port)
-
-        router_mac = self.ptf_test_port_map[str(src_port)]['target_dest_mac']
-
-        pkt = simple_tcp_packet(
-            pktlen=self.pktlen,
-            eth_dst=router_mac,
-            eth_src=src_mac,
-            ip_src=ip_src,
-            ip_dst=ip_dst,
-            tcp_sport=sport,
-            tcp_dport=dport,
-            ip_ttl=self.ttl,
-            ip_options=self.ip_options,
-            dl_vlan_enable=self.src_vid is not None,
-            vlan_vid=self.src_vid or 0)
-        exp_pkt = simple_tcp_packet(
-            self.pktlen,
-            ip_src=ip_src,
-            ip_dst=ip_dst,
-            tcp_sport=sport,
-            tcp_dport=dport,
-            ip_ttl=max(self.ttl-1, 0),
-            ip_options=self.ip_options,
-            dl_vlan_enable=self.dst_vid is not None,
-            vlan_vid=self.dst_vid or 0)
-        masked_exp_pkt = Mask(exp_pkt)
-        masked_exp_pkt.set_do_not_care_scapy(scapy.Ether, "dst")
-        masked_exp_pkt.set_do_not_care_scapy(scapy.Ether, "src")
-
-        # mask the chksum also if masking the ttl
-        if self.ignore_ttl:
-            masked_exp_pkt.set_do_not_care_scapy(scapy.IP, "ttl")
-            masked_exp_pkt.set_do_not_care_scapy(scapy.IP, "chksum")
-            masked_exp_pkt.set_do_not_care_scapy(scapy.TCP, "chksum")
+        sport = pkt['TCP'].sport
+        dport = pkt['TCP'].dport
 
         send_packet(self, src_port, pkt)
         logging.info('Sent Ether(src={}, dst={})/IP(src={}, dst={})/TCP(sport={}, dport={}) on port {}'
@@ -414,63 +434,45 @@ class FibTest(BaseTest):
                 rcvd_port, len_rcvd_pkt))
             logging.info(
                 'Recieved packet with length of {}'.format(len_rcvd_pkt))
-            exp_src_mac = None
-            if len(self.ptf_test_port_map[str(rcvd_port)]["target_src_mac"]) > 1:
-                # active-active dualtor, the packet could be received from either ToR, so use the received
-                # port to find the corresponding ToR
-                for dut_index, port_list in enumerate(dst_port_lists):
-                    if rcvd_port in port_list:
-                        exp_src_mac = self.ptf_test_port_map[str(
-                            rcvd_port)]["target_src_mac"][dut_index]
-            else:
-                exp_src_mac = self.ptf_test_port_map[str(
-                    rcvd_port)]["target_src_mac"][0]
-            actual_src_mac = scapy.Ether(rcvd_pkt).src
-            if exp_src_mac != actual_src_mac:
-                raise Exception(
-                    "Pkt sent from {} to {} on port {} was rcvd pkt on {} which is one of the expected ports, "
-                    "but the src mac doesn't match, expected {}, got {}".
-                    format(ip_src, ip_dst, src_port, rcvd_port, exp_src_mac, actual_src_mac))
+            self.validate_rcvd_src_mac(rcvd_port, rcvd_pkt, dst_port_lists, ip_src, ip_dst, src_port)
             return (rcvd_port, rcvd_pkt)
         elif self.pkt_action == self.ACTION_DROP:
             verify_no_packet_any(self, masked_exp_pkt, dst_ports)
             return (None, None)
-    # ---------------------------------------------------------------------
 
-    def check_ipv6_route(self, src_port, dst_ip_addr, dst_port_lists):
+    def create_ipv4_packets(self, src_port, dst_ip_addr):
         '''
-        @summary: Check IPv6 route works.
-        @param source_port_index: index of port to use for sending packet to switch
-        @param dest_ip_addr: destination IP to build packet with.
-        @param dst_port_lists: list of ports on which to expect packet to come back from the switch
-        @return Boolean
+        @summary: Create an IPv4 packet to a destination IP with random TCP ports, and the masked expected packet.
+        @return: (packet, masked expected packet, source IP)
         '''
         sport = random.randint(0, 65535)
         dport = random.randint(0, 65535)
-        ip_src = '2000:0030::1'
+        ip_src = "30.0.0.1"
         ip_dst = dst_ip_addr
         src_mac = self.dataplane.get_mac(0, src_port)
 
         router_mac = self.ptf_test_port_map[str(src_port)]['target_dest_mac']
 
-        pkt = simple_tcpv6_packet(
+        pkt = simple_tcp_packet(
             pktlen=self.pktlen,
             eth_dst=router_mac,
             eth_src=src_mac,
-            ipv6_dst=ip_dst,
-            ipv6_src=ip_src,
+            ip_src=ip_src,
+            ip_dst=ip_dst,
             tcp_sport=sport,
             tcp_dport=dport,
-            ipv6_hlim=self.ttl,
+            ip_ttl=self.ttl,
+            ip_options=self.ip_options,
             dl_vlan_enable=self.src_vid is not None,
             vlan_vid=self.src_vid or 0)
-        exp_pkt = simple_tcpv6_packet(
-            pktlen=self.pktlen,
-            ipv6_dst=ip_dst,
-            ipv6_src=ip_src,
+        exp_pkt = simple_tcp_packet(
+            self.pktlen,
+            ip_src=ip_src,
+            ip_dst=ip_dst,
             tcp_sport=sport,
             tcp_dport=dport,
-            ipv6_hlim=max(self.ttl-1, 0),
+            ip_ttl=max(self.ttl-1, 0),
+            ip_options=self.ip_options,
             dl_vlan_enable=self.dst_vid is not None,
             vlan_vid=self.dst_vid or 0)
         masked_exp_pkt = Mask(exp_pkt)
@@ -479,9 +481,26 @@ class FibTest(BaseTest):
 
         # mask the chksum also if masking the ttl
         if self.ignore_ttl:
-            masked_exp_pkt.set_do_not_care_scapy(scapy.IPv6, "hlim")
+            masked_exp_pkt.set_do_not_care_scapy(scapy.IP, "ttl")
+            masked_exp_pkt.set_do_not_care_scapy(scapy.IP, "chksum")
             masked_exp_pkt.set_do_not_care_scapy(scapy.TCP, "chksum")
 
+        return pkt, masked_exp_pkt, ip_src
+    # ---------------------------------------------------------------------
+
+    def check_ipv6_route(self, src_port, dst_ip_addr, dst_port_lists):
+        '''
+        @summary: Check IPv6 route works.
+        @param source_port_index: index of port to use for sending packet to switch
+        @param dest_ip_addr: destination IP to build packet with.
+        @param dst_port_lists: list of ports on which to expect packet to come back from the switch
+        @return Boolean
+        '''
+        pkt, masked_exp_pkt, ip_src = self.create_ipv6_packets(src_port, dst_ip_addr)
+        ip_dst = dst_ip_addr
+        sport = pkt['TCP'].sport
+        dport = pkt['TCP'].dport
+
         send_packet(self, src_port, pkt)
         logging.info('Sent Ether(src={}, dst={})/IPv6(src={}, dst={})/TCP(sport={}, dport={}) on port {}'
                      .format(pkt.src,
@@ -522,28 +541,56 @@ class FibTest(BaseTest):
                 rcvd_port, len_rcvd_pkt))
             logging.info(
                 'Recieved packet with length of {}'.format(len_rcvd_pkt))
-            exp_src_mac = None
-            if len(self.ptf_test_port_map[str(rcvd_port)]["target_src_mac"]) > 1:
-                # active-active dualtor, the packet could be received from either ToR, so use the received
-                # port to find the corresponding ToR
-                for dut_index, port_list in enumerate(dst_port_lists):
-                    if rcvd_port in port_list:
-                        exp_src_mac = self.ptf_test_port_map[str(
-                            rcvd_port)]["target_src_mac"][dut_index]
-            else:
-                exp_src_mac = self.ptf_test_port_map[str(
-                    rcvd_port)]["target_src_mac"][0]
-            actual_src_mac = scapy.Ether(rcvd_pkt).src
-            if exp_src_mac != actual_src_mac:
-                raise Exception(
-                    "Pkt sent from {} to {} on port {} was rcvd pkt on {} which is one of the expected ports, "
-                    "but the src mac doesn't match, expected {}, got {}".
-                    format(ip_src, ip_dst, src_port, rcvd_port, exp_src_mac, actual_src_mac))
+            self.validate_rcvd_src_mac(rcvd_port, rcvd_pkt, dst_port_lists, ip_src, ip_dst, src_port)
             return (rcvd_port, rcvd_pkt)
         elif self.pkt_action == self.ACTION_DROP:
             verify_no_packet_any(self, masked_exp_pkt, dst_ports)
             return (None, None)
 
+    def create_ipv6_packets(self, src_port, dst_ip_addr):
+        '''
+        @summary: Create an IPv6 packet to a destination IP with random TCP ports, and the masked expected packet.
+        @return: (packet, masked expected packet, source IP)
+        '''
+        sport = random.randint(0, 65535)
+        dport = random.randint(0, 65535)
+        ip_src = '2000:0030::1'
+        ip_dst = dst_ip_addr
+        src_mac = self.dataplane.get_mac(0, src_port)
+
+        router_mac = self.ptf_test_port_map[str(src_port)]['target_dest_mac']
+
+        pkt = simple_tcpv6_packet(
+            pktlen=self.pktlen,
+            eth_dst=router_mac,
+            eth_src=src_mac,
+            ipv6_dst=ip_dst,
+            ipv6_src=ip_src,
+            tcp_sport=sport,
+            tcp_dport=dport,
+            ipv6_hlim=self.ttl,
+            dl_vlan_enable=self.src_vid is not None,
+            vlan_vid=self.src_vid or 0)
+        exp_pkt = simple_tcpv6_packet(
+            pktlen=self.pktlen,
+            ipv6_dst=ip_dst,
+            ipv6_src=ip_src,
+            tcp_sport=sport,
+            tcp_dport=dport,
+            ipv6_hlim=max(self.ttl-1, 0),
+            dl_vlan_enable=self.dst_vid is not None,
+            vlan_vid=self.dst_vid or 0)
+        masked_exp_pkt = Mask(exp_pkt)
+        masked_exp_pkt.set_do_not_care_scapy(scapy.Ether, "dst")
+        masked_exp_pkt.set_do_not_care_scapy(scapy.Ether, "src")
+
+        # mask the chksum also if masking the ttl
+        if self.ignore_ttl:
+            masked_exp_pkt.set_do_not_care_scapy(scapy.IPv6, "hlim")
+            masked_exp_pkt.set_do_not_care_scapy(scapy.TCP, "chksum")
+
+        return pkt, masked_exp_pkt, ip_src
+
     def check_within_expected_range(self, actual, expected):
         '''
         @summary: Check if the actual number is within the accepted range of the expected number
@@ -0,0 +1,192 @@
+"""
+Windowed, pipelined send/verify engine for PTF tests.
+
+Tests like the hash and FIB balancing tests send thousands of packets, each one expected
+on any one of a set of candidate ports. Sending one packet and then blocking in
+verify_packet_any_port before sending the next one makes the test time dominated by
+per-packet waits. This engine instead:
+
+    - tags each packet with a unique ID in its payload,
+    - sends the packets in windows of configurable size,
+    - collects the received packets from all the ports concurrently,
+    - matches the received packets to the sent ones through an ID index, and checks that
+      they match the expected (masked) packet on one of the expected ports.
+
+The pass/fail semantics are the same as with verify_packet_any_port: a packet passes if
+it is received on one of its expected ports, matching the expected packet, before the
+timeout expires. Packets not received are re-sent up to `tries` times in total.
+"""
+import logging
+import struct
+import time
+from collections import defaultdict
+
+import ptf.packet as scapy
+from ptf.testutils import dp_poll
+from ptf.testutils import send_packet
+
+PKT_ID_MAGIC = b'PTFPKTID'
+PKT_ID_FORMAT = '!I'
+PKT_ID_LEN = len(PKT_ID_MAGIC) + struct.calcsize(PKT_ID_FORMAT)
+
+DEFAULT_WINDOW = 64
+DEFAULT_TIMEOUT = 10
+
+
+def tag_packet(pkt, pkt_id):
+    '''
+    @summary: Write the packet ID at the beginning of the payload of a scapy packet, in place.
+              The payload length is not changed.
+    @param pkt: scapy packet with a Raw payload of at least PKT_ID_LEN bytes
+    @param pkt_id: ID of the packet
+    '''
+    raw = pkt.getlayer(scapy.Raw)
+    if raw is None or len(raw.load) < PKT_ID_LEN:
+        raise ValueError("Packet has no payload room for a packet ID: {}".format(repr(pkt)))
+    raw.load = PKT_ID_MAGIC + struct.pack(PKT_ID_FORMAT, pkt_id) + raw.load[PKT_ID_LEN:]
+
+
+def get_packet_id(pkt_bytes):
+    '''
+    @summary: Get the packet ID written by tag_packet from the raw bytes of a received packet.
+    @return: ID of the packet, or None if the packet is not tagged
+    '''
+    pkt_bytes = bytes(pkt_bytes)
+    offset = pkt_bytes.find(PKT_ID_MAGIC)
+    if offset < 0 or offset + PKT_ID_LEN > len(pkt_bytes):
+        return None
+    return struct.unpack_from(PKT_ID_FORMAT, pkt_bytes, offset + len(PKT_ID_MAGIC))[0]
+
+
+class PipelinedPacket(object):
+    '''
+    @summary: A packet sent by the pipelined engine and its verification result
+    '''
+
+    def __init__(self, pkt_id, src_port, pkt, masked_exp_pkt, dst_ports, context):
+        self.pkt_id = pkt_id
+        self.src_port = src_port
+        self.pkt = pkt
+        self.masked_exp_pkt = masked_exp_pkt
+        self.dst_ports = set(dst_ports)
+        self.context = context
+        self.rcvd_port = None
+        self.rcvd_pkt = None
+
+    @property
+    def received(self):
+        return self.rcvd_port is not None
+
+
+class PipelinedVerifier(object):
+    '''
+    @summary: Send queued packets in windows and verify each one is received on any of its expected ports.
+
+    Usage:
+        verifier = PipelinedVerifier(test, window=64, timeout=10, tries=2)
+        for ...:
+            verifier.add(src_port, pkt, masked_exp_pkt, dst_ports, context=...)
+        for sent in verifier.run():
+            ... sent.rcvd_port, sent.rcvd_pkt, sent.context ...
+    '''
+
+    def __init__(self, test, window=DEFAULT_WINDOW, timeout=DEFAULT_TIMEOUT, tries=1, resend_count=1,
+                 device_number=0):
+        '''
+        @param test: the PTF test, whose dataplane is used to send and receive packets
+        @param window: max number of packets in flight
+        @param timeout: seconds to wait for the packets of a window after the last one was sent
+        @param tries: number of times a packet not received is sent
+        @param resend_count: number of copies of a packet sent on retries
+        @param device_number: PTF device number
+        '''
+        self.test = test
+        self.window = max(int(window), 1)
+        self.timeout = timeout
+        self.tries = max(int(tries), 1)
+        self.resend_count = resend_count
+        self.device_number = device_number
+        self.packets = []
+        self.port_hit_cnt = defaultdict(int)
+        self.unmatched_cnt = 0
+
+    def add(self, src_port, pkt, masked_exp_pkt, dst_ports, context=None):
+        '''
+        @summary: Tag a packet and its expected packet with a unique ID, and queue it for sending.
+        @param src_port: port to send the packet on
+        @param pkt: scapy packet to send
+        @param masked_exp_pkt: ptf Mask of the expected packet
+        @param dst_ports: ports on which the packet is expected
+        @param context: opaque data returned along with the verification result
+        @return: ID of the packet
+        '''
+        pkt_id = len(self.packets)
+        tag_packet(pkt, pkt_id)
+        tag_packet(masked_exp_pkt.exp_pkt, pkt_id)
+        self.packets.append(PipelinedPacket(pkt_id, src_port, pkt, masked_exp_pkt, dst_ports, context))
+        return pkt_id
+
+    def _collect(self, window_pkts):
+        outstanding = {sent.pkt_id: sent for sent in window_pkts}
+        deadline = time.time() + self.timeout
+        while outstanding:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            result = dp_poll(self.test, device_number=self.device_number, timeout=remaining)
+            if not isinstance(result, self.test.dataplane.PollSuccess):
+                break
+            sent = outstanding.get(get_packet_id(result.packet))
+            if sent is None or result.port not in sent.dst_ports or not sent.masked_exp_pkt.pkt_match(result.packet):
+                self.unmatched_cnt += 1
+                continue
+            sent.rcvd_port = result.port
+            sent.rcvd_pkt = result.packet
+            self.port_hit_cnt[result.port] += 1
+            del outstanding[sent.pkt_id]
+
+    def run(self):
+        '''
+        @summary: Send all the queued packets and collect the received ones.
+        @return: list of PipelinedPacket in the order they were added
+        @raise AssertionError: if some packets were not received on their expected ports
+        '''
+        start = time.time()
+        pending = self.packets
+        for attempt in range(self.tries):
+            if attempt > 0:
+                logging.warning("{} packets were not received, trying again".format(len(pending)))
+            count = 1 if attempt == 0 else self.resend_count
+            for i in range(0, len(pending), self.window):
+                window_pkts = pending[i:i + self.window]
+                self.test.dataplane.flush()
+                for sent in window_pkts:
+                    send_packet(self.test, sent.src_port, sent.pkt, count=count)
+                self._collect(window_pkts)
+            pending = [sent for sent in pending if not sent.received]
+            if not pending:
+                break
+        self.test.dataplane.flush()
+
+        logging.info("Pipelined verification of {} packets done in {:.2f} seconds, window {}, "
+                     "per-port hit count: {}, unmatched packets: {}"
+                     .format(len(self.packets), time.time() - start, self.window, dict(self.port_hit_cnt),
+                             self.unmatched_cnt))
+        missing_ids = self.get_missing_ids()
+        if missing_ids:
+            details = ["id {} sent on port {}, expected on ports {}".format(
+                sent.pkt_id, sent.src_port, sorted(sent.dst_ports)) for sent in self.packets if not sent.received]
+            assert False, "Did not receive {} expected packets: {}".format(len(missing_ids), "; ".join(details))
+        return self.packets
+
+    def get_missing_ids(self):
+        '''
+        @return: IDs of the packets not received on their expected ports
+        '''
+        return [sent.pkt_id for sent in self.packets if not sent.received]
+
+    def get_port_hit_cnt(self):
+        '''
+        @return: dict of port to number of the expected packets received on it
+        '''
+        return dict(self.port_hit_cnt)
@@ -32,6 +32,7 @@ from ptf.testutils import simple_nvgre_packet
 import fib
 import lpm
 import macsec  # noqa F401
+from pipelined_verify import PipelinedVerifier
 
 
 class HashTest(BaseTest):
@@ -113,6 +114,9 @@ class HashTest(BaseTest):
         self.base_mac = self.dataplane.get_mac(
             *random.choice(list(self.dataplane.ports.keys())))
         self.vxlan_dest_port = int(self.test_params.get('vxlan_dest_port', 0))
+        # Number of packets in flight when checking balancing, 0 to send and verify the packets one by one
+        self.pipeline_window = int(self.test_params.get('pipeline_window', 0))
+        self.pipeline = None
 
     def _get_nexthops(self, src_port, dst_ip):
         active_dut_indexes = [0]
@@ -217,13 +221,11 @@ class HashTest(BaseTest):
             assert len(hit_count_map.keys()) == len(
                 self.ptf_test_port_map[str(ingress_port)]["target_dut"])
         else:
-            for _ in range(0, self.balancing_test_times * len(list(itertools.chain(*exp_port_lists)))):
-                logging.info('Checking hash key {}, src_port={}, exp_ports={}, dst_ip={}'
-                             .format(hash_key, src_port, exp_port_lists, dst_ip))
-                (matched_port, _) = self.check_ip_route(
-                    hash_key, src_port, dst_ip, exp_port_lists)
-                hit_count_map[matched_port] = hit_count_map.get(
-                    matched_port, 0) + 1
+            hit_count_map = self.get_hit_count_map(
+                self.balancing_test_times * len(list(itertools.chain(*exp_port_lists))),
+                lambda: self.check_ip_route(hash_key, src_port, dst_ip, exp_port_lists),
+                'Checking hash key {}, src_port={}, exp_ports={}, dst_ip={}'
+                .format(hash_key, src_port, exp_port_lists, dst_ip))
             logging.info("hash_key={}, hit count map: {}".format(
                 hash_key, hit_count_map))
             for next_hop in next_hops:
@@ -237,11 +239,67 @@ class HashTest(BaseTest):
             (matched_port, received) = self.check_ipv6_route(
                 hash_key=hash_key, src_port=src_port, dst_port_lists=dst_port_lists)
         assert received
-        logging.info("Received packet at " + str(matched_port))
-        self.dataplane.flush()
-        time.sleep(0.02)
+        if self.pipeline is None:
+            logging.info("Received packet at " + str(matched_port))
+            self.dataplane.flush()
+            time.sleep(0.02)
         return (matched_port, received)
 
+    def get_hit_count_map(self, count, check_route, log_msg):
+        '''
+        @summary: Check a route count times and count the packets received on each port.
+                  When pipeline_window is set, check_route only queues its packet, and the queued
+                  packets are then sent and verified in windows by the pipelined engine.
+        @param count: number of times to check the route
+        @param check_route: function checking the route once, returning (matched_port, received)
+        @param log_msg: message logged before checking the route
+        @return: dict of port to number of packets received on it
+        '''
+        hit_count_map = {}
+        if not self.pipeline_window:
+            for _ in range(0, count):
+                logging.info(log_msg)
+                (matched_port, _) = check_route()
+                hit_count_map[matched_port] = hit_count_map.get(
+                    matched_port, 0) + 1
+            return hit_count_map
+
+        logging.info('{}, {} packets with pipeline window {}'.format(log_msg, count, self.pipeline_window))
+        # HashTest retries sending a packet not received once, the encapsulation tests do not retry
+        tries = 2 if self.__class__.__name__ == 'HashTest' else 1
+        self.pipeline = PipelinedVerifier(self, window=self.pipeline_window, tries=tries)
+        try:
+            for _ in range(0, count):
+                check_route()
+            sent_pkts = self.pipeline.run()
+        finally:
+            self.pipeline = None
+        for sent in sent_pkts:
+            (matched_port, _) = self.get_validated_packet(sent.rcvd_port, sent.rcvd_pkt, *sent.context)
+            hit_count_map[matched_port] = hit_count_map.get(
+                matched_port, 0) + 1
+        return hit_count_map
+
+    def send_and_verify_route(self, src_port, pkt, masked_exp_pkt, dst_port_lists, logs, ip_src, ip_dst):
+        '''
+        @summary: Send a packet and verify it is received on one of the expected ports, or queue it
+                  in the pipelined engine when checking balancing with pipeline_window set.
+        '''
+        if self.pipeline is not None:
+            self.pipeline.add(src_port, pkt, masked_exp_pkt, list(itertools.chain(*dst_port_lists)),
+                              context=(dst_port_lists, ip_src, ip_dst, src_port))
+            return (None, True)
+        if self.__class__.__name__ == 'HashTest':
+            rcvd_port, rcvd_pkt = retry_call(
+                self.send_and_verify_packets,
+                fargs=[src_port, pkt, masked_exp_pkt, dst_port_lists, logs],
+                tries=2,
+                delay=2
+            )
+        else:
+            rcvd_port, rcvd_pkt = self.send_and_verify_packets(src_port, pkt, masked_exp_pkt, dst_port_lists, logs=logs)
+        return self.get_validated_packet(rcvd_port, rcvd_pkt, dst_port_lists, ip_src, ip_dst, src_port)
+
     def _get_ip_proto(self, ipv6=False):
         # ip_proto 2 is IGMP, should not be forwarded by router
         # ip_proto 4, 41 and 47 are encapsulation protocol, ip payload will be malformat
@@ -401,7 +459,6 @@ class HashTest(BaseTest):
         '''
         @summary: Check IPv4 route works.
         '''
-        class_name = self.__class__.__name__
         ip_src = self.src_ip_interval.get_random_ip(
         ) if hash_key == 'src-ip' else self.src_ip_interval.get_first_ip()
         ip_dst = self.dst_ip_interval.get_random_ip(
@@ -450,22 +507,12 @@ class HashTest(BaseTest):
             ip_dst=ip_dst,
             ip_proto=ip_proto
         )
-        if class_name == 'HashTest':
-            rcvd_port, rcvd_pkt = retry_call(
-                self.send_and_verify_packets,
-                fargs=[src_port, pkt, masked_exp_pkt, dst_port_lists, logs],
-                tries=2,
-                delay=2
-            )
-        else:
-            rcvd_port, rcvd_pkt = self.send_and_verify_packets(src_port, pkt, masked_exp_pkt, dst_port_lists, logs=logs)
-        return self.get_validated_packet(rcvd_port, rcvd_pkt, dst_port_lists, ip_src, ip_dst, src_port)
+        return self.send_and_verify_route(src_port, pkt, masked_exp_pkt, dst_port_lists, logs, ip_src, ip_dst)
 
     def check_ipv6_route(self, hash_key, src_port, dst_port_lists, outer_src_ip=None, outer_dst_ip=None):
         '''
         @summary: Check IPv6 route works.
         '''
-        class_name = self.__class__.__name__
         ip_src = self.src_ip_interval.get_random_ip(
         ) if hash_key == 'src-ip' else self.src_ip_interval.get_first_ip()
         ip_dst = self.dst_ip_interval.get_random_ip(
@@ -516,16 +563,7 @@ class HashTest(BaseTest):
             ip_proto=ip_proto,
             version='IPv6'
         )
-        if class_name == 'HashTest':
-            rcvd_port, rcvd_pkt = retry_call(
-                self.send_and_verify_packets,
-                fargs=[src_port, pkt, masked_exp_pkt, dst_port_lists, logs],
-                tries=2,
-                delay=2
-            )
-        else:
-            rcvd_port, rcvd_pkt = self.send_and_verify_packets(src_port, pkt, masked_exp_pkt, dst_port_lists, logs=logs)
-        return self.get_validated_packet(rcvd_port, rcvd_pkt, dst_port_lists, ip_src, ip_dst, src_port)
+        return self.send_and_verify_route(src_port, pkt, masked_exp_pkt, dst_port_lists, logs, ip_src, ip_dst)
 
     def check_within_expected_range(self, actual, expected, hash_key):
         '''
@@ -766,8 +804,9 @@ class IPinIPHashTest(HashTest):
                 hash_key=hash_key, src_port=src_port, dst_port_lists=dst_port_lists, outer_src_ip=outer_src_ip,
                 outer_dst_ip=outer_dst_ip)
         assert received
-        logging.info("Received packet at " + str(matched_port))
-        time.sleep(0.02)
+        if self.pipeline is None:
+            logging.info("Received packet at " + str(matched_port))
+            time.sleep(0.02)
         return (matched_port, received)
 
     def check_hash(self, hash_key):
@@ -808,23 +847,19 @@ class IPinIPHashTest(HashTest):
             # The length of inner_frame is not used as hash key for IPinIP packet.
             # The test generates IPinIP packets with random inner_frame_length, and then verify the egress path.
             # The egress port should never change
-            for _ in range(0, self.balancing_test_times * len(list(itertools.chain(*exp_port_lists)))):
-                logging.info('Checking hash key {}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
-                             .format(hash_key, exp_port_lists, outer_src_ip, outer_dst_ip))
-                (matched_index, _) = self.check_ip_route(hash_key,
-                                                         src_port, exp_port_lists, outer_src_ip, outer_dst_ip)
-                hit_count_map[matched_index] = hit_count_map.get(
-                    matched_index, 0) + 1
+            hit_count_map = self.get_hit_count_map(
+                self.balancing_test_times * len(list(itertools.chain(*exp_port_lists))),
+                lambda: self.check_ip_route(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip),
+                'Checking hash key {}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
+                .format(hash_key, exp_port_lists, outer_src_ip, outer_dst_ip))
             logging.info("hit count map: {}".format(hit_count_map))
             assert True if len(hit_count_map.keys()) == 1 else False
         else:
-            for _ in range(0, self.balancing_test_times * len(list(itertools.chain(*exp_port_lists)))):
-                logging.info('Checking hash key {}, src_port={}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
-                             .format(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip))
-                (matched_index, _) = self.check_ip_route(hash_key,
-                                                         src_port, exp_port_lists, outer_src_ip, outer_dst_ip)
-                hit_count_map[matched_index] = hit_count_map.get(
-                    matched_index, 0) + 1
+            hit_count_map = self.get_hit_count_map(
+                self.balancing_test_times * len(list(itertools.chain(*exp_port_lists))),
+                lambda: self.check_ip_route(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip),
+                'Checking hash key {}, src_port={}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
+                .format(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip))
             logging.info("hash_key={}, hit count map: {}".format(
                 hash_key, hit_count_map))
             for next_hop in next_hops:
@@ -973,8 +1008,9 @@ class VxlanHashTest(HashTest):
                 hash_key=hash_key, src_port=src_port, dst_port_lists=dst_port_lists, outer_src_ip=outer_src_ip,
                 outer_dst_ip=outer_dst_ip)
         assert received
-        logging.info("Received packet at " + str(matched_port))
-        time.sleep(0.02)
+        if self.pipeline is None:
+            logging.info("Received packet at " + str(matched_port))
+            time.sleep(0.02)
         return (matched_port, received)
 
     def check_hash(self, hash_key):
@@ -998,14 +1034,11 @@ class VxlanHashTest(HashTest):
                 logging.warning("{} has only {} nexthop".format(
                     outer_dst_ip, exp_port_list))
                 assert False
-        hit_count_map = {}
-        for _ in range(0, self.balancing_test_times * len(list(itertools.chain(*exp_port_lists)))):
-            logging.info('Checking hash key {}, src_port={}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
-                         .format(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip))
-            (matched_index, _) = self.check_ip_route(hash_key,
-                                                     src_port, exp_port_lists, outer_src_ip, outer_dst_ip)
-            hit_count_map[matched_index] = hit_count_map.get(
-                matched_index, 0) + 1
+        hit_count_map = self.get_hit_count_map(
+            self.balancing_test_times * len(list(itertools.chain(*exp_port_lists))),
+            lambda: self.check_ip_route(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip),
+            'Checking hash key {}, src_port={}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
+            .format(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip))
         logging.info("hash_key={}, hit count map: {}".format(
             hash_key, hit_count_map))
         for next_hop in next_hops:
@@ -1180,8 +1213,9 @@ class NvgreHashTest(HashTest):
                 hash_key=hash_key, src_port=src_port, dst_port_lists=dst_port_lists, outer_src_ip=outer_src_ipv6,
                 outer_dst_ip=outer_dst_ipv6)
         assert received
-        logging.info("Received packet at " + str(matched_port))
-        time.sleep(0.02)
+        if self.pipeline is None:
+            logging.info("Received packet at " + str(matched_port))
+            time.sleep(0.02)
         return (matched_port, received)
 
     def check_hash(self, hash_key):
@@ -1203,15 +1237,12 @@ class NvgreHashTest(HashTest):
                 logging.warning("{} has only {} nexthop".format(
                     outer_dst_ip, exp_port_list))
                 assert False
-        hit_count_map = {}
-        for _ in range(0, self.balancing_test_times * len(list(itertools.chain(*exp_port_lists)))):
-            logging.info('Checking hash key {}, src_port={}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
-                         .format(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip))
-            (matched_index, _) = self.check_ip_route(hash_key,
-                                                     src_port, exp_port_lists, outer_src_ip, outer_dst_ip,
-                                                     outer_src_ipv6, outer_dst_ipv6)
-            hit_count_map[matched_index] = hit_count_map.get(
-                matched_index, 0) + 1
+        hit_count_map = self.get_hit_count_map(
+            self.balancing_test_times * len(list(itertools.chain(*exp_port_lists))),
+            lambda: self.check_ip_route(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip,
+                                        outer_src_ipv6, outer_dst_ipv6),
+            'Checking hash key {}, src_port={}, exp_ports={}, outer_src_ip={}, outer_dst_ip={}'
+            .format(hash_key, src_port, exp_port_lists, outer_src_ip, outer_dst_ip))
         logging.info("hash_key={}, hit count map: {}".format(
             hash_key, hit_count_map))
         for next_hop in next_hops:
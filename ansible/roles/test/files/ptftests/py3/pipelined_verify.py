@@ -0,0 +1 @@
+../pipelined_verify.py
\ No newline at end of file
@@ -81,6 +81,10 @@ defaults = {
     "SPYTEST_DETECT_CONCURRENT_ACCESS": "1",
     "SPYTEST_SYSLOG_ANALYSIS": "1",
     "SPYTEST_USE_NO_MORE": "0",
+    "SPYTEST_DEFERRED_EXEC": "0",
+    "SPYTEST_PROFILE_STREAM": "1",
+    "SPYTEST_PROFILE_MAX_CMDS": "10000",
+    "SPYTEST_RESULTS_STORE": "1",
     "SPYTEST_PRESERVE_GNMI_CERT": "1",
     "SPYTEST_CMD_FAIL_RESULT_SUPPORT": "1",
     "SPYTEST_USE_FULL_NODEID": "0",
@@ -50,6 +50,7 @@ from spytest import paths
 from spytest import cmdargs
 from spytest import env
 from spytest import syslog
+from spytest import profile
 from spytest import generate
 from spytest import item_utils
 
@@ -290,6 +291,8 @@ class Context(object):
         # create net module and register devices
         self.net = Net(self.cfg, self.file_prefix, self.log, self._tb)
         self.net.set_workarea(self.wa)
+        if env.match("SPYTEST_PROFILE_STREAM", "1", "1"):
+            profile.set_stream_file(paths.get_profile_log(_get_logs_path()[1]))
         self.log.warning("Registering Topology")
         self.net.register_devices(self.topo)
 
@@ -1220,6 +1223,9 @@ class WorkArea(object):
         return desc
 
     def report(self, msgid, *args, **kwargs):
+        # the deferred commands failures must be part of the result being reported
+        self._context.net.deferred_join()
+
         dut = kwargs.get("dut", None)
         rtype = kwargs.get("type", "fail")
         tcid = kwargs.get("tcid", None)
@@ -2598,6 +2604,7 @@ class WorkArea(object):
             self.fetch_support(None, "pre-module-prolog", "", "", name)
 
     def _pre_module_epilog(self, name):
+        self._trace_deferred_saved_time(name)
         self._scope_module_epilog(name, "pre-module-epilog")
 
     def _post_module_prolog(self, name, res, desc):
@@ -3167,6 +3174,18 @@ class WorkArea(object):
             for [start_time, msg, dut1, dut2] in stats.canbe_parallel:
                 ftrace(start_time, msg, dut1, dut2)
             utils.banner(None, func=ftrace)
+        if stats.deferred_cmds:
+            msg = "parallelized by deferred execution: {}".format(nodeid)
+            utils.banner(msg, func=ftrace)
+            for [start_time, msg, duts, saved_time] in stats.deferred_cmds:
+                ftrace(start_time, msg, duts, saved_time)
+            utils.banner(None, func=ftrace)
+
+    def _trace_deferred_saved_time(self, name):
+        saved_time = self._context.net.get_deferred_saved_time(True)
+        if saved_time:
+            msg = "deferred execution recovered {} in module {}"
+            self.log(msg.format(utils.time_format(saved_time, True), name))
 
     def _test_log_finish(self, nodeid, func_name, res, desc, time_taken):
 
@@ -3219,6 +3238,13 @@ class WorkArea(object):
             ofh.write("\nTOTAL TG Time = {}".format(stats.tg_cmd_time))
             ofh.write("\nTOTAL PROMPT NFOUND = {}".format(stats.pnfound))
             ofh.write("\nTOTAL TECH SUPPORT = {}".format(stats.ts_files))
+            stats.deferred_saved_time = utils.time_format(stats.deferred_saved_time, True)
+            ofh.write("\nTOTAL DEFERRED Recovered Time = {}".format(stats.deferred_saved_time))
+            for name, count in sorted(stats.dropped.items()):
+                ofh.write("\nTOTAL {} DROPPED = {}".format(name.upper(), count))
+            for [ctype, dut, count, total, p50, p90, p99, max_time] in stats.cmd_summary:
+                ofh.write("\n{} SUMMARY: {} COUNT = {} TOTAL = {} P50 = {} P90 = {} P99 = {} MAX = {}".format(
+                          ctype, dut, count, total, p50, p90, p99, max_time))
             for [start_time, thid, ctype, dut, cmd, ctime] in stats.cmds:
                 start_msg = "\n{} {}".format(get_timestamp(this=start_time), thid)
                 if ctype == "CMD":
@@ -3235,6 +3261,8 @@ class WorkArea(object):
                     ofh.write("{}PROMPT NFOUND: {}".format(start_msg, cmd))
                 elif ctype == "TECH_SUPPORT":
                     ofh.write("{}TECH SUPPORT: {}".format(start_msg, cmd))
+                elif ctype == "DEFERRED":
+                    ofh.write("{}DEFERRED RECOVERED TIME: {} {} = {}".format(start_msg, ctime, dut, cmd))
             ofh.write("\n=========================================================\n")
         try:
             self.stats_count = self.stats_count + 1
@@ -6001,13 +6029,17 @@ def fixture_setup_finish(fixturedef, request):
         wa.log_time("Misc {} Hook scope {} end".format(fixturedef.baseid, fixturedef.scope))
 
 
-def pyfunc_call(pyfuncitem, after):
+def pyfunc_call(pyfuncitem, after, passed=True):
     wa = get_work_area()
     if not wa:
         return None
     func_name = pyfuncitem.location[2]
     if after:
-        wa._pre_function_epilog(func_name)
+        try:
+            # fail the test when the deferred commands it issued last have failed
+            wa._context.net.deferred_join(passed)
+        finally:
+            wa._pre_function_epilog(func_name)
     elif wa.abort_module_msg:
         return wa.abort_module_msg
 
@@ -19,6 +19,7 @@ from spytest import batch
 from spytest import compare
 from spytest import tcmap
 from spytest import mail
+from spytest import results_store
 
 import utilities.common as utils
 
@@ -88,9 +89,12 @@ def read_all_result_names(logs_path, suffix, extn, dot="."):
     return files
 
 
-def read_all_results(logs_path, suffix, rmindex=True):
+def read_all_results(logs_path, suffix, rmindex=True, sort=False, limit=None):
 
     csv_files = read_all_result_names(logs_path, suffix, "csv")
+    if env.match("SPYTEST_RESULTS_STORE", "1", "1"):
+        return results_store.read_results(csv_files, rmindex, sort, limit)
+
     results = []
     for csv_file in csv_files:
         gw_name = os.path.basename(os.path.dirname(csv_file))
@@ -98,9 +102,20 @@ def read_all_results(logs_path, suffix, rmindex=True):
             row.insert(0, gw_name)
             results.append(row)
 
+    if sort:
+        results = sorted(results, key=itemgetter(5))
+    if limit is not None:
+        results = results[:limit]
+
     return results
 
 
+def read_report_csv(filepath, rmindex=True):
+    if env.match("SPYTEST_RESULTS_STORE", "1", "1"):
+        return results_store.read_report_csv(filepath, rmindex)
+    return Result.read_report_csv(filepath, rmindex)
+
+
 def concat_files(target, files, add_prefix=True):
     lines = []
     for fp in files:
@@ -454,7 +469,7 @@ def module_report(func_rows, tc_rows, results_csv, tcresults_csv,
     modules_csv = modules_csv or paths.get_modules_csv(logs_path, bool(offset))
     modules_htm = modules_htm or paths.get_modules_htm(logs_path, bool(offset))
     syslog_htm = paths.get_syslog_htm(None, bool(offset))
-    func_rows = func_rows or Result.read_report_csv(results_csv)
+    func_rows = func_rows or read_report_csv(results_csv)
     module_logs = OrderedDict()
     tgen_logs = OrderedDict()
     tgen_urls = OrderedDict()
@@ -464,7 +479,7 @@ def module_report(func_rows, tc_rows, results_csv, tcresults_csv,
     tsfiles = tsfiles or {}
 
     tc_all, tc_pass = OrderedDict(), OrderedDict()
-    tc_rows = tc_rows or Result.read_report_csv(tcresults_csv)
+    tc_rows = tc_rows or read_report_csv(tcresults_csv)
     for row in tc_rows:
         module = row[offset + 7]
         res = row[offset + 2]
@@ -687,7 +702,7 @@ def consolidated_results(logs_path, add_nes=False):
 
     nes_rows = []
     if add_nes and env.get("SPYTEST_REPORTS_ADD_NES", "1") != "0":
-        all_rows, already_added = [], []
+        all_rows, already_added = [], set()
         all_rows.extend(utils.read_csv(os.path.join(logs_path, "batch_nes.csv")))
         all_rows.extend(utils.read_csv(os.path.join(logs_path, "batch_pending.csv")))
         for row in all_rows:
@@ -696,25 +711,24 @@ def consolidated_results(logs_path, add_nes=False):
             if testcase == "--no-mapped-testcases--":
                 testcase = func
             if testcase not in already_added:
-                already_added.append(testcase)
+                already_added.add(testcase)
                 nes_rows.append(row)
 
     # functions
-    results = read_all_results(logs_path, "functions")
-    consolidated = sorted(results, key=itemgetter(5))
-    if nes_rows and results:
+    consolidated = read_all_results(logs_path, "functions", sort=True)
+    if nes_rows and consolidated:
         # ID,Module,TestFunction,Result,TimeTaken,ExecutedOn,Syslogs,FCLI,TSSH,DCNT,Description,Devices,KnownIssue
-        tmp = results[0][:]  # use the fist row as template
+        tmp = read_all_results(logs_path, "functions", limit=1)[0]  # use the fist row as template
         tmp[0], tmp[3], tmp[4], tmp[5], tmp[10], tmp[11] = \
             "", neid, "0:00:00", "2022-01-03 14:20:27", neid, ""
-        already_added = []
+        already_added = set()
         for nes_row in nes_rows:
             nes_id, nes_module, nes_func, nes_testcase, nes_node = nes_row[0:5]
             if nes_id == "#":
                 continue
             if nes_func in already_added:
                 continue
-            already_added.append(nes_func)
+            already_added.add(nes_func)
             try:
                 nes_node = nes_node.split(">")[-2].split("<")[0]
             except Exception:
@@ -756,14 +770,13 @@ def consolidated_results(logs_path, add_nes=False):
     module_report(None, None, results_csv, tcresults_csv, 1, tsfiles)
 
     # testcases
-    results = read_all_results(logs_path, "testcases")
-    consolidated = sorted(results, key=itemgetter(5))
+    consolidated = read_all_results(logs_path, "testcases", sort=True)
     tcdict = {}
     for row in consolidated:
         tcdict[row[2]] = row
-    if nes_rows and results:
+    if nes_rows and consolidated:
         # ID,Feature,TestCase,Result,ResultType,ExecutedOn,Description,Function,Module,Devices,KnownIssue
-        tmp = results[0][:]  # use the fist row as template
+        tmp = read_all_results(logs_path, "testcases", limit=1)[0]  # use the fist row as template
         tmp[0], tmp[1], tmp[3], tmp[5], tmp[6], tmp[9] = \
             "", neid, neid, "2022-01-03 14:20:27", neid, ""
         for nes_row in nes_rows:
@@ -852,8 +865,7 @@ def consolidated_results(logs_path, add_nes=False):
             print("Failed to generate analisys report")
 
     # syslogs
-    results = read_all_results(logs_path, "syslog")
-    consolidated = sorted(results, key=itemgetter(5))
+    consolidated = read_all_results(logs_path, "syslog", sort=True)
     links, indexes = get_header_info(ReportType.SYSLOGS, ["Node", "Device", "Module"])
     for row in consolidated:
         node_name = row[indexes["Node"]]
@@ -1364,7 +1376,7 @@ def features_summary(logs_path, cols, offset, srs={}):
 
     totals = []
     for name, fpath in zip(names, fpaths):
-        rows = Result.read_report_csv(fpath, False)
+        rows = read_report_csv(fpath, False)
         if len(rows) > 1:
             totals.append(rows[1])
             totals[-1][0] = name
@@ -1394,8 +1406,8 @@ def features_report(func_rows, tc_rows, results_csv, tcresults_csv, offset=0,
     if logs_path is None:
         logs_path = _get_logs_path()[1]
 
-    tc_rows = tc_rows or Result.read_report_csv(tcresults_csv)
-    func_rows = func_rows or Result.read_report_csv(results_csv)
+    tc_rows = tc_rows or read_report_csv(tcresults_csv)
+    func_rows = func_rows or read_report_csv(results_csv)
 
     # create the all features report
     features_csv = features_csv or paths.get_features_csv(logs_path, bool(offset))
@@ -1689,8 +1701,8 @@ def sub_report(src_log_path, dst_log_path=None, consolidated=False,
                include=None, exclude=None, name=None):
     tcresults_csv = paths.get_tc_results_csv(src_log_path, consolidated)
     results_csv = paths.get_results_csv(src_log_path, consolidated)
-    tc_rows = Result.read_report_csv(tcresults_csv)
-    func_rows = Result.read_report_csv(results_csv)
+    tc_rows = read_report_csv(tcresults_csv)
+    func_rows = read_report_csv(results_csv)
 
     offset = 1 if consolidated else 0
     if include is not None:
@@ -1748,9 +1760,9 @@ def combined_report(dst_log_path, src_log_paths, consolidated=True):
     for name, src_log_path in src_log_paths:
         tcresults_csv = paths.get_tc_results_csv(src_log_path, consolidated)
         results_csv = paths.get_results_csv(src_log_path, consolidated)
-        tc_rows[name] = Result.read_report_csv(tcresults_csv)
+        tc_rows[name] = read_report_csv(tcresults_csv)
         tc_rows[None].extend(tc_rows[name])
-        func_rows[name] = Result.read_report_csv(results_csv)
+        func_rows[name] = read_report_csv(results_csv)
         func_rows[None].extend(func_rows[name])
 
     for name, ent in func_rows.items():
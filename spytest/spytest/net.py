@@ -84,6 +84,10 @@ class Net(object):
         self.fix_sonic_51743 = env.match("SPYTEST_FIX_SONIC_51743", "1", "1")
         self.cmd_lock_support = env.match("SPYTEST_CONCURRENT_CONFIG_LOCK", "1", "0")
         self.onie_noip_recover = bool(env.get("SPYTEST_RECOVER_FROM_ONIE_WTIHOUT_IP", "1") != "0")
+        # run the same command issued to different DUTs back-to-back concurrently
+        self.deferred_exec = env.match("SPYTEST_DEFERRED_EXEC", "1", "0")
+        self.deferred_batch = None
+        self.deferred_saved_time = 0
         self.session_start_time = get_timenow()
         self.module_start_time = None
         self.module_max_timeout_triggered = False
@@ -2201,6 +2205,10 @@ class Net(object):
                       expect_disc=False, opts=None, **kwargs):
         output = ""
 
+        # complete the deferred commands before sending any other command from main thread
+        if self.deferred_batch and putils.is_main_thread():
+            self.deferred_join()
+
         opts = opts or self.run_opts(None, **kwargs)
         trace_log = trace_log or self.default_trace_log
 
@@ -5393,6 +5401,8 @@ class Net(object):
     def module_init_start(self, max_timeout, fcli, tryssh):
         msg = "Net Module Init {} {} {}".format(max_timeout, fcli, tryssh)
         self.logger.info(msg)
+        self.deferred_join(False)
+        self.deferred_saved_time = 0
         self.session_start_time = None
         self.module_start_time = get_timenow()
         self.module_max_timeout = max_timeout
@@ -5478,6 +5488,7 @@ class Net(object):
         self.wa.hooks.post_session(devname)
 
     def session_close(self):
+        self.deferred_join(False)
         putils.exec_foreach(self.cfg.faster_init, self.topo.duts,
                             self._session_close_dut)
 
@@ -5507,6 +5518,7 @@ class Net(object):
                             self._set_tryssh, tryssh_val, switch)
 
     def tc_start(self, start_time=None):
+        self.deferred_join(False)
         self.tc_start_time = start_time
         profile.init()
 
@@ -6008,9 +6020,15 @@ class Net(object):
         return cmd
 
     def show(self, devname, cmd, **kwargs):
+        line = utils.get_line_number(3)
+        if self._deferred_supported(devname, **kwargs):
+            return self._deferred_submit("show", devname, cmd, self._show_locked, line, devname, cmd, **kwargs)
+        self.deferred_join()
+        return self._show_locked(line, devname, cmd, **kwargs)
+
+    def _show_locked(self, line, devname, cmd, **kwargs):
         if not self._cmd_lock(devname, cmd):
             return None
-        line = utils.get_line_number(3)
         retval = self._show(line, devname, cmd, **kwargs)
         self._cmd_unlock(devname, cmd)
         return retval
@@ -6128,12 +6146,80 @@ class Net(object):
         return self._cli_lock(access, cmd, suffix="cmd", trace=False)
 
     def config(self, devname, cmd, **kwargs):
+        if self._deferred_supported(devname, **kwargs):
+            return self._deferred_submit("config", devname, cmd, self._config_locked, devname, cmd, **kwargs)
+        self.deferred_join()
+        return self._config_locked(devname, cmd, **kwargs)
+
+    def _config_locked(self, devname, cmd, **kwargs):
         if not self._cmd_lock(devname, cmd):
             return None
         retval = self._config(devname, cmd, **kwargs)
         self._cmd_unlock(devname, cmd)
         return retval
 
+    def _deferred_supported(self, devname, **kwargs):
+        if not self.deferred_exec or not putils.is_main_thread():
+            return False
+        if self.is_filemode(devname):
+            return False
+        # commands changing the device state beyond the CLI are always run in order
+        for name in ["expect_reboot", "expect_ipchange", "confirm"]:
+            if kwargs.get(name, None):
+                return False
+        # only the commands whose output is discarded by the caller can be run in background
+        return utils.is_result_ignored(skip_dir=os.path.dirname(os.path.abspath(__file__)))
+
+    def _deferred_submit(self, op, devname, cmd, func, *args, **kwargs):
+        """
+        Run the command in background, the caller discards its output so None is returned.
+        Consecutive calls with the same command to different DUTs run concurrently,
+        any other call first waits for the pending commands to complete.
+        """
+        key = [op, cmd, sorted([[k, str(v)] for k, v in kwargs.items()])]
+        batch = self.deferred_batch
+        if batch and (batch.key != key or devname in batch.results):
+            self.deferred_join()
+            batch = None
+        if not batch:
+            batch = SpyTestDict(key=key, cmd=cmd, start_time=get_timenow())
+            batch.results = OrderedDict()
+            self.deferred_batch = batch
+        batch.results[devname] = putils.DeferredResult(func, *args, **kwargs)
+        return None
+
+    def deferred_join(self, raise_error=True):
+        """
+        Wait for the pending deferred commands to complete and account the time recovered.
+        The errors are reported and the first one is raised again.
+        """
+        batch = self.deferred_batch
+        if not batch or not putils.is_main_thread():
+            return
+        self.deferred_batch = None
+        error = None
+        for devname, result in batch.results.items():
+            exp = result.get_error()
+            if exp is not None and not result.is_error_raised():
+                msg = "deferred command '{}' failed: {}".format(batch.cmd, exp)
+                self.dut_err(devname, msg)
+                error = error or result
+        if len(batch.results) > 1:
+            results = list(batch.results.values())
+            total_time = sum([result.elapsed() for result in results])
+            wall_time = max([r.end_time for r in results]) - min([r.start_time for r in results])
+            saved_time = int(max(total_time - wall_time, 0) * 1000)
+            self.deferred_saved_time = self.deferred_saved_time + saved_time
+            profile.deferred(batch.start_time, batch.cmd, list(batch.results.keys()), saved_time)
+        if error and raise_error:
+            error.join()
+
+    def get_deferred_saved_time(self, reset=False):
+        retval = self.deferred_saved_time
+        if reset:
+            self.deferred_saved_time = 0
+        return retval
+
     def _config(self, devname, cmd, **kwargs):
         opts = self._parse_cli_opts(devname, cmd, **kwargs)
 
@@ -354,6 +354,10 @@ def get_pid_log(prefix=None):
     return get_file_path("pid", "txt", prefix)
 
 
+def get_profile_log(prefix=None):
+    return get_file_path("profile", "tsv", prefix)
+
+
 def parse_nodeid(nodeid):
     try:
         module, func = nodeid.split("::", 1)
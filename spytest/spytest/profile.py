@@ -1,98 +1,328 @@
+import logging
+import math
+import re
+import threading
+from collections import deque
 
 from spytest.st_time import get_timenow
+from spytest.st_time import parse
 from spytest.dicts import SpyTestDict
+from spytest import env
 
 from utilities.parallel import get_thread_name
 
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+MAX_TRACE_ENTRIES = 1000
+
+# escapes of the profile stream fields, one event per line
+ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+UNESCAPES = {v: k for k, v in ESCAPES.items()}
+ESCAPE_RE = re.compile(r"[\\\t\n\r]")
+UNESCAPE_RE = re.compile(r"\\[\\tnr]")
+
+logger = logging.getLogger(__name__)
+
+
+class LatencySketch(object):
+    """
+    Fixed size sketch of the command times, with log scaled buckets.
+    The quantiles are within the given relative accuracy of the actual
+    values as long as the buckets are not collapsed.
+    """
+
+    def __init__(self, accuracy=0.02, max_bins=256):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = dict()
+        self.zeros = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.count = self.count + 1
+        self.total = self.total + value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros = self.zeros + 1
+            return
+        index = int(math.ceil(math.log(value) / self.log_gamma))
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            # collapse the lowest buckets, the high quantiles stay accurate
+            [low, next_low] = sorted(self.bins)[:2]
+            self.bins[next_low] = self.bins[next_low] + self.bins.pop(low)
+
+    def quantile(self, q):
+        if not self.count:
+            return 0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for index in sorted(self.bins):
+            seen = seen + self.bins[index]
+            if seen > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(int(round(value)), self.max)
+        return self.max
+
+
+class EventView(object):
+    """
+    Re-iterable view of the events streamed to the profile file
+    between the given offsets, in the order they were recorded.
+    """
+
+    def __init__(self, filepath, start, end, ctypes=None, short=False):
+        self.filepath = filepath
+        self.start = start
+        self.end = end
+        self.ctypes = ctypes
+        self.short = short
+
+    def __iter__(self):
+        if not self.filepath or self.end <= self.start:
+            return
+        with open(self.filepath, "rb") as ifh:
+            ifh.seek(self.start)
+            pos = self.start
+            while pos < self.end:
+                line = ifh.readline()
+                if not line:
+                    break
+                pos = pos + len(line)
+                event = _decode(line)
+                if event is None:
+                    continue
+                if self.ctypes and event[2] not in self.ctypes:
+                    continue
+                if self.short:
+                    [start_time, thid, _, dut, msg, cmd_time] = event
+                    yield [start_time, thid, dut, msg, cmd_time]
+                else:
+                    yield event
+
+
+def _escape(field):
+    return ESCAPE_RE.sub(lambda m: ESCAPES[m.group(0)], field)
+
+
+def _unescape(field):
+    return UNESCAPE_RE.sub(lambda m: UNESCAPES[m.group(0)], field)
+
+
+def _encode(start_time, thid, ctype, dut, msg, value):
+    fields = [start_time.strftime(TIME_FORMAT), thid, ctype, dut or "", str(value), msg]
+    line = "\t".join([_escape(field) for field in fields])
+    return "{}\n".format(line).encode("utf-8", "replace")
+
+
+def _decode(line):
+    """
+    Returns the event of the line, or None if the line is malformed
+    """
+    parts = line.decode("utf-8", "replace").rstrip("\n").split("\t")
+    if len(parts) != 6:
+        return None
+    [start_time, thid, ctype, dut, value, msg] = [_unescape(part) for part in parts]
+    try:
+        start_time = parse(start_time, TIME_FORMAT)
+    except Exception:
+        return None
+    value = int(value) if value.lstrip("-").isdigit() else value
+    return [start_time, thid, ctype, dut or None, msg, value]
+
 
 class Profile(object):
 
     def init(self):
-        self.pnfound = 0
-        self.ts_files = 0
-        self.tg_total_wait = 0
-        self.tc_total_wait = 0
-        self.tg_total_wait = 0
-        self.tc_cmd_time = 0
-        self.tc_cmds = []
-        self.tg_cmd_time = 0
-        self.tg_cmds = []
-        self.helper_cmd_time = 0
-        self.helper_cmds = []
-        self.cmds = []
-        self.profile_ids = dict()
-        self.canbe_parallel = []
+        with self.lock:
+            self.pnfound = 0
+            self.ts_files = 0
+            self.tg_total_wait = 0
+            self.tc_total_wait = 0
+            self.tc_cmd_time = 0
+            self.tg_cmd_time = 0
+            self.helper_cmd_time = 0
+            self.sketches = dict()
+            self.canbe_parallel = []
+            self.deferred_cmds = []
+            self.deferred_saved_time = 0
+            max_cmds = int(env.get("SPYTEST_PROFILE_MAX_CMDS", "10000"))
+            self.cmds = deque(maxlen=max_cmds)
+            self.dropped = dict()
+            if self.stream:
+                self.stream.flush()
+                self.stream_offset = self.stream.tell()
 
     def __init__(self):
+        self.lock = threading.Lock()
+        self.profile_ids = dict()
+        self.next_pid = 0
+        self.last_start = [None, None]
+        self.stream = None
+        self.stream_path = None
+        self.stream_offset = 0
         self.init()
 
+    def set_stream_file(self, filepath):
+        """
+        Stream the events to the given append-only file instead of keeping
+        them in memory, only the aggregates are kept in memory.
+        """
+        with self.lock:
+            if self.stream:
+                self.stream.close()
+            self.stream, self.stream_path = None, None
+            if filepath:
+                self.stream = open(filepath, "ab")
+                self.stream_path = filepath
+                self.stream_offset = self.stream.tell()
+                self.cmds.clear()
+
+    def _add_event(self, start_time, thid, ctype, dut, msg, value):
+        # called with the lock held
+        if self.stream:
+            self.stream.write(_encode(start_time, thid, ctype, dut, msg, value))
+        else:
+            if len(self.cmds) == self.cmds.maxlen:
+                self._count_dropped("cmds", self.cmds.maxlen)
+            self.cmds.append([start_time, thid, ctype, dut, msg, value])
+        if ctype in ["CMD", "HELPER", "TG", "DEFERRED"]:
+            key = (ctype, dut)
+            if key not in self.sketches:
+                self.sketches[key] = LatencySketch()
+            self.sketches[key].add(value)
+
+    def _count_dropped(self, name, limit):
+        # called with the lock held
+        if name not in self.dropped:
+            logger.warning("profile %s exceeded %d entries, the extra entries are dropped", name, limit)
+        self.dropped[name] = self.dropped.get(name, 0) + 1
+
+    def _add_trace(self, name, entries, entry):
+        if len(entries) < MAX_TRACE_ENTRIES:
+            entries.append(entry)
+        else:
+            self._count_dropped(name, MAX_TRACE_ENTRIES)
+
     def start(self, msg, dut=None, data=None):
         msg = msg.replace("\r", "")
         msg = msg.replace("\n", "\\n")
-        count = len(self.profile_ids)
-        self.profile_ids[count] = [get_timenow(), dut, msg, data]
-        return count
+        with self.lock:
+            pid = self.next_pid
+            self.next_pid = pid + 1
+            self.profile_ids[pid] = [get_timenow(), dut, msg, data, self.last_start]
+            self.last_start = [dut, msg]
+        return pid
 
     def stop(self, pid):
-        [start_time, dut, msg, data] = self.profile_ids[pid]
-        delta = get_timenow() - start_time
-        cmd_time = int(delta.total_seconds() * 1000)
+        stop_time = get_timenow()
         thid = get_thread_name()
-        if dut:
-            if pid > 0 and thid == "T0000: ":
-                [_, pdut, pmsg, _] = self.profile_ids[pid - 1]
-                if pmsg == msg and dut != pdut:
-                    self.canbe_parallel.append([start_time, msg, dut, pdut])
-            if "spytest-helper.py" in msg:
-                self.helper_cmds.append([start_time, thid, dut, msg, cmd_time])
-                self.helper_cmd_time = self.helper_cmd_time + cmd_time
-                self.cmds.append([start_time, thid, "HELPER", dut, msg, cmd_time])
+        with self.lock:
+            [start_time, dut, msg, data, [pdut, pmsg]] = self.profile_ids.pop(pid)
+            delta = stop_time - start_time
+            cmd_time = int(delta.total_seconds() * 1000)
+            if dut:
+                if pid > 0 and thid == "T0000: ":
+                    if pmsg == msg and dut != pdut:
+                        self._add_trace("canbe_parallel", self.canbe_parallel, [start_time, msg, dut, pdut])
+                if "spytest-helper.py" in msg:
+                    self.helper_cmd_time = self.helper_cmd_time + cmd_time
+                    self._add_event(start_time, thid, "HELPER", dut, msg, cmd_time)
+                else:
+                    self.tc_cmd_time = self.tc_cmd_time + cmd_time
+                    self._add_event(start_time, thid, "CMD", dut, msg, cmd_time)
             else:
-                self.tc_cmds.append([start_time, thid, dut, msg, cmd_time])
-                self.tc_cmd_time = self.tc_cmd_time + cmd_time
-                self.cmds.append([start_time, thid, "CMD", dut, msg, cmd_time])
-        else:
-            self.tg_cmds.append([start_time, thid, dut, msg, cmd_time])
-            self.tg_cmd_time = self.tg_cmd_time + cmd_time
-            self.cmds.append([start_time, thid, "TG", dut, msg, cmd_time])
+                self.tg_cmd_time = self.tg_cmd_time + cmd_time
+                self._add_event(start_time, thid, "TG", dut, msg, cmd_time)
         return data
 
+    def deferred(self, start_time, msg, duts, saved_time):
+        msg = msg.replace("\r", "")
+        msg = msg.replace("\n", "\\n")
+        thid = get_thread_name()
+        duts = ",".join(duts)
+        with self.lock:
+            self._add_trace("deferred_cmds", self.deferred_cmds, [start_time, msg, duts, saved_time])
+            self.deferred_saved_time = self.deferred_saved_time + saved_time
+            self._add_event(start_time, thid, "DEFERRED", duts, msg, saved_time)
+
     def wait(self, val, is_tg=False):
         start_time = get_timenow()
         thid = get_thread_name()
-        if is_tg:
-            self.tg_total_wait = self.tg_total_wait + val
-            self.cmds.append([start_time, thid, "TGWAIT", None, "TG sleep", val])
-        else:
-            self.tc_total_wait = self.tc_total_wait + val
-            self.cmds.append([start_time, thid, "WAIT", None, "static delay", val])
+        with self.lock:
+            if is_tg:
+                self.tg_total_wait = self.tg_total_wait + val
+                self._add_event(start_time, thid, "TGWAIT", None, "TG sleep", val)
+            else:
+                self.tc_total_wait = self.tc_total_wait + val
+                self._add_event(start_time, thid, "WAIT", None, "static delay", val)
 
     def prompt_nfound(self, cmd):
         start_time = get_timenow()
         thid = get_thread_name()
-        self.pnfound = self.pnfound + 1
-        self.cmds.append([start_time, thid, "PROMPT_NFOUND", None, cmd, ""])
+        with self.lock:
+            self.pnfound = self.pnfound + 1
+            self._add_event(start_time, thid, "PROMPT_NFOUND", None, cmd, "")
 
     def tech_support(self, cmd):
         start_time = get_timenow()
         thid = get_thread_name()
-        self.ts_files = self.ts_files + 1
-        self.cmds.append([start_time, thid, "TECH_SUPPORT", None, cmd, ""])
+        with self.lock:
+            self.ts_files = self.ts_files + 1
+            self._add_event(start_time, thid, "TECH_SUPPORT", None, cmd, "")
+
+    def _get_view(self, ctypes=None, short=False):
+        # called with the lock held
+        if self.stream:
+            self.stream.flush()
+            return EventView(self.stream_path, self.stream_offset,
+                             self.stream.tell(), ctypes, short)
+        cmds = []
+        for [start_time, thid, ctype, dut, msg, value] in self.cmds:
+            if ctypes and ctype not in ctypes:
+                continue
+            if short:
+                cmds.append([start_time, thid, dut, msg, value])
+            else:
+                cmds.append([start_time, thid, ctype, dut, msg, value])
+        return cmds
+
+    def get_summary(self):
+        """
+        Returns list of [ctype, dut, count, total, p50, p90, p99, max]
+        """
+        retval = []
+        with self.lock:
+            for (ctype, dut) in sorted(self.sketches, key=lambda k: (k[0], k[1] or "")):
+                sketch = self.sketches[(ctype, dut)]
+                retval.append([ctype, dut, sketch.count, sketch.total,
+                               sketch.quantile(0.5), sketch.quantile(0.9),
+                               sketch.quantile(0.99), sketch.max])
+        return retval
 
     def get_stats(self):
         stats = SpyTestDict()
-        stats.tg_total_wait = self.tg_total_wait
-        stats.tc_total_wait = self.tc_total_wait
-        stats.tc_cmd_time = self.tc_cmd_time
-        stats.tc_cmds = self.tc_cmds
-        stats.tg_cmd_time = self.tg_cmd_time
-        stats.tg_cmds = self.tg_cmds
-        stats.helper_cmd_time = self.helper_cmd_time
-        stats.helper_cmds = self.helper_cmds
-        stats.cmds = self.cmds
-        stats.canbe_parallel = self.canbe_parallel
-        stats.pnfound = self.pnfound
-        stats.ts_files = self.ts_files
+        stats.cmd_summary = self.get_summary()
+        with self.lock:
+            stats.tg_total_wait = self.tg_total_wait
+            stats.tc_total_wait = self.tc_total_wait
+            stats.tc_cmd_time = self.tc_cmd_time
+            stats.tc_cmds = self._get_view(["CMD"], True)
+            stats.tg_cmd_time = self.tg_cmd_time
+            stats.tg_cmds = self._get_view(["TG"], True)
+            stats.helper_cmd_time = self.helper_cmd_time
+            stats.helper_cmds = self._get_view(["HELPER"], True)
+            stats.cmds = self._get_view()
+            stats.canbe_parallel = list(self.canbe_parallel)
+            stats.deferred_cmds = list(self.deferred_cmds)
+            stats.deferred_saved_time = self.deferred_saved_time
+            stats.pnfound = self.pnfound
+            stats.ts_files = self.ts_files
+            stats.dropped = dict(self.dropped)
         return stats
 
 
@@ -103,6 +333,10 @@ def init():
     return obj.init()
 
 
+def set_stream_file(filepath):
+    return obj.set_stream_file(filepath)
+
+
 def start(msg, dut=None, data=None):
     return obj.start(msg, dut, data)
 
@@ -111,6 +345,10 @@ def stop(pid):
     return obj.stop(pid)
 
 
+def deferred(start_time, msg, duts, saved_time):
+    return obj.deferred(start_time, msg, duts, saved_time)
+
+
 def wait(val, is_tg=False):
     return obj.wait(val, is_tg)
 
@@ -119,9 +357,52 @@ def get_stats():
     return obj.get_stats()
 
 
+def get_summary():
+    return obj.get_summary()
+
+
 def prompt_nfound(cmd):
     return obj.prompt_nfound(cmd)
 
 
 def tech_support(cmd):
     return obj.tech_support(cmd)
+
+
+def benchmark(count=100000, duts=4, filepath=None):
+    """
+    Measure the peak memory used to profile a synthetic session with the
+    given number of commands, with and without streaming to a file.
+    """
+    import os
+    import tempfile
+    import tracemalloc
+
+    def run(stream_path):
+        prof = Profile()
+        prof.set_stream_file(stream_path)
+        tracemalloc.start()
+        for index in range(count):
+            pid = prof.start("show interface status {}".format(index), "D{}".format(index % duts + 1))
+            prof.stop(pid)
+            if index % 100 == 0:
+                prof.wait(1)
+        stats = prof.get_stats()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        prof.set_stream_file(None)
+        return peak, sum(1 for _ in stats.cmds), stats.cmd_summary
+
+    retval = SpyTestDict()
+    tmp_path = filepath or tempfile.mktemp(suffix=".tsv")
+    try:
+        retval.stream_peak, retval.stream_events, retval.summary = run(tmp_path)
+    finally:
+        if not filepath and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    retval.memory_peak, retval.memory_events, _ = run(None)
+    return retval
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,226 @@
+import os
+import sqlite3
+import threading
+
+from spytest.result import Result
+
+# the report cells are stored joined with the ASCII unit separator
+separator = "\x1f"
+
+schema = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    node TEXT,
+    mtime INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS rows (
+    file_id INTEGER,
+    seq INTEGER,
+    executed_on TEXT,
+    data TEXT,
+    PRIMARY KEY (file_id, seq)
+);
+CREATE TEMP TABLE IF NOT EXISTS selected (
+    file_id INTEGER PRIMARY KEY,
+    position INTEGER
+);
+"""
+
+
+def _get_file_state(filepath):
+    try:
+        st = os.stat(filepath)
+    except Exception:
+        return None, None
+    mtime = getattr(st, "st_mtime_ns", None)
+    if mtime is None:
+        mtime = int(st.st_mtime * 1000000000)
+    return mtime, st.st_size
+
+
+class ResultsStore(object):
+    """
+    Store of the rows of the report CSV files.
+    Each file is parsed once and parsed again only when it changes,
+    the reports are built from the queries on the store. The query results
+    are cached until any of the files they are built from is parsed again.
+    """
+
+    def __init__(self, db_path=":memory:", max_cached=32):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(schema)
+        self.generation = 0
+        self.file_generation = dict()
+        self.max_cached = max_cached
+        self.cache = dict()
+
+    def _ingest(self, filepath):
+        mtime, size = _get_file_state(filepath)
+        cur = self.conn.execute("SELECT id, mtime, size FROM files WHERE path = ?", (filepath,))
+        entry = cur.fetchone()
+        if entry and entry[1] == mtime and entry[2] == size:
+            return entry[0]
+        self.generation = self.generation + 1
+        if entry:
+            file_id = entry[0]
+            self.conn.execute("DELETE FROM rows WHERE file_id = ?", (file_id,))
+            self.conn.execute("UPDATE files SET mtime = ?, size = ? WHERE id = ?",
+                              (mtime, size, file_id))
+        else:
+            node = os.path.basename(os.path.dirname(filepath))
+            cur = self.conn.execute("INSERT INTO files (path, node, mtime, size) VALUES (?, ?, ?, ?)",
+                                    (filepath, node, mtime, size))
+            file_id = cur.lastrowid
+        self.file_generation[file_id] = self.generation
+        rows = []
+        for seq, row in enumerate(Result.read_report_csv(filepath, False)):
+            # ExecutedOn column, the node name replaces the row index when read
+            executed_on = row[5] if len(row) > 5 else None
+            rows.append((file_id, seq, executed_on, separator.join(row)))
+        self.conn.executemany("INSERT INTO rows VALUES (?, ?, ?, ?)", rows)
+        return file_id
+
+    def _select(self, files):
+        ids = [self._ingest(filepath) for filepath in files]
+        self.conn.execute("DELETE FROM selected")
+        self.conn.executemany("INSERT OR IGNORE INTO selected VALUES (?, ?)",
+                              [(file_id, pos) for pos, file_id in enumerate(ids)])
+        self.conn.commit()
+        return tuple(ids)
+
+    @staticmethod
+    def _build_row(node, data, rmindex, add_node):
+        row = data.split(separator)
+        if rmindex:
+            row.pop(0)
+        if add_node:
+            row.insert(0, node)
+        return tuple(row)
+
+    def read(self, files, rmindex=True, add_node=True, sort=False, limit=None):
+        """
+        Returns the rows of the given files, in the order of the files, with
+        the node name of each file inserted as the first column.
+        When sort is set, the rows are sorted on ExecutedOn, and the rows with the
+        same ExecutedOn stay in the order of the files as with a stable sort.
+        """
+        order = "s.position, r.seq"
+        if sort:
+            order = "r.executed_on, {}".format(order)
+        query = "SELECT f.node, r.data FROM rows r JOIN selected s ON r.file_id = s.file_id " \
+                "JOIN files f ON f.id = r.file_id ORDER BY {}".format(order)
+        if limit is not None:
+            query = "{} LIMIT {}".format(query, int(limit))
+        with self.lock:
+            ids = self._select(files)
+            key = (ids, rmindex, add_node, sort, limit)
+            generations = tuple(self.file_generation[file_id] for file_id in ids)
+            entry = self.cache.get(key)
+            if not entry or entry[0] != generations:
+                rows = [self._build_row(node, data, rmindex, add_node)
+                        for node, data in self.conn.execute(query)]
+                if len(self.cache) >= self.max_cached:
+                    self.cache.clear()
+                entry = self.cache[key] = (generations, rows)
+        # the callers modify the rows
+        return [list(row) for row in entry[1]]
+
+    def read_file(self, filepath, rmindex=True):
+        return self.read([filepath], rmindex, False)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM rows")
+            self.conn.execute("DELETE FROM files")
+            self.conn.commit()
+            self.file_generation.clear()
+            self.cache.clear()
+
+
+store = None
+
+
+def get_store():
+    global store
+    if store is None:
+        store = ResultsStore()
+    return store
+
+
+def read_results(files, rmindex=True, sort=False, limit=None):
+    return get_store().read(files, rmindex, True, sort, limit)
+
+
+def read_report_csv(filepath, rmindex=True):
+    return get_store().read_file(filepath, rmindex)
+
+
+def benchmark(nodes=50, functions=400, testcases=4, path=None):
+    """
+    Compare the time to read and sort the results of a synthetic batch run
+    with the given number of nodes, directly from the CSV files and from the store.
+    """
+    import time
+    import glob
+    import shutil
+    import tempfile
+    from operator import itemgetter
+
+    import utilities.common as utils
+
+    logs_path = path or tempfile.mkdtemp()
+    hdr = ["#", "Module", "TestFunction", "Result", "TimeTaken", "ExecutedOn", "Description"]
+    for node in range(nodes):
+        rows, tc_rows = [], []
+        for func in range(functions):
+            executed_on = "2022-01-03 14:{:02d}:{:02d}".format(func % 60, node % 60)
+            module = "test_module_{}.py".format(func % 20)
+            rows.append([func + 1, module, "test_func_{}_{}".format(node, func), "Pass",
+                         "0:00:10", executed_on, "description, with comma"])
+            for tc in range(testcases):
+                tc_rows.append([len(tc_rows) + 1, module, "tc_{}_{}_{}".format(node, func, tc), "Pass",
+                                "Pass", executed_on, "description"])
+        node_path = os.path.join(logs_path, "gw{}".format(node))
+        utils.write_csv_file(hdr, rows, os.path.join(node_path, "results_functions.csv"))
+        utils.write_csv_file(hdr, tc_rows, os.path.join(node_path, "results_testcases.csv"))
+
+    retval = {}
+    try:
+        for suffix in ["functions", "testcases"]:
+            files = glob.glob("{}/gw*/*_{}.csv".format(logs_path, suffix))
+
+            start = time.time()
+            expected = []
+            for csv_file in files:
+                for row in Result.read_report_csv(csv_file):
+                    row.insert(0, os.path.basename(os.path.dirname(csv_file)))
+                    expected.append(row)
+            expected = sorted(expected, key=itemgetter(5))
+            retval["{}_csv".format(suffix)] = time.time() - start
+
+            bench_store = ResultsStore()
+            start = time.time()
+            actual = bench_store.read(files, sort=True)
+            retval["{}_store_first".format(suffix)] = time.time() - start
+            start = time.time()
+            actual = bench_store.read(files, sort=True)
+            retval["{}_store_next".format(suffix)] = time.time() - start
+            # one node updating its results
+            utils.write_csv_file(hdr, Result.read_report_csv(files[0], False)[:-1], files[0])
+            start = time.time()
+            bench_store.read(files, sort=True)
+            retval["{}_store_changed".format(suffix)] = time.time() - start
+            retval["{}_rows".format(suffix)] = len(actual)
+            retval["{}_match".format(suffix)] = bool(actual == expected)
+    finally:
+        if not path:
+            shutil.rmtree(logs_path, ignore_errors=True)
+
+    return retval
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -202,8 +202,8 @@ def unused_pytest_keyboard_interrupt(excinfo):
 def pytest_pyfunc_call(pyfuncitem):
     trace("\n%s: prolog", get_proc_name())
     stf.pyfunc_call(pyfuncitem, False)
-    yield
-    stf.pyfunc_call(pyfuncitem, True)
+    outcome = yield
+    stf.pyfunc_call(pyfuncitem, True, outcome.excinfo is None)
     trace("\n%s: epilog", get_proc_name())
 
 
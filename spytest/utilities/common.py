@@ -347,6 +347,37 @@ def get_line_numbers(lvl=0, count=4):
     return "/".join([str(line) for line in lines])
 
 
+_result_ignored_cache = dict()
+
+
+def is_result_ignored(lvl=0, skip_dir=None):
+    """
+    Check if the caller discards the return value of the current call,
+    i.e. the calling statement is a bare call whose result is popped.
+    The frames of the files in skip_dir are pass-through wrappers and are skipped.
+    """
+    cf = inspect.currentframe().f_back
+    for _ in range(lvl):
+        cf = cf.f_back if cf else None
+    while cf and skip_dir and os.path.dirname(os.path.abspath(cf.f_code.co_filename)) == skip_dir:
+        cf = cf.f_back
+    if not cf:
+        return False
+    key = (cf.f_code, cf.f_lasti)
+    if key not in _result_ignored_cache:
+        import dis
+        retval = False
+        try:
+            for instr in dis.get_instructions(cf.f_code):
+                if instr.offset > cf.f_lasti:
+                    retval = bool(instr.opname == "POP_TOP")
+                    break
+        except Exception:
+            pass
+        _result_ignored_cache[key] = retval
+    return _result_ignored_cache[key]
+
+
 def trace(fmt, *args):
     sys.stdout.write(fmt % args)
 
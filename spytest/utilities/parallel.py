@@ -420,6 +420,54 @@ class ExecuteBackgroud(object):
             print(e2)
 
 
+class DeferredResult(object):
+    """
+    Result of a function executed in a background thread.
+    The thread is joined when the result is waited for.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self.start_time = time.time()
+        self.end_time = None
+        self._value = None
+        self._error = None
+        self._raised = False
+        self._joined = False
+        call_stack = utils.get_call_stack(2)
+
+        def _thread_func():
+            save_call_stack(call_stack)
+            try:
+                self._value = func(*args, **kwargs)
+            except (Exception, SystemExit) as e:
+                self._error = e
+            finally:
+                self.end_time = time.time()
+
+        self._thread = create_thread(target=_thread_func)
+        self._thread.start()
+
+    def join(self, raise_error=True):
+        if not self._joined:
+            wait_for_threads([self._thread])
+            self._joined = True
+        if self._error is not None and raise_error and not self._raised:
+            self._raised = True
+            raise self._error
+        return self._value
+
+    def get_error(self):
+        self.join(False)
+        return self._error
+
+    def is_error_raised(self):
+        return self._raised
+
+    def elapsed(self):
+        self.join(False)
+        return self.end_time - self.start_time
+
+
 def ensure_no_exception(values, action="abort"):
     """
     Importing st in function because this file has been imported by
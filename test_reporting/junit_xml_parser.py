@@ -26,6 +26,7 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
 import argparse
 import glob
 import json
+import multiprocessing
 import sys
 import os
 
@@ -44,6 +45,9 @@ REPORT_LIST.append("Script Name, Total, Pass, Fail, Skip, Error, XFail, Time")
 MAXIMUM_XML_SIZE = 20e7  # 20MB
 MAXIMUM_SUMMARY_SIZE = 1024  # 1MB
 
+# Number of XML files sent to a parser process at once.
+ARCHIVE_PARSE_CHUNK_SIZE = 16
+
 # Fields found in the testsuite/root section of the JUnit XML file.
 TESTSUITES_TAG = "testsuites"
 TESTSUITE_TAG = "testsuite"
@@ -178,7 +182,7 @@ def validate_junit_xml_archive(directory_name, strict=False):
     roots = []
     metadata_source = None
     metadata = {}
-    doc_list = set(glob.glob(os.path.join(directory_name, "**", "*.xml"), recursive=True))
+    doc_list = sorted(set(glob.glob(os.path.join(directory_name, "**", "*.xml"), recursive=True)))
 
     total_size = 0
     for document in doc_list:
@@ -226,6 +230,207 @@ def validate_junit_xml_path(path, strict=False):
     return roots
 
 
+def parse_junit_xml_path(path, strict=False, processes=None):
+    """Validate and parse an XML file or archive into JSON.
+
+    Same as parse_test_result(validate_junit_xml_path(path, strict)), archives are parsed with
+    parse_junit_xml_archive.
+    """
+    if os.path.isfile(path):
+        return parse_test_result([(validate_junit_xml_file(path), path)])
+
+    return parse_junit_xml_archive(path, strict, processes)
+
+
+def parse_junit_xml_archive(directory_name, strict=False, processes=None):
+    """Validate and parse an XML archive into JSON.
+
+    The XML documents are validated and parsed incrementally in a pool of processes, without building the
+    full XML trees, and the results are merged in the order of the document paths. The result is the same
+    as parse_test_result(validate_junit_xml_archive(directory_name, strict)).
+
+    Args:
+        directory_name: The name of the directory containing XML documents.
+        strict: Fail if any of the XML documents is not valid.
+        processes: The number of parser processes, the number of CPUs by default.
+
+    Returns:
+        A dict containing the parsed test result.
+
+    Raises:
+        JUnitXMLValidationError: if the provided files exceed 10MB, or in strict mode if any of the
+            provided files is unparseable or is missing required fields.
+    """
+    if not os.path.exists(directory_name) or not os.path.isdir(directory_name):
+        print("directory {} not found".format(directory_name))
+        return parse_test_result(None)
+
+    doc_list = sorted(set(glob.glob(os.path.join(directory_name, "**", "*.xml"), recursive=True)))
+
+    total_size = 0
+    for document in doc_list:
+        total_size += os.path.getsize(document)
+
+    if total_size > MAXIMUM_XML_SIZE:
+        raise JUnitXMLValidationError("provided directory is too large")
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, len(doc_list))
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap(_stream_junit_xml_file, doc_list, chunksize=ARCHIVE_PARSE_CHUNK_SIZE)
+    else:
+        pool = None
+        results = map(_stream_junit_xml_file, doc_list)
+
+    test_result_json = defaultdict(dict)
+    metadata_source = None
+    metadata = {}
+    parsed = 0
+    try:
+        for document, result in zip(doc_list, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+
+                root_metadata = {k: v for k, v in result["root_metadata"].items()
+                                 if k in REQUIRED_METADATA_PROPERTIES and k != "timestamp"}
+                if root_metadata:
+                    if not metadata_source:
+                        metadata_source = document
+                        metadata = root_metadata
+
+                    if root_metadata != metadata:
+                        raise JUnitXMLValidationError(f"{document} metadata differs from {metadata_source}\n"
+                                                      f"{document}: {root_metadata}\n"
+                                                      f"{metadata_source}: {metadata}")
+            except Exception as e:
+                if strict:
+                    raise JUnitXMLValidationError(f"could not parse {document}: {e}") from e
+
+                print(f"could not parse {document}: {e} - skipping")
+                continue
+
+            test_result_json["test_metadata"] = _update_test_metadata(test_result_json["test_metadata"],
+                                                                      result["test_metadata"])
+            test_result_json["test_cases"] = _update_test_cases(test_result_json["test_cases"],
+                                                                result["test_cases"])
+            test_result_json["test_summary"] = _update_test_summary(test_result_json["test_summary"],
+                                                                    result["test_summary"])
+            parsed += 1
+    finally:
+        if pool:
+            pool.terminate()
+
+    if not parsed:
+        print("provided directory {} does not contain any valid XML files".format(directory_name))
+        return parse_test_result(None)
+
+    print(f"Parsed {parsed} XML document(s) into test result JSON.")
+    return test_result_json
+
+
+def _stream_junit_xml_file(document_name):
+    """Validate and parse an XML file incrementally.
+
+    The test cases are validated and parsed as soon as they are read, and then cleared, so that only
+    one test case is in memory at a time.
+
+    Returns:
+        A dict with the parsed test summary, metadata and test cases of the test suite and the metadata
+        of the root element, or the JUnitXMLValidationError if the file is not valid.
+    """
+    try:
+        return _stream_junit_xml(document_name)
+    except JUnitXMLValidationError as e:
+        return e
+    except Exception as e:
+        return JUnitXMLValidationError(repr(e))
+
+
+def _stream_junit_xml(document_name):
+    if not os.path.exists(document_name) or not os.path.isfile(document_name):
+        raise JUnitXMLValidationError("file not found")
+
+    if os.path.getsize(document_name) > MAXIMUM_XML_SIZE:
+        raise JUnitXMLValidationError("provided file is too large")
+
+    # The errors are raised once the whole document is parsed, in the order the validation of a
+    # full XML tree raises them
+    summary_error = metadata_error = cases_error = None
+    root = suite = None
+    root_properties = suite_properties = None
+    test_summary = {}
+    test_cases = defaultdict(list)
+    path = []
+
+    try:
+        for event, element in ET.iterparse(document_name, events=("start", "end"), forbid_dtd=True):
+            if event == "start":
+                path.append(element)
+                if len(path) == 1:
+                    root = element
+                    if root.tag == TESTSUITE_TAG:
+                        suite = root
+                    elif root.tag != TESTSUITES_TAG:
+                        summary_error = JUnitXMLValidationError(
+                            f"Either {TESTSUITES_TAG} or {TESTSUITE_TAG} tag are not found on root element")
+                elif len(path) == 2 and suite is None and root.tag == TESTSUITES_TAG and element.tag == TESTSUITE_TAG:
+                    suite = element
+                if element is suite and not summary_error:
+                    try:
+                        _validate_test_summary_attributes(suite)
+                    except JUnitXMLValidationError as e:
+                        summary_error = e
+                    test_summary = _parse_test_summary(suite)
+                continue
+
+            path.pop()
+            parent = path[-1] if path else None
+            if parent is None:
+                continue
+
+            if element.tag == PROPERTIES_TAG:
+                if parent is root and root_properties is None:
+                    root_properties = _parse_test_metadata_properties(element)
+                    try:
+                        _validate_test_metadata_properties(element)
+                    except JUnitXMLValidationError as e:
+                        metadata_error = e
+                if parent is suite and suite_properties is None:
+                    suite_properties = _parse_test_metadata_properties(element)
+            elif element.tag == TESTCASE_TAG:
+                if parent is root and not cases_error:
+                    try:
+                        _validate_test_case(element)
+                    except JUnitXMLValidationError as e:
+                        cases_error = e
+                if parent is suite:
+                    feature, result = _parse_test_case(element)
+                    if feature is not None and result is not None:
+                        test_cases[feature].append(result)
+
+            # The children of the root and of the test suites are parsed once they end, clear them
+            if parent is root or parent is suite or (len(path) == 2 and root.tag == TESTSUITES_TAG):
+                element.clear()
+    except Exception as e:
+        raise JUnitXMLValidationError(f"could not parse {document_name}: {e}") from e
+
+    if root.tag == TESTSUITES_TAG and suite is None:
+        summary_error = JUnitXMLValidationError(f"{TESTSUITE_TAG} tag not found")
+    for error in [summary_error, metadata_error, cases_error]:
+        if error:
+            raise error
+
+    return {
+        "root_metadata": root_properties or {},
+        "test_metadata": suite_properties or {},
+        "test_summary": test_summary,
+        "test_cases": dict(test_cases),
+    }
+
+
 def _validate_junit_xml(root):
     _validate_test_summary(root)
     _validate_test_metadata(root)
@@ -244,6 +449,10 @@ def _validate_test_summary(root):
     else:
         raise JUnitXMLValidationError(f"Either {TESTSUITES_TAG} or {TESTSUITE_TAG} tag are not found on root element")
 
+    _validate_test_summary_attributes(testsuit_element)
+
+
+def _validate_test_summary_attributes(testsuit_element):
     for xml_field, expected_type in REQUIRED_TESTSUITE_ATTRIBUTES:
         if xml_field not in testsuit_element.keys():
             raise JUnitXMLValidationError(f"{xml_field} not found in <{TESTSUITE_TAG}> element")
@@ -259,8 +468,10 @@ def _validate_test_summary(root):
 
 
 def _validate_test_metadata(root):
-    properties_element = root.find(PROPERTIES_TAG)
+    _validate_test_metadata_properties(root.find(PROPERTIES_TAG))
+
 
+def _validate_test_metadata_properties(properties_element):
     if not properties_element:
         return
 
@@ -327,16 +538,17 @@ def _validate_test_case_properties(root):
         print("missing testcase property: {}".format(list(missing_testcase_property)))
 
 
-def _validate_test_cases(root):
-    def _validate_test_case(test_case):
-        for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
-            if attribute not in test_case.keys():
-                raise JUnitXMLValidationError(
-                    f'"{attribute}" not found in test case '
-                    f"\"{test_case.get('name', 'Name Not Found')}\""
-                )
-        _validate_test_case_properties(test_case)
+def _validate_test_case(test_case):
+    for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
+        if attribute not in test_case.keys():
+            raise JUnitXMLValidationError(
+                f'"{attribute}" not found in test case '
+                f"\"{test_case.get('name', 'Name Not Found')}\""
+            )
+    _validate_test_case_properties(test_case)
 
+
+def _validate_test_cases(root):
     cases = root.findall(TESTCASE_TAG)
 
     for test_case in cases:
@@ -412,8 +624,10 @@ def _extract_test_summary(test_cases):
 
 
 def _parse_test_metadata(root):
-    properties_element = root.find(PROPERTIES_TAG)
+    return _parse_test_metadata_properties(root.find(PROPERTIES_TAG))
+
 
+def _parse_test_metadata_properties(properties_element):
     if not properties_element:
         return {}
 
@@ -446,69 +660,70 @@ def _parse_testcase_properties(root):
     return testcase_properties
 
 
-def _parse_test_cases(root):
-    test_case_results = defaultdict(list)
-
-    def _parse_test_case(test_case):
-
-        # For special case like: <testcase time="17.190" />
-        # There is no required attributes in it, then just return None, None
-        for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
-            if attribute not in test_case.keys():
-                return None, None
-
-        result = {}
+def _parse_test_case(test_case):
+
+    # For special case like: <testcase time="17.190" />
+    # There is no required attributes in it, then just return None, None
+    for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
+        if attribute not in test_case.keys():
+            return None, None
+
+    result = {}
+
+    # FIXME: This is specific to pytest, needs to be extended to support spytest.
+    test_class_tokens = test_case.get("classname").split(".")
+    feature = test_class_tokens[0]
+
+    for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
+        result[attribute] = test_case.get(attribute)
+    for attribute in REQUIRED_TESTCASE_PROPERTIES:
+        testcase_properties = _parse_testcase_properties(test_case)
+        if attribute in testcase_properties:
+            result[attribute] = testcase_properties[attribute]
+
+    # NOTE: "if failure" and "if error" does not work with the ETree library.
+    failure = test_case.find("failure")
+    error = test_case.find("error")
+    skipped = test_case.find("skipped")
+
+    # Any test which marked as xfail will drop out a property to the report xml file.
+    # Add prefix "xfail_" to tests which are marked with xfail
+    properties_element = test_case.find(PROPERTIES_TAG)
+    xfail_case = ""
+    if properties_element:
+        for prop in properties_element.iterfind(PROPERTY_TAG):
+            if prop.get("name") == "xfail":
+                xfail_case = "xfail_"
+                break
+
+    # NOTE: "error" is unique in that it can occur alongside a succesful, failed, or skipped test result.
+    # Because of this, we track errors separately so that the error can be correlated with the stage it
+    # occurred.
+    # By looking into test results from past 300 days, error only occur with skipped test result.
+    #
+    # If there is *only* an error tag we note that as well, as this indicates that the framework
+    # errored out during setup or teardown.
+    if failure is not None:
+        result["result"] = "{}failure".format(xfail_case)
+        summary = failure.get("message", "")
+    elif skipped is not None:
+        result["result"] = "{}skipped".format(xfail_case)
+        summary = skipped.get("message", "")
+    elif error is not None:
+        result["result"] = "{}error".format(xfail_case)
+        summary = error.get("message", "")
+    else:
+        result["result"] = "{}success".format(xfail_case)
+        summary = ""
 
-        # FIXME: This is specific to pytest, needs to be extended to support spytest.
-        test_class_tokens = test_case.get("classname").split(".")
-        feature = test_class_tokens[0]
+    result["summary"] = summary[:min(len(summary), MAXIMUM_SUMMARY_SIZE)]
+    result["error"] = error is not None
 
-        for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
-            result[attribute] = test_case.get(attribute)
-        for attribute in REQUIRED_TESTCASE_PROPERTIES:
-            testcase_properties = _parse_testcase_properties(test_case)
-            if attribute in testcase_properties:
-                result[attribute] = testcase_properties[attribute]
-
-        # NOTE: "if failure" and "if error" does not work with the ETree library.
-        failure = test_case.find("failure")
-        error = test_case.find("error")
-        skipped = test_case.find("skipped")
-
-        # Any test which marked as xfail will drop out a property to the report xml file.
-        # Add prefix "xfail_" to tests which are marked with xfail
-        properties_element = test_case.find(PROPERTIES_TAG)
-        xfail_case = ""
-        if properties_element:
-            for prop in properties_element.iterfind(PROPERTY_TAG):
-                if prop.get("name") == "xfail":
-                    xfail_case = "xfail_"
-                    break
-
-        # NOTE: "error" is unique in that it can occur alongside a succesful, failed, or skipped test result.
-        # Because of this, we track errors separately so that the error can be correlated with the stage it
-        # occurred.
-        # By looking into test results from past 300 days, error only occur with skipped test result.
-        #
-        # If there is *only* an error tag we note that as well, as this indicates that the framework
-        # errored out during setup or teardown.
-        if failure is not None:
-            result["result"] = "{}failure".format(xfail_case)
-            summary = failure.get("message", "")
-        elif skipped is not None:
-            result["result"] = "{}skipped".format(xfail_case)
-            summary = skipped.get("message", "")
-        elif error is not None:
-            result["result"] = "{}error".format(xfail_case)
-            summary = error.get("message", "")
-        else:
-            result["result"] = "{}success".format(xfail_case)
-            summary = ""
+    return feature, result
 
-        result["summary"] = summary[:min(len(summary), MAXIMUM_SUMMARY_SIZE)]
-        result["error"] = error is not None
 
-        return feature, result
+def _parse_test_cases(root):
+    test_case_results = defaultdict(list)
 
     for test_case in root.findall("testcase"):
         feature, result = _parse_test_case(test_case)
@@ -572,6 +787,63 @@ def _update_test_cases(current, update):
     return new_cases
 
 
+def benchmark_archive_parsing(files=5000, cases=20, output_size=100000, processes=None, directory_name=None):
+    """Compare the serial and the parallel parsing of a synthetic XML archive.
+
+    Args:
+        files: The number of XML documents in the archive.
+        cases: The number of test cases of each document.
+        output_size: The size of the captured output of each test case.
+        processes: The number of parser processes of the parallel parsing.
+        directory_name: The directory to write the archive in, a temporary directory by default.
+
+    Returns:
+        A dict with the parsing times in seconds, and whether both results are the same.
+    """
+    import shutil
+    import tempfile
+    import time
+
+    properties = "".join(f'<property name="{name}" value="{name}_value" />'
+                         for name in REQUIRED_METADATA_PROPERTIES if name != "timestamp")
+    output = "x" * output_size
+    archive = directory_name or tempfile.mkdtemp()
+    try:
+        for index in range(files):
+            module = f"feature_{index % 50}"
+            testcases = []
+            for case in range(cases):
+                result = ['', '<failure message="failed">trace</failure>', '<skipped message="skipped" />'][case % 3]
+                testcases.append(f'<testcase classname="{module}.test_{index}" file="{module}/test_{index}.py" '
+                                 f'line="{case}" name="test_{case}" time="{case}.5">{result}'
+                                 f'<system-out>{output}</system-out></testcase>')
+            document = os.path.join(archive, module, f"test_{index}.xml")
+            os.makedirs(os.path.dirname(document), exist_ok=True)
+            with open(document, "w") as xml_file:
+                xml_file.write(f'<?xml version="1.0" encoding="utf-8"?>\n'
+                               f'<testsuite errors="0" failures="{cases // 3}" name="pytest" skipped="{cases // 3}" '
+                               f'tests="{cases}" time="{cases * 1.5}"><properties>{properties}'
+                               f'<property name="timestamp" value="2020-09-14 18:{index % 60:02d}:19.675190" />'
+                               f'</properties>{"".join(testcases)}</testsuite>')
+
+        start = time.time()
+        serial = parse_test_result(validate_junit_xml_archive(archive))
+        serial_time = time.time() - start
+
+        start = time.time()
+        parallel = parse_junit_xml_archive(archive, processes=processes)
+        parallel_time = time.time() - start
+    finally:
+        if not directory_name:
+            shutil.rmtree(archive, ignore_errors=True)
+
+    return {
+        "serial_time": serial_time,
+        "parallel_time": parallel_time,
+        "same_result": json.dumps(serial, sort_keys=True) == json.dumps(parallel, sort_keys=True),
+    }
+
+
 def validate_junit_json_file(path):
     """Validate that a JSON file is a valid test report.
 
@@ -690,6 +962,12 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
         action="store_true",
         help="Fail validation checks if ANY file in a given directory is not parseable."
     )
+    parser.add_argument(
+        "--processes",
+        "-p",
+        type=int,
+        help="Number of processes parsing the files of a given directory, the number of CPUs by default."
+    )
     parser.add_argument(
         "--json",
         "-j",
@@ -700,11 +978,12 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
 
     args = parser.parse_args()
 
+    test_result_json = None
     try:
         if args.json:
             validate_junit_json_file(args.file_name)
         elif args.directory:
-            roots = validate_junit_xml_archive(args.file_name, args.strict)
+            test_result_json = parse_junit_xml_archive(args.file_name, args.strict, args.processes)
         else:
             roots = [(validate_junit_xml_file(args.file_name), args.file_name)]
     except JUnitXMLValidationError as e:
@@ -721,7 +1000,8 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
         print(f"{args.file_name} validated succesfully!")
         sys.exit(0)
 
-    test_result_json = parse_test_result(roots)
+    if not args.directory:
+        test_result_json = parse_test_result(roots)
     if test_result_json is None:
         print("XML file doesn't exist or no data in the file.")
         sys.exit(1)
@@ -1,9 +1,12 @@
 """Wrappers and utilities for storing test reports."""
+import gzip
 import json
 import os
 import tempfile
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from azure.kusto.data import KustoConnectionStringBuilder
 
 try:
@@ -32,6 +35,9 @@ from typing import Dict, List
 
 TASK_RESULT_FILE = "pipeline_task_results.json"
 
+# Max number of files ingested at the same time, each table is ingested to each cluster in its own thread
+INGEST_MAX_WORKERS = 8
+
 
 class ReportDBConnector(ABC):
     """ReportDBConnector is a wrapper for a back-end data store for JUnit test reports.
@@ -146,7 +152,7 @@ class KustoConnector(ReportDBConnector):
         SAI_HEADER_INVOC_TABLE: "SAIHeaderDefinitionMapping",
     }
 
-    def __init__(self, db_name: str, auth_method: str = "appKey"):
+    def __init__(self, db_name: str, auth_method: str = "appKey", max_workers: int = INGEST_MAX_WORKERS):
         """Initialize a Kusto report DB connector.
 
         Args:
@@ -154,9 +160,13 @@ class KustoConnector(ReportDBConnector):
             auth_method: Authentication method for Kusto connection.
                 Supported methods: appKey, managedId, interactive, azureCli,
                 deviceCode, userToken, appToken, defaultCredential
+            max_workers: Max number of files ingested at the same time.
         """
         self.db_name = db_name
         self.auth_method = auth_method
+        self.max_workers = max_workers
+        # Rows of each table waiting for the end of the current batch, None if no batch is open
+        self._pending_rows = None
 
         ingest_cluster = os.getenv("TEST_REPORT_INGEST_KUSTO_CLUSTER")
 
@@ -278,18 +288,19 @@ class KustoConnector(ReportDBConnector):
                 This id does not have to be unique.
             report_guid: A randomly generated UUID that is used to query for a specific test run across tables.
         """
-        if not report_json:
-            print(
-                "Test result file is not found or empty. We will only upload pipeline results and summary.")
+        with self.batch():
+            if not report_json:
+                print(
+                    "Test result file is not found or empty. We will only upload pipeline results and summary.")
+                self._upload_pipeline_results(
+                    external_tracking_id, report_guid, testbed, os_version)
+                self._upload_summary(report_json, report_guid)
+                return
             self._upload_pipeline_results(
                 external_tracking_id, report_guid, testbed, os_version)
+            self._upload_metadata(report_json, external_tracking_id, report_guid)
             self._upload_summary(report_json, report_guid)
-            return
-        self._upload_pipeline_results(
-            external_tracking_id, report_guid, testbed, os_version)
-        self._upload_metadata(report_json, external_tracking_id, report_guid)
-        self._upload_summary(report_json, report_guid)
-        self._upload_test_cases(report_json, report_guid)
+            self._upload_test_cases(report_json, report_guid)
 
     def upload_reachability_data(self, ping_output: List) -> None:
         ping_time = str(datetime.utcnow())
@@ -426,42 +437,90 @@ class KustoConnector(ReportDBConnector):
         print("Upload test case")
         self._ingest_data(self.TEST_CASE_TABLE, test_cases)
 
-    def _ingest_data(self, table, data):
-        props = IngestionProperties(
-            database=self.db_name,
-            table=table,
-            data_format=self.TABLE_FORMAT_LOOKUP[table],
-            ingestion_mapping_reference=self.TABLE_MAPPING_LOOKUP[table]
-        )
+    @contextmanager
+    def batch(self):
+        """Batch the uploads until the end of the context.
 
-        # Create temporary file with delete=False to avoid Windows permission issues
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.json', text=True)
+        The rows uploaded to the same table are ingested from a single file, and the tables are ingested
+        concurrently when the context exits. Nested batches are ingested with the outermost one.
+        """
+        if self._pending_rows is not None:
+            yield
+            return
+
+        self._pending_rows = {}
         try:
-            with os.fdopen(temp_fd, 'w') as temp_file:
-                if isinstance(data, list):
-                    temp_file.write('\n'.join([json.dumps(entry) for entry in data]))
-                else:
-                    temp_file.write(json.dumps(data))
+            yield
+            pending_rows = self._pending_rows
+        finally:
+            self._pending_rows = None
+        self._ingest_tables(pending_rows)
 
-            print("Ingest to primary cluster...")
-            self._ingestion_client.ingest_from_file(
-                temp_path, ingestion_properties=props)
+    def _ingest_data(self, table, data):
+        rows = data if isinstance(data, list) else [data]
+        if self._pending_rows is not None:
+            self._pending_rows.setdefault(table, []).extend(rows)
+        else:
+            self._ingest_tables({table: rows})
 
-            if self._ingestion_client_backup:
-                print("Ingest to backup cluster...")
-                self._ingestion_client_backup.ingest_from_file(
-                    temp_path, ingestion_properties=props)
+    def _ingest_tables(self, table_rows):
+        """Ingest the rows of each table to the primary and backup clusters concurrently."""
+        clients = [("primary", self._ingestion_client)]
+        if self._ingestion_client_backup:
+            clients.append(("backup", self._ingestion_client_backup))
+
+        temp_paths = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = []
+                for table, rows in table_rows.items():
+                    props = IngestionProperties(
+                        database=self.db_name,
+                        table=table,
+                        data_format=self.TABLE_FORMAT_LOOKUP[table],
+                        ingestion_mapping_reference=self.TABLE_MAPPING_LOOKUP[table]
+                    )
+                    temp_path = self._write_ingestion_file(rows)
+                    temp_paths.append(temp_path)
+                    for cluster, client in clients:
+                        print(f"Ingest {len(rows)} rows to {table} on {cluster} cluster...")
+                        futures.append(executor.submit(client.ingest_from_file, temp_path, ingestion_properties=props))
+
+                # Wait for all the ingestions before raising, so that no file is removed while it is ingested
+                errors = [future.exception() for future in futures]
+            error = next((e for e in errors if e is not None), None)
+            if error:
+                raise error
 
         except Exception as e:
             print(f"Ingestion failed with error: {e}")
             raise
         finally:
-            # Clean up the temporary file
-            try:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except Exception as cleanup_e:
-                print(f"Warning - failed to clean up temp file {temp_path}: {cleanup_e}")
+            # Clean up the temporary files
+            for temp_path in temp_paths:
+                try:
+                    if os.path.exists(temp_path):
+                        os.unlink(temp_path)
+                except Exception as cleanup_e:
+                    print(f"Warning - failed to clean up temp file {temp_path}: {cleanup_e}")
+
+    def _write_ingestion_file(self, rows):
+        """Write the rows to a gzip compressed temporary file, one JSON document per line.
+
+        The file name ends with .gz, so that the ingestion client uploads it as it is instead of compressing it.
+        """
+        # Create temporary file with delete=False to avoid Windows permission issues
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.json.gz')
+        try:
+            with os.fdopen(temp_fd, 'wb') as temp_file:
+                with gzip.open(temp_file, 'wt', encoding='utf-8') as gzip_file:
+                    for row in rows:
+                        gzip_file.write(json.dumps(row))
+                        gzip_file.write('\n')
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        return temp_path
 
     def _ingest_data_file(self, table, data_file):
         props = IngestionProperties(
@@ -7,8 +7,7 @@ import os
 
 from junit_xml_parser import (
     validate_junit_json_file,
-    validate_junit_xml_path,
-    parse_test_result
+    parse_junit_xml_path
 )
 from report_data_storage import KustoConnector
 
@@ -101,8 +100,7 @@ python3 report_uploader.py tests/files/sample_tr.xml -e TRACKING_ID#22
                     if args.json:
                         test_result_json = validate_junit_json_file(path_name)
                     else:
-                        roots = validate_junit_xml_path(path_name)
-                        test_result_json = parse_test_result(roots)
+                        test_result_json = parse_junit_xml_path(path_name)
                     kusto_db.upload_report(test_result_json, tracking_id, report_guid, testbed, version)
             except Exception as e:
                 print(f"Failed to upload report '{path_name}', exception: {repr(e)}")
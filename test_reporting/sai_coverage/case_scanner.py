@@ -5,19 +5,25 @@ The key points are AST (abstract syntax tree) and DFS(depth first search).
 
 import argparse
 import ast
+import hashlib
 import json
+import multiprocessing
 import os
+import time
 import uuid
 
 from datetime import date
 from multipledispatch import dispatch
 
-from constant import (FINAL_RESULT_SAVE_DIR, IGNORE_FILE_LIST,
-                      PRIORI_RESULT_SAVE_DIR, SAI_API_PREFIX,
+from constant import (CASE_SCAN_CACHE_DIR, FINAL_RESULT_SAVE_DIR, IGNORE_FILE_LIST,
+                      PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME, SAI_API_PREFIX,
                       SAI_HEADER_FILENAME, UNRUNNABLE_TAG_LIST)
 from data_model.test_invocation import TestInvocation
 from sai_report_utils import seach_defalt_parms
 
+# Version of the cached file results, to be increased when the scanning of a file changes
+CACHE_VERSION = 1
+
 
 def get_parser(description="SAI Interface Scanner"):
     """
@@ -28,6 +34,10 @@ def get_parser(description="SAI Interface Scanner"):
                         default="../CaseScanner/files/ptf", help="directory to scan.")
     parser.add_argument("--save_path", "-sp", type=str, default=FINAL_RESULT_SAVE_DIR,
                         help="directory to save the compressed results.")
+    parser.add_argument("--cache_dir", "-cd", type=str, default=CASE_SCAN_CACHE_DIR,
+                        help="directory to cache the results of each file, empty to disable the cache.")
+    parser.add_argument("--processes", "-n", type=int, default=None,
+                        help="number of processes parsing the files (default: CPU count).")
     args = parser.parse_args()
     return args
 
@@ -42,27 +52,136 @@ class SAICoverageScanner(object):
         self.save_path = parser.save_path
         os.makedirs(self.save_path, exist_ok=True)
 
+        self.cache_dir = getattr(parser, "cache_dir", None)
+        self.processes = getattr(parser, "processes", None)
+
         self.header_path = os.path.join(
             PRIORI_RESULT_SAVE_DIR, SAI_HEADER_FILENAME)
+        self.header_data = None
         self.final_coverage = list()
         self.file_dict = dict()
 
     def parse(self):
         '''
         Parse file level
+
+        The files are parsed in a process pool, and the result of each file is cached by the hash of its content,
+        so that only the changed files are parsed again.
         '''
+        start = time.time()
+        scan_files = []
         for (root, _, filenames) in os.walk(self.case_path):
             for filename in filenames:
                 if filename.endswith(".py") and \
                    filename not in IGNORE_FILE_LIST and \
                    "helper" not in filename.lower():
-                    with open(root + "/" + filename, "r") as f:
+                    with open(root + "/" + filename, "rb") as f:
                         test_set = "t0" if 'sai_test' in root else "ptf"
-                        code = f.read()
-                        f_ast = ast.parse(code)
-                        self.parse_class(f_ast, filename, test_set, root)
-                        self.file_dict[filename[:-3]] = self.final_coverage
-                        self.final_coverage = []
+                        scan_files.append((f.read(), filename, test_set, root))
+
+        results = [None] * len(scan_files)
+        cache_keys = [None] * len(scan_files)
+        if self.cache_dir:
+            scan_digest = self.get_scan_digest()
+            for idx, scan_file in enumerate(scan_files):
+                cache_keys[idx] = self.get_cache_key(scan_digest, *scan_file)
+                results[idx] = self.load_cached_result(cache_keys[idx])
+
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        missing_files = [scan_files[idx] for idx in missing]
+        processes = self.processes or multiprocessing.cpu_count()
+        if processes == 1 or len(missing) <= 1:
+            parsed = [self.parse_file(*scan_file) for scan_file in missing_files]
+        else:
+            with multiprocessing.Pool(processes, initializer=_init_worker,
+                                      initargs=(self.case_path, self.save_path)) as pool:
+                parsed = pool.map(_parse_file_worker, missing_files)
+
+        for idx, result in zip(missing, parsed):
+            results[idx] = result
+            if cache_keys[idx]:
+                self.store_cached_result(cache_keys[idx], result)
+
+        # The files with the same name are merged in the walk order, the records get a new id and upload time
+        upload_time = str(date.today())
+        for (_, filename, _, _), result in zip(scan_files, results):
+            self.file_dict[filename[:-3]] = [dict(record, id=str(uuid.uuid4()), upload_time=upload_time)
+                                             for record in result]
+
+        print("Scanned {} files ({} from cache) in {:.2f}s".format(
+            len(scan_files), len(scan_files) - len(missing), time.time() - start))
+
+    def parse_file(self, code, file_name, test_set, sai_folder):
+        '''
+        Parse a file
+
+        Args:
+            code: file content
+            file_name: file name
+            test_set: distinguish test set ("t0" or "ptf")
+            sai_folder: folder name of the scanning file
+
+        Return:
+            list: SAI interface invocations of the file
+        '''
+        # The SAI interfaces are called by name, a file without their prefix has none
+        if SAI_API_PREFIX.encode() not in code:
+            return []
+        f_ast = ast.parse(code)
+        self.parse_class(f_ast, file_name, test_set, sai_folder)
+        coverage, self.final_coverage = self.final_coverage, []
+        return coverage
+
+    def get_scan_digest(self):
+        '''
+        Get the digest of the scanner version and of the SAI header and adapter results used to scan the files
+
+        Return:
+            str: hex digest
+        '''
+        digest = hashlib.sha256(str(CACHE_VERSION).encode())
+        for path in [self.header_path, os.path.join(PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME)]:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def get_cache_key(self, scan_digest, code, file_name, test_set, sai_folder):
+        '''
+        Get the cache key of a file
+
+        Args:
+            scan_digest: digest of the scanner version and SAI results, see get_scan_digest
+            code: file content
+            file_name: file name
+            test_set: distinguish test set ("t0" or "ptf")
+            sai_folder: folder name of the scanning file
+
+        Return:
+            str: hex digest of the file content and of its scanning parameters
+        '''
+        digest = hashlib.sha256()
+        for value in [scan_digest, file_name, test_set, sai_folder]:
+            digest.update(value.encode() + b"\0")
+        digest.update(code)
+        return digest.hexdigest()
+
+    def load_cached_result(self, cache_key):
+        cache_file = os.path.join(self.cache_dir, cache_key + ".json")
+        try:
+            with open(cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_cached_result(self, cache_key, result):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_file = os.path.join(self.cache_dir, cache_key + ".json")
+        # Write to a temporary file first, so that a concurrent scan never reads a partial result
+        tmp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+        with open(tmp_file, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_file, cache_file)
 
     def parse_class(self, raw_ast, file_name, test_set, sai_folder):
         '''
@@ -226,7 +345,9 @@ class SAICoverageScanner(object):
             runnable: distinguish whether case runnable
             sai_folder: folder name of the scanning file
         '''
-        header_data = self.parse_header(self.header_path)
+        if self.header_data is None:
+            self.header_data = self.parse_header(self.header_path)
+        header_data = self.header_data
         header_key = "sai_" + sai_interface.split("sai_thrift_")[1] + "_fn"
         if header_key not in header_data:
             return
@@ -354,6 +475,18 @@ class SAICoverageScanner(object):
         return True
 
 
+_worker_scanner = None
+
+
+def _init_worker(case_path, save_path):
+    global _worker_scanner
+    _worker_scanner = SAICoverageScanner(argparse.Namespace(path=case_path, save_path=save_path))
+
+
+def _parse_file_worker(scan_file):
+    return _worker_scanner.parse_file(*scan_file)
+
+
 if __name__ == '__main__':
     parser = get_parser()
     scanner = SAICoverageScanner(parser)
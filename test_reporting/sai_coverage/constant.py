@@ -4,6 +4,7 @@ This file defines SAI qualification report constant variables
 
 PRIORI_RESULT_SAVE_DIR = "result"
 FINAL_RESULT_SAVE_DIR = "result/scan"
+CASE_SCAN_CACHE_DIR = "result/cache/case_scan"
 
 SAI_API_PREFIX = "sai_thrift"
 IGNORE_FILE_LIST = ["sai_adapter.py",
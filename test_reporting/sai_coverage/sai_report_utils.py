@@ -5,6 +5,8 @@ This file defines SAI qualification report utils
 import json
 import os
 
+from functools import lru_cache
+
 from constant import PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME
 
 
@@ -31,9 +33,22 @@ def seach_defalt_parms(sai_interface, idx):
     Return:
         the name of attribute
     """
-    file_name = os.path.join(PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME)
-    with open(file_name, 'r') as rf:
-        dic = json.load(rf)
-        if sai_interface in dic:
-            return dic[sai_interface][idx - 1]
+    dic = load_adapter_result(os.path.join(PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME))
+    if sai_interface in dic:
+        return dic[sai_interface][idx - 1]
     return "unknown"
+
+
+@lru_cache(maxsize=None)
+def load_adapter_result(file_name):
+    """
+    Load the sai_adapter scanning result, once per process
+
+    Args:
+        file_name: file name
+
+    Return:
+        the parameter names of each SAI interface
+    """
+    with open(file_name, 'r') as rf:
+        return json.load(rf)
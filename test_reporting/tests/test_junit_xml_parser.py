@@ -4,6 +4,7 @@ import pytest
 
 from test_reporting.junit_xml_parser import validate_junit_xml_stream, validate_junit_xml_file
 from test_reporting.junit_xml_parser import validate_junit_xml_archive, parse_test_result, JUnitXMLValidationError
+from test_reporting.junit_xml_parser import parse_junit_xml_archive
 
 
 VALID_TEST_RESULT = """<?xml version="1.0" encoding="utf-8"?>
@@ -242,6 +243,36 @@ def test_json_output_from_archive():
     assert ordered(parse_test_result(roots)) == ordered(EXPECTED_JSON_OUTPUT)
 
 
+@pytest.mark.parametrize("processes", [1, 2])
+def test_json_output_from_archive_parallel(processes):
+    roots = validate_junit_xml_archive(VALID_TEST_RESULT_ARCHIVE)
+    assert parse_junit_xml_archive(VALID_TEST_RESULT_ARCHIVE, processes=processes) == parse_test_result(roots)
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_json_output_from_archive_parallel_invalid_files(tmp_path, strict):
+    documents = {
+        "valid.xml": VALID_TEST_RESULT,
+        "testsuites.xml": f"<testsuites>{VALID_TEST_RESULT.split('?>', 1)[1]}</testsuites>",
+        "broken.xml": VALID_TEST_RESULT.replace("</", "<"),
+        "nested/missing_attribute.xml": VALID_TEST_RESULT.replace('line="369" ', ""),
+        "nested/other_testbed.xml": VALID_TEST_RESULT.replace("vms-kvm-t0", "vms-kvm-t1"),
+    }
+    for name, content in documents.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(content)
+
+    if strict:
+        with pytest.raises(JUnitXMLValidationError, match="could not parse"):
+            validate_junit_xml_archive(str(tmp_path), strict)
+        with pytest.raises(JUnitXMLValidationError, match="could not parse"):
+            parse_junit_xml_archive(str(tmp_path), strict, processes=2)
+    else:
+        roots = validate_junit_xml_archive(str(tmp_path), strict)
+        assert len(roots) == 2
+        assert parse_junit_xml_archive(str(tmp_path), strict, processes=2) == parse_test_result(roots)
+
+
 def test_xml_file_not_found():
     with pytest.raises(JUnitXMLValidationError, match="file not found"):
         validate_junit_xml_file("nonexistent.xml")
@@ -0,0 +1,125 @@
+"""Tests for the Kusto ingestion of the test reports, with fake ingestion clients."""
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("azure.kusto.ingest")
+
+from test_reporting import report_data_storage  # noqa: E402
+from test_reporting.report_data_storage import KustoConnector  # noqa: E402
+
+
+class FakeIngestClient:
+    """Ingestion client recording the payload size, rows and timing of each ingested file."""
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+        self.delay = 0
+        self.error = None
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def ingest_from_file(self, path, ingestion_properties):
+        start = time.monotonic()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append({
+                "table": ingestion_properties.table,
+                "path": path,
+                "payload_size": os.path.getsize(path),
+                "rows": rows,
+                "start": start,
+                "end": time.monotonic(),
+            })
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def fake_clusters(monkeypatch):
+    clusters = {}
+
+    def create_client(cluster):
+        clusters[cluster] = FakeIngestClient(cluster)
+        return clusters[cluster]
+
+    monkeypatch.setenv("TEST_REPORT_INGEST_KUSTO_CLUSTER", "primary")
+    monkeypatch.setenv("TEST_REPORT_INGEST_KUSTO_CLUSTER_BACKUP", "backup")
+    monkeypatch.setattr(report_data_storage, "KustoIngestClient", create_client)
+    monkeypatch.setattr(KustoConnector, "_create_connection_string_builder",
+                        lambda self, cluster, auth_method, backup=False: cluster)
+    return clusters
+
+
+def _report(case_count):
+    return {
+        "test_metadata": {"testbed": "vms-kvm-t0", "topology": "t0"},
+        "test_summary": {"tests": case_count, "failures": 0, "errors": 0, "skipped": 0, "xfails": 0, "time": 1.0},
+        "test_cases": {"bgp": [{"name": "test_bgp_{}".format(i), "result": "success"} for i in range(case_count)]},
+    }
+
+
+def test_upload_report_ingests_each_table_once_per_cluster(fake_clusters):
+    kusto = KustoConnector("db")
+
+    kusto.upload_report(_report(1000), "tracking", "guid")
+
+    for cluster in ["primary", "backup"]:
+        calls = {call["table"]: call for call in fake_clusters[cluster].calls}
+        assert sorted(calls) == sorted([KustoConnector.PIPELINE_TABLE, KustoConnector.METADATA_TABLE,
+                                        KustoConnector.SUMMARY_TABLE, KustoConnector.TEST_CASE_TABLE])
+        test_cases = calls[KustoConnector.TEST_CASE_TABLE]
+        assert len(test_cases["rows"]) == 1000
+        assert test_cases["rows"][0] == {"name": "test_bgp_0", "result": "success", "id": "guid", "feature": "bgp"}
+        # The rows are compressed
+        assert test_cases["payload_size"] < len("\n".join(json.dumps(row) for row in test_cases["rows"])) / 5
+        assert calls[KustoConnector.METADATA_TABLE]["rows"][0]["tracking_id"] == "tracking"
+        assert not any(os.path.exists(call["path"]) for call in calls.values())
+
+
+def test_upload_report_ingests_tables_concurrently(fake_clusters):
+    kusto = KustoConnector("db")
+    for client in fake_clusters.values():
+        client.delay = 0.2
+
+    start = time.monotonic()
+    kusto.upload_report(_report(10), "tracking", "guid")
+    elapsed = time.monotonic() - start
+
+    calls = fake_clusters["primary"].calls + fake_clusters["backup"].calls
+    assert len(calls) == 8
+    # The 8 ingestions overlap instead of taking 8 times the delay
+    assert max(call["start"] for call in calls) < min(call["end"] for call in calls)
+    assert elapsed < 0.2 * 4
+
+
+def test_batch_merges_rows_of_the_same_table(fake_clusters):
+    kusto = KustoConnector("db")
+
+    with kusto.batch():
+        kusto.upload_expected_runs([{"run": 1}, {"run": 2}])
+        with kusto.batch():
+            kusto.upload_expected_runs([{"run": 3}])
+        assert not fake_clusters["primary"].calls
+
+    calls = fake_clusters["primary"].calls
+    assert len(calls) == 1
+    assert calls[0]["table"] == KustoConnector.EXPECTED_TEST_RUNS_TABLE
+    assert calls[0]["rows"] == [{"run": 1}, {"run": 2}, {"run": 3}]
+
+
+def test_ingestion_error_is_raised_after_all_ingestions(fake_clusters):
+    kusto = KustoConnector("db")
+    fake_clusters["backup"].error = RuntimeError("backup cluster is down")
+
+    with pytest.raises(RuntimeError, match="backup cluster is down"):
+        kusto.upload_report(_report(10), "tracking", "guid")
+
+    assert len(fake_clusters["primary"].calls) == 4
+    assert not any(os.path.exists(call["path"]) for call in fake_clusters["primary"].calls)
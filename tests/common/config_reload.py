@@ -10,6 +10,7 @@ from tests.common.utilities import wait_until
 from tests.common.configlet.utils import chk_for_pfc_wd
 from tests.common.platform.interface_utils import check_interface_status_of_up_ports
 from tests.common.helpers.dut_utils import ignore_t2_syslog_msgs
+from tests.common.helpers.sonic_db import invalidate_sonic_db_cache
 
 logger = logging.getLogger(__name__)
 
@@ -288,6 +289,9 @@ def config_reload(sonic_host, config_source='config_db', wait=120, start_bgp=Tru
             cmd = f'config reload -y -f -l {golden_path}'
         sonic_host.shell(cmd, executable="/bin/bash")
 
+    # The DB content was reloaded, drop the cached sonic-db query results of this host
+    invalidate_sonic_db_cache(sonic_host.hostname)
+
     modular_chassis = sonic_host.get_facts().get("modular_chassis")
     wait = max(wait, 600) if modular_chassis else wait
 
@@ -8,17 +8,20 @@ including APPL_DB, CONFIG_DB, and STATE_DB.
 Main features:
 - Take snapshots of Redis databases
 - Compare snapshots and generate detailed diffs
+- Stream snapshots stored as sorted, line-delimited key records so that large DBs
+  are diffed with bounded memory
 - Filter out volatile/transient data that changes frequently
 - Provide metrics on database differences
 """
 
 from enum import Enum
+import hashlib
 import json
 import logging
 import os
 import re
 import copy
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from collections import Counter
 from dataclasses import dataclass
 
@@ -27,19 +30,45 @@ from tests.common.helpers.custom_msg_utils import add_custom_msg
 logger = logging.getLogger(__name__)
 
 
+SNAPSHOT_FILE_SUFFIX = ".jsonl"
+LEGACY_SNAPSHOT_FILE_SUFFIX = ".json"
+
+
+class KeyPatternMatcher:
+    """
+    Precompiled form of a set of key patterns, as accepted by match_key.
+
+    All the prefixes are checked with a single str.startswith call and all the regular
+    expressions are combined into a single compiled regular expression, instead of
+    running one re.match per pattern per key.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = list(patterns)
+        self._prefixes = tuple(patterns)
+        self._regex = re.compile("|".join("(?:{})".format(p) for p in patterns)) if patterns else None
+
+    def match(self, key: str) -> bool:
+        if key.startswith(self._prefixes):
+            return True
+        return self._regex is not None and self._regex.match(key) is not None
+
+
 def match_key(key, kset):
     """
     Check if a key matches any pattern in the given set.
 
     Args:
         key (str): The key to match against patterns
-        kset (iterable): Set of patterns to match against. Patterns can be:
+        kset (iterable or KeyPatternMatcher): Set of patterns to match against. Patterns can be:
                         - String prefixes (checked with startswith)
                         - Regular expressions (checked with re.match)
 
     Returns:
         bool: True if the key matches any pattern in kset, False otherwise
     """
+    if isinstance(kset, KeyPatternMatcher):
+        return kset.match(key)
     for k in kset:
         if key.startswith(k):
             return True
@@ -81,6 +110,90 @@ def dut_dump(redis_cmd, duthost, data_dir, fname):
     return db_read
 
 
+def _hash_content(content_json: str) -> str:
+    return hashlib.sha1(content_json.encode("utf-8")).hexdigest()
+
+
+def write_snapshot_records(db_dump: dict, path: str):
+    """
+    Write a DB dump as a snapshot file of sorted, line-delimited key records.
+
+    Each line is a JSON array of [key, hash, content] where hash is the SHA1 of the
+    canonical JSON form of content. Records are sorted by key so that two snapshot
+    files can be diffed with a streaming merge-join.
+
+    Args:
+        db_dump (dict): DB dump as produced by redis-dump, keyed by top-level DB key
+        path (str): Path of the snapshot file to write
+    """
+    with open(path, "w") as f:
+        for key in sorted(db_dump):
+            content_json = json.dumps(db_dump[key], sort_keys=True, separators=(",", ":"), default=str)
+            f.write("[{},\"{}\",{}]\n".format(json.dumps(key), _hash_content(content_json), content_json))
+
+
+def read_snapshot_records(path: str) -> Iterator[Tuple[str, Optional[str], dict]]:
+    """
+    Stream the (key, hash, content) records of a snapshot file written by write_snapshot_records.
+
+    Snapshot files in the legacy format (a single JSON document) are loaded in memory and
+    yielded as sorted records without hash.
+
+    Args:
+        path (str): Path of the snapshot file
+
+    Yields:
+        tuple: (key, hash, content) of each top-level DB key, sorted by key
+    """
+    if path.endswith(LEGACY_SNAPSHOT_FILE_SUFFIX):
+        with open(path, "r") as f:
+            db_dump = json.load(f)
+        yield from _dict_records(db_dump)
+        return
+
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                key, content_hash, content = json.loads(line)
+                yield key, content_hash, content
+
+
+def _dict_records(db_dump: dict) -> Iterator[Tuple[str, Optional[str], dict]]:
+    for key in sorted(db_dump):
+        yield key, None, db_dump[key]
+
+
+def _merge_join(records_a: Iterable, records_b: Iterable) -> Iterator[Tuple[Optional[tuple], Optional[tuple]]]:
+    """
+    Merge-join two streams of records sorted by key.
+
+    Yields:
+        tuple: (record_a, record_b) where one of them is None if the key only exists in one stream
+    """
+    iter_a = iter(records_a)
+    iter_b = iter(records_b)
+
+    def _next(records, prev_key):
+        record = next(records, None)
+        if record is not None and prev_key is not None and record[0] <= prev_key:
+            raise ValueError(f"Snapshot records are not sorted by key: {record[0]} after {prev_key}")
+        return record
+
+    rec_a = _next(iter_a, None)
+    rec_b = _next(iter_b, None)
+    while rec_a is not None or rec_b is not None:
+        if rec_b is None or (rec_a is not None and rec_a[0] < rec_b[0]):
+            yield rec_a, None
+            rec_a = _next(iter_a, rec_a[0])
+        elif rec_a is None or rec_b[0] < rec_a[0]:
+            yield None, rec_b
+            rec_b = _next(iter_b, rec_b[0])
+        else:
+            yield rec_a, rec_b
+            rec_a = _next(iter_a, rec_a[0])
+            rec_b = _next(iter_b, rec_b[0])
+
+
 class DBType(Enum):
     """Supported Redis database types in SONiC. Value is their numeric DB index."""
     APPL = 0
@@ -293,31 +406,123 @@ class SnapshotDiff:
     """Container for differing values and metrics of a snapshot comparison for a singleDB supporting metric tracking
     """
     def __init__(self, db_type: DBType, snapshot_a: dict, snapshot_b: dict, label_a: str = "a", label_b: str = "b"):
+        self._init(db_type, label_a, label_b)
+        self._build(_dict_records(snapshot_a), _dict_records(snapshot_b), copy_values=True)
+
+    @classmethod
+    def from_snapshot_files(cls, db_type: DBType, path_a: str, path_b: str,
+                            label_a: str = "a", label_b: str = "b") -> "SnapshotDiff":
+        """
+        Diff two snapshot files by streaming their sorted key records.
+
+        Only one record of each snapshot is held in memory at a time, plus the resulting diff.
+        Keys whose record hashes are equal in both snapshots are skipped without being compared.
+
+        Args:
+            db_type (DBType): Type of the snapshotted DB
+            path_a (str): Path of the first snapshot file
+            path_b (str): Path of the second snapshot file
+            label_a (str): Label for the first snapshot (default: "a")
+            label_b (str): Label for the second snapshot (default: "b")
+
+        Returns:
+            SnapshotDiff: The diff between the two snapshot files
+        """
+        snapshot_diff = cls.__new__(cls)
+        snapshot_diff._init(db_type, label_a, label_b)
+        snapshot_diff._build(read_snapshot_records(path_a), read_snapshot_records(path_b), copy_values=False)
+        return snapshot_diff
+
+    def _init(self, db_type: DBType, label_a: str, label_b: str):
         self._db_type = db_type
-        self._snapshot_a = snapshot_a
-        self._snapshot_b = snapshot_b
         self._label_a = label_a
         self._label_b = label_b
-
-        # Start building metrics on snapshot
+        self._always_ignore_keys = set(VOLATILE_VALUES.get(db_type, []))
+        self._always_ignore_matcher = KeyPatternMatcher(self._always_ignore_keys)
         self._metrics = DbComparisonMetrics()
-        self._metrics.total_a_keys = len(self._snapshot_a)
-        self._metrics.total_a_values_incl_volatile, self._metrics.total_a_values_excl_volatile = \
-            _sum_total_values(db_type, self._snapshot_a)
-        self._metrics.total_b_keys = len(self._snapshot_b)
-        self._metrics.total_b_values_incl_volatile, self._metrics.total_b_values_excl_volatile = \
-            _sum_total_values(db_type, self._snapshot_b)
-
-        # Build the diff
-        if db_type == DBType.STATE:
-            state_db_diff = self._diff_state_db_process_stats(self._snapshot_a, self._snapshot_b)
-            # Remove all 'PROCESS_STATS|*' keys from the dbs since they've already been diffed
-            self._snapshot_a = {k: v for k, v in self._snapshot_a.items() if not k.startswith("PROCESS_STATS|")}
-            self._snapshot_b = {k: v for k, v in self._snapshot_b.items() if not k.startswith("PROCESS_STATS|")}
-            remaining_diff = self._diff_dict(db_type, self._snapshot_a, self._snapshot_b)
+        self._diff = {}
+
+    def _count_record(self, content: dict, key: str, is_a: bool):
+        """Add a top-level key and its values to the snapshot totals of the metrics"""
+        assert "value" in content, f"Unexpected entry in {self._db_type.name} DB: {key} : {content}"
+        value_dict = content["value"]
+        total_incl_volatile = len(value_dict)
+        total_excl_volatile = sum(1 for k in value_dict if k not in self._always_ignore_keys)
+        if is_a:
+            self._metrics.total_a_keys += 1
+            self._metrics.total_a_values_incl_volatile += total_incl_volatile
+            self._metrics.total_a_values_excl_volatile += total_excl_volatile
+        else:
+            self._metrics.total_b_keys += 1
+            self._metrics.total_b_values_incl_volatile += total_incl_volatile
+            self._metrics.total_b_values_excl_volatile += total_excl_volatile
+
+    def _one_sided_value(self, value, copy_values: bool):
+        if isinstance(value, dict):
+            # Remove always ignore keys
+            if copy_values:
+                value = copy.deepcopy(value)
+            _recursively_remove_keys_matching_pattern(value, self._always_ignore_matcher)
+        return value
+
+    def _build(self, records_a: Iterable, records_b: Iterable, copy_values: bool):
+        """Build the diff and the metrics with a single merge-join pass over both snapshots' sorted records"""
+        is_state_db = self._db_type == DBType.STATE
+        process_cmds_a = []
+        process_cmds_b = []
+        remaining_diff = {}
+
+        for rec_a, rec_b in _merge_join(records_a, records_b):
+            if rec_a is not None:
+                self._count_record(rec_a[2], rec_a[0], is_a=True)
+            if rec_b is not None:
+                self._count_record(rec_b[2], rec_b[0], is_a=False)
+
+            key = rec_a[0] if rec_a is not None else rec_b[0]
+            if is_state_db and key.startswith("PROCESS_STATS|"):
+                # 'PROCESS_STATS|*' keys are diffed separately based on the processes running
+                for rec, extracted_cmd_store in [(rec_a, process_cmds_a), (rec_b, process_cmds_b)]:
+                    if rec is not None and re.match(r"^PROCESS_STATS\|\d+", key):
+                        content = rec[2]
+                        assert "value" in content and "CMD" in content["value"], \
+                            f"Unexpected PROCESS_STATS entry: {key} : {content}"
+                        extracted_cmd_store.append(content["value"]["CMD"])
+                continue
+
+            if key in self._always_ignore_keys:
+                continue
+
+            if rec_b is None:
+                remaining_diff[key] = {
+                    self._label_a: self._one_sided_value(rec_a[2], copy_values),
+                    self._label_b: None
+                }
+            elif rec_a is None:
+                remaining_diff[key] = {
+                    self._label_a: None,
+                    self._label_b: self._one_sided_value(rec_b[2], copy_values)
+                }
+            else:
+                _, hash_a, value_a = rec_a
+                _, hash_b, value_b = rec_b
+                if hash_a is not None and hash_a == hash_b:
+                    # Identical content, nothing to diff
+                    continue
+                if isinstance(value_a, dict) and isinstance(value_b, dict):
+                    nested_diff = self._diff_dict(self._db_type, value_a, value_b)
+                    if nested_diff:
+                        remaining_diff[key] = nested_diff
+                elif value_a != value_b:
+                    remaining_diff[key] = {
+                        self._label_a: value_a,
+                        self._label_b: value_b
+                    }
+
+        if is_state_db:
+            state_db_diff = self._diff_process_cmds(process_cmds_a, process_cmds_b)
             self._diff = {**state_db_diff, **remaining_diff}
         else:
-            self._diff = self._diff_dict(db_type, self._snapshot_a, self._snapshot_b)
+            self._diff = remaining_diff
 
         # Now that diff has been built, get metrics on the diff components
         self._metrics.populate_diff_metrics_from_diff(self._diff, label_a=self._label_a, label_b=self._label_b)
@@ -330,27 +535,16 @@ class SnapshotDiff:
     def metrics(self) -> DbComparisonMetrics:
         return self._metrics
 
-    def _diff_state_db_process_stats(self, state_db_a: dict, state_db_b: dict) -> dict:
+    def _diff_process_cmds(self, db_a_processes: List[str], db_b_processes: List[str]) -> dict:
         """Between reboots or process restarts the PID can change but there is an
-        equivalent process running. This pairs up the PROCESS_STATS entries and diffs
-        based on the process running vs not.
+        equivalent process running. This pairs up the CMD of the PROCESS_STATS entries
+        and diffs based on the process running vs not.
 
         NOTE: That some PROCESS_STATS entries have a CMD: "" i.e. empty but there is still
               a non-zero PPID. In reality these entries form a tree and should be assembled
               into a tree structure and the trees of each compared. For now, this is simply
               a count of process matches. So far this has been adequate.
         """
-
-        # Extract all the CMD entries out of the DB's
-        db_a_processes = []
-        db_b_processes = []
-        for extracted_cmd_store, state_db in [(db_a_processes, state_db_a), (db_b_processes, state_db_b)]:
-            for key, content in state_db.items():
-                if re.match(r"^PROCESS_STATS\|\d+", key):
-                    assert "value" in content and "CMD" in content["value"], \
-                        f"Unexpected PROCESS_STATS entry: {key} : {content}"
-                    extracted_cmd_store.append(content["value"]["CMD"])
-
         db_a_processes_counter = Counter(db_a_processes)
         db_b_processes_counter = Counter(db_b_processes)
         db_a_only_processes = list((db_a_processes_counter - db_b_processes_counter).elements())
@@ -376,7 +570,7 @@ class SnapshotDiff:
     def _diff_dict(self, db_type: DBType, dict_a: dict, dict_b: dict) -> dict:
 
         result = {}
-        always_ignore_keys = set(VOLATILE_VALUES.get(db_type, []))
+        always_ignore_keys = self._always_ignore_keys
 
         a_keys = set(dict_a.keys()) - always_ignore_keys
         b_keys = set(dict_b.keys()) - always_ignore_keys
@@ -386,28 +580,16 @@ class SnapshotDiff:
 
         # Process a-only keys
         for key in a_only_keys:
-            if isinstance(dict_a[key], dict):
-                # Remove always ignore keys
-                val = copy.deepcopy(dict_a[key])
-                _recursively_remove_keys_matching_pattern(val, always_ignore_keys)
-            else:
-                val = dict_a[key]
             result[key] = {
-                self._label_a: val,
+                self._label_a: self._one_sided_value(dict_a[key], copy_values=True),
                 self._label_b: None
             }
 
         # Process b-only keys
         for key in b_only_keys:
-            if isinstance(dict_b[key], dict):
-                # Remove always ignore keys
-                val = copy.deepcopy(dict_b[key])
-                _recursively_remove_keys_matching_pattern(val, always_ignore_keys)
-            else:
-                val = dict_b[key]
             result[key] = {
                 self._label_a: None,
-                self._label_b: val
+                self._label_b: self._one_sided_value(dict_b[key], copy_values=True)
             }
 
         # Process keys that are in both
@@ -510,9 +692,11 @@ def _recursively_remove_keys_matching_pattern(d_for_removal, patterns):
 
     Args:
         d_for_removal (dict): Dictionary to remove keys from (modified in-place)
-        patterns (iterable): Set of patterns to match against keys using match_key()
+        patterns (iterable or KeyPatternMatcher): Set of patterns to match against keys using match_key()
     """
     if isinstance(d_for_removal, dict):
+        if not isinstance(patterns, KeyPatternMatcher):
+            patterns = KeyPatternMatcher(patterns)
         keys_to_remove = [k for k in d_for_removal if match_key(k, patterns)]
         for k in keys_to_remove:
             del d_for_removal[k]
@@ -520,19 +704,14 @@ def _recursively_remove_keys_matching_pattern(d_for_removal, patterns):
             _recursively_remove_keys_matching_pattern(v, patterns)
 
 
-def _sum_total_values(db_type: DBType, db_dump: dict) -> Tuple[int, int]:
-    """Summarize the number of total values in the DB dump."""
-    total_incl_volatile = 0
-    total_excl_volatile = 0
-    always_ignore_keys = VOLATILE_VALUES.get(db_type, [])
-    for tl_key, content in db_dump.items():
-        assert "value" in content, f"Unexpected entry in {db_type.name} DB: {tl_key} : {content}"
-        value_dict = content["value"]
-        for key in value_dict:
-            total_incl_volatile += 1
-            if key not in always_ignore_keys:
-                total_excl_volatile += 1
-    return total_incl_volatile, total_excl_volatile
+def _list_snapshot_files(snapshot_dir: str) -> Dict[str, str]:
+    """Map DB name to snapshot file name for the snapshot files in a snapshot dir, preferring the record format"""
+    snapshot_files = {}
+    for suffix in (LEGACY_SNAPSHOT_FILE_SUFFIX, SNAPSHOT_FILE_SUFFIX):
+        for f in os.listdir(snapshot_dir):
+            if f.endswith(suffix):
+                snapshot_files[f[:-len(suffix)]] = f
+    return snapshot_files
 
 
 class SonicRedisDBSnapshotter:
@@ -567,7 +746,8 @@ class SonicRedisDBSnapshotter:
         Take a snapshot of specified Redis databases on the DUT.
 
         This method captures the current state of the specified Redis databases
-        and stores them as JSON files in a snapshot directory.
+        and stores them as snapshot files of sorted, line-delimited key records
+        (see write_snapshot_records) in a snapshot directory.
 
         Args:
             snapshot_name (str): Name identifier for this snapshot
@@ -578,10 +758,10 @@ class SonicRedisDBSnapshotter:
         snapshot_dir = f"{self._snapshot_base_dir}/{snapshot_name}/"
         os.makedirs(snapshot_dir, exist_ok=True)
         for db in snapshot_dbs:
-            cmd = f"redis-dump -d {db.value} --pretty"
+            cmd = f"redis-dump -d {db.value}"
             dump = dut_dump(cmd, self._duthost, snapshot_dir, db.name)
-            with open(f"{snapshot_dir}/{db.name}.json", "w") as f:
-                f.write(json.dumps(dump, indent=4, default=str))
+            write_snapshot_records(dump, f"{snapshot_dir}/{db.name}{SNAPSHOT_FILE_SUFFIX}")
+            del dump
 
         logger.info(f"Snapshot {snapshot_name} taken for {self._duthost.hostname} at {snapshot_dir}")
 
@@ -589,9 +769,10 @@ class SonicRedisDBSnapshotter:
         """
         Compare two snapshots and return detailed differences for each database.
 
-        This method loads two previously taken snapshots and compares them,
+        This method streams two previously taken snapshots and compares them,
         generating SnapshotDiff objects for each database type that contains
-        the differences and metrics.
+        the differences and metrics. Snapshots in the legacy single JSON document
+        format are supported as well.
 
         Args:
             snapshot_a (str): Name of the first snapshot to compare
@@ -605,24 +786,24 @@ class SonicRedisDBSnapshotter:
             AssertionError: If the snapshots don't contain the same database types
         """
         snapshot_a_dir = f"{self._snapshot_base_dir}/{snapshot_a}"
-        snapshot_a_dbs = [f for f in os.listdir(snapshot_a_dir) if f.endswith(".json")]
+        snapshot_a_dbs = _list_snapshot_files(snapshot_a_dir)
 
         snapshot_b_dir = f"{self._snapshot_base_dir}/{snapshot_b}"
-        snapshot_b_dbs = [f for f in os.listdir(snapshot_b_dir) if f.endswith(".json")]
+        snapshot_b_dbs = _list_snapshot_files(snapshot_b_dir)
 
         assert set(snapshot_a_dbs) == set(snapshot_b_dbs), "Snapshotted dbs do not match. Cannot compare"
 
         result = {}
 
-        for db_file in snapshot_a_dbs:
-            db_name = db_file.replace(".json", "")
+        for db_name, db_file_a in snapshot_a_dbs.items():
             db_type = DBType[db_name]
             if db_type == DBType.ASIC:
                 # NOTE: ASIC DB diffing not currently supported
                 continue
-            db_dump_a = json.load(open(os.path.join(snapshot_a_dir, db_file), 'r'))
-            db_dump_b = json.load(open(os.path.join(snapshot_b_dir, db_file), 'r'))
-            snapshot_diff = SnapshotDiff(db_type, db_dump_a, db_dump_b, label_a=snapshot_a, label_b=snapshot_b)
+            snapshot_diff = SnapshotDiff.from_snapshot_files(db_type,
+                                                             os.path.join(snapshot_a_dir, db_file_a),
+                                                             os.path.join(snapshot_b_dir, snapshot_b_dbs[db_name]),
+                                                             label_a=snapshot_a, label_b=snapshot_b)
 
             result[db_type] = snapshot_diff
 
@@ -20,6 +20,7 @@ from tests.common.utilities import get_host_visible_vars
 from tests.common.cache import cached
 from tests.common.helpers.constants import DEFAULT_ASIC_ID, DEFAULT_NAMESPACE
 from tests.common.helpers.platform_api.chassis import is_inband_port
+from tests.common.helpers.sonic_db import invalidate_sonic_db_cache
 from tests.common.errors import RunAnsibleModuleFail
 from tests.common import constants
 from typing import TypedDict
@@ -418,16 +419,25 @@ class SonicHost(AnsibleHostBase):
         @return: A dictionary in which key is the service name and values are service status
                  and service type.
         """
-        monit_services_status = {}
         services_status_result = self.shell("sudo monit status", module_ignore_errors=True, verbose=True)
 
         exit_code = services_status_result["rc"]
         if exit_code != 0:
-            return monit_services_status
+            return {}
+
+        return self.parse_monit_services_status(services_status_result["stdout_lines"])
 
-        for index, service_info in enumerate(services_status_result["stdout_lines"]):
+    @staticmethod
+    def parse_monit_services_status(stdout_lines):
+        """
+        @summary: Parse the output of 'monit status' into the metadata of the monitored services.
+        @return: A dictionary in which key is the service name and values are service status
+                 and service type.
+        """
+        monit_services_status = {}
+        for index, service_info in enumerate(stdout_lines):
             if service_info.strip().startswith("status"):
-                service_type_name = services_status_result["stdout_lines"][index - 1]
+                service_type_name = stdout_lines[index - 1]
                 service_type = service_type_name.split("'")[0].strip()
                 service_name = service_type_name.split("'")[1].strip()
                 service_status = service_info.split("status", 1)[1].strip()
@@ -511,7 +521,15 @@ class SonicHost(AnsibleHostBase):
             service = res['cmd'].split()[2]
             service_results[service] = res
 
-        # Parse critical group and service definition of all services
+        return self.parse_critical_group_process(service_results)
+
+    def parse_critical_group_process(self, service_results):
+        """
+        @summary: Parse the critical_processes files of the critical services
+        @param service_results: Dictionary of service name to the result ('rc' and 'stdout_lines') of
+            reading /etc/supervisor/critical_processes in the service container
+        @return: Dictionary of service name to its critical 'groups' and 'processes'
+        """
         group_process_results = {}
         for service in self.critical_services:
             if service not in service_results or service_results[service]['rc'] != 0:
@@ -599,7 +617,15 @@ class SonicHost(AnsibleHostBase):
             service = res['cmd'].split()[2]
             service_results[service] = res
 
-        # Parse critical process status of all services
+        return self.parse_all_critical_process_status(group_process_results, service_results)
+
+    def parse_all_critical_process_status(self, group_process_results, service_results):
+        """
+        @summary: Parse the critical process status of all the critical services
+        @param group_process_results: Output of parse_critical_group_process
+        @param service_results: Dictionary of service name to the result ('stdout_lines') of
+            'supervisorctl status' in the service container
+        """
         all_critical_process = {}
         for service in self.critical_services:
             service_critical_process = {
@@ -2065,16 +2091,24 @@ Totals               6450                 6449
         )
         return crm_facts
 
+    def _invalidate_sonic_db_cache_of_service(self, service_name):
+        # swss and syncd recreate the SAI objects when they are (re)started, the cached sonic-db query results
+        # of this host are stale
+        if service_name.split("@")[0] in ("swss", "syncd"):
+            invalidate_sonic_db_cache(self.hostname)
+
     def start_service(self, service_name, docker_name):
         logging.debug("Starting {}".format(service_name))
         if not self.is_service_fully_started(docker_name):
             self.command("sudo systemctl start {}".format(service_name))
+            self._invalidate_sonic_db_cache_of_service(service_name)
             logging.debug("started {}".format(service_name))
 
     def stop_service(self, service_name, docker_name):
         logging.debug("Stopping {}".format(service_name))
         if self.is_service_fully_started(docker_name):
             self.command("sudo systemctl stop {}".format(service_name))
+            self._invalidate_sonic_db_cache_of_service(service_name)
         logging.debug("Stopped {}".format(service_name))
 
     def restart_service(self, service_name, docker_name):
@@ -2085,6 +2119,7 @@ Totals               6450                 6449
         else:
             self.command("sudo systemctl start {}".format(service_name))
             logging.debug("started {}".format(service_name))
+        self._invalidate_sonic_db_cache_of_service(service_name)
 
     def reset_service(self, service_name, docker_name):
         logging.debug("Stopping {}".format(service_name))
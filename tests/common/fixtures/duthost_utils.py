@@ -720,14 +720,15 @@ def load_dscp_to_queue_map(duthost, port, dut_qos_maps_module):
         return {}
 
 
-def check_bgp_router_id(duthost, mgFacts):
+def check_bgp_router_id(duthost, mgFacts, bgp_summary=None):
     """
-    Check bgp router ID is same as Loopback0
+    Check bgp router ID is same as Loopback0, bgp_summary is the output of "show bgp summary json" if already known
     """
-    check_bgp_router_id_cmd = r'vtysh -c "show bgp summary json"'
-    bgp_summary = duthost.shell(check_bgp_router_id_cmd, module_ignore_errors=True)
+    if bgp_summary is None:
+        check_bgp_router_id_cmd = r'vtysh -c "show bgp summary json"'
+        bgp_summary = duthost.shell(check_bgp_router_id_cmd, module_ignore_errors=True)['stdout']
     try:
-        bgp_summary_json = json.loads(bgp_summary['stdout'])
+        bgp_summary_json = json.loads(bgp_summary)
         if 'ipv4Unicast' not in bgp_summary_json:
             logger.info("No ipv4Unicast in BGP summary")
             # for Ipv6 only device, just check if routerId exists or not.
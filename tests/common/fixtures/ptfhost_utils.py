@@ -16,6 +16,7 @@ from tests.common.dualtor.dual_tor_common import ActiveActivePortID
 from tests.common.dualtor.dual_tor_utils import update_linkmgrd_probe_interval, recover_linkmgrd_probe_interval
 from tests.common.utilities import wait_until, is_ipv6_only_topology
 from tests.common.dualtor.dual_tor_utils import mux_cable_server_ip
+from tests.ptf_runner import get_ptf_host_facts, register_ptf_worker, unregister_ptf_worker
 from pytest_ansible.errors import AnsibleConnectionFailure
 
 
@@ -35,6 +36,9 @@ ICMP_RESPONDER_PY = "icmp_responder.py"
 ICMP_RESPONDER_CONF_TEMPL = "icmp_responder.conf.j2"
 GARP_SERVICE_PY = 'garp_service.py'
 GARP_SERVICE_CONF_TEMPL = 'garp_service.conf.j2'
+PTF_WORKER_PY = 'ptf_worker.py'
+PTF_WORKER_CONF_TEMPL = 'ptf_worker.conf.j2'
+PTF_WORKER_SOCKET = '/tmp/ptf_worker.sock'
 PTF_TEST_PORT_MAP = '/root/ptf_test_port_map.json'
 PROBER_INTERVAL_MS = 3000
 
@@ -316,6 +320,59 @@ def ptf_portmap_file_module(rand_selected_dut, ptfhost, tbinfo):
 icmp_responder_session_started = False
 
 
+def _ptf_worker_ready(ptfhost, ptf_python):
+    result = ptfhost.shell("{} {} ping --socket {}".format(
+        ptf_python, os.path.join(OPT_DIR, PTF_WORKER_PY), PTF_WORKER_SOCKET), module_ignore_errors=True)
+    return result["rc"] == 0
+
+
+@pytest.fixture(scope="session", autouse=True)
+def run_ptf_worker(ptfhost, request):
+    """
+        Run the warm PTF worker on the PTF host when --enable_ptf_worker is set, ptf_runner then runs the
+        Python 3 test cases on it instead of launching the ptf binary for each test case.
+
+        Args:
+            ptfhost (AnsibleHost): Packet Test Framework (PTF)
+            request: pytest request object
+    """
+    if not request.config.getoption("--enable_ptf_worker"):
+        yield
+        return
+
+    if get_ptf_host_facts(ptfhost)["ptf_img_type"] == "mixed":
+        ptf_python, ptf_cmd = "/root/env-python3/bin/python3", "/root/env-python3/bin/ptf"
+    else:
+        ptf_python, ptf_cmd = "/usr/bin/python3", "/usr/local/bin/ptf"
+
+    logger.info("Start PTF worker on ptfhost '{0}'".format(ptfhost.hostname))
+    ptfhost.copy(src=os.path.join(SCRIPTS_SRC_DIR, PTF_WORKER_PY), dest=OPT_DIR)
+    with open(os.path.join(TEMPLATES_DIR, PTF_WORKER_CONF_TEMPL)) as f:
+        template = Template(f.read())
+    ptfhost.copy(content=template.render(ptf_worker_python=ptf_python, ptf_worker_ptf=ptf_cmd,
+                                         ptf_worker_socket=PTF_WORKER_SOCKET),
+                 dest=os.path.join(SUPERVISOR_CONFIG_DIR, "ptf_worker.conf"))
+    ptfhost.shell("supervisorctl update")
+    # Restart a worker left running by a previous session, it may run an older ptf_worker.py
+    ptfhost.shell("supervisorctl stop ptf_worker", module_ignore_errors=True)
+    # Remove the socket of a stopped worker, it would look like the new worker is listening
+    ptfhost.file(path=PTF_WORKER_SOCKET, state="absent")
+    ptfhost.shell("supervisorctl start ptf_worker")
+    # The worker binds its socket only after preloading ptf and scapy. ptf_runner disables a worker
+    # which doesn't answer for the rest of the session, so register it only once it answers.
+    if wait_until(60, 2, 0, _ptf_worker_ready, ptfhost, ptf_python):
+        register_ptf_worker(ptfhost, ptf_cmd, ptf_python, PTF_WORKER_SOCKET)
+    else:
+        logger.warning("PTF worker on ptfhost '{0}' is not ready, ptf_runner runs the ptf binary".format(
+            ptfhost.hostname))
+
+    yield
+
+    logger.info("Stop PTF worker on ptfhost '{0}'".format(ptfhost.hostname))
+    unregister_ptf_worker(ptfhost)
+    ptfhost.shell("supervisorctl stop ptf_worker", module_ignore_errors=True)
+
+
 @pytest.fixture(scope="session", autouse=True)
 def run_icmp_responder_session(duthosts, duthost, ptfhost, tbinfo, request):
     """Run icmp_responder on ptfhost session-wise on dualtor testbeds with active-active ports."""
@@ -0,0 +1,80 @@
+"""
+Run several shell commands on a host in a single script, to save the overhead of one ansible call per command.
+
+The output and the exit code of each command are delimited by marker lines:
+    <marker> <name>
+    <output of the command>
+    <marker> <name> rc=<exit code>
+A marker is found anywhere in a line, since it follows the last line of a command output which doesn't end with
+a newline.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def build_commands_script(commands, marker):
+    """
+    Build the script running the commands one after the other.
+
+    Args:
+        commands: List of (name, command). The names must be unique and must not contain the marker.
+        marker: Marker of the sections of the script output.
+
+    Returns:
+        The script.
+    """
+    lines = []
+    for name, command in commands:
+        lines.append('echo "{} {}"'.format(marker, name))
+        lines.append(command)
+        lines.append('echo "{} {} rc=$?"'.format(marker, name))
+    return "\n".join(lines)
+
+
+def parse_commands_script_output(stdout_lines, marker):
+    """
+    Split the output of a script built by build_commands_script into the sections of the commands.
+
+    Args:
+        stdout_lines: Output lines of the script.
+        marker: Marker of the sections of the script output.
+
+    Returns:
+        Dictionary of command name to (exit code, output lines). A command which didn't complete, e.g. if the
+        script was killed, has no section.
+    """
+    sections = {}
+    name, output = None, []
+    for line in stdout_lines:
+        index = line.find(marker)
+        if index < 0:
+            if name is not None:
+                output.append(line)
+            continue
+        if index > 0 and name is not None:
+            output.append(line[:index])
+        tag = line[index + len(marker) + 1:]
+        if name is not None and tag.startswith(name) and tag[len(name):].startswith(" rc="):
+            sections[name] = (int(tag[len(name) + 4:]), output)
+            name, output = None, []
+        else:
+            name, output = tag, []
+    return sections
+
+
+def run_commands_script(host, commands, marker):
+    """
+    Run the commands in a single script on the host.
+
+    Args:
+        host: The host to run the commands on, e.g. a SonicHost.
+        commands: List of (name, command). The names must be unique and must not contain the marker.
+        marker: Marker of the sections of the script output.
+
+    Returns:
+        Dictionary of command name to (exit code, output lines), see parse_commands_script_output.
+    """
+    logger.debug("Executing {} commands in one script on {}".format(len(commands), host.hostname))
+    result = host.shell(build_commands_script(commands, marker), module_ignore_errors=True, verbose=False)
+    return parse_commands_script_output(result.get("stdout_lines", []), marker)
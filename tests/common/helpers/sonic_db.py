@@ -2,11 +2,76 @@ import logging
 import json
 import six
 import ast
+import threading
+from collections import defaultdict
+from six.moves import shlex_quote
 from tests.common.helpers.constants import DEFAULT_NAMESPACE
 from tests.common.devices.sonic_asic import SonicAsic
 
 logger = logging.getLogger(__name__)
 
+# Max number of keys queried by one batched command, to stay well below the max command line length.
+BATCH_MAX_KEYS = 256
+# Number of keys scanned by each SCAN iteration. Each iteration starts a sonic-db-cli process, so it is large
+# enough to scan a scaled ASIC_DB in a few iterations, while still not blocking redis as long as KEYS would.
+SCAN_COUNT = 50000
+
+# Lua scripts run with EVAL, so that all the keys of a batch are read in one redis round-trip.
+_HGETALL_BATCH_SCRIPT = """
+local r = {}
+for _, k in ipairs(KEYS) do
+    local v = redis.call('HGETALL', k)
+    if #v > 0 then
+        local h = {}
+        for i = 1, #v, 2 do h[v[i]] = v[i + 1] end
+        r[k] = h
+    end
+end
+return cjson.encode(r)
+"""
+
+_HMGET_BATCH_SCRIPT = """
+local r = {}
+for _, k in ipairs(KEYS) do
+    local v = redis.call('HMGET', k, unpack(ARGV))
+    local h = {}
+    for i, f in ipairs(ARGV) do
+        if v[i] then h[f] = v[i] end
+    end
+    r[k] = h
+end
+return cjson.encode(r)
+"""
+
+_SCAN_SCRIPT = """
+local r = redis.call('SCAN', ARGV[1], 'MATCH', ARGV[2], 'COUNT', ARGV[3])
+return r[1] .. '\\n' .. table.concat(r[2], '\\n')
+"""
+
+# Generation counter of each DUT, bumped on config reload and reboot to invalidate the cached sonic-db query results
+_db_generations = defaultdict(int)
+_db_generations_lock = threading.Lock()
+
+
+def invalidate_sonic_db_cache(hostname=None):
+    """
+    Invalidates the sonic-db query results cached by SonicDbCli instances created with use_cache=True.
+
+    Args:
+        hostname: Hostname of the DUT whose cached results to invalidate. All DUTs if None.
+    """
+    with _db_generations_lock:
+        hostnames = [hostname] if hostname else list(_db_generations.keys())
+        for name in hostnames:
+            _db_generations[name] += 1
+    logger.debug("Invalidated sonic-db cache of %s", hostname or "all DUTs")
+
+
+def get_sonic_db_generation(hostname):
+    """Returns the current sonic-db cache generation of a DUT."""
+    with _db_generations_lock:
+        return _db_generations[hostname]
+
 
 class SonicDbCli(object):
     """Base class for interface to SonicDb using sonic-db-cli command.
@@ -14,12 +79,42 @@ class SonicDbCli(object):
         Attributes:
             host: a SonicHost or SonicAsic.  Commands will be run on this shell.
             database: database number.
+            use_cache: cache the query results until the DUT is reloaded or rebooted, see invalidate_sonic_db_cache.
         """
 
-    def __init__(self, host, database='APPL_DB'):
+    def __init__(self, host, database='APPL_DB', use_cache=False):
         """Initializes base class with defaults"""
         self.host = host
         self.database = database
+        self.use_cache = use_cache
+        self._cache = {}
+        self._cache_generation = None
+
+    def _get_sonichost(self):
+        """Returns the SonicHost the commands are run on."""
+        return getattr(self.host, "sonichost", self.host)
+
+    def _cache_get(self, cache_key):
+        """
+        Gets a cached query result.
+
+        Returns:
+            The cached result, or None if caching is disabled, the result is not cached, or the DUT was reloaded or
+            rebooted since the result was cached.
+        """
+        if not self.use_cache:
+            return None
+        generation = get_sonic_db_generation(self._get_sonichost().hostname)
+        if generation != self._cache_generation:
+            self._cache = {}
+            self._cache_generation = generation
+            return None
+        return self._cache.get(cache_key)
+
+    def _cache_set(self, cache_key, value):
+        if self.use_cache:
+            self._cache[cache_key] = value
+        return value
 
     def _cli_prefix(self):
         """Builds opening of sonic-db-cli command for other methods."""
@@ -84,15 +179,18 @@ class SonicDbCli(object):
 
 
         """
+        cached = self._cache_get(("hget", key, field))
+        if cached is not None:
+            return cached
         cmd = self._cli_prefix() + "hget {} {}".format(key, field)
         result = self._run_and_check(cmd)
         if result == {}:
             raise SonicDbKeyNotFound("Key: %s, field: %s not found in sonic-db cmd: %s" % (key, field, cmd))
         else:
             if six.PY2:
-                return result['stdout'].decode('unicode-escape')
+                return self._cache_set(("hget", key, field), result['stdout'].decode('unicode-escape'))
             else:
-                return result['stdout']
+                return self._cache_set(("hget", key, field), result['stdout'])
 
     def hget_all(self, key):
         """
@@ -105,6 +203,9 @@ class SonicDbCli(object):
             SonicDbKeyNotFound: If the key is not found.
         """
 
+        cached = self._cache_get(("hgetall", key))
+        if cached is not None:
+            return cached
         cmd = self._cli_prefix() + "HGETALL {}".format(key)
         result = self._run_and_check(cmd)
         if result == {}:
@@ -117,7 +218,109 @@ class SonicDbCli(object):
                 v = result['stdout']
             v_sanitized = v.replace('\n', '\\n')
             v_dict = ast.literal_eval(v_sanitized)
-            return v_dict
+            return self._cache_set(("hgetall", key), v_dict)
+
+    def _eval_json(self, script, keys, args=()):
+        """
+        Runs a Lua script returning a JSON string with EVAL, in one redis round-trip.
+
+        Args:
+            script: The Lua script.
+            keys: List of keys passed to the script as KEYS.
+            args: List of arguments passed to the script as ARGV.
+
+        Returns:
+            The decoded JSON returned by the script.
+        """
+        cmd = self._cli_prefix() + "EVAL {} {} {}".format(
+            shlex_quote(script), len(keys), " ".join(shlex_quote(str(arg)) for arg in list(keys) + list(args)))
+        result = self._run_and_raise(cmd)
+        return json.loads(result['stdout'])
+
+    def _batched(self, name, script, keys, args=()):
+        """Queries keys in batches of BATCH_MAX_KEYS keys, reusing the cached result of each key if any."""
+        result = {}
+        missing_keys = []
+        for key in keys:
+            cached = self._cache_get((name, key) + tuple(args))
+            if cached is not None:
+                result[key] = cached
+            elif key not in missing_keys:
+                missing_keys.append(key)
+        for i in range(0, len(missing_keys), BATCH_MAX_KEYS):
+            batch = self._eval_json(script, missing_keys[i:i + BATCH_MAX_KEYS], args)
+            for key, value in batch.items():
+                # cjson encodes an empty table as an empty object, so the hash values are always dicts
+                result[key] = self._cache_set((name, key) + tuple(args), value)
+        return result
+
+    def hget_all_batch(self, keys):
+        """
+        Gets all the fields of many keys with HGETALL, pipelined in one redis session on the DUT.
+
+        Args:
+            keys: List of full names of the keys to get.
+
+        Returns:
+            Dictionary of key to dictionary of field and value. Keys which do not exist are not in the dictionary.
+        """
+        return self._batched("hgetall", _HGETALL_BATCH_SCRIPT, keys)
+
+    def hget_batch(self, keys, fields):
+        """
+        Gets the value of some fields of many keys with HMGET, pipelined in one redis session on the DUT.
+
+        Args:
+            keys: List of full names of the keys to get.
+            fields: List of names of the hash fields to get.
+
+        Returns:
+            Dictionary of key to dictionary of field and value. Fields which do not exist are not in the dictionary.
+        """
+        return self._batched("hmget", _HMGET_BATCH_SCRIPT, keys, list(fields))
+
+    def scan_keys(self, pattern, count=SCAN_COUNT):
+        """
+        Gets the list of keys matching a pattern with SCAN, which unlike KEYS does not block the redis server.
+
+        All the SCAN iterations run on the DUT in one command.
+
+        Args:
+            pattern: Redis key pattern.
+            count: Number of keys scanned by each SCAN iteration.
+
+        Returns:
+            List of keys, empty if no key matches the pattern.
+        """
+        cached = self._cache_get(("scan", pattern))
+        if cached is not None:
+            return cached
+        sonic_db_cli = getattr(self.host, "sonic_db_cli", "sonic-db-cli")
+        cmd = ("cursor=0; while true; do "
+               "out=$({cli} {db} EVAL {script} 0 $cursor {pattern} {count}) || exit 1; "
+               "echo \"$out\" | tail -n +2; "
+               "cursor=$(echo \"$out\" | head -n 1); "
+               "[ \"$cursor\" = \"0\" ] && break; "
+               "done").format(cli=sonic_db_cli, db=self.database, script=shlex_quote(_SCAN_SCRIPT),
+                              pattern=shlex_quote(pattern), count=int(count))
+        logger.debug("SONIC-DB-CLI: %s", cmd)
+        result = self._get_sonichost().shell(cmd, verbose=False)
+        # SCAN may return a key more than once
+        keys = list(dict.fromkeys(line for line in result["stdout_lines"] if line))
+        return self._cache_set(("scan", pattern), keys)
+
+    def _scan_and_raise(self, pattern):
+        """
+        Gets the list of keys matching a pattern with SCAN.
+
+        Raises:
+            SonicDbNoCommandOutput: If no key matches the pattern.
+        """
+        keys = self.scan_keys(pattern)
+        if not keys:
+            logger.warning("No key matches pattern: %s" % pattern)
+            raise SonicDbNoCommandOutput("Pattern: %s matched no key in %s." % (pattern, self.database))
+        return keys
 
     def get_and_check_key_value(self, key, value, field=None):
         """
@@ -161,17 +364,12 @@ class SonicDbCli(object):
                 SonicDbKeyNotFound: If the key or field has no value or is not present.
 
         """
-        cmd = self._cli_prefix() + " keys {}".format(table)
-        result = self._run_and_check(cmd)
-        if result == {}:
+        keys = self.scan_keys(table)
+        if not keys:
             if raise_error_when_not_found:
-                raise SonicDbKeyNotFound("No keys for %s found in sonic-db cmd: %s" % (table, cmd))
+                raise SonicDbKeyNotFound("No keys for %s found in sonic-db with pattern: %s" % (table, table))
             return []
-        else:
-            if six.PY2:
-                return result['stdout'].decode('unicode-escape').splitlines()
-            else:
-                return result['stdout'].splitlines()
+        return keys
 
     def dump(self, table):
         """
@@ -224,11 +422,11 @@ class AsicDbCli(SonicDbCli):
     ASIC_ROUTERINTF_TABLE = "ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE"
     ASIC_NEIGH_ENTRY_TABLE = "ASIC_STATE:SAI_OBJECT_TYPE_NEIGHBOR_ENTRY"
 
-    def __init__(self, host):
+    def __init__(self, host, use_cache=False):
         """
         Initializes a connection to the ASIC DB (database 1)
         """
-        super(AsicDbCli, self).__init__(host, 'ASIC_DB')
+        super(AsicDbCli, self).__init__(host, 'ASIC_DB', use_cache=use_cache)
         # cache this to improve speed
         self.hostif_portidlist = []
         self.hostif_table = []
@@ -238,16 +436,14 @@ class AsicDbCli(SonicDbCli):
 
     def get_switch_key(self):
         """Returns a list of keys in the switch table"""
-        cmd = self._cli_prefix() + "KEYS %s*" % AsicDbCli.ASIC_SWITCH_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"][0]
+        return self._scan_and_raise("%s*" % AsicDbCli.ASIC_SWITCH_TABLE)[0]
 
     def get_system_port_key_list(self, refresh=False):
         """Returns a list of keys in the system port table"""
         if self.system_port_key_list != [] and refresh is False:
             return self.system_port_key_list
 
-        cmd = self._cli_prefix() + "KEYS %s*" % AsicDbCli.ASIC_SYSPORT_TABLE
-        self.system_port_key_list = self._run_and_raise(cmd)["stdout_lines"]
+        self.system_port_key_list = self._scan_and_raise("%s*" % AsicDbCli.ASIC_SYSPORT_TABLE)
         return self.system_port_key_list
 
     def get_port_key_list(self, refresh=False):
@@ -256,38 +452,32 @@ class AsicDbCli(SonicDbCli):
         if self.port_key_list != [] and refresh is False:
             return self.port_key_list
 
-        cmd = self._cli_prefix() + "KEYS %s*" % AsicDbCli.ASIC_PORT_TABLE
-        self.port_key_list = self._run_and_raise(cmd)["stdout_lines"]
+        self.port_key_list = self._scan_and_raise("%s*" % AsicDbCli.ASIC_PORT_TABLE)
         return self.port_key_list
 
     def get_hostif_list(self):
         """Returns a list of keys in the host interface table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_HOSTIF_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._scan_and_raise("%s:*" % AsicDbCli.ASIC_HOSTIF_TABLE)
 
     def get_asic_db_lag_list(self, refresh=False):
         """Returns a list of keys in the lag table"""
         if self.lagid_key_list != [] and refresh is False:
             return self.lagid_key_list
 
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_LAG_TABLE
-        self.lagid_key_list = self._run_and_raise(cmd)["stdout_lines"]
+        self.lagid_key_list = self._scan_and_raise("%s:*" % AsicDbCli.ASIC_LAG_TABLE)
         return self.lagid_key_list
 
     def get_asic_db_lag_member_list(self):
         """Returns a list of keys in the lag member table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_LAG_MEMBER_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._scan_and_raise("%s:*" % AsicDbCli.ASIC_LAG_MEMBER_TABLE)
 
     def get_router_if_list(self):
         """Returns a list of keys in the router interface table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_ROUTERINTF_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._scan_and_raise("%s:*" % AsicDbCli.ASIC_ROUTERINTF_TABLE)
 
     def get_neighbor_list(self):
         """Returns a list of keys in the neighbor table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_NEIGH_ENTRY_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._scan_and_raise("%s:*" % AsicDbCli.ASIC_NEIGH_ENTRY_TABLE)
 
     def get_neighbor_key_by_ip(self, ipaddr):
         """Returns the key in the neighbor table that is for a specific IP neighbor
@@ -296,9 +486,9 @@ class AsicDbCli(SonicDbCli):
             ipaddr: The IP address to search for in the neighbor table.
 
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS %s*%s*" % (AsicDbCli.ASIC_NEIGH_ENTRY_TABLE, ipaddr))
+        keys = self._scan_and_raise("%s*%s*" % (AsicDbCli.ASIC_NEIGH_ENTRY_TABLE, ipaddr))
         match_str = '"ip":"%s"' % ipaddr
-        for key in result["stdout_lines"]:
+        for key in keys:
             if match_str in key:
                 neighbor_key = key
                 break
@@ -445,8 +635,8 @@ class AppDbCli(SonicDbCli):
     APP_LAG_TABLE = "LAG_TABLE"
     APP_LAG_MEMBER_TABLE = "LAG_MEMBER_TABLE"
 
-    def __init__(self, host):
-        super(AppDbCli, self).__init__(host, 'APPL_DB')
+    def __init__(self, host, use_cache=False):
+        super(AppDbCli, self).__init__(host, 'APPL_DB', use_cache=use_cache)
 
     def get_neighbor_key_by_ip(self, ipaddr):
         """Returns the key in the neighbor table that is for a specific IP neighbor
@@ -455,9 +645,9 @@ class AppDbCli(SonicDbCli):
             ipaddr: The IP address to search for in the neighbor table.
 
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS %s:*%s" % (AppDbCli.APP_NEIGH_TABLE, ipaddr))
+        keys = self._scan_and_raise("%s:*%s" % (AppDbCli.APP_NEIGH_TABLE, ipaddr))
         neighbor_key = None
-        for key in result["stdout_lines"]:
+        for key in keys:
             if key.endswith(ipaddr):
                 neighbor_key = key
                 break
@@ -468,15 +658,13 @@ class AppDbCli(SonicDbCli):
         """
         Retuns lag list in app db
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS *%s*" % AppDbCli.APP_LAG_TABLE)
-        return result["stdout_lines"]
+        return self._scan_and_raise("*%s*" % AppDbCli.APP_LAG_TABLE)
 
     def get_app_db_lag_member_list(self):
         """
         return lag member list in app db
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS *{}:*".format(AppDbCli.APP_LAG_MEMBER_TABLE))
-        return result["stdout_lines"]
+        return self._scan_and_raise("*{}:*".format(AppDbCli.APP_LAG_MEMBER_TABLE))
 
     def dump_neighbor_table(self):
         """
@@ -497,9 +685,9 @@ class VoqDbCli(SonicDbCli):
     SYSTEM_LAG_MEMBER_TABLE = "SYSTEM_LAG_MEMBER_TABLE"
     SYSTEM_NEIGHBOR_TABLE = "SYSTEM_NEIGH"
 
-    def __init__(self, host):
+    def __init__(self, host, use_cache=False):
         """Initializes the class with the database parameters and finds the IP address of the database"""
-        super(VoqDbCli, self).__init__(host, 'CHASSIS_APP_DB')
+        super(VoqDbCli, self).__init__(host, 'CHASSIS_APP_DB', use_cache=use_cache)
         output = host.command("grep chassis_db_address /etc/sonic/chassisdb.conf")
         self.ip = output['stdout'].split("=")[1]
 
@@ -510,10 +698,9 @@ class VoqDbCli(SonicDbCli):
             ipaddr: The IP address to search for in the neighbor table.
 
         """
-        cmd = self._cli_prefix() + 'KEYS "%s|*%s"' % (VoqDbCli.SYSTEM_NEIGHBOR_TABLE, ipaddr)
-        result = self._run_and_raise(cmd)
+        keys = self._scan_and_raise("%s|*%s" % (VoqDbCli.SYSTEM_NEIGHBOR_TABLE, ipaddr))
         neighbor_key = None
-        for key in result["stdout_lines"]:
+        for key in keys:
             if key.endswith(ipaddr):
                 neighbor_key = key
                 break
@@ -547,13 +734,11 @@ class VoqDbCli(SonicDbCli):
 
     def get_lag_list(self):
         """Returns a list of keys in the system lag table"""
-        cmd = self._cli_prefix() + "KEYS *{}*".format(VoqDbCli.SYSTEM_LAG_TABLE)
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._scan_and_raise("*{}*".format(VoqDbCli.SYSTEM_LAG_TABLE))
 
     def get_lag_member_list(self):
         """Returns a list of keys in the ststem lag member table"""
-        cmd = self._cli_prefix() + "KEYS *{}*".format(VoqDbCli.SYSTEM_LAG_MEMBER_TABLE)
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._scan_and_raise("*{}*".format(VoqDbCli.SYSTEM_LAG_MEMBER_TABLE))
 
     def dump_neighbor_table(self):
         """
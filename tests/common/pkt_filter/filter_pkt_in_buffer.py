@@ -1,5 +1,6 @@
 from collections import OrderedDict
 
+import logging
 import sys
 import time
 import json
@@ -13,6 +14,16 @@ if sys.version_info.major > 2:
 else:
     NATIVE_TYPE = (int, float, long, bool, list, dict, tuple, set, str, bytes, unicode, type(None))     # noqa: F821
 
+logger = logging.getLogger(__name__)
+
+# Max time to wait for the expected packet in the buffer
+DEFAULT_TIMEOUT = 3
+# Time without new packets in the buffer after which all the packets are considered received
+DEFAULT_SETTLE_TIME = 0.5
+POLL_INTERVAL = 0.05
+# Fields of a layer which set its header length, so the offsets of the next layers
+HEADER_LENGTH_FIELDS = ("ihl", "dataofs")
+
 
 def _parse_layer(layer):
     """
@@ -69,11 +80,138 @@ def convert_pkt_to_dict(pkt):
     return packet_dict
 
 
+def _get_bits(built):
+    """
+    Get the number of bits of a partially built layer header
+
+    Args:
+        built: Bytes built so far, or tuple (bytes, bits, value) while a bit field is being built
+
+    Returns:
+        Number of bits
+    """
+    if isinstance(built, tuple):
+        return len(built[0]) * 8 + built[1]
+    return len(built) * 8
+
+
+def _get_field_bit_offsets(layer):
+    """
+    Get the bit offsets of the fields of a layer, by building its header field by field as scapy does
+
+    Args:
+        layer: Layer of packet
+
+    Returns:
+        Dictionary of field name to (bit offset in the header, bit size)
+    """
+    offsets = {}
+    built = b""
+    for field in layer.fields_desc:
+        start = _get_bits(built)
+        built = field.addfield(layer, built, layer.getfieldval(field.name))
+        offsets[field.name] = (start, _get_bits(built) - start)
+
+    return offsets
+
+
+def compile_match_fields(pkt, match_fields):
+    """
+    Compile the match fields of the expected packet to byte offsets, masks and values, so that
+    the received packets can be matched on their raw bytes without being dissected
+
+    The byte offsets are valid only for the packets with the same layout as the expected packet,
+    so the fields which select the next layer (e.g. Ethernet type and IP proto) and set the header
+    length of the layers before the matched ones are compiled as the layout fields.
+
+    Args:
+        pkt: Scapy packet
+        match_fields: List of packet fields that should be matched, as (layer name, field name)
+
+    Returns:
+        Tuple of the compiled layout fields and match fields, each a list of (start, end, mask, value)
+        where the mask is None if the field is made of whole bytes and the value is then bytes.
+        None if a match field is not in the expected packet
+    """
+    pkt_bytes = bytes(pkt)
+    layers = []
+    while pkt.getlayer(len(layers)) is not None:
+        layers.append(pkt.getlayer(len(layers)))
+
+    # Same as convert_pkt_to_dict, a layer name refers to the last layer of this name
+    layer_indexes = {layer.name: index for index, layer in enumerate(layers)}
+    fields = []
+    for layer_name, field_name in match_fields:
+        index = layer_indexes.get(layer_name)
+        if index is None or field_name not in [field.name for field in layers[index].fields_desc]:
+            return None
+        fields.append((index, field_name))
+
+    layout_fields = []
+    for index in range(max([layer_index for layer_index, _ in fields], default=0)):
+        lower, upper = layers[index], layers[index + 1]
+        for bind_fields, layer_cls in lower.payload_guess:
+            if type(upper) is layer_cls:
+                layout_fields.extend((index, field_name) for field_name in bind_fields)
+        layout_fields.extend((index, field.name) for field in lower.fields_desc if field.name in HEADER_LENGTH_FIELDS)
+
+    offsets = {}
+
+    def compile_fields(fields):
+        compiled = []
+        for index, field_name in fields:
+            if index not in offsets:
+                offsets[index] = _get_field_bit_offsets(layers[index])
+            layer_offset = (len(pkt_bytes) - len(bytes(layers[index]))) * 8
+            bit_offset, bits = offsets[index][field_name]
+            bit_offset += layer_offset
+
+            start, end = bit_offset // 8, (bit_offset + bits + 7) // 8
+            if bit_offset % 8 == 0 and bits % 8 == 0:
+                entry = (start, end, None, pkt_bytes[start:end])
+            else:
+                bit_mask = ((1 << bits) - 1) << (end * 8 - bit_offset - bits)
+                entry = (start, end, bit_mask, int.from_bytes(pkt_bytes[start:end], "big") & bit_mask)
+            if entry not in compiled:
+                compiled.append(entry)
+
+        return compiled
+
+    return compile_fields(layout_fields), compile_fields(fields)
+
+
+def match_compiled_fields(pkt_bytes, compiled):
+    """
+    Match the raw bytes of a packet against compiled match fields
+
+    Args:
+        pkt_bytes: Raw bytes of packet
+        compiled: Layout fields or match fields returned by compile_match_fields
+
+    Returns:
+        True if all the fields match
+    """
+    for start, end, bit_mask, value in compiled:
+        if end > len(pkt_bytes):
+            return False
+        if bit_mask is None:
+            if pkt_bytes[start:end] != value:
+                return False
+        elif int.from_bytes(pkt_bytes[start:end], "big") & bit_mask != value:
+            return False
+
+    return True
+
+
 class FilterPktBuffer(object):
     """
     FilterPktBuffer class for finding of packets in the buffer of PTF
+
+    The packets with the same layout as the expected packet are matched on their raw bytes with the
+    match fields compiled from the expected packet, the other packets are dissected to be matched.
     """
-    def __init__(self, ptfadapter, exp_pkt, dst_port_numbers, match_fields=None, ignore_fields=None):
+    def __init__(self, ptfadapter, exp_pkt, dst_port_numbers, match_fields=None, ignore_fields=None,
+                 timeout=DEFAULT_TIMEOUT, settle_time=DEFAULT_SETTLE_TIME):
         """
         Initialize an object for finding packets in the buffer
 
@@ -83,6 +221,8 @@ class FilterPktBuffer(object):
             dst_port_numbers: Destination port numbers
             match_fields: List of packet fields that should be matched
             ignore_fields: List of packet fields that should be ignored
+            timeout: Max time to wait for the expected packet in the buffer
+            settle_time: Time without new packets after a match, after which the buffer is not waited for anymore
         """
         self.received_pkt = None
         self.received_pkt_diff = []
@@ -98,12 +238,25 @@ class FilterPktBuffer(object):
         if ignore_fields is None:
             ignore_fields = []
         self.ignore_fields = ignore_fields
+        self.timeout = timeout
+        self.settle_time = settle_time
 
         self.masked_exp_pkt = mask.Mask(self.pkt)
         self.pkt_dict = convert_pkt_to_dict(self.pkt)
 
         self.__ignore_fields()
 
+        self.match_on_bytes = True
+        self.compiled_match_fields = None
+        try:
+            self.compiled_match_fields = compile_match_fields(self.pkt, self.match_fields)
+        except Exception as e:
+            # The packets are dissected to be matched if the expected packet can't be built field by field
+            logger.warning("Failed to compile the match fields {}, matching dissected packets: {}".format(
+                self.match_fields, repr(e)))
+            self.match_on_bytes = False
+        self.__scan_state = {}
+
     def __ignore_fields(self):
         """
         Ignore fields of packet
@@ -129,36 +282,104 @@ class FilterPktBuffer(object):
 
         return pkt_dict
 
-    def __find_pkt_in_buffer(self, dst_port_number):
+    def __match_pkt_dict(self, pkt_bytes):
+        """
+        Match the dissected fields of packet with the expected packet
+
+        Args:
+            pkt_bytes: Raw bytes of packet
+
+        Returns:
+            True if all the match fields are equal
+        """
+        packet_dict = convert_pkt_to_dict(packet.Ether(pkt_bytes))
+
+        for field, value in self.match_fields:
+            try:
+                if packet_dict[field][value] != self.pkt_dict[field][value]:
+                    return False
+            except KeyError:
+                return False
+
+        return True
+
+    def __match_pkt(self, pkt_bytes):
+        """
+        Match packet with the expected packet by using matched fields
+
+        Args:
+            pkt_bytes: Raw bytes of packet
+
+        Returns:
+            True if the packet matches
+        """
+        if not self.match_on_bytes:
+            return self.__match_pkt_dict(pkt_bytes)
+
+        if self.compiled_match_fields is None:
+            # A match field is not in the expected packet, no packet can match
+            return False
+
+        layout_fields, match_fields = self.compiled_match_fields
+        if not match_compiled_fields(pkt_bytes, layout_fields):
+            # The fields of a packet with another layout are not at the compiled offsets
+            return self.__match_pkt_dict(pkt_bytes)
+
+        return match_compiled_fields(pkt_bytes, match_fields)
+
+    def __scan_buffer(self, dst_port_number):
         """
-        Find expected packet in buffer by using matched fields
+        Match the packets added to the buffer of the port since the previous scan
+
+        Args:
+            dst_port_number: Destination port number
 
         Returns:
-            Received packet
+            True if the buffer changed since the previous scan
         """
-        time.sleep(3)
         common_buffer = self.ptfadapter.dataplane.packet_queues
         packet_buffer = common_buffer[(0, dst_port_number)][:]
-        matched_index = 0
-        received_pkt = None
-
-        for pkt in packet_buffer:
-            packet_dict = convert_pkt_to_dict(packet.Ether(pkt[0]))
-
-            for field, value in self.match_fields:
-                try:
-                    if packet_dict[field][value] != self.pkt_dict[field][value]:
-                        break
-                except KeyError:
-                    break
-            else:
+        scanned, last_pkt, matched_index, received_pkt = self.__scan_state.get(dst_port_number, (0, None, 0, None))
+
+        changed = len(packet_buffer) != scanned
+        if scanned and (len(packet_buffer) < scanned or packet_buffer[scanned - 1] is not last_pkt):
+            # Packets were removed from the buffer, scan it again
+            scanned, matched_index, received_pkt = 0, 0, None
+            changed = True
+
+        for pkt in packet_buffer[scanned:]:
+            if self.__match_pkt(pkt[0]):
                 matched_index += 1
-                received_pkt = packet.Ether(pkt[0])
+                received_pkt = pkt[0]
+
+        last_pkt = packet_buffer[-1] if packet_buffer else None
+        self.__scan_state[dst_port_number] = (len(packet_buffer), last_pkt, matched_index, received_pkt)
+
+        return changed
 
-        if received_pkt:
-            return ({dst_port_number: matched_index}, received_pkt)
+    def __wait_for_pkt_in_buffer(self):
+        """
+        Scan the buffers of the destination ports until the expected packet is found and no new packets
+        are received for the settle time, or until the timeout
+        """
+        self.__scan_state = {}
+        start_time = time.time()
+        settle_deadline = start_time + self.settle_time
 
-        return (None, None)
+        while True:
+            changed = False
+            for dst_port in self.dst_port_numbers:
+                changed = self.__scan_buffer(dst_port) or changed
+
+            now = time.time()
+            if changed:
+                settle_deadline = now + self.settle_time
+
+            found = any(state[2] for state in self.__scan_state.values())
+            if now - start_time >= self.timeout or (found and now >= settle_deadline):
+                break
+
+            time.sleep(POLL_INTERVAL)
 
     def __diff_between_dict(self, rcv_pkt_dict, exp_pkt_dict, path=''):
         """
@@ -211,12 +432,15 @@ class FilterPktBuffer(object):
         Returns:
             Bool value or difference between received packet and expected packet
         """
+        self.__wait_for_pkt_in_buffer()
+
         for dst_port in self.dst_port_numbers:
-            matched_index, received_pkt = self.__find_pkt_in_buffer(dst_port)
+            _, _, matched_index, received_pkt = self.__scan_state[dst_port]
 
             if received_pkt:
-                self.received_pkt = received_pkt
-                self.matched_index.update(matched_index)
+                # Only the matched packet is dissected, for the comparison with the expected packet
+                self.received_pkt = packet.Ether(received_pkt)
+                self.matched_index[dst_port] = matched_index
 
         if self.received_pkt:
             return self.masked_exp_pkt.pkt_match(self.received_pkt) or self._diff_between_pkt(self.received_pkt)
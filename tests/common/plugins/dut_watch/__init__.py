@@ -0,0 +1,31 @@
+import pytest
+
+from tests.common.helpers.dut_utils import creds_on_dut
+from .dut_watch import (WatchPredicate, RedisFieldPredicate, UnitStatePredicate,   # noqa: F401
+                        SupervisorStatePredicate, SyslogPatternPredicate, wait_until_watched, get_wait_stats,
+                        log_wait_stats, start_dut_watch_stream, stop_dut_watch_streams)
+
+
+def pytest_addoption(parser):
+    """Describe plugin specified options"""
+    parser.addoption("--dut_watch", action="store_true", default=False,
+                     help="Watch the predicates waited for by wait_until_watched with an agent on the DUTs, "
+                          "instead of polling them")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dut_watch(request):
+    """
+    Start a DUT watch agent on each DUT if the --dut_watch option is set, and log the time saved by
+    wait_until_watched at the end of the session
+    """
+    if request.config.getoption("--dut_watch"):
+        duthosts = request.getfixturevalue("duthosts")
+        for duthost in duthosts:
+            creds = creds_on_dut(duthost)
+            start_dut_watch_stream(duthost, creds["sonicadmin_user"], creds["sonicadmin_password"])
+
+    yield
+
+    stop_dut_watch_streams()
+    log_wait_stats()
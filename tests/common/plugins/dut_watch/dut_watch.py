@@ -0,0 +1,405 @@
+import json
+import logging
+import math
+import os
+import shlex
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import paramiko
+
+from tests.common.utilities import wait_until
+
+logger = logging.getLogger(__name__)
+
+DUT_WATCH_AGENT = "/tmp/dut_watch_agent.py"
+AGENT_START_TIMEOUT = 30
+# Min time between two attempts to restart a broken stream, e.g. while the DUT reboots
+RECONNECT_INTERVAL = 30
+
+
+class WatchPredicate(object):
+    """
+    Base class of the predicates which can be watched by the DUT watch agent.
+
+    A predicate is also a condition function, which checks the predicate once with a command run on the DUT,
+    so that it can be used with wait_until when the DUT isn't watched.
+    """
+
+    def __init__(self, duthost, name):
+        self.duthost = duthost
+        self.__name__ = name
+
+    def get_request(self):
+        """
+        @summary: Returns the watch request sent to the DUT watch agent
+        """
+        raise NotImplementedError
+
+    def check(self):
+        raise NotImplementedError
+
+    def start(self):
+        """
+        @summary: Called by wait_until_watched when it starts to watch the predicate
+        """
+        pass
+
+    def __call__(self):
+        return self.check()
+
+
+class RedisFieldPredicate(WatchPredicate):
+    """
+    A field of a redis hash has the expected value. Watched with the keyspace notifications of the key.
+    The db is the name of the database, e.g. STATE_DB.
+    """
+
+    def __init__(self, duthost, db, key, field, value, namespace=None):
+        WatchPredicate.__init__(self, duthost, "redis {} {} {} == {}".format(db, key, field, value))
+        self.db = db
+        self.key = key
+        self.field = field
+        self.value = value
+        self.namespace = namespace
+
+    def get_request(self):
+        return {"type": "redis", "db": self.db, "key": self.key, "field": self.field, "value": self.value,
+                "namespace": self.namespace}
+
+    def check(self):
+        ns_option = "-n {} ".format(self.namespace) if self.namespace else ""
+        result = self.duthost.shell("sonic-db-cli {}{} HGET {} {}".format(
+            ns_option, self.db, shlex.quote(self.key), shlex.quote(self.field)), module_ignore_errors=True)
+        return result["stdout"].strip() == self.value
+
+
+class UnitStatePredicate(WatchPredicate):
+    """
+    A systemd unit is in the expected state, as reported by 'systemctl is-active'.
+    """
+
+    def __init__(self, duthost, unit, state="active"):
+        WatchPredicate.__init__(self, duthost, "unit {} is {}".format(unit, state))
+        self.unit = unit
+        self.state = state
+
+    def get_request(self):
+        return {"type": "unit", "unit": self.unit, "value": self.state}
+
+    def check(self):
+        result = self.duthost.shell("systemctl is-active {}".format(self.unit), module_ignore_errors=True)
+        return result["stdout"].strip() == self.state
+
+
+class SupervisorStatePredicate(WatchPredicate):
+    """
+    A supervisor program of a container is in the expected state, as reported by 'supervisorctl status'.
+    """
+
+    def __init__(self, duthost, container, program, state="RUNNING"):
+        WatchPredicate.__init__(self, duthost, "{}:{} is {}".format(container, program, state))
+        self.container = container
+        self.program = program
+        self.state = state
+
+    def get_request(self):
+        return {"type": "supervisor", "container": self.container, "program": self.program, "value": self.state}
+
+    def check(self):
+        result = self.duthost.shell("docker exec {} supervisorctl status {}".format(self.container, self.program),
+                                    module_ignore_errors=True)
+        fields = result["stdout"].split()
+        return len(fields) > 1 and fields[1] == self.state
+
+
+class SyslogPatternPredicate(WatchPredicate):
+    """
+    A line matching the pattern is logged to the syslog after the wait started.
+    The pattern must be an extended regular expression with the same meaning for grep -E and python re.
+    """
+
+    def __init__(self, duthost, pattern):
+        WatchPredicate.__init__(self, duthost, "syslog matches '{}'".format(pattern))
+        self.pattern = pattern
+        self.count = None
+        self.position = None
+
+    def get_request(self):
+        request = {"type": "syslog", "pattern": self.pattern}
+        if self.position:
+            request["inode"], request["offset"] = self.position
+        return request
+
+    def _count_matches(self):
+        result = self.duthost.shell("sudo grep -cE {} /var/log/syslog".format(shlex.quote(self.pattern)),
+                                    module_ignore_errors=True)
+        return int(result["stdout"].strip() or 0)
+
+    def start(self):
+        # The agent matches the lines logged from the current syslog position when it adds the watch, and the
+        # polling fallback counts the lines matching after the current count. So the lines logged before the
+        # watch is added are matched either way.
+        self.position = None
+        try:
+            result = self.duthost.shell("sudo stat -c '%i %s' /var/log/syslog && sudo grep -cE {} /var/log/syslog"
+                                        .format(shlex.quote(self.pattern)), module_ignore_errors=True)
+            lines = result["stdout"].split("\n")
+            inode, offset = lines[0].split()
+            self.position = (int(inode), int(offset))
+            self.count = int(lines[1].strip() or 0) if len(lines) > 1 else 0
+        except Exception as e:
+            logger.debug("Failed to get the syslog position and the lines matching {}: {}".format(
+                self.pattern, repr(e)))
+
+    def check(self):
+        count = self._count_matches()
+        if self.count is None:
+            # First check, the lines logged before the wait started don't count
+            self.count = count
+            return False
+        matched = count > self.count
+        self.count = count
+        return matched
+
+
+class DutWatchStream(object):
+    """
+    Long-lived SSH connection to the DUT watch agent. The waiters are woken as soon as the agent reports
+    that their predicate is satisfied.
+    """
+
+    def __init__(self, hostname, address, user, password):
+        self.hostname = hostname
+        self.address = address
+        self.user = user
+        self.password = password
+        self.ssh = None
+        self.channel = None
+        self.alive = False
+        self.last_start = 0
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.next_id = 0
+        self.pending = {}
+
+    def start(self):
+        """
+        @summary: Upload the agent to the DUT and start it on a new SSH connection
+        """
+        self.last_start = time.time()
+        self.ssh = paramiko.SSHClient()
+        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.ssh.connect(self.address, username=self.user, password=self.password,
+                         allow_agent=False, look_for_keys=False, timeout=10)
+        with self.ssh.open_sftp() as sftp:
+            sftp.put(os.path.join(os.path.dirname(__file__), "dut_watch_agent.py"), DUT_WATCH_AGENT)
+        self.channel = self.ssh.get_transport().open_session()
+        self.channel.exec_command("sudo python3 -u {}".format(DUT_WATCH_AGENT))
+        self.channel.settimeout(AGENT_START_TIMEOUT)
+        reader = self.channel.makefile("r")
+        ready = json.loads(reader.readline() or "{}")
+        if not ready.get("ready"):
+            raise Exception("DUT watch agent failed to start on {}".format(self.hostname))
+        self.channel.settimeout(None)
+        self.alive = True
+        thread = threading.Thread(name="DUT watch {}".format(self.hostname), target=self._read, args=(reader,))
+        thread.daemon = True
+        thread.start()
+        logger.info("Started DUT watch agent on {}".format(self.hostname))
+
+    def ensure_started(self):
+        """
+        @summary: Restart a broken stream, at most once per RECONNECT_INTERVAL
+        @return: True if the stream is alive
+        """
+        if self.alive:
+            return True
+        with self.start_lock:
+            # Another thread may have restarted the stream while this one waited for the lock
+            if self.alive:
+                return True
+            if time.time() - self.last_start < RECONNECT_INTERVAL:
+                return False
+            self.close()
+            try:
+                self.start()
+            except Exception as e:
+                logger.warning("Failed to start DUT watch agent on {}: {}".format(self.hostname, repr(e)))
+            return self.alive
+
+    def _read(self, reader):
+        try:
+            for line in reader:
+                message = json.loads(line)
+                with self.lock:
+                    entry = self.pending.get(message.get("id"))
+                if not entry:
+                    continue
+                if "error" in message:
+                    logger.warning("DUT watch agent on {} failed to watch {}: {}".format(
+                        self.hostname, entry["predicate"].__name__, message["error"]))
+                entry["result"] = message.get("result")
+                entry["event"].set()
+        except Exception as e:
+            logger.warning("DUT watch stream of {} failed: {}".format(self.hostname, repr(e)))
+        finally:
+            self.alive = False
+            with self.lock:
+                # Wake the waiters, they fall back to polling
+                for entry in self.pending.values():
+                    entry["event"].set()
+
+    def _send(self, message):
+        with self.send_lock:
+            self.channel.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+    def wait(self, predicate, timeout):
+        """
+        @summary: Wait until the agent reports that the predicate is satisfied
+        @return: True if it is satisfied, False if it isn't before the timeout,
+            None if the stream failed or the agent can't watch the predicate
+        """
+        with self.lock:
+            watch_id = self.next_id
+            self.next_id += 1
+            entry = {"predicate": predicate, "event": threading.Event(), "result": None}
+            self.pending[watch_id] = entry
+        try:
+            request = predicate.get_request()
+            request["id"] = watch_id
+            self._send(request)
+            if not entry["event"].wait(timeout):
+                self._send({"id": watch_id, "cancel": True})
+                return False
+            return entry["result"]
+        except Exception as e:
+            logger.warning("Failed to watch {} on {}: {}".format(predicate.__name__, self.hostname, repr(e)))
+            return None
+        finally:
+            with self.lock:
+                self.pending.pop(watch_id, None)
+
+    def close(self):
+        self.alive = False
+        if self.ssh:
+            self.ssh.close()
+            self.ssh = None
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+_wait_stats = defaultdict(lambda: {"calls": 0, "watched": 0, "wait_time": 0.0, "saved_time": 0.0})
+_wait_stats_lock = threading.Lock()
+
+
+def start_dut_watch_stream(duthost, user, password):
+    """
+    @summary: Start the DUT watch agent of a DUT, the watchable predicates of the DUT are then watched
+        by wait_until_watched instead of polled
+    """
+    stream = DutWatchStream(duthost.hostname, duthost.mgmt_ip, user, password)
+    try:
+        stream.start()
+    except Exception as e:
+        logger.warning("Failed to start DUT watch agent on {}, conditions will be polled: {}".format(
+            duthost.hostname, repr(e)))
+    with _streams_lock:
+        _streams[duthost.hostname] = stream
+    return stream
+
+
+def stop_dut_watch_streams():
+    with _streams_lock:
+        for stream in _streams.values():
+            stream.close()
+        _streams.clear()
+
+
+def get_dut_watch_stream(hostname):
+    """
+    @return: The alive DUT watch stream of the DUT, or None
+    """
+    with _streams_lock:
+        stream = _streams.get(hostname)
+    if stream and stream.ensure_started():
+        return stream
+    return None
+
+
+def _record_wait(call_site, watched, wait_time, saved_time):
+    with _wait_stats_lock:
+        stats = _wait_stats[call_site]
+        stats["calls"] += 1
+        stats["watched"] += watched
+        stats["wait_time"] += wait_time
+        stats["saved_time"] += saved_time
+
+
+def get_wait_stats():
+    """
+    @return: Dict of the wait statistics of each call site of wait_until_watched
+    """
+    with _wait_stats_lock:
+        return {call_site: dict(stats) for call_site, stats in _wait_stats.items()}
+
+
+def log_wait_stats():
+    stats = get_wait_stats()
+    if not stats:
+        return
+    logger.info("wait_until_watched statistics, by estimated time saved against polling:")
+    for call_site, site_stats in sorted(stats.items(), key=lambda item: -item[1]["saved_time"]):
+        logger.info("    {}: {} calls, {} watched, waited {:.1f}s, saved {:.1f}s".format(
+            call_site, site_stats["calls"], site_stats["watched"], site_stats["wait_time"],
+            site_stats["saved_time"]))
+
+
+def wait_until_watched(timeout, interval, delay, condition, *args, **kwargs):
+    """
+    @summary: Same as wait_until, but the watchable predicates of the DUTs with a DUT watch stream are watched
+        by the DUT watch agent, which reports them as soon as they are satisfied instead of after the next poll.
+        Other conditions, or predicates of DUTs without a stream, are polled with wait_until.
+    @param timeout: Maximum time to wait
+    @param interval: Poll interval, also used to estimate the time saved against polling
+    @param delay: Delay time
+    @param condition: A WatchPredicate, or a function that returns False or True
+    @param *args: Extra args required by the 'condition' function.
+    @param **kwargs: Extra args required by the 'condition' function.
+    @return: True if the condition is satisfied before timeout, False otherwise
+    """
+    caller = sys._getframe(1)
+    call_site = "{}:{}".format(os.path.relpath(caller.f_code.co_filename), caller.f_lineno)
+
+    stream = None
+    if isinstance(condition, WatchPredicate) and not args and not kwargs:
+        stream = get_dut_watch_stream(condition.duthost.hostname)
+    if stream is None:
+        start_time = time.time()
+        result = wait_until(timeout, interval, delay, condition, *args, **kwargs)
+        _record_wait(call_site, False, time.time() - start_time, 0)
+        return result
+
+    if delay > 0:
+        time.sleep(delay)
+    start_time = time.time()
+    condition.start()
+    result = stream.wait(condition, timeout)
+    elapsed_time = time.time() - start_time
+    if result is None:
+        # The stream failed, poll for the remaining time
+        result = wait_until(max(timeout - elapsed_time, 0), interval, 0, condition)
+        _record_wait(call_site, False, time.time() - start_time, 0)
+        return result
+
+    saved_time = 0
+    if result and interval > 0:
+        # When polled, the condition is seen satisfied at the first check after it is
+        saved_time = min(math.ceil(elapsed_time / interval) * interval, timeout) - elapsed_time
+    _record_wait(call_site, True, elapsed_time, max(saved_time, 0))
+    logger.debug("%s is %s after %.2f seconds" % (condition.__name__, result, elapsed_time))
+    return result
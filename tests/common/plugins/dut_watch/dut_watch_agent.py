@@ -0,0 +1,288 @@
+"""
+DUT side agent of the dut_watch plugin.
+
+Reads watch requests as JSON lines on stdin and writes a JSON line on stdout as soon as the watched
+predicate is satisfied. The predicates are checked on the DUT, so that the test host doesn't need a
+round-trip per check:
+    - redis: a field of a redis hash has the expected value, checked when the key is changed
+      (keyspace notifications), or every POLL_INTERVAL if they are disabled
+    - unit: a systemd unit is in the expected state
+    - supervisor: a supervisor program of a container is in the expected state
+    - syslog: a line matching a pattern is logged after the syslog position given in the watch request
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+POLL_INTERVAL = 0.5
+SUPERVISOR_POLL_INTERVAL = 1
+SYSLOG_FILE = "/var/log/syslog"
+DB_IDS = {
+    "APPL_DB": 0,
+    "ASIC_DB": 1,
+    "COUNTERS_DB": 2,
+    "LOGLEVEL_DB": 3,
+    "CONFIG_DB": 4,
+    "FLEX_COUNTER_DB": 5,
+    "STATE_DB": 6,
+}
+
+output_lock = threading.Lock()
+
+
+def send(message):
+    with output_lock:
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+
+def run(cmd):
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    return proc.stdout.strip()
+
+
+def redis_cli(namespace, db=None):
+    asic = re.sub(r"\D", "", namespace or "")
+    cmd = ["redis-cli", "-s", "/var/run/redis{}/redis.sock".format(asic)]
+    if db is not None:
+        cmd += ["-n", str(DB_IDS.get(db, db))]
+    return cmd
+
+
+class Watch(object):
+
+    def __init__(self, request):
+        self.id = request["id"]
+        self.request = request
+        self.done = False
+        self.last_value = None
+
+    def check(self):
+        return False
+
+    def satisfied(self, value):
+        self.last_value = value
+        return value == self.request.get("value")
+
+    def finish(self):
+        if not self.done:
+            self.done = True
+            send({"id": self.id, "result": True, "value": self.last_value})
+
+
+class RedisWatch(Watch):
+
+    def check(self):
+        req = self.request
+        value = run(redis_cli(req.get("namespace"), req["db"]) + ["HGET", req["key"], req["field"]])
+        return self.satisfied(value)
+
+
+class UnitWatch(Watch):
+
+    def check(self):
+        return self.satisfied(run(["systemctl", "is-active", self.request["unit"]]))
+
+
+class SupervisorWatch(Watch):
+
+    def check(self):
+        out = run(["docker", "exec", self.request["container"], "supervisorctl", "status", self.request["program"]])
+        fields = out.split()
+        return self.satisfied(fields[1] if len(fields) > 1 else "")
+
+
+class SyslogWatch(Watch):
+
+    def __init__(self, request):
+        Watch.__init__(self, request)
+        self.pattern = re.compile(request["pattern"])
+
+    def match(self, line):
+        if self.pattern.search(line):
+            self.last_value = line.rstrip("\n")
+            return True
+        return False
+
+
+class Agent(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.watches = {}
+        self.keyspace_events = {}
+        # redis-cli SUBSCRIBE process of each redis watch with keyspace notifications
+        self.subscriptions = {}
+
+    def add(self, request):
+        types = {"redis": RedisWatch, "unit": UnitWatch, "supervisor": SupervisorWatch, "syslog": SyslogWatch}
+        watch = types[request["type"]](request)
+        with self.lock:
+            self.watches[watch.id] = watch
+        if request["type"] == "redis":
+            self.subscribe(watch)
+        if request["type"] == "syslog":
+            self.scan_syslog(watch)
+        if watch.check():
+            self.finish(watch)
+
+    def cancel(self, watch_id):
+        with self.lock:
+            self.watches.pop(watch_id, None)
+            proc = self.subscriptions.pop(watch_id, None)
+        if proc:
+            # Don't wait for the next keyspace event to stop the subscription
+            proc.kill()
+
+    def finish(self, watch):
+        with self.lock:
+            if self.watches.pop(watch.id, None) is None:
+                return
+            proc = self.subscriptions.pop(watch.id, None)
+        if proc:
+            proc.kill()
+        watch.finish()
+
+    def get_watches(self, watch_type):
+        with self.lock:
+            return [watch for watch in self.watches.values() if isinstance(watch, watch_type)]
+
+    def subscribe(self, watch):
+        """
+        Check the redis watch each time its key is changed, if the keyspace notifications are enabled
+        """
+        namespace = watch.request.get("namespace") or ""
+        if namespace not in self.keyspace_events:
+            config = run(redis_cli(namespace) + ["CONFIG", "GET", "notify-keyspace-events"]).split("\n")
+            flags = config[-1] if len(config) > 1 else ""
+            self.keyspace_events[namespace] = "K" in flags and ("A" in flags or "h" in flags)
+        if not self.keyspace_events[namespace]:
+            watch.request["poll"] = True
+            return
+
+        db = DB_IDS.get(watch.request["db"], watch.request["db"])
+        channel = "__keyspace@{}__:{}".format(db, watch.request["key"])
+        proc = subprocess.Popen(redis_cli(namespace) + ["--csv", "SUBSCRIBE", channel],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+        with self.lock:
+            if watch.id not in self.watches:
+                # Cancelled while subscribing
+                proc.kill()
+                return
+            self.subscriptions[watch.id] = proc
+        thread = threading.Thread(target=self.wait_keyspace_events, args=(watch, proc))
+        thread.daemon = True
+        thread.start()
+
+    def wait_keyspace_events(self, watch, proc):
+        try:
+            # The first message is the subscription confirmation, check again in case the key was changed
+            # before the subscription
+            for line in proc.stdout:
+                if watch.done or watch.id not in self.watches:
+                    break
+                if watch.check():
+                    self.finish(watch)
+                    break
+        finally:
+            with self.lock:
+                if self.subscriptions.get(watch.id) is proc:
+                    del self.subscriptions[watch.id]
+            proc.kill()
+            proc.wait()
+
+    def poll(self):
+        last_supervisor_poll = 0
+        while True:
+            time.sleep(POLL_INTERVAL)
+            watches = [watch for watch in self.get_watches(RedisWatch) if watch.request.get("poll")]
+            watches += self.get_watches(UnitWatch)
+            if time.time() - last_supervisor_poll >= SUPERVISOR_POLL_INTERVAL:
+                last_supervisor_poll = time.time()
+                watches += self.get_watches(SupervisorWatch)
+            for watch in watches:
+                try:
+                    if watch.check():
+                        self.finish(watch)
+                except Exception as e:
+                    send({"id": watch.id, "error": repr(e)})
+                    self.cancel(watch.id)
+
+    def match_syslog(self, lines):
+        for line in lines:
+            for watch in self.get_watches(SyslogWatch):
+                if watch.match(line):
+                    self.finish(watch)
+
+    def scan_syslog(self, watch):
+        """
+        Match the lines logged from the syslog position captured when the wait started, follow_syslog may
+        have read them before the watch was added
+        """
+        inode, offset = watch.request.get("inode"), watch.request.get("offset")
+        if inode is None or offset is None:
+            return
+        rotated = SYSLOG_FILE + ".1"
+        try:
+            if os.stat(SYSLOG_FILE).st_ino == inode:
+                files = [(SYSLOG_FILE, offset)]
+            elif os.path.exists(rotated) and os.stat(rotated).st_ino == inode:
+                files = [(rotated, offset), (SYSLOG_FILE, 0)]
+            else:
+                files = [(SYSLOG_FILE, 0)]
+        except (IOError, OSError):
+            return
+        for path, position in files:
+            try:
+                with open(path, errors="replace") as syslog:
+                    syslog.seek(position)
+                    for line in syslog:
+                        if watch.match(line):
+                            self.finish(watch)
+                            return
+            except (IOError, OSError):
+                pass
+
+    def follow_syslog(self):
+        syslog, inode = None, None
+        while True:
+            try:
+                if os.stat(SYSLOG_FILE).st_ino != inode:
+                    new_syslog = open(SYSLOG_FILE, errors="replace")
+                    if syslog:
+                        # Rotated, read the end of the previous file and the new file from its beginning
+                        self.match_syslog(syslog.readlines())
+                        syslog.close()
+                    else:
+                        new_syslog.seek(0, os.SEEK_END)
+                    syslog, inode = new_syslog, os.fstat(new_syslog.fileno()).st_ino
+                self.match_syslog(syslog.readlines())
+            except (IOError, OSError):
+                pass
+            time.sleep(POLL_INTERVAL / 2)
+
+    def serve(self):
+        for target in [self.poll, self.follow_syslog]:
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+        send({"ready": True})
+
+        for line in sys.stdin:
+            request = {}
+            try:
+                request = json.loads(line)
+                if request.get("cancel"):
+                    self.cancel(request["id"])
+                else:
+                    self.add(request)
+            except Exception as e:
+                send({"id": request.get("id"), "error": repr(e)})
+
+
+if __name__ == "__main__":
+    Agent().serve()
@@ -0,0 +1,184 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tests.common.plugins.dut_watch.dut_watch import (DutWatchStream, RedisFieldPredicate, SyslogPatternPredicate,
+                                                      wait_until_watched)
+
+# The dut_watch fixture of the plugin hides the dut_watch module in the package
+dut_watch = importlib.import_module("tests.common.plugins.dut_watch.dut_watch")
+dut_watch_agent = importlib.import_module("tests.common.plugins.dut_watch.dut_watch_agent")
+
+
+def shell_result(stdout):
+    return {"stdout": stdout, "rc": 0}
+
+
+class TestPredicates(unittest.TestCase):
+    """Test cases for the evaluation of the predicates on the test host."""
+
+    def test_redis_field_predicate(self):
+        duthost = MagicMock()
+        duthost.shell.return_value = shell_result("up\n")
+        predicate = RedisFieldPredicate(duthost, "STATE_DB", "PORT_TABLE|Ethernet0", "oper_status", "up")
+
+        self.assertTrue(predicate())
+        duthost.shell.return_value = shell_result("down\n")
+        self.assertFalse(predicate())
+        self.assertEqual(duthost.shell.call_args[0][0], "sonic-db-cli STATE_DB HGET 'PORT_TABLE|Ethernet0' oper_status")
+
+    def test_syslog_pattern_predicate_counts_lines_logged_after_the_first_check(self):
+        duthost = MagicMock()
+        predicate = SyslogPatternPredicate(duthost, "it's (up|down)")
+
+        duthost.shell.return_value = shell_result("3")
+        self.assertFalse(predicate())
+        self.assertFalse(predicate())
+        duthost.shell.return_value = shell_result("4")
+        self.assertTrue(predicate())
+        # The pattern is quoted for the shell
+        self.assertEqual(duthost.shell.call_args[0][0],
+                         "sudo grep -cE 'it'\"'\"'s (up|down)' /var/log/syslog")
+
+    def test_syslog_pattern_predicate_counts_lines_logged_after_start(self):
+        duthost = MagicMock()
+        predicate = SyslogPatternPredicate(duthost, "swss started")
+
+        duthost.shell.return_value = shell_result("1234 5678\n3")
+        predicate.start()
+        # The agent matches the lines logged from the syslog position of the start
+        self.assertEqual(predicate.get_request(),
+                         {"type": "syslog", "pattern": "swss started", "inode": 1234, "offset": 5678})
+        duthost.shell.return_value = shell_result("4")
+        self.assertTrue(predicate())
+
+
+class TestWaitUntilWatched(unittest.TestCase):
+    """Test cases for wait_until_watched."""
+
+    def test_predicate_polled_without_stream(self):
+        duthost = MagicMock()
+        duthost.hostname = "dut"
+        duthost.shell.side_effect = [shell_result("down"), shell_result("up")]
+        predicate = RedisFieldPredicate(duthost, "STATE_DB", "key", "field", "up")
+
+        with patch.object(dut_watch, "get_dut_watch_stream", return_value=None):
+            self.assertTrue(wait_until_watched(5, 0.1, 0, predicate))
+        self.assertEqual(duthost.shell.call_count, 2)
+
+    def test_fallback_keeps_the_syslog_lines_logged_while_watched(self):
+        duthost = MagicMock()
+        duthost.hostname = "dut"
+        # Count when the wait starts, then when it polls after the stream failed
+        duthost.shell.side_effect = [shell_result("1234 5678\n3"), shell_result("4")]
+        predicate = SyslogPatternPredicate(duthost, "swss started")
+        stream = MagicMock()
+        stream.wait.return_value = None
+
+        with patch.object(dut_watch, "get_dut_watch_stream", return_value=stream):
+            self.assertTrue(wait_until_watched(5, 0.1, 0, predicate))
+        stream.wait.assert_called_once_with(predicate, 5)
+
+
+class TestDutWatchStream(unittest.TestCase):
+    """Test cases for the test host side of the DUT watch stream."""
+
+    def test_wait_timeout_cancels_the_watch(self):
+        stream = DutWatchStream("dut", "10.0.0.1", "user", "password")
+        stream.channel = MagicMock()
+        predicate = RedisFieldPredicate(MagicMock(), "STATE_DB", "key", "field", "up")
+
+        self.assertFalse(stream.wait(predicate, 0.1))
+        messages = [json.loads(call[0][0]) for call in stream.channel.sendall.call_args_list]
+        self.assertEqual(messages[0]["type"], "redis")
+        self.assertEqual(messages[1], {"id": messages[0]["id"], "cancel": True})
+        self.assertFalse(stream.pending)
+
+    def test_ensure_started_restarts_once(self):
+        stream = DutWatchStream("dut", "10.0.0.1", "user", "password")
+        starts = []
+
+        def start():
+            starts.append(1)
+            time.sleep(0.2)
+            stream.alive = True
+
+        stream.start = start
+        threads = [threading.Thread(target=stream.ensure_started) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(starts), 1)
+        self.assertTrue(stream.alive)
+
+
+class TestAgent(unittest.TestCase):
+    """Test cases for the predicate evaluation and the cancellation in the DUT watch agent."""
+
+    def setUp(self):
+        self.sent = []
+        patcher = patch.object(dut_watch_agent, "send", side_effect=self.sent.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_watch_finished_when_satisfied(self):
+        agent = dut_watch_agent.Agent()
+        with patch.object(dut_watch_agent, "run", return_value="active"):
+            agent.add({"id": 1, "type": "unit", "unit": "swss", "value": "active"})
+        self.assertEqual(self.sent, [{"id": 1, "result": True, "value": "active"}])
+        self.assertFalse(agent.watches)
+
+    def test_syslog_watch_matches_new_lines(self):
+        agent = dut_watch_agent.Agent()
+        agent.add({"id": 1, "type": "syslog", "pattern": "swss (started|stopped)"})
+        agent.match_syslog(["bgp started\n"])
+        self.assertFalse(self.sent)
+        agent.match_syslog(["swss started\n"])
+        self.assertEqual(self.sent, [{"id": 1, "result": True, "value": "swss started"}])
+
+    def test_syslog_watch_matches_lines_logged_before_it_is_added(self):
+        agent = dut_watch_agent.Agent()
+        with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False) as syslog:
+            syslog.write("swss started\n")
+            offset = syslog.tell()
+            # Logged after the wait started, but before the agent added the watch
+            syslog.write("bgp started\nswss started again\n")
+        self.addCleanup(os.remove, syslog.name)
+
+        with patch.object(dut_watch_agent, "SYSLOG_FILE", syslog.name):
+            agent.add({"id": 1, "type": "syslog", "pattern": "swss started",
+                       "inode": os.stat(syslog.name).st_ino, "offset": offset})
+        self.assertEqual(self.sent, [{"id": 1, "result": True, "value": "swss started again"}])
+
+    def test_cancel_kills_the_subscription(self):
+        agent = dut_watch_agent.Agent()
+        # redis-cli SUBSCRIBE blocks until the next keyspace event
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"],
+                                stdout=subprocess.PIPE, universal_newlines=True)
+        values = {"CONFIG": "notify-keyspace-events\nKA", "HGET": "down"}
+
+        def run(cmd):
+            return values["HGET" if "HGET" in cmd else "CONFIG"]
+
+        with patch.object(dut_watch_agent, "run", side_effect=run), \
+                patch.object(dut_watch_agent.subprocess, "Popen", return_value=proc):
+            agent.add({"id": 1, "type": "redis", "db": "STATE_DB", "key": "key", "field": "field", "value": "up"})
+        self.assertIn(1, agent.subscriptions)
+
+        agent.cancel(1)
+        proc.wait(5)
+        self.assertIsNotNone(proc.returncode)
+        self.assertFalse(agent.subscriptions)
+        self.assertFalse(self.sent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import logging
 import pytest
+from tests.common.helpers.multi_thread_utils import SafeThreadPoolExecutor
 from tests.common.plugins.memory_utilization.memory_utilization import MemoryMonitor
 
 logger = logging.getLogger(__name__)
@@ -9,6 +10,19 @@ logger.setLevel(logging.INFO)
 _memory_errors_by_test = {}
 
 
+def _collect_memory_values(duthosts, memory_monitors, memory_values, stage):
+    """Collect the memory values of all the DUTs concurrently, in one script run per DUT."""
+    def collect(duthost):
+        logger.info("Collecting memory data on {}".format(duthost.hostname))
+        memory_values[stage][duthost.hostname].update(memory_monitors[duthost.hostname].collect_memory_values())
+
+    with SafeThreadPoolExecutor(max_workers=8) as executor:
+        for duthost in duthosts:
+            if duthost.topo_type == 't2':
+                continue
+            executor.submit(collect, duthost)
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--disable_memory_utilization",
@@ -48,22 +62,8 @@ def pytest_runtest_setup(item):
     logger.debug("Memory monitors ready: {}".format(list(memory_monitors.keys()) if memory_monitors else "None"))
     logger.debug("memory_values {} ".format(memory_values))
 
-    for duthost in duthosts:
-        if duthost.topo_type == 't2':
-            continue
-
-        # Trigger monit to refresh its cache so subsequent collection reads fresh data
-        logger.info("Triggering monit refresh on {} before collecting memory data".format(duthost.hostname))
-        memory_monitors[duthost.hostname].execute_command("sudo monit validate")
-
-        # Initial memory check for all registered commands
-        for name, cmd, memory_params, memory_check in memory_monitors[duthost.hostname].commands:
-            try:
-                output = memory_monitors[duthost.hostname].execute_command(cmd)
-                memory_values["before_test"][duthost.hostname][name] = memory_check(output, memory_params)
-            except Exception as e:
-                logger.warning("Error collecting initial memory data for {}: {}".format(name, str(e)))
-                memory_values["before_test"][duthost.hostname][name] = {}
+    # Initial memory check for all registered commands
+    _collect_memory_values(duthosts, memory_monitors, memory_values, "before_test")
 
     logger.info("Before test: collected memory_values {}".format(memory_values))
 
@@ -91,23 +91,13 @@ def pytest_runtest_teardown(item, nextitem):
     memory_monitors, memory_values = memory_utilization
     memory_errors = []
 
+    # memory check for all registered commands
+    _collect_memory_values(duthosts, memory_monitors, memory_values, "after_test")
+
     for duthost in duthosts:
         if duthost.topo_type == 't2':
             continue
 
-        # Trigger monit to refresh its cache so subsequent collection reads fresh data
-        logger.info("Triggering monit refresh on {} before collecting memory data".format(duthost.hostname))
-        memory_monitors[duthost.hostname].execute_command("sudo monit validate")
-
-        # memory check for all registered commands
-        for name, cmd, memory_params, memory_check in memory_monitors[duthost.hostname].commands:
-            try:
-                output = memory_monitors[duthost.hostname].execute_command(cmd)
-                memory_values["after_test"][duthost.hostname][name] = memory_check(output, memory_params)
-            except Exception as e:
-                logger.warning("Error collecting final memory data for {}: {}".format(name, str(e)))
-                memory_values["after_test"][duthost.hostname][name] = {}
-
         # Only check thresholds if we have data to compare
         if any(memory_values["before_test"][duthost.hostname]) and any(memory_values["after_test"][duthost.hostname]):
             try:
@@ -3,12 +3,18 @@ import re
 import json
 from os.path import join, split
 
+from tests.common.helpers.commands_script import run_commands_script
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 MEMORY_UTILIZATION_COMMON_JSON_FILE = join(split(__file__)[0], "memory_utilization_common.json")
 MEMORY_UTILIZATION_DEPENDENCE_JSON_FILE = join(split(__file__)[0], "memory_utilization_dependence.json")
 
+OUTPUT_MARKER = "### MEMORY_UTILIZATION"
+# Run before collecting the memory values, to refresh the monit cache
+MONIT_REFRESH_COMMAND = "sudo monit validate"
+
 
 class MemoryMonitor:
     def __init__(self, ansible_host):
@@ -42,6 +48,49 @@ class MemoryMonitor:
             logger.warning("Error executing command '{}': {}".format(cmd, str(e)))
             return ""  # Return empty string on error
 
+    def execute_commands(self, cmds):
+        """Execute shell commands in a single script on the DUT and return the output of each command.
+
+        The output of each command is delimited by marker lines. The commands whose output can't be found in the
+        script output, e.g. if the script failed, are executed one by one.
+        """
+        sections = {}
+        try:
+            results = run_commands_script(self.ansible_host, [(str(idx), cmd) for idx, cmd in enumerate(cmds)],
+                                          OUTPUT_MARKER)
+            sections = {int(idx): "\n".join(output) for idx, (_, output) in results.items()}
+        except Exception as e:
+            logger.warning("Error executing the commands script: {}".format(str(e)))
+
+        outputs = []
+        for idx, cmd in enumerate(cmds):
+            if idx not in sections:
+                logger.warning("No output of command '{}' in the commands script, executing it alone".format(cmd))
+                outputs.append(self.execute_command(cmd))
+                continue
+            if not sections[idx]:
+                logger.warning("Command '{}' returned no output".format(cmd))
+            outputs.append(sections[idx])
+        return outputs
+
+    def collect_memory_values(self):
+        """Refresh the monit cache, then run the registered commands and parse their memory values.
+
+        All the commands are executed in a single script on the DUT, and the commands registered several times
+        are executed only once.
+        """
+        cmds = list(dict.fromkeys(cmd for _, cmd, _, _ in self.commands))
+        outputs = dict(zip(cmds, self.execute_commands([MONIT_REFRESH_COMMAND] + cmds)[1:]))
+
+        memory_values = {}
+        for name, cmd, memory_params, memory_check in self.commands:
+            try:
+                memory_values[name] = memory_check(outputs[cmd], memory_params)
+            except Exception as e:
+                logger.warning("Error collecting memory data for {}: {}".format(name, str(e)))
+                memory_values[name] = {}
+        return memory_values
+
     def check_memory_thresholds(self, current_values, previous_values):
         """Check memory usage against thresholds. """
         logger.debug("Starting memory threshold check")
@@ -8,6 +8,7 @@ import ptf.mask as mask
 from ptf.base_tests import BaseTest
 from ptf.dataplane import DataPlane, DataPlanePortNN
 from tests.common.utilities import wait_until
+from .rx_queues import RxQueues
 import logging
 
 
@@ -129,6 +130,8 @@ class PtfTestAdapter(BaseTest):
                 packet
             )
         self.dataplane = ptf.dataplane_instance
+        self.rx_queues = RxQueues(self.dataplane, ptf.config['qlen'])
+        self.rx_queues.install()
         self._attach_cleanup_helpers()
 
     def _attach_cleanup_helpers(self):
@@ -140,13 +143,7 @@ class PtfTestAdapter(BaseTest):
             Prevents backlog from prior test affecting pps/downtime.
             """
             try:
-                for (dev, port) in list(getattr(dp, "ports", {}).keys()):
-                    drained = 0
-                    while drained < max_per_port:
-                        pkt = dp.poll(device_number=dev, port_number=port, timeout=0)
-                        if pkt is None:
-                            break
-                        drained += 1
+                self.rx_queues.drain(max_per_port)
             except Exception:
                 pass
 
@@ -162,6 +159,9 @@ class PtfTestAdapter(BaseTest):
                 pass
         dp.drain = drain
         dp.clear_masks = clear_masks
+        # Receive queue helpers, e.g. dp.set_rx_index([(30, 4)]) to look up the polled packets by IPv4 destination
+        dp.set_rx_index = self.rx_queues.set_index
+        dp.get_rx_queue_stats = self.rx_queues.get_stats
 
     def kill(self):
         """ Close dataplane socket and kill data plane thread """
@@ -0,0 +1,285 @@
+"""Bounded receive queues for the PTF dataplane.
+
+The PTF dataplane keeps the packets received on each port in a list, which is popped from its front by every poll,
+and a poll with an expected packet matches the queued packets one by one until it finds it. The receive queues
+replace these lists with ring buffers, which are cleared in O(1) and count the packets dropped on overflow. A header
+index can also be set on the queues: the packets are then indexed by the bytes of the selected header ranges, and a
+poll with an expected packet which cares about all these bytes only matches the packets with the same index key.
+"""
+import sys
+from collections import deque
+
+import ptf.mask as mask
+import ptf.ptfutils as ptfutils
+from ptf.dataplane import DataPlane, match_exp_pkt
+
+
+class RxQueueStats(object):
+    """Packet counters of the receive queue of a port, the received packets are either still queued, dequeued by the
+    polls, flushed or dropped on overflow."""
+
+    def __init__(self):
+        self.received = 0
+        self.dequeued = 0
+        self.flushed = 0
+        self.overflow_drops = 0
+        self.high_watermark = 0
+
+    def to_dict(self, queued):
+        return {
+            "received": self.received,
+            "queued": queued,
+            "dequeued": self.dequeued,
+            "flushed": self.flushed,
+            "overflow_drops": self.overflow_drops,
+            "high_watermark": self.high_watermark,
+        }
+
+
+class RxRingBuffer(deque):
+    """Receive queue of a port, used by the PTF dataplane in place of its list of (packet, timestamp).
+
+    The oldest packet is dropped when a packet is received on a full queue. The packets are numbered in the order they
+    are received, the index maps the index key of the packets to the sequence numbers of the packets with this key.
+    """
+
+    def __init__(self, maxlen, stats, index_key=None, packets=()):
+        super(RxRingBuffer, self).__init__(packets, maxlen)
+        self.stats = stats
+        self.index_key = index_key
+        self.head_seq = 0
+        self.rebuild_index()
+
+    def append(self, item):
+        if len(self) == self.maxlen:
+            self.stats.overflow_drops += 1
+            self.head_seq += 1
+        super(RxRingBuffer, self).append(item)
+        self.stats.received += 1
+        self.stats.high_watermark = max(self.stats.high_watermark, len(self))
+
+        if self.index_key is not None:
+            key = self.index_key(item[0])
+            if key is not None:
+                self.index.setdefault(key, deque()).append(self.head_seq + len(self) - 1)
+                # The sequence numbers of the removed packets are only cleaned up when their key is looked up
+                if len(self.index) > 2 * self.maxlen:
+                    self.rebuild_index()
+
+    def popleft(self):
+        item = super(RxRingBuffer, self).popleft()
+        self.head_seq += 1
+        self.stats.dequeued += 1
+        return item
+
+    def pop(self, index=-1):
+        # PTF pops the oldest packet with pop(0)
+        if index == 0:
+            return self.popleft()
+        if index not in (-1, len(self) - 1):
+            raise IndexError("only the oldest or the newest packet can be popped from a receive queue")
+        return super(RxRingBuffer, self).pop()
+
+    def discard(self, count):
+        """Remove the given number of oldest packets, the caller counts them."""
+        count = min(count, len(self))
+        if count == len(self):
+            super(RxRingBuffer, self).clear()
+            self.index = {}
+        else:
+            for _ in range(count):
+                super(RxRingBuffer, self).popleft()
+        self.head_seq += count
+
+    def clear(self):
+        self.stats.flushed += len(self)
+        self.discard(len(self))
+
+    def snapshot(self):
+        """Get a copy of the queued packets, taken atomically."""
+        return list(super(RxRingBuffer, self).__iter__())
+
+    def __iter__(self):
+        # Iterate on a copy, the dataplane thread appends the packets while the tests iterate on the queue
+        return iter(self.snapshot())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.snapshot()[index]
+        return super(RxRingBuffer, self).__getitem__(index)
+
+    def rebuild_index(self):
+        self.index = {}
+        if self.index_key is None:
+            return
+        for seq, (pkt, _) in enumerate(self.snapshot(), self.head_seq):
+            key = self.index_key(pkt)
+            if key is not None:
+                self.index.setdefault(key, deque()).append(seq)
+
+    def lookup(self, key):
+        """Get the sequence numbers of the queued packets with the given index key, oldest first."""
+        seqs = self.index.get(key)
+        if seqs is None:
+            return []
+        while seqs and seqs[0] < self.head_seq:
+            seqs.popleft()
+        if not seqs:
+            del self.index[key]
+        return list(seqs)
+
+
+class HeaderIndex(object):
+    """Index key made of the bytes of the selected header ranges of a packet."""
+
+    def __init__(self, ranges):
+        """
+        Args:
+            ranges: List of (offset, length) of the header bytes of the index key, e.g. [(30, 4)] for the destination
+                IPv4 address of an untagged packet
+        """
+        self.ranges = [(offset, offset + length) for offset, length in ranges]
+        self.min_len = max(end for _, end in self.ranges)
+
+    def __call__(self, pkt):
+        if len(pkt) < self.min_len:
+            return None
+        return b"".join(pkt[start:end] for start, end in self.ranges)
+
+    def expected_key(self, exp_pkt):
+        """Get the index key of an expected packet, or None if the packets it matches may have other keys."""
+        if isinstance(exp_pkt, mask.Mask):
+            if not exp_pkt.is_valid() or exp_pkt.size < self.min_len:
+                return None
+            for start, end in self.ranges:
+                if any(byte_mask != 0xff for byte_mask in exp_pkt.mask[start:end]):
+                    return None
+            return self(bytes(exp_pkt.exp_pkt))
+
+        return self(bytes(exp_pkt))
+
+
+class RxQueues(object):
+    """Ring buffer receive queues of the ports of a PTF dataplane."""
+
+    def __init__(self, dataplane, qlen):
+        self.dataplane = dataplane
+        self.qlen = qlen
+        self.index = None
+        self.stats = {}
+        self._poll = None
+
+    def install(self):
+        """Replace the packet queues of the dataplane, and its poll, flush and set_qlen methods."""
+        dp = self.dataplane
+        with dp.cvar:
+            for port_id, queue in list(dp.packet_queues.items()):
+                dp.packet_queues[port_id] = self._new_queue(port_id, queue)
+            # The queues drop their oldest packets themselves, so that they count the overflow drops
+            dp.qlen = sys.maxsize
+
+        self._poll = dp._poll
+        dp._poll = self.poll
+        dp.flush = self.flush
+        dp.set_qlen = self.set_qlen
+
+    def _new_queue(self, port_id, packets=()):
+        stats = self.stats.setdefault(port_id, RxQueueStats())
+        return RxRingBuffer(self.qlen, stats, self.index, packets)
+
+    def set_qlen(self, qlen):
+        """Set the max number of packets of each queue, the oldest packets of the longer queues are dropped."""
+        dp = self.dataplane
+        with dp.cvar:
+            self.qlen = qlen
+            for port_id, queue in list(dp.packet_queues.items()):
+                packets = list(queue)
+                self.stats.setdefault(port_id, RxQueueStats()).overflow_drops += max(len(packets) - qlen, 0)
+                dp.packet_queues[port_id] = self._new_queue(port_id, packets[max(len(packets) - qlen, 0):])
+
+    def set_index(self, ranges):
+        """Index the received packets by the bytes of the given header ranges, stop indexing if ranges is None.
+
+        Args:
+            ranges: List of (offset, length) of the header bytes of the index key
+        """
+        dp = self.dataplane
+        with dp.cvar:
+            self.index = HeaderIndex(ranges) if ranges else None
+            for queue in list(dp.packet_queues.values()):
+                if isinstance(queue, RxRingBuffer):
+                    queue.index_key = self.index
+                    queue.rebuild_index()
+
+    def flush(self):
+        """Drop the queued packets of all the ports."""
+        self.drain()
+
+    def drain(self, max_per_port=None):
+        """Drop up to max_per_port oldest queued packets of each port, all of them if max_per_port is None."""
+        dp = self.dataplane
+        with dp.cvar:
+            for port_id, queue in list(dp.packet_queues.items()):
+                count = len(queue) if max_per_port is None else min(max_per_port, len(queue))
+                self.stats.setdefault(port_id, RxQueueStats()).flushed += count
+                if count == len(queue):
+                    # The queue is replaced rather than emptied, in O(1)
+                    dp.packet_queues[port_id] = self._new_queue(port_id)
+                elif isinstance(queue, RxRingBuffer):
+                    queue.discard(count)
+                else:
+                    del queue[:count]
+
+    def get_stats(self):
+        """Get the packet counters of the receive queue of each port.
+
+        Returns:
+            Dictionary of (device number, port number) to the counters: received, queued, dequeued (packets
+            returned or discarded by the polls), flushed, overflow_drops (oldest packets dropped on a full queue)
+            and high_watermark
+        """
+        dp = self.dataplane
+        with dp.cvar:
+            return {port_id: stats.to_dict(len(dp.packet_queues.get(port_id, ())))
+                    for port_id, stats in list(self.stats.items())}
+
+    def poll(self, device_number=0, port_number=None, timeout=None, exp_pkt=None, filters=[]):
+        """Same as the poll of the PTF dataplane, the packets of the expected packet key are looked up in the index
+        instead of matching all the queued packets."""
+        dp = self.dataplane
+        key = None
+        if exp_pkt is not None and port_number is not None and self.index is not None and \
+                isinstance(dp.packet_queues.get((device_number, port_number)), RxRingBuffer):
+            key = self.index.expected_key(exp_pkt)
+        if key is None:
+            return self._poll(device_number, port_number, timeout, exp_pkt, filters)
+
+        recent_packets = deque(maxlen=DataPlane.POLL_MAX_RECENT_PACKETS)
+        grab_log = {"packet_count": 0}
+
+        def discard(queue, count):
+            # Same as PTF, the packets received before the expected packet are discarded
+            recent_packets.extend(queue[i][0] for i in range(max(count - recent_packets.maxlen, 0), count))
+            grab_log["packet_count"] += count
+            queue.stats.dequeued += count
+            queue.discard(count)
+
+        def grab():
+            queue = dp.packet_queues[(device_number, port_number)]
+            for seq in queue.lookup(key):
+                pkt, time = queue[seq - queue.head_seq]
+                if all(f(pkt) for f in filters) and match_exp_pkt(exp_pkt, pkt):
+                    discard(queue, seq - queue.head_seq)
+                    queue.popleft()
+                    grab_log["packet_count"] += 1
+                    return DataPlane.PollSuccess(device_number, port_number, pkt, exp_pkt, time)
+
+            discard(queue, len(queue))
+            return None
+
+        with dp.cvar:
+            ret = ptfutils.timed_wait(dp.cvar, grab, timeout=timeout)
+
+        if ret is None:
+            return DataPlane.PollFailure(exp_pkt, recent_packets, grab_log["packet_count"])
+        return ret
@@ -13,6 +13,7 @@ from tests.common.plugins.sanity_check import constants
 from tests.common.plugins.sanity_check import checks
 from tests.common.plugins.sanity_check.checks import *      # noqa: F401, F403
 from tests.common.plugins.sanity_check.recover import recover, recover_chassis
+from tests.common.plugins.sanity_check.snapshot import collect_health_snapshots, clear_health_snapshots
 from tests.common.plugins.sanity_check.constants import STAGE_PRE_TEST, STAGE_POST_TEST
 from tests.common.helpers.assertions import pytest_assert as pt_assert
 from tests.common.helpers.custom_msg_utils import add_custom_msg
@@ -145,14 +146,21 @@ def filter_check_items(tbinfo, duthosts, check_items):
 
 def do_checks(request, check_items, *args, **kwargs):
     check_results = []
-    for item in check_items:
-        check_fixture = request.getfixturevalue(item)
-        results = check_fixture(*args, **kwargs)
-        logger.debug("check results of each item {}".format(results))
-        if results and isinstance(results, list):
-            check_results.extend(results)
-        elif results:
-            check_results.append(results)
+    # Collect the data of all the check items in one round-trip per DUT, the checks only go back to
+    # the DUT when they retry
+    collect_health_snapshots(request.getfixturevalue("duthosts"), check_items,
+                             request.getfixturevalue("tbinfo"))
+    try:
+        for item in check_items:
+            check_fixture = request.getfixturevalue(item)
+            results = check_fixture(*args, **kwargs)
+            logger.debug("check results of each item {}".format(results))
+            if results and isinstance(results, list):
+                check_results.extend(results)
+            elif results:
+                check_results.append(results)
+    finally:
+        clear_health_snapshots()
     return check_results
 
 
@@ -15,6 +15,7 @@ from tests.common.dualtor.constants import UPPER_TOR, LOWER_TOR, NIC
 from tests.common.dualtor.dual_tor_common import CableType, active_standby_ports                # noqa: F401
 from tests.common.cache import FactsCache
 from tests.common.plugins.sanity_check.constants import STAGE_PRE_TEST, STAGE_POST_TEST
+from tests.common.plugins.sanity_check.snapshot import get_health_snapshot, use_ipv6_interfaces
 from tests.common.helpers.parallel import parallel_run, reset_ansible_local_tmp
 from tests.common.dualtor.mux_simulator_control import _probe_mux_ports
 from tests.common.fixtures.duthost_utils import check_bgp_router_id
@@ -45,15 +46,43 @@ CHECK_ITEMS = [
 __all__ = CHECK_ITEMS
 
 
-def _find_down_phy_ports(dut, phy_interfaces):
+def _get_networking_uptime(dut):
+    snapshot = get_health_snapshot(dut)
+    networking_uptime = snapshot.networking_uptime() if snapshot else None
+    if networking_uptime is None:
+        networking_uptime = dut.get_networking_uptime()
+    return networking_uptime
+
+
+def _get_monit_services_status(dut):
+    # The first check uses the health snapshot, the retries get the status from the DUT
+    snapshot = get_health_snapshot(dut)
+    monit_services_status = snapshot.take_monit_services_status() if snapshot else None
+    if monit_services_status is None:
+        monit_services_status = dut.get_monit_services_status()
+    return monit_services_status
+
+
+def _get_all_critical_process_status(dut):
+    # The first check uses the health snapshot, the retries get the status from the DUT
+    snapshot = get_health_snapshot(dut)
+    processes_status = snapshot.take_all_critical_process_status(dut) if snapshot else None
+    if processes_status is None:
+        processes_status = dut.all_critical_process_status()
+    return processes_status
+
+
+def _find_down_phy_ports(dut, phy_interfaces, snapshot=None):
     down_phy_ports = []
     include_inband_intfs = True if dut.sonichost.get_facts().get(
         'switch_type', None) == 'voq' else False
-    intf_facts = dut.show_interface(command='status',
-                                    include_internal_intfs=(
-                                        '201811' not in dut.os_version),
-                                    include_inband_intfs=include_inband_intfs)[
-                                        'ansible_facts']['int_status']
+    include_internal_intfs = '201811' not in dut.os_version
+    intf_facts = snapshot.take_interface_status(dut.namespace, include_internal_intfs) if snapshot else None
+    if intf_facts is None:
+        intf_facts = dut.show_interface(command='status',
+                                        include_internal_intfs=include_internal_intfs,
+                                        include_inband_intfs=include_inband_intfs)[
+                                            'ansible_facts']['int_status']
     for intf in phy_interfaces:
         try:
             if intf_facts[intf]['oper_state'] == 'down':
@@ -63,11 +92,12 @@ def _find_down_phy_ports(dut, phy_interfaces):
     return down_phy_ports
 
 
-def _find_down_ip_ports(dut, ip_interfaces, use_ipv6=False):
+def _find_down_ip_ports(dut, ip_interfaces, use_ipv6=False, snapshot=None):
     down_ip_ports = []
-    if use_ipv6:
+    ip_intf_facts = snapshot.take_ip_interfaces(dut.namespace, use_ipv6) if snapshot else None
+    if ip_intf_facts is None and use_ipv6:
         ip_intf_facts = dut.show_ipv6_interface()['ansible_facts']['ipv6_interfaces']
-    else:
+    elif ip_intf_facts is None:
         ip_intf_facts = dut.show_ip_interface()['ansible_facts']['ip_interfaces']
 
     for intf in ip_interfaces:
@@ -79,7 +109,7 @@ def _find_down_ip_ports(dut, ip_interfaces, use_ipv6=False):
     return down_ip_ports
 
 
-def _find_down_ports(dut, phy_interfaces, ip_interfaces, use_ipv6=False):
+def _find_down_ports(dut, phy_interfaces, ip_interfaces, use_ipv6=False, snapshot=None):
     """Finds the ports which are operationally down
 
     Args:
@@ -87,13 +117,14 @@ def _find_down_ports(dut, phy_interfaces, ip_interfaces, use_ipv6=False):
         phy_interfaces (list): List of all phyiscal operation in 'admin_up'
         ip_interfaces (list): List of the L3 interfaces
         use_ipv6 (bool): Whether to use IPv6 interface check instead of IPv4
+        snapshot (HealthSnapshot): The health snapshot of the DUT, its status is used only once
 
     Returns:
         [list]: list of the down ports
     """
     down_ports = []
-    down_ports = _find_down_ip_ports(dut, ip_interfaces, use_ipv6) + \
-        _find_down_phy_ports(dut, phy_interfaces)
+    down_ports = _find_down_ip_ports(dut, ip_interfaces, use_ipv6, snapshot) + \
+        _find_down_phy_ports(dut, phy_interfaces, snapshot)
 
     return down_ports
 
@@ -113,7 +144,7 @@ def check_interfaces(duthosts, tbinfo):
         results = kwargs['results']
         logger.info("Checking interfaces status on %s..." % dut.hostname)
 
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = _get_networking_uptime(dut).seconds
         timeout = max((SYSTEM_STABILIZE_MAX_TIME - networking_uptime), 0)
         if dut.get_facts().get("modular_chassis"):
             timeout = max(timeout, 600)
@@ -125,16 +156,16 @@ def check_interfaces(duthosts, tbinfo):
         check_result = {"failed": True, "check_item": "interfaces", "host": dut.hostname}
 
         # Determine if we should use IPv6 interface checking
-        use_ipv6 = (
-            "-v6-" in tbinfo["topo"]["name"]
-            if tbinfo and "topo" in tbinfo and "name" in tbinfo["topo"]
-            else False
-        )
+        use_ipv6 = use_ipv6_interfaces(tbinfo)
+        # The first check uses the health snapshot, the retries get the status from the DUT
+        snapshot = get_health_snapshot(dut)
 
         for asic in dut.asics:
             ip_interfaces = []
-            cfg_facts = asic.config_facts(host=dut.hostname,
-                                          source="persistent", verbose=False)['ansible_facts']
+            cfg_facts = snapshot.config_tables(asic.namespace) if snapshot else None
+            if cfg_facts is None:
+                cfg_facts = asic.config_facts(host=dut.hostname,
+                                              source="persistent", verbose=False)['ansible_facts']
             phy_interfaces = [k for k, v in list(cfg_facts["PORT"].items()) if
                               "admin_status" in v and v["admin_status"] == "up"]
             if "PORTCHANNEL_INTERFACE" in cfg_facts:
@@ -156,14 +187,14 @@ def check_interfaces(duthosts, tbinfo):
                 logger.info("Using IPv6 interface checking for topology: %s" % tbinfo["topo"]["name"])
 
             if timeout == 0:  # Check interfaces status, do not retry.
-                down_ports += _find_down_ports(asic, phy_interfaces, ip_interfaces, use_ipv6)
+                down_ports += _find_down_ports(asic, phy_interfaces, ip_interfaces, use_ipv6, snapshot)
                 check_result["failed"] = True if len(down_ports) > 0 else False
                 check_result["down_ports"] = down_ports
             else:  # Retry checking interface status
                 start = time.time()
                 elapsed = 0
                 while elapsed < timeout:
-                    down_ports = _find_down_ports(asic, phy_interfaces, ip_interfaces, use_ipv6)
+                    down_ports = _find_down_ports(asic, phy_interfaces, ip_interfaces, use_ipv6, snapshot)
                     check_result["failed"] = True if len(down_ports) > 0 else False
                     check_result["down_ports"] = down_ports
 
@@ -195,9 +226,14 @@ def check_bgp(duthosts, tbinfo):
     def _check_bgp_on_dut(*args, **kwargs):
         dut = kwargs['node']
         results = kwargs['results']
+        # The first check uses the health snapshot, the retries get the status from the DUT
+        snapshot = get_health_snapshot(dut)
 
         def _check_default_route(version, dut):
             # Return True if successfully get default route
+            has_default_route = snapshot.take_default_route(version) if snapshot else None
+            if has_default_route is not None:
+                return has_default_route
             res = dut.shell("show ip{} route {}/0".format("" if version == 4 else "v6",
                             "0.0.0.0" if version == 4 else "::"), module_ignore_errors=True)
             return not res["rc"] and len(res["stdout"].strip()) != 0
@@ -216,10 +252,17 @@ def check_bgp(duthosts, tbinfo):
                 return False
             return True
 
+        def _check_bgp_router_id(dut, mgFacts):
+            bgp_summary = snapshot.take_bgp_summary() if snapshot else None
+            return check_bgp_router_id(dut, mgFacts, bgp_summary=bgp_summary)
+
         def _check_bgp_status_helper():
             asic_check_results = []
             try:
-                bgp_facts = dut.bgp_facts(asic_index='all')
+                bgp_neighbors = snapshot.take_bgp_neighbors(dut) if snapshot else None
+                if bgp_neighbors is None:
+                    bgp_neighbors = [a_asic_facts['ansible_facts']['bgp_neighbors']
+                                     for a_asic_facts in dut.bgp_facts(asic_index='all')]
             except Exception as e:
                 logger.error("Failed to get BGP status on host %s: %s", dut.hostname, repr(e))
                 check_result['failed'] = True
@@ -232,13 +275,12 @@ def check_bgp(duthosts, tbinfo):
             #      but adding this check here will make BGP check more robust,
             #      and it is necessary since many operations highly depends on the BGP status)
 
-            if len(bgp_facts) == 0:
+            if len(bgp_neighbors) == 0:
                 logger.info("Failed to get BGP status on host %s ..." % dut.hostname)
                 asic_check_results.append(True)
 
-            for asic_index, a_asic_facts in enumerate(bgp_facts):
+            for asic_index, a_asic_neighbors in enumerate(bgp_neighbors):
                 a_asic_result = False
-                a_asic_neighbors = a_asic_facts['ansible_facts']['bgp_neighbors']
                 num_v4_neighbors = len([neigh_addr for neigh_addr, neigh_detail in list(a_asic_neighbors.items())
                                         if neigh_detail['ip_version'] == 4])
                 num_v6_neighbors = len([neigh_addr for neigh_addr, neigh_detail in list(a_asic_neighbors.items())
@@ -297,7 +339,7 @@ def check_bgp(duthosts, tbinfo):
             results[dut.hostname] = check_result
             return
 
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = _get_networking_uptime(dut).seconds
         if SYSTEM_STABILIZE_MAX_TIME - networking_uptime + 480 > 500:
             # If max_timeout is higher than 600, it will exceed parallel_run's timeout
             # the check will be killed by parallel_run, we can't get expected results.
@@ -330,7 +372,7 @@ def check_bgp(duthosts, tbinfo):
 
         mgFacts = dut.get_extended_minigraph_facts(tbinfo)
         if dut.num_asics() == 1 and tbinfo['topo']['type'] != 't2' and \
-           not wait_until(timeout, interval, 0, check_bgp_router_id, dut, mgFacts):
+           not wait_until(timeout, interval, 0, _check_bgp_router_id, dut, mgFacts):
             check_result['failed'] = True
             logger.info("Failed to verify BGP router identifier is Loopback0 address on %s" % dut.hostname)
 
@@ -377,8 +419,11 @@ def check_dbmemory(duthosts):
         redis_cmd = "client list"
         check_result = {"failed": False, "check_item": "dbmemory", "host": dut.hostname}
         # check the db memory on the redis instance running on each instance
+        snapshot = get_health_snapshot(dut)
         for asic in dut.asics:
-            res = asic.run_redis_cli_cmd(redis_cmd)['stdout_lines']
+            res = snapshot.take_redis_client_list(asic.namespace) if snapshot else None
+            if res is None:
+                res = asic.run_redis_cli_cmd(redis_cmd)['stdout_lines']
             result, total_omem, non_zero_output = _is_db_omem_over_threshold(res)
             check_result["total_omem"] = total_omem
             if result:
@@ -841,7 +886,7 @@ def check_monit(duthosts):
         results = kwargs['results']
 
         logger.info("Checking status of each Monit service...")
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = _get_networking_uptime(dut).seconds
         timeout = max((MONIT_STABILIZE_MAX_TIME - networking_uptime), 0)
         interval = 20
         logger.info("networking_uptime = {} seconds, timeout = {} seconds, interval = {} seconds"
@@ -850,7 +895,7 @@ def check_monit(duthosts):
         check_result = {"failed": False, "check_item": "monit", "host": dut.hostname}
 
         if timeout == 0:
-            monit_services_status = dut.get_monit_services_status()
+            monit_services_status = _get_monit_services_status(dut)
             if not monit_services_status:
                 logger.info("Monit was not running.")
                 check_result["failed"] = True
@@ -866,7 +911,7 @@ def check_monit(duthosts):
             is_monit_running = False
             while elapsed < timeout:
                 check_result["failed"] = False
-                monit_services_status = dut.get_monit_services_status()
+                monit_services_status = _get_monit_services_status(dut)
                 if not monit_services_status:
                     wait(interval, msg="Monit was not started and wait {} seconds to retry. Remaining time: {}."
                          .format(interval, timeout - elapsed))
@@ -913,7 +958,7 @@ def check_processes(duthosts):
         results = kwargs['results']
         logger.info("Checking process status on %s..." % dut.hostname)
 
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = _get_networking_uptime(dut).seconds
         timeout = max((SYSTEM_STABILIZE_MAX_TIME - networking_uptime), 0)
         interval = 20
         logger.info("networking_uptime=%d seconds, timeout=%d seconds, interval=%d seconds" %
@@ -921,7 +966,7 @@ def check_processes(duthosts):
 
         check_result = {"failed": False, "check_item": "processes", "host": dut.hostname}
         if timeout == 0:  # Check processes status, do not retry.
-            processes_status = dut.all_critical_process_status()
+            processes_status = _get_all_critical_process_status(dut)
             check_result["processes_status"] = processes_status
             check_result["services_status"] = {}
             for container_name, processes in list(processes_status.items()):
@@ -937,7 +982,7 @@ def check_processes(duthosts):
             elapsed = 0
             while elapsed < timeout:
                 check_result["failed"] = False
-                processes_status = dut.all_critical_process_status()
+                processes_status = _get_all_critical_process_status(dut)
                 check_result["processes_status"] = processes_status
                 check_result["services_status"] = {}
                 for container_name, processes in list(processes_status.items()):
@@ -1207,10 +1252,13 @@ def check_orchagent_usage(duthosts):
         results = kwargs['results']
         logger.info("Checking orchagent CPU usage on %s..." % dut.hostname)
         check_result = {"failed": False, "check_item": "orchagent_usage", "host": dut.hostname}
-        res = dut.shell(
-            "COLUMNS=512 show processes cpu | grep orchagent | awk '{print $9}'",
-            module_ignore_errors=True,
-        )["stdout_lines"]
+        snapshot = get_health_snapshot(dut)
+        res = snapshot.take_orchagent_usage() if snapshot else None
+        if res is None:
+            res = dut.shell(
+                "COLUMNS=512 show processes cpu | grep orchagent | awk '{print $9}'",
+                module_ignore_errors=True,
+            )["stdout_lines"]
 
         check_result["orchagent_usage"] = res
         logger.info("Done checking orchagent CPU usage on %s" % dut.hostname)
@@ -0,0 +1,344 @@
+"""
+Health snapshot of the DUTs shared by the sanity checks.
+
+The raw data needed by the enabled checks is gathered with a single shell script run per DUT, on all the DUTs
+concurrently, before the checks are run. Each check evaluates its first round on the snapshot, the checks which
+fail and retry collect their own data again from the DUT.
+
+The sections run the same commands as the ansible modules and DUT methods used by the checks, and are parsed by the
+same parsers (see ansible/module_utils/facts_parse_utils.py). Each command is bounded by a timeout, like the
+shell_cmds calls of the DUT methods, so a hung container can't block the sanity check.
+"""
+import importlib.util
+import json
+import logging
+import os
+import re
+import shlex
+import time
+from datetime import datetime, timedelta
+
+from tests.common.devices.sonic import SonicHost
+from tests.common.helpers.commands_script import run_commands_script
+from tests.common.helpers.multi_thread_utils import SafeThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SECTION_MARKER = "### SANITY_SNAPSHOT"
+# The snapshot sections needed by each check item
+SNAPSHOT_SECTIONS = {
+    "check_processes": ["networking", "processes"],
+    "check_interfaces": ["networking", "interfaces"],
+    "check_bgp": ["networking", "bgp"],
+    "check_monit": ["networking", "monit"],
+    "check_dbmemory": ["client_list"],
+    "check_orchagent_usage": ["orchagent_usage"],
+}
+
+# The config_db tables read by check_interfaces
+CONFIG_TABLES = ["PORT", "PORTCHANNEL_INTERFACE", "VLAN_INTERFACE"]
+CONFIG_TABLES_CMD = "python3 -c 'import json, sys; config = json.load(open(sys.argv[1])); " \
+    "print(json.dumps({t: config[t] for t in sys.argv[2:] if t in config}))' %s " + " ".join(CONFIG_TABLES)
+
+# Timeout in seconds of each snapshot command, by section name
+COMMAND_TIMEOUT = 30
+SECTION_TIMEOUTS = {
+    "supervisorctl": 60,
+    "bgp_neighbors": 60,
+}
+# Exit code of a command killed by timeout, its section is considered not collected
+TIMEOUT_RC = 124
+
+FACTS_PARSE_UTILS_PATH = os.path.realpath(
+    os.path.join(os.path.dirname(__file__), '../../../../ansible/module_utils/facts_parse_utils.py'))
+
+
+def _load_facts_parse_utils():
+    spec = importlib.util.spec_from_file_location("facts_parse_utils", FACTS_PARSE_UTILS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+facts_parse_utils = _load_facts_parse_utils()
+
+_snapshots = {}
+
+
+def use_ipv6_interfaces(tbinfo):
+    """
+    @return: Whether check_interfaces checks the IPv6 interfaces instead of the IPv4 ones
+    """
+    return "-v6-" in tbinfo["topo"]["name"] if tbinfo and "topo" in tbinfo and "name" in tbinfo["topo"] else False
+
+
+def _get_interface_commands(dut, use_ipv6):
+    commands = []
+    include_internal_intfs = '201811' not in dut.os_version
+    include_inband_intfs = dut.facts.get('switch_type', None) == 'voq'
+    for asic in dut.asics:
+        ns = asic.namespace or ""
+        config_file = "/etc/sonic/config_db{}.json".format(asic.asic_index if dut.is_multi_asic else "")
+        commands.append(("config_tables {}".format(ns), CONFIG_TABLES_CMD % config_file))
+
+        cli_options = " -n {}".format(asic.namespace) if asic.namespace is not None else ""
+        if include_internal_intfs and asic.namespace is not None:
+            cli_options += " -d all"
+        if include_inband_intfs:
+            cli_options += " -d all"
+        commands.append(("interface_status {}".format(ns), "show interface status{}".format(cli_options)))
+
+        ip_options = " -n {} -d all".format(asic.namespace) if asic.namespace is not None else ""
+        version = 6 if use_ipv6 else 4
+        commands.append(("ipv{}_interfaces {}".format(version, ns),
+                         "show ip{} interfaces{}".format("v6" if use_ipv6 else "", ip_options)))
+    return commands
+
+
+def _get_bgp_commands(dut):
+    commands = [("bgp_feature", "show feature status bgp")]
+    for asic in dut.asics:
+        instance = "bgp{}".format(asic.asic_index) if dut.facts['num_asic'] != 1 else "bgp"
+        commands.append(("bgp_neighbors {}".format(asic.asic_index),
+                         'docker exec -i {} vtysh -c "show ip bgp neighbor"'.format(instance)))
+    if not dut.is_multi_asic:
+        commands.append(("default_route 4", "show ip route 0.0.0.0/0"))
+        commands.append(("default_route 6", "show ipv6 route ::/0"))
+        commands.append(("bgp_summary", 'vtysh -c "show bgp summary json"'))
+    return commands
+
+
+def _get_process_commands(dut):
+    commands = []
+    for service in dut.critical_services:
+        commands.append(("critical_processes {}".format(service),
+                         'docker exec {} bash -c "[ -f /etc/supervisor/critical_processes ]'
+                         ' && cat /etc/supervisor/critical_processes"'.format(service)))
+        commands.append(("supervisorctl {}".format(service), "docker exec {} supervisorctl status".format(service)))
+    return commands
+
+
+def _get_section_commands(dut, sections, tbinfo=None):
+    """
+    @summary: Get the commands of the snapshot sections, they are the same commands as the ones run by the checks
+    @return: List of (section name, command)
+    """
+    commands = []
+    if "networking" in sections:
+        commands.append(("now", 'date +"%Y-%m-%d %H:%M:%S"'))
+        commands.append(("networking", "systemctl -p ExecMainStartTimestamp show networking"))
+    if "monit" in sections:
+        commands.append(("monit", "sudo monit status"))
+    if "client_list" in sections:
+        for asic in dut.asics:
+            redis_cmd = "/usr/bin/redis-cli client list"
+            if asic.namespace:
+                redis_cmd = "sudo ip netns exec {} {}".format(asic.namespace, redis_cmd)
+            commands.append(("client_list {}".format(asic.namespace or ""), redis_cmd))
+    if "orchagent_usage" in sections:
+        commands.append(("orchagent_usage", "COLUMNS=512 show processes cpu | grep orchagent | awk '{print $9}'"))
+    # Interfaces and BGP are only checked on the frontend nodes
+    if "interfaces" in sections and dut.is_frontend_node():
+        commands.extend(_get_interface_commands(dut, use_ipv6_interfaces(tbinfo)))
+    if "bgp" in sections and dut.is_frontend_node():
+        commands.extend(_get_bgp_commands(dut))
+    if "processes" in sections:
+        commands.extend(_get_process_commands(dut))
+    return commands
+
+
+def _bound_commands(commands):
+    """
+    @summary: Run each command under timeout, like the shell_cmds calls of the DUT methods
+    """
+    bounded = []
+    for name, command in commands:
+        timeout = SECTION_TIMEOUTS.get(name.split()[0], COMMAND_TIMEOUT)
+        bounded.append((name, "timeout {} bash -c {}".format(timeout, shlex.quote(command))))
+    return bounded
+
+
+class HealthSnapshot(object):
+    """
+    Raw data of a DUT collected in one run of the snapshot script.
+
+    Each getter returns None if the data isn't in the snapshot or it couldn't be collected, the checks then
+    collect it from the DUT. The data which the checks retry on is taken only once, so the retries always
+    see fresh data.
+    """
+
+    def __init__(self, hostname, sections):
+        self.hostname = hostname
+        self.sections = sections
+        self.collected_at = time.time()
+        self.taken = set()
+
+    def _get_output(self, name):
+        rc, output = self.sections.get(name, (None, None))
+        if rc != 0:
+            return None
+        return output
+
+    def _take_output(self, name):
+        if name in self.taken:
+            return None
+        self.taken.add(name)
+        return self._get_output(name)
+
+    def networking_uptime(self):
+        """
+        @summary: Same as get_networking_uptime, the time since the snapshot was collected is added
+        """
+        now = self._get_output("now")
+        props = self._get_output("networking")
+        if not now or not props:
+            return None
+        start_time = props[0].split("=", 1)[-1]
+        try:
+            uptime = datetime.strptime(now[0], "%Y-%m-%d %H:%M:%S") - \
+                datetime.strptime(start_time, "%a %Y-%m-%d %H:%M:%S %Z")
+        except ValueError:
+            return None
+        return uptime + timedelta(seconds=time.time() - self.collected_at)
+
+    def take_monit_services_status(self):
+        """
+        @summary: Same as get_monit_services_status
+        """
+        rc, output = self.sections.get("monit", (None, None))
+        if "monit" in self.taken or rc in (None, TIMEOUT_RC):
+            return None
+        self.taken.add("monit")
+        if rc != 0:
+            return {}
+        return SonicHost.parse_monit_services_status(output)
+
+    def take_redis_client_list(self, namespace):
+        return self._take_output("client_list {}".format(namespace or ""))
+
+    def take_orchagent_usage(self):
+        return self._take_output("orchagent_usage")
+
+    def config_tables(self, namespace):
+        """
+        @summary: The check_interfaces tables of the persistent config, formatted like config_facts
+        """
+        output = self._get_output("config_tables {}".format(namespace or ""))
+        if not output:
+            return None
+        try:
+            config = json.loads("\n".join(output))
+        except ValueError:
+            return None
+        return facts_parse_utils.format_config({table: config.get(table, {}) for table in CONFIG_TABLES})
+
+    def take_interface_status(self, namespace, include_internal_intfs):
+        """
+        @summary: Same as the int_status facts of show_interface
+        """
+        output = self._take_output("interface_status {}".format(namespace or ""))
+        if output is None:
+            return None
+        return facts_parse_utils.parse_interface_status(output, include_internal_intfs)
+
+    def take_ip_interfaces(self, namespace, use_ipv6=False):
+        """
+        @summary: Same as the ip_interfaces facts of show_ip_interface, or the ipv6_interfaces facts of
+            show_ipv6_interface
+        """
+        version = 6 if use_ipv6 else 4
+        output = self._take_output("ipv{}_interfaces {}".format(version, namespace or ""))
+        if output is None:
+            return None
+        return facts_parse_utils.parse_ip_interfaces(output, version)
+
+    def take_bgp_neighbors(self, dut):
+        """
+        @summary: Same as the bgp_neighbors facts of bgp_facts(asic_index='all')
+        @return: List of the BGP neighbors of each asic
+        """
+        feature = self._take_output("bgp_feature")
+        outputs = [self._take_output("bgp_neighbors {}".format(asic.asic_index)) for asic in dut.asics]
+        if feature is None or any(output is None for output in outputs):
+            return None
+        if re.search(r'bgp\s+disabled', "\n".join(feature)):
+            return [{} for _ in outputs]
+        return [facts_parse_utils.parse_bgp_neighbors("\n".join(output)) for output in outputs]
+
+    def take_default_route(self, version):
+        """
+        @return: Whether the default route of the IP version is present, or None
+        """
+        name = "default_route {}".format(version)
+        rc, output = self.sections.get(name, (None, None))
+        if name in self.taken or rc in (None, TIMEOUT_RC):
+            return None
+        self.taken.add(name)
+        return not rc and len("\n".join(output).strip()) != 0
+
+    def take_bgp_summary(self):
+        output = self._take_output("bgp_summary")
+        return "\n".join(output) if output is not None else None
+
+    def take_all_critical_process_status(self, dut):
+        """
+        @summary: Same as all_critical_process_status
+        """
+        if "processes" in self.taken:
+            return None
+        self.taken.add("processes")
+        group_results, status_results = {}, {}
+        for service in dut.critical_services:
+            for name, results in [("critical_processes", group_results), ("supervisorctl", status_results)]:
+                rc, output = self.sections.get("{} {}".format(name, service), (None, None))
+                if rc is None:
+                    return None
+                results[service] = {"rc": rc, "stdout_lines": output}
+        group_process_results = dut.parse_critical_group_process(group_results)
+        return dut.parse_all_critical_process_status(group_process_results, status_results)
+
+
+def _collect_health_snapshot(dut, sections, tbinfo):
+    try:
+        commands = _get_section_commands(dut, sections, tbinfo)
+        outputs = run_commands_script(dut, _bound_commands(commands), SECTION_MARKER)
+    except Exception as e:
+        logger.warning("Failed to collect the health snapshot of {}: {}".format(dut.hostname, repr(e)))
+        return
+    _snapshots[dut.hostname] = HealthSnapshot(dut.hostname, outputs)
+
+
+def collect_health_snapshots(duthosts, check_items, tbinfo=None):
+    """
+    @summary: Collect the health snapshot of all the DUTs concurrently, for the given check items.
+        A DUT on which the snapshot fails has no snapshot, its checks collect their data as usual.
+    """
+    clear_health_snapshots()
+    sections = set()
+    for item in check_items:
+        sections.update(SNAPSHOT_SECTIONS.get(item, []))
+    # check_bgp is skipped on the topologies without BGP neighbors
+    if "bgp" in sections and tbinfo:
+        topo = tbinfo['topo']
+        if not topo.get('properties', {}).get('topology', {}).get('VMs') or 'tgen' in topo or 'ixia' in topo:
+            sections.discard("bgp")
+    if not sections:
+        return
+
+    start_time = time.time()
+    with SafeThreadPoolExecutor(max_workers=8) as executor:
+        for dut in duthosts:
+            executor.submit(_collect_health_snapshot, dut, sections, tbinfo)
+    logger.info("Collected the health snapshot of {} DUTs in {:.1f} seconds, sections: {}".format(
+        len(_snapshots), time.time() - start_time, sorted(sections)))
+
+
+def get_health_snapshot(dut):
+    """
+    @return: The health snapshot of the DUT, or None
+    """
+    return _snapshots.get(dut.hostname)
+
+
+def clear_health_snapshots():
+    _snapshots.clear()
@@ -16,6 +16,7 @@ from .plugins.loganalyzer.utils import support_ignore_loganalyzer
 from .utilities import wait_until, get_plt_reboot_ctrl, is_ipv6_address
 from tests.common.helpers.dut_utils import ignore_t2_syslog_msgs, create_duthost_console, creds_on_dut
 from tests.common.fixtures.conn_graph_facts import get_graph_facts
+from tests.common.helpers.sonic_db import invalidate_sonic_db_cache
 
 logger = logging.getLogger(__name__)
 
@@ -434,6 +435,7 @@ def reboot(duthost, localhost, reboot_type='cold', delay=10,
     # pre-reboot cached interpreter value, we need to clear the cached facts so that they are
     # re-gathered on next use.
     duthost.meta("clear_facts")
+    invalidate_sonic_db_cache(duthost.hostname)
 
     if return_after_reconnect:
         return
@@ -6,7 +6,7 @@ for the telemetry system including Reporter, Metric, and MetricCollection.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, List, Union, Callable
+from typing import TYPE_CHECKING, Dict, Optional, List, Tuple, Union, Callable
 from dataclasses import dataclass
 import os
 import time
@@ -18,6 +18,12 @@ from .constants import (
     ENV_SONIC_MGMT_TESTBED_NAME, ENV_SONIC_MGMT_BUILD_VERSION, ENV_SONIC_MGMT_JOB_ID
 )
 
+if TYPE_CHECKING:
+    from .metrics.sketch import QuantileSketch
+
+# Max number of label sets interned per metric, the cache is reset when it is reached
+MAX_INTERNED_LABEL_KEYS = 65536
+
 
 @dataclass
 class HistogramRecordData:
@@ -32,16 +38,20 @@ class HistogramRecordData:
     sum: Optional[float] = None
     min: Optional[float] = None
     max: Optional[float] = None
+    sketch: Optional["QuantileSketch"] = None
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
-        return {
+        data = {
             "bucket_counts": self.bucket_counts,
             "total_count": self.total_count,
             "sum": self.sum,
             "min": self.min,
             "max": self.max
         }
+        if self.sketch is not None:
+            data["sketch"] = self.sketch.to_dict()
+        return data
 
 
 # Type alias for metric data that can be either a single value or a list of values
@@ -274,6 +284,7 @@ class Metric(ABC):
         self._value_convertor = value_convertor
         self._common_labels = common_labels or {}
         self._data: Dict[str, MetricDataEntry] = {}  # Map of labels_key -> MetricDataEntry
+        self._label_keys: Dict[Tuple, str] = {}  # Map of label items -> interned labels_key
 
         # Register this metric with the reporter
         self.reporter.register_metric(self)
@@ -298,12 +309,19 @@ class Metric(ABC):
         Returns:
             String key representing the labels
         """
-        if labels is None:
+        if not labels:
             return ""
 
-        # Sort labels for consistent key generation
-        sorted_items = sorted(labels.items())
-        return '|'.join(f"{k}={v}" for k, v in sorted_items)
+        # The key of a label set is built once, the following records only hash its items
+        items = tuple(labels.items())
+        key = self._label_keys.get(items)
+        if key is None:
+            if len(self._label_keys) >= MAX_INTERNED_LABEL_KEYS:
+                self._label_keys.clear()
+
+            # Sort labels for consistent key generation
+            key = self._label_keys[items] = '|'.join(f"{k}={v}" for k, v in sorted(items))
+        return key
 
     def get_metric_records(self) -> List[MetricRecord]:
         """
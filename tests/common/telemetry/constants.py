@@ -79,6 +79,8 @@ METRIC_NAMESPACE_TEST_RESULT = "test.result"
 
 # Environment Variables
 ENV_SONIC_MGMT_TS_REPORT_ENDPOINT = "SONIC_MGMT_TS_REPORT_ENDPOINT"
+ENV_SONIC_MGMT_DB_REPORT_STREAM = "SONIC_MGMT_DB_REPORT_STREAM"
+ENV_SONIC_MGMT_DB_REPORT_COMPRESS = "SONIC_MGMT_DB_REPORT_COMPRESS"
 ENV_SONIC_MGMT_GENERATE_BASELINE = "SONIC_MGMT_GENERATE_BASELINE"
 ENV_SONIC_MGMT_TESTBED_NAME = "SONIC_MGMT_TESTBED_NAME"
 ENV_SONIC_MGMT_BUILD_VERSION = "SONIC_MGMT_BUILD_VERSION"
@@ -67,3 +67,4 @@ def db_reporter(request, tbinfo) -> Generator[DBReporter, None, None]:
             yield reporter
         finally:
             reporter.report()
+            reporter.close()
@@ -0,0 +1,183 @@
+"""
+Mergeable quantile sketch for the SONiC telemetry framework.
+
+The histogram buckets of a metric are fixed when it is defined, so the percentiles computed from
+them are only as accurate as the bucket boundaries. The sketch keeps log scaled bins instead, the
+quantiles it returns are within a relative accuracy of the actual values whatever their range, and
+sketches with the same accuracy can be merged, e.g. the sketches of several ports or test runs.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_QUANTILES = [0.5, 0.9, 0.99, 0.999]
+
+
+class QuantileSketch:
+    """
+    Quantile sketch with log scaled bins.
+
+    A positive value v is counted in the bin i such that gamma^(i-1) < v <= gamma^i, the negative
+    values are counted the same way by their absolute value and the zeros separately.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy: Max relative error of the returned quantiles, between 0 and 1
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Relative accuracy must be between 0 and 1, got {relative_accuracy}")
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive_bins: Dict[int, int] = {}
+        self.negative_bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float):
+        """
+        Add a single value to the sketch.
+
+        Args:
+            value: Value to add
+        """
+        if value > 0:
+            index = self._index(value)
+            self.positive_bins[index] = self.positive_bins.get(index, 0) + 1
+        elif value < 0:
+            index = self._index(-value)
+            self.negative_bins[index] = self.negative_bins.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_many(self, values: Iterable[float]):
+        """
+        Add multiple values to the sketch, binned in one pass when numpy is available.
+
+        Args:
+            values: List or array of values to add
+        """
+        if not NUMPY_AVAILABLE:
+            for value in values:
+                self.add(value)
+            return
+
+        array = np.asarray(values, dtype=float).ravel()
+        if not array.size:
+            return
+
+        for bins, magnitudes in [(self.positive_bins, array[array > 0]), (self.negative_bins, -array[array < 0])]:
+            if not magnitudes.size:
+                continue
+            indexes, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma), return_counts=True)
+            for index, count in zip(indexes.astype(int).tolist(), counts.tolist()):
+                bins[index] = bins.get(index, 0) + count
+
+        self.zero_count += int(np.count_nonzero(array == 0))
+        self.count += array.size
+        low, high = array.min().item(), array.max().item()
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other: Sketch with the same relative accuracy
+        """
+        if other.gamma != self.gamma:
+            raise ValueError(f"Cannot merge sketches of relative accuracy {other.relative_accuracy} "
+                             f"and {self.relative_accuracy}")
+
+        for bins, other_bins in [(self.positive_bins, other.positive_bins),
+                                 (self.negative_bins, other.negative_bins)]:
+            for index, count in other_bins.items():
+                bins[index] = bins.get(index, 0) + count
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def _bin_value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Get the estimated value of a quantile.
+
+        Args:
+            q: Quantile between 0 and 1, e.g. 0.99 for the 99th percentile
+
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        value = self.max
+        for index in sorted(self.negative_bins, reverse=True):
+            seen += self.negative_bins[index]
+            if seen > rank:
+                value = -self._bin_value(index)
+                break
+        else:
+            seen += self.zero_count
+            if seen > rank:
+                value = 0
+            else:
+                for index in sorted(self.positive_bins):
+                    seen += self.positive_bins[index]
+                    if seen > rank:
+                        value = self._bin_value(index)
+                        break
+
+        return min(max(value, self.min), self.max)
+
+    def to_dict(self, quantiles: Optional[List[float]] = None) -> dict:
+        """
+        Convert to dictionary for JSON serialization.
+
+        Args:
+            quantiles: Quantiles to report (default: p50, p90, p99 and p999)
+
+        Returns:
+            Dictionary with the relative accuracy and the estimated quantiles
+        """
+        quantiles = quantiles or DEFAULT_QUANTILES
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "quantiles": {"p" + "{:g}".format(round(q * 100, 6)).replace(".", ""): self.quantile(q)
+                          for q in quantiles}
+        }
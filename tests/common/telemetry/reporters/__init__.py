@@ -4,5 +4,6 @@ Reporter implementations for the SONiC telemetry framework.
 
 from .ts_reporter import TSReporter
 from .db_reporter import DBReporter
+from .db_sink import read_metrics_jsonl
 
-__all__ = ['TSReporter', 'DBReporter']
+__all__ = ['TSReporter', 'DBReporter', 'read_metrics_jsonl']
@@ -3,6 +3,8 @@ Database (DB) Reporter for historical analysis and trend tracking.
 
 This reporter writes metrics to local files that can be uploaded to
 OLTP databases for historical analysis, reporting, and trend tracking.
+The records are written as one JSON document per test file, or appended
+to a JSON lines file when streaming is enabled (see db_sink.py).
 """
 
 import datetime
@@ -11,7 +13,8 @@ import logging
 import os
 from typing import Optional, List
 from ..base import Reporter, HistogramRecordData
-from ..constants import REPORTER_TYPE_DB
+from ..constants import REPORTER_TYPE_DB, ENV_SONIC_MGMT_DB_REPORT_STREAM, ENV_SONIC_MGMT_DB_REPORT_COMPRESS
+from .db_sink import JsonLinesSink, JSONL_SUFFIX, JSONL_GZ_SUFFIX
 
 
 class DBReporter(Reporter):
@@ -22,7 +25,8 @@ class DBReporter(Reporter):
     to databases for long-term storage, trend analysis, and reporting.
     """
 
-    def __init__(self, output_dir: Optional[str] = None, request=None, tbinfo=None):
+    def __init__(self, output_dir: Optional[str] = None, request=None, tbinfo=None,
+                 stream: Optional[bool] = None, compress: Optional[bool] = None, flush_interval: float = 1.0):
         """
         Initialize DB reporter with file output configuration.
 
@@ -30,14 +34,28 @@ class DBReporter(Reporter):
             output_dir: Directory for output files (default: current directory)
             request: pytest request object for test context
             tbinfo: testbed info fixture data
+            stream: Append each report to a JSON lines file instead of rewriting a JSON file
+                (default: from SONIC_MGMT_DB_REPORT_STREAM env var)
+            compress: Compress the JSON lines file with gzip
+                (default: from SONIC_MGMT_DB_REPORT_COMPRESS env var)
+            flush_interval: Max time in seconds the streamed records stay buffered
         """
         super().__init__(REPORTER_TYPE_DB, request, tbinfo)
         self.output_dir = output_dir or os.getcwd()
+        if stream is None:
+            stream = os.environ.get(ENV_SONIC_MGMT_DB_REPORT_STREAM) == "1"
+        if compress is None:
+            compress = os.environ.get(ENV_SONIC_MGMT_DB_REPORT_COMPRESS) == "1"
+        self.stream = stream
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.sink = None
 
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
 
-        logging.info(f"DBReporter initialized: output_dir={self.output_dir}")
+        logging.info(f"DBReporter initialized: output_dir={self.output_dir}, stream={self.stream}, "
+                     f"compress={self.compress}")
 
     def _report(self, timestamp: float):
         """
@@ -48,6 +66,10 @@ class DBReporter(Reporter):
         """
         logging.info(f"DBReporter: Writing {len(self.recorded_metrics)} metric records to file")
 
+        if self.stream:
+            self._report_to_sink(timestamp)
+            return
+
         # Generate filename based on test file path
         filename = self._generate_filename()
         filepath = os.path.join(self.output_dir, filename)
@@ -101,13 +123,43 @@ class DBReporter(Reporter):
             logging.error(f"DBReporter: Failed to write metric records to {filepath}: {e}")
             raise
 
+    def _report_to_sink(self, timestamp: float):
+        """
+        Append the collected metrics to the JSON lines file, the file is written in the background.
+
+        Args:
+            timestamp: Timestamp for this reporting batch
+        """
+        if self.sink is None:
+            filepath = os.path.join(self.output_dir, self._generate_filename())
+            self.sink = JsonLinesSink(filepath, self.reporter_type, self.test_context,
+                                      compress=self.compress, flush_interval=self.flush_interval)
+        self.sink.write_batch(self.recorded_metrics, timestamp)
+
+    def flush(self):
+        """
+        Write the streamed records still buffered and stop the background writer.
+        A new writer is started by the next report.
+        """
+        if self.sink is not None:
+            sink, self.sink = self.sink, None
+            sink.close()
+            logging.info(f"DBReporter: Flushed metric records to {sink.filepath}")
+
+    def close(self):
+        """
+        Write the streamed records still buffered. Call it when done with the reporter.
+        """
+        self.flush()
+
     def _generate_filename(self) -> str:
         """
         Generate filename based on test file path.
 
         Returns:
             Filename in format: <test_file_path_without_extension>.metrics.json,
-            e.g. "/dns/static_dns/test_static_dns.metrics.json"
+            e.g. "/dns/static_dns/test_static_dns.metrics.json", or .metrics.jsonl
+            (.metrics.jsonl.gz if compressed) when streaming
         """
         # Get test file path from test context
         test_file = self.test_context.get('test.file', 'unknown')
@@ -116,6 +168,8 @@ class DBReporter(Reporter):
         if test_file.endswith('.py'):
             test_file = test_file[:-3]
 
+        if self.stream:
+            return f"{test_file}{JSONL_GZ_SUFFIX if self.compress else JSONL_SUFFIX}"
         return f"{test_file}.metrics.json"
 
     def get_output_files(self) -> List[str]:
@@ -125,9 +179,10 @@ class DBReporter(Reporter):
         Returns:
             List of output file paths
         """
+        self.flush()
         files = []
         for filename in os.listdir(self.output_dir):
-            if filename.endswith('.metrics.json'):
+            if filename.endswith(('.metrics.json', JSONL_SUFFIX, JSONL_GZ_SUFFIX)):
                 files.append(os.path.join(self.output_dir, filename))
         return sorted(files)
 
@@ -0,0 +1,286 @@
+"""
+Append-only JSON lines sink for the DB reporter.
+
+Each report of a DBReporter is appended to the file as compact rows instead of rewriting
+the whole file, so that reporting at short intervals costs only the new records and keeps
+the previous batches. The lines of the file are:
+
+    {"type": "header", "reporter_type": ..., "test_context": {...}}
+    {"type": "series", "id": 0, "metric_name": ..., "metric_type": ..., "description": ...,
+     "unit": ..., "labels": {...}, "buckets": [...]}
+    {"type": "batch", "timestamp": ..., "rows": [[0, <data>], ...]}
+
+A header starts the output of each reporter, the metadata of a series (metric and labels) is
+written once after the header, before the first batch referencing it. The rows of a batch
+reference the series by id, the ids are only valid until the next header.
+
+The lines are buffered and written by a background thread. When compression is enabled, each
+flush is appended as a gzip member, so the file stays readable while it is being written.
+"""
+
+import datetime
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..base import HistogramRecordData, MetricRecord
+
+JSONL_SUFFIX = ".metrics.jsonl"
+JSONL_GZ_SUFFIX = ".metrics.jsonl.gz"
+
+
+class JsonLinesSink:
+    """
+    Buffered writer of the DB reporter records to an append-only JSON lines file.
+    """
+
+    def __init__(self, filepath: str, reporter_type: str, test_context: Dict[str, str],
+                 compress: bool = False, flush_interval: float = 1.0, max_buffered_lines: int = 10000):
+        """
+        Initialize the sink and start its writer thread.
+
+        Args:
+            filepath: Path of the output file, appended to if it exists
+            reporter_type: Type of the reporter writing to the sink
+            test_context: Test context labels of the reporter
+            compress: Write gzip members instead of plain text
+            flush_interval: Max time in seconds the lines stay buffered
+            max_buffered_lines: Number of buffered lines which triggers a flush
+        """
+        self.filepath = filepath
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.max_buffered_lines = max_buffered_lines
+        self.series_ids: Dict[Tuple, int] = {}
+        self.error: Optional[Exception] = None
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="DBReporter sink", daemon=True)
+        self._writer.start()
+
+        self._put([{"type": "header", "reporter_type": reporter_type, "test_context": test_context}])
+
+    def _put(self, messages: List[dict]):
+        self._queue.put([json.dumps(message, separators=(",", ":")) for message in messages])
+
+    def write_batch(self, records: List[MetricRecord], timestamp: float):
+        """
+        Append a batch of records, with the metadata of the series seen for the first time.
+
+        Args:
+            records: Recorded metrics of the batch
+            timestamp: Timestamp of the batch in nanoseconds
+        """
+        if self._closed:
+            raise ValueError(f"DBReporter sink of {self.filepath} is closed")
+
+        messages = []
+        rows = []
+        for record in records:
+            key = (record.metric.name, tuple(sorted(record.labels.items())))
+            series_id = self.series_ids.get(key)
+            if series_id is None:
+                series_id = self.series_ids[key] = len(self.series_ids)
+                series = {
+                    "type": "series",
+                    "id": series_id,
+                    "metric_name": record.metric.name,
+                    "metric_type": record.metric.metric_type,
+                    "description": record.metric.description,
+                    "unit": record.metric.unit,
+                    "labels": record.labels
+                }
+                if hasattr(record.metric, 'buckets'):
+                    series["buckets"] = record.metric.buckets
+                messages.append(series)
+
+            if isinstance(record.data, HistogramRecordData):
+                rows.append([series_id, record.data.to_dict()])
+            else:
+                rows.append([series_id, record.data])
+
+        messages.append({"type": "batch", "timestamp": timestamp, "rows": rows})
+        self._put(messages)
+
+    def _write_loop(self):
+        buffered = []
+        deadline = None
+        closing = False
+        while not closing:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                lines = self._queue.get(timeout=timeout)
+                if lines is None:
+                    closing = True
+                else:
+                    buffered.extend(lines)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+            if buffered and (closing or len(buffered) >= self.max_buffered_lines or time.monotonic() >= deadline):
+                self._write(buffered)
+                buffered = []
+                deadline = None
+
+    def _write(self, lines: List[str]):
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            if self.compress:
+                with gzip.open(self.filepath, "ab") as f:
+                    f.write(data)
+            else:
+                with open(self.filepath, "ab") as f:
+                    f.write(data)
+        except Exception as e:
+            logging.error(f"DBReporter: Failed to write metric records to {self.filepath}: {e}")
+            self.error = e
+
+    def close(self):
+        """
+        Flush the buffered lines and stop the writer thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        if self.error:
+            raise self.error
+
+
+def read_metrics_jsonl(filepath: str) -> dict:
+    """
+    Read a JSON lines file written by the DB reporter sink into the JSON shape written by the DB reporter.
+
+    The records of all the batches are returned in the order they were reported, the metadata is the
+    one of the last batch.
+
+    Args:
+        filepath: Path of the JSON lines file, plain or gzip compressed
+
+    Returns:
+        Dict with the "metadata" and "records" of the file
+    """
+    opener = gzip.open if filepath.endswith(".gz") else open
+    header = {}
+    series = {}
+    records = []
+    last_timestamp = None
+    with opener(filepath, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            if message["type"] == "header":
+                header = message
+                series = {}
+            elif message["type"] == "series":
+                series[message["id"]] = message
+            elif message["type"] == "batch":
+                timestamp = message["timestamp"]
+                timestamp_iso = datetime.datetime.fromtimestamp(timestamp / 1e9).isoformat()
+                last_timestamp = timestamp_iso
+                for series_id, data in message["rows"]:
+                    metadata = series[series_id]
+                    if "buckets" in metadata and isinstance(data, dict):
+                        data = dict(data, buckets=metadata["buckets"])
+                    records.append({
+                        "metric_name": metadata["metric_name"],
+                        "metric_type": metadata["metric_type"],
+                        "description": metadata["description"],
+                        "unit": metadata["unit"],
+                        "labels": metadata["labels"],
+                        "data": data,
+                        "timestamp": timestamp,
+                        "timestamp_iso": timestamp_iso
+                    })
+
+    return {
+        "metadata": {
+            "reporter_type": header.get("reporter_type"),
+            "timestamp": last_timestamp,
+            "test_context": header.get("test_context", {}),
+            "record_count": len(records)
+        },
+        "records": records
+    }
+
+
+def benchmark(ports: int = 256, queues: int = 8, batches: int = 20, output_dir: Optional[str] = None) -> dict:
+    """
+    Compare the write time and the file size of the JSON report and of the JSON lines sink, for
+    port and queue metrics of a DUT reported in several batches.
+
+    Args:
+        ports: Number of ports with metrics
+        queues: Number of queues per port with metrics
+        batches: Number of reports
+        output_dir: Directory of the output files (default: a temporary directory)
+
+    Returns:
+        Dict with the write time in seconds and the file size in bytes of each format
+    """
+    import shutil
+    import tempfile
+    from unittest.mock import Mock
+
+    from ..metrics.device import DevicePortMetrics, DeviceQueueMetrics
+    from .db_reporter import DBReporter
+
+    def run(temp_dir, **kwargs):
+        request = Mock()
+        request.node.name = "test_benchmark"
+        request.node.fspath.strpath = "/test/path/test_benchmark.py"
+        request.node.callspec.params = {}
+        reporter = DBReporter(output_dir=temp_dir, request=request, tbinfo={"conf-name": "benchmark"}, **kwargs)
+        port_metrics = [DevicePortMetrics(reporter=reporter, labels={"device.id": "dut-01",
+                                                                     "device.port.id": f"Ethernet{port * 4}"})
+                        for port in range(ports)]
+        queue_metrics = [DeviceQueueMetrics(reporter=reporter, labels={"device.id": "dut-01",
+                                                                       "device.queue.id": f"Ethernet{port * 4}|{q}"})
+                         for port in range(ports) for q in range(queues)]
+
+        write_time = 0
+        for batch in range(batches):
+            for metrics in port_metrics:
+                metrics.rx_bps.record(batch * 1000)
+                metrics.tx_bps.record(batch * 1000)
+                metrics.rx_drop.record(batch)
+            for metrics in queue_metrics:
+                metrics.watermark_bytes.record(batch * 100)
+            start = time.time()
+            reporter.report(timestamp=(1234567890 + batch) * 1000000000)
+            write_time += time.time() - start
+        start = time.time()
+        reporter.close()
+        write_time += time.time() - start
+        output_file = reporter.get_output_files()[0]
+        return write_time, os.path.getsize(output_file), output_file
+
+    temp_dir = output_dir or tempfile.mkdtemp()
+    result = {}
+    try:
+        for name, kwargs in [("json", {}), ("jsonl", {"stream": True}),
+                             ("jsonl_gz", {"stream": True, "compress": True})]:
+            run_dir = os.path.join(temp_dir, name)
+            os.makedirs(run_dir, exist_ok=True)
+            write_time, size, output_file = run(run_dir, **kwargs)
+            result[f"{name}_write_time"] = write_time
+            result[f"{name}_size"] = size
+            if name != "json":
+                result[f"{name}_records"] = read_metrics_jsonl(output_file)["metadata"]["record_count"]
+    finally:
+        if not output_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return result
+
+
+if __name__ == "__main__":
+    print(benchmark())
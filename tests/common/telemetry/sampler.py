@@ -0,0 +1,472 @@
+"""
+Fixed-cadence sampler of the device metrics of DUTs.
+
+A sampler reads all its metric families from the DUT redis databases (COUNTERS_DB, STATE_DB) with
+one shell command per tick, instead of one show command per family, and records them into the
+device metric collections of a reporter. Each tick is reported with the redis time of the DUT, and
+the rates are computed from the counters and redis times of consecutive samples, so they are not
+skewed by the time the command takes to run.
+
+Usage:
+
+    with sample_device_metrics(duthosts, db_reporter, interval=5):
+        run_traffic()
+
+The samplers report all the metrics registered to the reporter at each tick, a reporter dedicated
+to the samplers is recommended. With the DBReporter, enable streaming so that each tick is appended.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .base import Reporter, default_value_convertor
+from .constants import (
+    METRIC_LABEL_DEVICE_ID, METRIC_LABEL_DEVICE_PORT_ID, METRIC_LABEL_DEVICE_QUEUE_ID,
+    METRIC_LABEL_DEVICE_QUEUE_CAST, METRIC_LABEL_DEVICE_PSU_ID, METRIC_LABEL_DEVICE_PSU_MODEL,
+    METRIC_LABEL_DEVICE_PSU_SERIAL, METRIC_LABEL_DEVICE_PSU_HW_REV, METRIC_LABEL_DEVICE_SENSOR_ID,
+    METRIC_LABEL_DEVICE_FAN_ID
+)
+from .metrics.device import (
+    DevicePortMetrics, DeviceQueueMetrics, DevicePSUMetrics, DeviceFanMetrics, DeviceTemperatureMetrics
+)
+
+DEVICE_METRIC_FAMILIES = ("port", "queue", "psu", "fan", "temperature")
+# Families read from the databases of each ASIC namespace, the others are read from the host databases
+ASIC_METRIC_FAMILIES = ("port", "queue")
+SAMPLER_SCRIPT_PATH = "/tmp/telemetry_sampler.lua"
+
+PORT_COUNTER_FIELDS = [
+    "SAI_PORT_STAT_IF_IN_OCTETS", "SAI_PORT_STAT_IF_OUT_OCTETS",
+    "SAI_PORT_STAT_IF_IN_UCAST_PKTS", "SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS",
+    "SAI_PORT_STAT_IF_OUT_UCAST_PKTS", "SAI_PORT_STAT_IF_OUT_NON_UCAST_PKTS",
+    "SAI_PORT_STAT_IF_IN_ERRORS", "SAI_PORT_STAT_IF_OUT_ERRORS",
+    "SAI_PORT_STAT_IF_IN_DISCARDS", "SAI_PORT_STAT_IF_OUT_DISCARDS",
+    "SAI_PORT_STAT_ETHER_RX_OVERSIZE_PKTS", "SAI_PORT_STAT_ETHER_TX_OVERSIZE_PKTS",
+]
+
+# Reads the metric families of ARGV in one redis round-trip, the result is tagged with the redis time
+SAMPLER_SCRIPT = """
+local port_fields = {%s}
+local time = redis.call('TIME')
+local r = {time = {tonumber(time[1]), tonumber(time[2])}}
+
+local function hashes(pattern)
+    local h = {}
+    local cursor = '0'
+    repeat
+        local s = redis.call('SCAN', cursor, 'MATCH', pattern, 'COUNT', 1000)
+        cursor = s[1]
+        for _, k in ipairs(s[2]) do
+            local v = redis.call('HGETALL', k)
+            local fields = {}
+            for j = 1, #v, 2 do fields[v[j]] = v[j + 1] end
+            h[string.sub(k, string.len(pattern))] = fields
+        end
+    until cursor == '0'
+    return h
+end
+
+local function name_map(key)
+    local v = redis.call('HGETALL', key)
+    local m = {}
+    for j = 1, #v, 2 do m[v[j]] = v[j + 1] end
+    return m
+end
+
+for _, family in ipairs(ARGV) do
+    if family == 'port' then
+        redis.call('SELECT', 2)
+        local ports = {}
+        for name, oid in pairs(name_map('COUNTERS_PORT_NAME_MAP')) do
+            local values = redis.call('HMGET', 'COUNTERS:' .. oid, unpack(port_fields))
+            local counters = {}
+            for j, field in ipairs(port_fields) do
+                if values[j] then counters[field] = values[j] end
+            end
+            ports[name] = counters
+        end
+        redis.call('SELECT', 0)
+        for name, counters in pairs(ports) do
+            local speed = redis.call('HGET', 'PORT_TABLE:' .. name, 'speed')
+            if speed then counters['speed'] = speed end
+        end
+        r['port'] = ports
+    elseif family == 'queue' then
+        redis.call('SELECT', 2)
+        local types = name_map('COUNTERS_QUEUE_TYPE_MAP')
+        local queues = {}
+        for name, oid in pairs(name_map('COUNTERS_QUEUE_NAME_MAP')) do
+            local watermark = redis.call('HGET', 'USER_WATERMARKS:' .. oid, 'SAI_QUEUE_STAT_SHARED_WATERMARK_BYTES')
+            queues[name] = {watermark = watermark or '0', type = types[oid] or ''}
+        end
+        r['queue'] = queues
+    elseif family == 'psu' then
+        redis.call('SELECT', 6)
+        r['psu'] = hashes('PSU_INFO|*')
+    elseif family == 'fan' then
+        redis.call('SELECT', 6)
+        r['fan'] = hashes('FAN_INFO|*')
+    elseif family == 'temperature' then
+        redis.call('SELECT', 6)
+        r['temperature'] = hashes('TEMPERATURE_INFO|*')
+    end
+end
+return cjson.encode(r)
+""" % ", ".join("'{}'".format(field) for field in PORT_COUNTER_FIELDS)
+
+SAMPLE_SEPARATOR = "### TELEMETRY_SAMPLE"
+
+QUEUE_CAST = {
+    "SAI_QUEUE_TYPE_UNICAST": "unicast",
+    "SAI_QUEUE_TYPE_MULTICAST": "multicast",
+    "SAI_QUEUE_TYPE_ALL": "all",
+}
+PSU_LED = {"off": 0, "green": 1, "amber": 2, "red": 3}
+
+
+def _to_float(value) -> Optional[float]:
+    """
+    Convert a value of the DUT databases to a metric value, None if it isn't a number.
+    """
+    if value is None:
+        return None
+    value = str(value)
+    if value.lower() in ("true", "false"):
+        value = value.capitalize()
+    try:
+        return default_value_convertor(value)
+    except ValueError:
+        return None
+
+
+def _counter(counters: Dict[str, str], *fields) -> Optional[float]:
+    values = [_to_float(counters.get(field)) for field in fields]
+    if any(value is None for value in values):
+        return None
+    return sum(values)
+
+
+class DeviceMetricSampler:
+    """
+    Background sampler of the device metrics of a DUT.
+
+    The ticks are scheduled at a fixed cadence from the start time, so the sampling time doesn't add up
+    as drift. A tick which can't start on time because the previous sample took too long is skipped and
+    counted as missed.
+    """
+
+    def __init__(self, duthost, reporter: Reporter, families: Iterable[str] = DEVICE_METRIC_FAMILIES,
+                 interval: float = 10.0, reporter_lock: Optional[threading.Lock] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the sampler of a DUT.
+
+        Args:
+            duthost: DUT to sample
+            reporter: Reporter the samples are recorded to and reported by
+            families: Metric families to sample, out of DEVICE_METRIC_FAMILIES
+            interval: Time in seconds between two ticks
+            reporter_lock: Lock shared by the samplers of the same reporter
+            clock: Monotonic clock the ticks are scheduled on
+        """
+        unknown = set(families) - set(DEVICE_METRIC_FAMILIES)
+        if unknown:
+            raise ValueError(f"Unknown device metric families: {sorted(unknown)}")
+
+        self.duthost = duthost
+        self.reporter = reporter
+        self.families = [family for family in DEVICE_METRIC_FAMILIES if family in families]
+        self.interval = interval
+        self.reporter_lock = reporter_lock or threading.Lock()
+        self.clock = clock
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.failed_ticks = 0
+        self._previous_ports: Dict[str, tuple] = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._command = None
+
+        self.metrics = {
+            "port": DevicePortMetrics(reporter=reporter),
+            "queue": DeviceQueueMetrics(reporter=reporter),
+            "psu": DevicePSUMetrics(reporter=reporter),
+            "fan": DeviceFanMetrics(reporter=reporter),
+            "temperature": DeviceTemperatureMetrics(reporter=reporter),
+        }
+
+    def _build_command(self) -> str:
+        """
+        Build the command reading all the families of the DUT, from the host databases and the databases of
+        each ASIC namespace.
+        """
+        script = f'"$(cat {SAMPLER_SCRIPT_PATH})"'
+        host_families = [family for family in self.families if family not in ASIC_METRIC_FAMILIES]
+        asic_families = [family for family in self.families if family in ASIC_METRIC_FAMILIES]
+        commands = []
+        if self.duthost.is_multi_asic:
+            if host_families:
+                commands.append(f"redis-cli EVAL {script} 0 {' '.join(host_families)}")
+            if asic_families:
+                for asic in self.duthost.asics:
+                    commands.append(f"docker exec {asic.get_docker_name('database')} "
+                                    f"redis-cli EVAL {script} 0 {' '.join(asic_families)}")
+        else:
+            commands.append(f"redis-cli EVAL {script} 0 {' '.join(self.families)}")
+        return f"; echo '{SAMPLE_SEPARATOR}'; ".join(commands)
+
+    def prepare(self):
+        """
+        Copy the sampler script to the DUT.
+        """
+        self.duthost.copy(content=SAMPLER_SCRIPT, dest=SAMPLER_SCRIPT_PATH)
+        self._command = self._build_command()
+
+    def sample(self) -> List[dict]:
+        """
+        Read the metric families from the DUT in one round-trip.
+
+        Returns:
+            The decoded output of the sampler script for each database it ran on
+        """
+        if self._command is None:
+            self.prepare()
+        output = self.duthost.shell(self._command, module_ignore_errors=True, verbose=False)["stdout"]
+        samples = []
+        for chunk in output.split(SAMPLE_SEPARATOR):
+            if chunk.strip():
+                samples.append(json.loads(chunk))
+        return samples
+
+    def record(self, samples: List[dict]) -> int:
+        """
+        Record the samples into the device metrics and report them, with the redis time of the DUT.
+
+        Returns:
+            Timestamp in nanoseconds the samples were reported with
+        """
+        timestamp = None
+        hostname = self.duthost.hostname
+        with self.reporter_lock:
+            for sample in samples:
+                sample_time = sample["time"][0] * 1000000000 + sample["time"][1] * 1000
+                timestamp = sample_time if timestamp is None else min(timestamp, sample_time)
+                self._record_ports(hostname, sample_time, sample.get("port") or {})
+                self._record_queues(hostname, sample.get("queue") or {})
+                self._record_psus(hostname, sample.get("psu") or {})
+                self._record_fans(hostname, sample.get("fan") or {})
+                self._record_temperatures(hostname, sample.get("temperature") or {})
+            if timestamp is not None:
+                self.reporter.report(timestamp=timestamp)
+        return timestamp
+
+    @staticmethod
+    def _record_values(metrics, values: Dict[str, Optional[float]], labels: Dict[str, str]):
+        for attribute_name, value in values.items():
+            if value is not None:
+                getattr(metrics, attribute_name).record(value, labels)
+
+    def _record_ports(self, hostname: str, sample_time: int, ports: Dict[str, Dict[str, str]]):
+        metrics = self.metrics["port"]
+        for port, counters in ports.items():
+            labels = {METRIC_LABEL_DEVICE_ID: hostname, METRIC_LABEL_DEVICE_PORT_ID: port}
+            values = {
+                "rx_ok": _counter(counters, "SAI_PORT_STAT_IF_IN_UCAST_PKTS", "SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS"),
+                "tx_ok": _counter(counters, "SAI_PORT_STAT_IF_OUT_UCAST_PKTS", "SAI_PORT_STAT_IF_OUT_NON_UCAST_PKTS"),
+                "rx_err": _counter(counters, "SAI_PORT_STAT_IF_IN_ERRORS"),
+                "tx_err": _counter(counters, "SAI_PORT_STAT_IF_OUT_ERRORS"),
+                "rx_drop": _counter(counters, "SAI_PORT_STAT_IF_IN_DISCARDS"),
+                "tx_drop": _counter(counters, "SAI_PORT_STAT_IF_OUT_DISCARDS"),
+                "rx_overrun": _counter(counters, "SAI_PORT_STAT_ETHER_RX_OVERSIZE_PKTS"),
+                "tx_overrun": _counter(counters, "SAI_PORT_STAT_ETHER_TX_OVERSIZE_PKTS"),
+            }
+
+            # The rates are computed from the previous sample of the port
+            rx_octets = _counter(counters, "SAI_PORT_STAT_IF_IN_OCTETS")
+            tx_octets = _counter(counters, "SAI_PORT_STAT_IF_OUT_OCTETS")
+            previous = self._previous_ports.get(port)
+            self._previous_ports[port] = (sample_time, rx_octets, tx_octets)
+            if previous and sample_time > previous[0]:
+                elapsed = (sample_time - previous[0]) / 1e9
+                speed = _to_float(counters.get("speed"))    # Mbps
+                for direction, octets, previous_octets in (("rx", rx_octets, previous[1]),
+                                                           ("tx", tx_octets, previous[2])):
+                    # Counters cleared or reset in between
+                    if octets is None or previous_octets is None or octets < previous_octets:
+                        continue
+                    bps = (octets - previous_octets) / elapsed
+                    values[f"{direction}_bps"] = bps
+                    if speed:
+                        values[f"{direction}_util"] = bps * 8 * 100 / (speed * 1000000)
+
+            self._record_values(metrics, values, labels)
+
+    def _record_queues(self, hostname: str, queues: Dict[str, Dict[str, str]]):
+        metrics = self.metrics["queue"]
+        for name, queue in queues.items():
+            port, _, queue_id = name.rpartition(":")
+            labels = {
+                METRIC_LABEL_DEVICE_ID: hostname,
+                METRIC_LABEL_DEVICE_PORT_ID: port,
+                METRIC_LABEL_DEVICE_QUEUE_ID: queue_id,
+                METRIC_LABEL_DEVICE_QUEUE_CAST: QUEUE_CAST.get(queue["type"], "unknown"),
+            }
+            self._record_values(metrics, {"watermark_bytes": _to_float(queue["watermark"])}, labels)
+
+    def _record_psus(self, hostname: str, psus: Dict[str, Dict[str, str]]):
+        metrics = self.metrics["psu"]
+        for psu, info in psus.items():
+            labels = {
+                METRIC_LABEL_DEVICE_ID: hostname,
+                METRIC_LABEL_DEVICE_PSU_ID: psu,
+                METRIC_LABEL_DEVICE_PSU_MODEL: info.get("model", "N/A"),
+                METRIC_LABEL_DEVICE_PSU_SERIAL: info.get("serial", "N/A"),
+                METRIC_LABEL_DEVICE_PSU_HW_REV: info.get("revision", "N/A"),
+            }
+            values = {
+                "voltage": _to_float(info.get("voltage")),
+                "current": _to_float(info.get("current")),
+                "power": _to_float(info.get("power")),
+                "status": _to_float(info.get("status")),
+                "led": PSU_LED.get(info.get("led_status", "").lower()),
+            }
+            self._record_values(metrics, values, labels)
+
+    def _record_fans(self, hostname: str, fans: Dict[str, Dict[str, str]]):
+        metrics = self.metrics["fan"]
+        for fan, info in fans.items():
+            labels = {METRIC_LABEL_DEVICE_ID: hostname, METRIC_LABEL_DEVICE_FAN_ID: fan}
+            status = info.get("status", "N/A")
+            values = {
+                "speed": _to_float(info.get("speed")),
+                "presence": _to_float(info.get("presence")),
+                # 0=N/A, 1=ok, 2=error
+                "status": 0 if status == "N/A" else (1 if status.lower() == "true" else 2),
+            }
+            self._record_values(metrics, values, labels)
+
+    def _record_temperatures(self, hostname: str, sensors: Dict[str, Dict[str, str]]):
+        metrics = self.metrics["temperature"]
+        for sensor, info in sensors.items():
+            labels = {METRIC_LABEL_DEVICE_ID: hostname, METRIC_LABEL_DEVICE_SENSOR_ID: sensor}
+            values = {
+                "reading": _to_float(info.get("temperature")),
+                "high_th": _to_float(info.get("high_threshold")),
+                "low_th": _to_float(info.get("low_threshold")),
+                "crit_high_th": _to_float(info.get("critical_high_threshold")),
+                "crit_low_th": _to_float(info.get("critical_low_threshold")),
+                "warning": _to_float(info.get("warning_status")),
+            }
+            self._record_values(metrics, values, labels)
+
+    def tick(self):
+        """
+        Sample the DUT and report the samples.
+        """
+        self.ticks += 1
+        try:
+            self.record(self.sample())
+        except Exception as e:
+            self.failed_ticks += 1
+            logging.warning(f"DeviceMetricSampler: Failed to sample {self.duthost.hostname}: {e}")
+
+    def _wait(self, seconds: float):
+        """
+        Wait until the next tick, or until the sampler is stopped.
+        """
+        self._stop_event.wait(seconds)
+
+    def _run(self):
+        start = self.clock()
+        next_tick = 0
+        while not self._stop_event.is_set():
+            self.tick()
+            next_tick += 1
+            elapsed = self.clock() - start
+            # Skip the ticks which are already late, the next tick stays on the cadence
+            late_ticks = int(elapsed // self.interval) - next_tick + 1
+            if late_ticks > 0:
+                self.missed_ticks += late_ticks
+                next_tick += late_ticks
+                logging.warning(f"DeviceMetricSampler: Missed {late_ticks} ticks on {self.duthost.hostname}, "
+                                f"sampling took longer than the {self.interval}s interval")
+            self._wait(start + next_tick * self.interval - self.clock())
+
+    def start(self):
+        """
+        Start sampling in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self.prepare()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"DeviceMetricSampler {self.duthost.hostname}",
+                                        daemon=True)
+        self._thread.start()
+        logging.info(f"DeviceMetricSampler: Started sampling {self.families} on {self.duthost.hostname} "
+                     f"every {self.interval}s")
+
+    def stop(self):
+        """
+        Stop sampling, the tick in progress is completed.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        logging.info(f"DeviceMetricSampler: Stopped sampling on {self.duthost.hostname}: {self.ticks} ticks, "
+                     f"{self.missed_ticks} missed, {self.failed_ticks} failed")
+
+
+def start_device_metric_samplers(duthosts, reporter: Reporter, families: Iterable[str] = DEVICE_METRIC_FAMILIES,
+                                 interval: float = 10.0) -> List[DeviceMetricSampler]:
+    """
+    Start sampling the device metrics of the DUTs concurrently, into the same reporter.
+
+    Returns:
+        The started samplers
+    """
+    reporter_lock = threading.Lock()
+    samplers = [DeviceMetricSampler(duthost, reporter, families, interval, reporter_lock) for duthost in duthosts]
+    try:
+        for sampler in samplers:
+            sampler.start()
+    except Exception:
+        stop_device_metric_samplers(samplers)
+        raise
+    return samplers
+
+
+def stop_device_metric_samplers(samplers: List[DeviceMetricSampler]) -> Dict[str, dict]:
+    """
+    Stop the samplers.
+
+    Returns:
+        Dict of the tick statistics of each DUT
+    """
+    for sampler in samplers:
+        sampler._stop_event.set()
+    stats = {}
+    for sampler in samplers:
+        sampler.stop()
+        stats[sampler.duthost.hostname] = {"ticks": sampler.ticks, "missed_ticks": sampler.missed_ticks,
+                                           "failed_ticks": sampler.failed_ticks}
+    return stats
+
+
+@contextmanager
+def sample_device_metrics(duthosts, reporter: Reporter, families: Iterable[str] = DEVICE_METRIC_FAMILIES,
+                          interval: float = 10.0):
+    """
+    Sample the device metrics of the DUTs in the background while the context is active.
+    """
+    samplers = start_device_metric_samplers(duthosts, reporter, families, interval)
+    try:
+        yield samplers
+    finally:
+        stop_device_metric_samplers(samplers)
@@ -6,6 +6,8 @@ JSON files for validation. When SONIC_MGMT_GENERATE_BASELINE=1, it generates
 new baseline files instead of testing.
 """
 
+import json
+import os
 import tempfile
 from unittest.mock import Mock
 
@@ -16,6 +18,7 @@ from common.telemetry import (
     GaugeMetric, HistogramMetric
 )
 from common.telemetry.reporters.db_reporter import DBReporter
+from common.telemetry.reporters.db_sink import read_metrics_jsonl
 from .common_utils import validate_db_reporter_output
 
 pytestmark = [
@@ -103,6 +106,93 @@ class TestDBReporter:
         # Validate against baseline
         validate_db_reporter_output(db_reporter)
 
+    def test_db_reporter_stream_matches_baseline(self):
+        """Test that the streamed records are read back in the same shape as the JSON report."""
+        self.mock_request.node.fspath.strpath = "/test/path/test_histogram_metrics.py"
+
+        db_reporter = DBReporter(
+            output_dir=self.temp_dir,
+            request=self.mock_request,
+            tbinfo=self.mock_tbinfo,
+            stream=True,
+            compress=True
+        )
+
+        histogram_metric = HistogramMetric(
+            name="test.histogram.response_time",
+            description="API response time distribution",
+            unit="milliseconds",
+            reporter=db_reporter,
+            buckets=[1.0, 2.0, 5.0, 10.0]
+        )
+        histogram_metric.record_bucket_counts([1, 3, 8], {"endpoint": "/api/v1/data"})
+        db_reporter.report(timestamp=1234567890000000000)
+
+        output_files = db_reporter.get_output_files()
+        assert len(output_files) == 1 and output_files[0].endswith(".metrics.jsonl.gz")
+
+        baseline_file = os.path.join(os.path.dirname(__file__), 'baselines', 'db_reporter',
+                                     'test_histogram_metrics.metrics.json')
+        with open(baseline_file, 'r') as f:
+            expected_output = json.load(f)
+        assert read_metrics_jsonl(output_files[0]) == expected_output
+
+    def test_db_reporter_stream_appends_batches(self):
+        """Test that each report is appended and the series metadata is written once."""
+        self.mock_request.node.fspath.strpath = "/test/path/test_stream_batches.py"
+
+        db_reporter = DBReporter(
+            output_dir=self.temp_dir,
+            request=self.mock_request,
+            tbinfo=self.mock_tbinfo,
+            stream=True
+        )
+
+        metric = GaugeMetric(
+            name="test.stream.metric1",
+            description="Streamed test metric",
+            unit="percent",
+            reporter=db_reporter
+        )
+
+        for batch in range(3):
+            metric.record(batch, {"device.id": "dut-01", "iteration": "1"})
+            metric.record(batch + 0.5, {"device.id": "dut-01", "iteration": "2"})
+            db_reporter.report(timestamp=1234567890000000000 + batch)
+        db_reporter.close()
+
+        # A new reporter of the same test file appends to the same file
+        new_reporter = DBReporter(
+            output_dir=self.temp_dir,
+            request=self.mock_request,
+            tbinfo=self.mock_tbinfo,
+            stream=True
+        )
+        GaugeMetric(
+            name="test.stream.metric2",
+            description="Streamed test metric",
+            unit="percent",
+            reporter=new_reporter
+        ).record(99, {"device.id": "dut-01"})
+        new_reporter.report(timestamp=1234567899000000000)
+
+        output_files = new_reporter.get_output_files()
+        assert len(output_files) == 1
+
+        with open(output_files[0], 'r') as f:
+            line_types = [json.loads(line)["type"] for line in f]
+        assert line_types == ["header", "series", "series", "batch", "batch", "batch", "header", "series", "batch"]
+
+        output = read_metrics_jsonl(output_files[0])
+        assert output["metadata"]["record_count"] == 7
+        assert [record["data"] for record in output["records"]] == [0, 0.5, 1, 1.5, 2, 2.5, 99]
+        assert output["records"][-1]["metric_name"] == "test.stream.metric2"
+        assert output["records"][-1]["timestamp"] == 1234567899000000000
+
+        # Plain files are not gzip compressed
+        with open(output_files[0], 'rb') as f:
+            assert f.read(2) != b"\x1f\x8b"
+
 
 if __name__ == "__main__":
     # Allow running tests directly
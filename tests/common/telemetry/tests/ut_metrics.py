@@ -11,9 +11,13 @@ Each metric test follows the pattern:
 3. Validate recorded metrics match expected behavior
 """
 
+import random
+
 import pytest
 
 from common.telemetry import GaugeMetric, HistogramMetric
+from common.telemetry.metrics import histogram as histogram_module
+from common.telemetry.metrics.sketch import QuantileSketch
 
 
 pytestmark = [
@@ -119,6 +123,77 @@ def test_label_precedence_and_merging(mock_reporter):
     assert labels["test.params.duration"] == "30s"     # New additional label
 
 
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_histogram_record_multi_matches_record(mock_reporter, monkeypatch, use_numpy):
+    """Test that the batch binning gives the same buckets and statistics as recording one by one."""
+    if use_numpy and not histogram_module.NUMPY_AVAILABLE:
+        pytest.skip("numpy is not available")
+    monkeypatch.setattr(histogram_module, "NUMPY_AVAILABLE", use_numpy)
+
+    buckets = [1.0, 2.0, 5.0, 10.0]
+    single = HistogramMetric("latency.single", "Latency", "microseconds", mock_reporter, buckets)
+    multi = HistogramMetric("latency.multi", "Latency", "microseconds", mock_reporter, buckets)
+
+    values = [0, 1, 1.5, 2, 5, 7, 10, 10.5, 100, -3]
+    for value in values:
+        single.record(value, {"port": "Ethernet0"})
+    multi.record_multi(values[:4], {"port": "Ethernet0"})
+    multi.record_multi(iter(values[4:]), {"port": "Ethernet0"})
+    multi.record_multi([], {"port": "Ethernet0"})
+
+    mock_reporter.gather_all_recorded_metrics()
+    single_data, multi_data = [record.data for record in mock_reporter.recorded_metrics]
+    assert multi_data.bucket_counts == single_data.bucket_counts == [3, 2, 1, 2, 2]
+    assert multi_data.total_count == single_data.total_count == 10
+    assert multi_data.sum == pytest.approx(single_data.sum)
+    assert (multi_data.min, multi_data.max) == (single_data.min, single_data.max) == (-3, 100)
+
+
+def test_histogram_quantile_sketch(mock_reporter):
+    """Test the accuracy of the quantiles kept by the sketch, and the merge of sketches."""
+    metric = HistogramMetric("latency", "Latency", "microseconds", mock_reporter, buckets=[100, 1000],
+                             sketch_accuracy=0.01)
+
+    rng = random.Random(0)
+    values = [rng.lognormvariate(6, 1.5) for _ in range(20000)]
+    metric.record_multi(values[:10000], {"port": "Ethernet0"})
+    for value in values[10000:10100]:
+        metric.record(value, {"port": "Ethernet0"})
+    metric.record_multi(values[10100:], {"port": "Ethernet0"})
+
+    mock_reporter.gather_all_recorded_metrics()
+    sketch = mock_reporter.recorded_metrics[0].data.sketch
+    values.sort()
+    for q in [0, 0.5, 0.9, 0.99, 0.999, 1]:
+        assert sketch.quantile(q) == pytest.approx(values[int(q * (len(values) - 1))], rel=0.01)
+
+    data = mock_reporter.recorded_metrics[0].data.to_dict()
+    assert set(data["sketch"]["quantiles"]) == {"p50", "p90", "p99", "p999"}
+    assert set(sketch.to_dict([0.29, 0.999, 1])["quantiles"]) == {"p29", "p999", "p100"}
+
+    other = QuantileSketch(0.01)
+    other.add_many([-5, 0, 0])
+    other.merge(sketch)
+    assert other.count == 20003
+    assert other.quantile(0) == -5
+    assert other.quantile(1) == values[-1]
+    with pytest.raises(ValueError):
+        other.merge(QuantileSketch(0.05))
+
+
+def test_label_keys_are_interned(mock_reporter):
+    """Test that the label sets get the same key whatever their order."""
+    metric = GaugeMetric("port.rx.bps", "Port RX", "bps", mock_reporter)
+
+    metric.record(1, {"device.port.id": "Ethernet0", "device.id": "dut-01"})
+    metric.record(2, {"device.id": "dut-01", "device.port.id": "Ethernet0"})
+    metric.record(3, {"device.id": "dut-01", "device.port.id": "Ethernet4"})
+
+    assert list(metric._data) == ["device.id=dut-01|device.port.id=Ethernet0",
+                                  "device.id=dut-01|device.port.id=Ethernet4"]
+    assert metric._data["device.id=dut-01|device.port.id=Ethernet0"].data == 2
+
+
 if __name__ == "__main__":
     # Allow running tests directly
     pytest.main([__file__])
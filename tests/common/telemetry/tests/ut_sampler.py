@@ -0,0 +1,210 @@
+"""
+Tests for the device metric sampler, with a DUT returning canned samples.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from common.telemetry.sampler import DeviceMetricSampler, SAMPLE_SEPARATOR, start_device_metric_samplers, \
+    stop_device_metric_samplers
+from .common_utils import MockReporter
+
+pytestmark = [
+    pytest.mark.topology('any'),
+    pytest.mark.disable_loganalyzer
+]
+
+
+def _mock_request():
+    request = Mock()
+    request.node.name = "test_sampler"
+    request.node.fspath.strpath = "/test/path/test_sampler.py"
+    request.node.callspec.params = {}
+    return request
+
+
+class RecordingReporter(MockReporter):
+    """Mock reporter keeping the records of each report."""
+
+    def __init__(self, request=None, tbinfo=None):
+        super().__init__(request, tbinfo)
+        self.reports = []
+
+    def _report(self, timestamp: float):
+        super()._report(timestamp)
+        records = {}
+        for record in self.recorded_metrics:
+            labels = tuple(sorted(record.labels.items()))
+            records[(record.metric.name, labels)] = record.data
+        self.reports.append((timestamp, records))
+
+
+class FakeClock:
+    """Monotonic clock only advanced by the fake DUT sampling time and the waits of the sampler."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDut:
+    """DUT returning the given samples, one per call of the sampler command."""
+
+    def __init__(self, hostname, samples, delay=0, clock=None):
+        self.hostname = hostname
+        self.is_multi_asic = False
+        self.samples = list(samples)
+        self.delay = delay
+        self.clock = clock
+        self.calls = 0
+
+    def copy(self, **kwargs):
+        pass
+
+    def shell(self, cmd, **kwargs):
+        self.calls += 1
+        if self.clock:
+            self.clock.now += self.delay
+        else:
+            time.sleep(self.delay)
+        sample = self.samples[min(self.calls, len(self.samples)) - 1]
+        return {"stdout": "\n{}\n".format(SAMPLE_SEPARATOR).join(json.dumps(s) for s in sample)}
+
+
+def _port_sample(seconds, usec, in_octets, out_octets):
+    return {
+        "time": [seconds, usec],
+        "port": {
+            "Ethernet0": {
+                "SAI_PORT_STAT_IF_IN_OCTETS": str(in_octets), "SAI_PORT_STAT_IF_OUT_OCTETS": str(out_octets),
+                "SAI_PORT_STAT_IF_IN_UCAST_PKTS": "10", "SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS": "5",
+                "SAI_PORT_STAT_IF_IN_ERRORS": "1", "speed": "100000"
+            }
+        }
+    }
+
+
+def test_sampler_port_rates_use_source_time():
+    """Test that the rates are computed from the redis time of the samples."""
+    reporter = RecordingReporter(request=_mock_request())
+    dut = FakeDut("dut-01", [
+        [_port_sample(1000, 0, 0, 0)],
+        [_port_sample(1002, 500000, 2500000000, 1250000000)],
+    ])
+    sampler = DeviceMetricSampler(dut, reporter, families=["port"])
+
+    sampler.tick()
+    sampler.tick()
+
+    labels = (("device.id", "dut-01"), ("device.port.id", "Ethernet0"))
+    first_timestamp, first = reporter.reports[0]
+    assert first_timestamp == 1000 * 1000000000
+    assert first[("port.rx.ok", labels)] == 15
+    assert first[("port.rx.err", labels)] == 1
+    assert ("port.rx.bps", labels) not in first
+
+    second_timestamp, second = reporter.reports[1]
+    assert second_timestamp == 1002500000000
+    assert second[("port.rx.bps", labels)] == 1000000000
+    assert second[("port.tx.bps", labels)] == 500000000
+    assert second[("port.rx.util", labels)] == 8
+    assert ("port.tx.err", labels) not in second
+
+
+def test_sampler_platform_families():
+    """Test the labels and values of the queue, PSU, fan and temperature samples."""
+    reporter = RecordingReporter(request=_mock_request())
+    dut = FakeDut("dut-01", [[{
+        "time": [1000, 0],
+        "queue": {"Ethernet0:3": {"watermark": "1024", "type": "SAI_QUEUE_TYPE_UNICAST"}},
+        "psu": {"PSU 1": {"voltage": "12.06", "current": "N/A", "status": "true", "led_status": "green",
+                          "model": "M1", "serial": "S1", "revision": "R1"}},
+        "fan": {"fan1": {"speed": "60", "presence": "True", "status": "False"}},
+        "temperature": {"CPU": {"temperature": "45.5", "high_threshold": "95", "warning_status": "False"}},
+    }]])
+    sampler = DeviceMetricSampler(dut, reporter)
+
+    sampler.tick()
+
+    _, records = reporter.reports[0]
+    queue_labels = (("device.id", "dut-01"), ("device.port.id", "Ethernet0"), ("device.queue.cast", "unicast"),
+                    ("device.queue.id", "3"))
+    assert records[("queue.watermark.bytes", queue_labels)] == 1024
+    psu_labels = (("device.id", "dut-01"), ("device.psu.hw_rev", "R1"), ("device.psu.id", "PSU 1"),
+                  ("device.psu.model", "M1"), ("device.psu.serial", "S1"))
+    assert records[("psu.voltage", psu_labels)] == 12.06
+    assert records[("psu.current", psu_labels)] == -1
+    assert records[("psu.status", psu_labels)] == 1
+    assert records[("psu.led", psu_labels)] == 1
+    fan_labels = (("device.fan.id", "fan1"), ("device.id", "dut-01"))
+    assert records[("fan.speed", fan_labels)] == 60
+    sensor_labels = (("device.id", "dut-01"), ("device.sensor.id", "CPU"))
+    assert records[("temperature.reading", sensor_labels)] == 45.5
+    assert records[("temperature.warning", sensor_labels)] == 0
+    assert ("temperature.low_th", sensor_labels) not in records
+
+
+def _run_with_fake_clock(sampler, clock, ticks):
+    """Run the sampler loop in the current thread on the fake clock, until the given number of ticks."""
+    waits = []
+
+    def wait(seconds):
+        waits.append(seconds)
+        clock.now += seconds
+        if sampler.ticks >= ticks:
+            sampler._stop_event.set()
+
+    sampler._wait = wait
+    sampler._run()
+    return waits
+
+
+def test_sampler_keeps_the_cadence():
+    """Test that the ticks are scheduled from the start time, the sampling time doesn't add up as drift."""
+    reporter = RecordingReporter(request=_mock_request())
+    clock = FakeClock()
+    dut = FakeDut("dut-01", [[_port_sample(1000, 0, 0, 0)]], delay=0.25, clock=clock)
+    sampler = DeviceMetricSampler(dut, reporter, families=["port"], interval=1, clock=clock)
+
+    waits = _run_with_fake_clock(sampler, clock, 4)
+
+    assert waits == [0.75] * 4
+    assert sampler.ticks == 4
+    assert sampler.missed_ticks == 0
+    assert len(reporter.reports) == 4
+
+
+def test_sampler_counts_missed_ticks():
+    """Test that the ticks which are due while the DUT is sampled are skipped and counted as missed."""
+    reporter = RecordingReporter(request=_mock_request())
+    clock = FakeClock()
+    dut = FakeDut("dut-02", [[_port_sample(1000, 0, 0, 0)]], delay=2.5, clock=clock)
+    sampler = DeviceMetricSampler(dut, reporter, families=["port"], interval=1, clock=clock)
+
+    waits = _run_with_fake_clock(sampler, clock, 3)
+
+    # Each tick takes 2.5 intervals, the ticks due at 1 and 2 are missed and the next tick starts at 3
+    assert waits == [0.5] * 3
+    assert sampler.ticks == 3
+    assert sampler.missed_ticks == 6
+    assert len(reporter.reports) == 3
+
+
+def test_sampler_threads_are_stopped():
+    """Test that the samplers of the DUTs run in background threads, which are stopped with their statistics."""
+    reporter = RecordingReporter(request=_mock_request())
+    duts = [FakeDut("dut-01", [[_port_sample(1000, 0, 0, 0)]]), FakeDut("dut-02", [[_port_sample(1000, 0, 0, 0)]])]
+
+    samplers = start_device_metric_samplers(duts, reporter, families=["port"], interval=60)
+    stats = stop_device_metric_samplers(samplers)
+
+    assert sorted(stats) == ["dut-01", "dut-02"]
+    assert all(stat["missed_ticks"] == 0 for stat in stats.values())
+    assert len(reporter.reports) == sum(stat["ticks"] for stat in stats.values())
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("DeviceMetricSampler")]
@@ -16,6 +16,7 @@ import threading
 import time
 import traceback
 import copy
+import hashlib
 import tempfile
 import uuid
 import paramiko
@@ -348,12 +349,125 @@ def join_all(threads, timeout):
                            [repr(thread) for thread in threads])
 
 
+# Process-wide cache of parsed inventories, keyed by the inventory file paths and their mtimes. Parsing the lab
+# inventories is expensive, and without this cache every host/group zone miss of the facts cache re-parsed them.
+_parsed_inventories = {}
+_parsed_inventories_lock = threading.Lock()
+_parsed_inventories_stats = {"loads": 0, "reuses": 0, "saved_seconds": 0.0}
+INVENTORY_SNAPSHOT_ZONE = "parsed_inventory"
+
+
+def _normalize_inv_files(inv_files):
+    if isinstance(inv_files, six.string_types):
+        return [inv_files]
+    return list(inv_files)
+
+
+def _get_inventory_cache_key(inv_files):
+    """Build the key of a parsed inventory: tuple of (absolute path, mtime) of each inventory file."""
+    key = []
+    for inv_file in _normalize_inv_files(inv_files):
+        path = os.path.abspath(inv_file)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        key.append((path, mtime))
+    return tuple(key)
+
+
+def _get_inventory_snapshot_name(cache_key):
+    return "inventory_{}".format(hashlib.sha1(repr(cache_key).encode("utf-8")).hexdigest())
+
+
+def _load_inventory_snapshot(cache_key, inv_files):
+    """Restore the parsed InventoryManager from the inventory snapshot written by another process.
+
+    The snapshot is stored through FactsCache, which pickles the InventoryManager, so it is shared by all the
+    xdist/parallel workers using the same cache location. Returns a tuple of (InventoryManager, seconds it took to
+    originally parse the inventory), or (None, None) if no usable snapshot exists.
+    """
+    try:
+        snapshot = cache.read(INVENTORY_SNAPSHOT_ZONE, _get_inventory_snapshot_name(cache_key))
+        if snapshot is FactsCache.NOTEXIST or snapshot.get("key") != cache_key:
+            return None, None
+        # FactsCache keeps the values it read in memory, the restored inventory must not share them
+        im = copy.deepcopy(snapshot["inventory"])
+        if not isinstance(im, InventoryManager):
+            return None, None
+        return im, snapshot["load_time"]
+    except Exception as e:
+        logger.warning("Failed to restore parsed inventory snapshot of {}: {}".format(inv_files, repr(e)))
+        return None, None
+
+
+def _save_inventory_snapshot(cache_key, im, load_time):
+    snapshot = {
+        "key": cache_key,
+        "inventory": im,
+        "load_time": load_time
+    }
+    try:
+        cache.write(INVENTORY_SNAPSHOT_ZONE, _get_inventory_snapshot_name(cache_key), snapshot)
+    except Exception as e:
+        # The snapshot only saves the inventory parsing of the other processes
+        logger.warning("Failed to save parsed inventory snapshot: {}".format(repr(e)))
+
+
+def _get_parsed_inventory(inv_files):
+    """Get the InventoryManager and VariableManager of the inventory files, parsing the inventory files only when they
+    were not parsed yet by this process or by any other worker process sharing the same facts cache, or when they were
+    changed since.
+    """
+    cache_key = _get_inventory_cache_key(inv_files)
+    with _parsed_inventories_lock:
+        entry = _parsed_inventories.get(cache_key)
+        if entry is None:
+            im, load_time = _load_inventory_snapshot(cache_key, inv_files)
+            if im is None:
+                start = time.time()
+                im = InventoryManager(loader=DataLoader(), sources=inv_files)
+                load_time = time.time() - start
+                _parsed_inventories_stats["loads"] += 1
+                logger.info("Parsed inventory {} in {:.2f} seconds".format(inv_files, load_time))
+                _save_inventory_snapshot(cache_key, im, load_time)
+            else:
+                _parsed_inventories_stats["reuses"] += 1
+                _parsed_inventories_stats["saved_seconds"] += load_time
+                logger.info("Restored parsed inventory {} from snapshot, saved {:.2f} seconds of inventory load time"
+                            .format(inv_files, load_time))
+            vm = VariableManager(loader=DataLoader(), inventory=im)
+            entry = {"im": im, "vm": vm, "load_time": load_time}
+            _parsed_inventories[cache_key] = entry
+        else:
+            _parsed_inventories_stats["reuses"] += 1
+            _parsed_inventories_stats["saved_seconds"] += entry["load_time"]
+            logger.debug("Reused parsed inventory {}, saved {:.2f} seconds, {:.2f} seconds in {} reuses in total"
+                         .format(inv_files, entry["load_time"], _parsed_inventories_stats["saved_seconds"],
+                                 _parsed_inventories_stats["reuses"]))
+        return entry
+
+
+def get_parsed_inventory_stats():
+    """Get the statistics of the process-wide parsed inventory cache.
+
+    Returns:
+        dict: Number of inventory parses, number of reuses of parsed inventories and the inventory load time saved.
+    """
+    with _parsed_inventories_lock:
+        return dict(_parsed_inventories_stats)
+
+
 def get_inventory_manager(inv_files):
-    return InventoryManager(loader=DataLoader(), sources=inv_files)
+    """Get the InventoryManager of the inventory files. The parsed inventory is shared process-wide, do not modify it.
+    """
+    return _get_parsed_inventory(inv_files)["im"]
 
 
 def get_variable_manager(inv_files):
-    return VariableManager(loader=DataLoader(), inventory=get_inventory_manager(inv_files))
+    """Get the VariableManager of the inventory files. The parsed inventory is shared process-wide, do not modify it.
+    """
+    return _get_parsed_inventory(inv_files)["vm"]
 
 
 def get_inventory_files(request):
@@ -428,7 +542,8 @@ def get_host_vars(inv_files, hostname):
     if not host:
         logger.error("Unable to find host {} in {}".format(hostname, str(inv_files)))
         return None
-    return host.vars.copy()
+    # The parsed inventory is shared, the callers get their own copy of the variables
+    return copy.deepcopy(host.vars)
 
 
 @cached(
@@ -452,12 +567,12 @@ def get_host_visible_vars(inv_files, hostname):
         dict or None: dict if the host is found, None if the host is not found.
     """
     vm = get_variable_manager(inv_files)
-    im = vm._inventory
+    im = get_inventory_manager(inv_files)
     host = im.get_host(hostname)
     if not host:
         logger.error("Unable to find host {} in {}".format(hostname, str(inv_files)))
         return None
-    return vm.get_vars(host=host)
+    return copy.deepcopy(vm.get_vars(host=host))
 
 
 @cached(
@@ -480,7 +595,7 @@ def get_group_visible_vars(inv_files, group_name):
         dict or None: dict if the host is found, None if the host is not found.
     """
     vm = get_variable_manager(inv_files)
-    im = vm._inventory
+    im = get_inventory_manager(inv_files)
     group = im.groups.get(group_name, None)
     if not group:
         logger.error("Unable to find group {} in {}".format(group_name, str(inv_files)))
@@ -490,13 +605,12 @@ def get_group_visible_vars(inv_files, group_name):
         logger.error("No host in group {}".format(group_name))
         return None
     first_host = group_hosts[0]
-    return vm.get_vars(host=first_host)
+    return copy.deepcopy(vm.get_vars(host=first_host))
 
 
 def get_test_server_host(inv_files, server):
     """Get test server ansible host from the 'server' column in testbed file."""
-    vm = get_variable_manager(inv_files)
-    im = vm._inventory
+    im = get_inventory_manager(inv_files)
     group = im.groups.get(server, None)
     if not group:
         logger.error("Unable to find group {} in {}".format(server, str(inv_files)))
@@ -534,7 +648,8 @@ def get_test_server_vars(inv_files, server):
     if not host:
         logger.error("Unable to find test server host under group {}".format(server))
         return None
-    return host.vars.copy()
+    # The parsed inventory is shared, the callers get their own copy of the variables
+    return copy.deepcopy(host.vars)
 
 
 @cached(
@@ -566,7 +681,7 @@ def get_test_server_visible_vars(inv_files, server):
         logger.error("Unable to find host %s in %s", test_server_host, inv_files)
         return None
 
-    return vm.get_vars(host=test_server_host)
+    return copy.deepcopy(vm.get_vars(host=test_server_host))
 
 
 def is_ipv4_address(ip_address):
@@ -41,6 +41,7 @@ from tests.common.fixtures.duthost_utils import backup_and_restore_config_db_ses
 from tests.common.fixtures.ptfhost_utils import ptf_portmap_file                            # noqa: F401
 from tests.common.fixtures.ptfhost_utils import ptf_test_port_map_active_active             # noqa: F401
 from tests.common.fixtures.ptfhost_utils import run_icmp_responder_session                  # noqa: F401
+from tests.common.fixtures.ptfhost_utils import run_ptf_worker                              # noqa: F401
 from tests.common.dualtor.dual_tor_utils import disable_timed_oscillation_active_standby    # noqa: F401
 from tests.common.dualtor.dual_tor_utils import config_active_active_dualtor
 from tests.common.dualtor.dual_tor_common import active_active_ports                        # noqa: F401
@@ -108,6 +109,7 @@ GOLDEN_CONFIG_DB_PATH_ORI = "/etc/sonic/golden_config_db.json.origin.backup"
 pytest_plugins = ('tests.common.plugins.ptfadapter',
                   'tests.common.plugins.ansible_fixtures',
                   'tests.common.plugins.dut_monitor',
+                  'tests.common.plugins.dut_watch',
                   'tests.common.plugins.loganalyzer',
                   'tests.common.plugins.pdu_controller',
                   'tests.common.plugins.sanity_check',
@@ -248,6 +250,9 @@ def pytest_addoption(parser):
                      help="Enable QoS PTF test debugging mode with pdb breakpoint")
     parser.addoption("--ingress_drop_probing", action="store_true", default=False,
                      help="Enable ingress drop threshold probing instead of PFC xoff probing")
+    parser.addoption("--enable_ptf_worker", action="store_true", default=False,
+                     help="Run the Python 3 PTF test cases on a warm PTF worker instead of launching ptf for each "
+                          "test case")
 
     #########################
     #   post-test options   #
@@ -1,6 +1,7 @@
 import ast
 import pathlib
 import pipes
+import time
 import traceback
 import logging
 import allure
@@ -9,8 +10,19 @@ from datetime import datetime
 import os
 import six
 
+from tests.common.errors import RunAnsibleModuleFail
+
 logger = logging.getLogger(__name__)
 
+PTF_WORKER_PY = "/opt/ptf_worker.py"
+# Exit code of the PTF worker client when the worker can't be reached
+PTF_WORKER_UNAVAILABLE_RC = 250
+
+# Host type facts of the PTF hosts, they don't change during a session. Keyed by PTF hostname.
+_ptf_host_facts = {}
+# PTF workers running on the PTF hosts, registered by the run_ptf_worker fixture. Keyed by PTF hostname.
+_ptf_workers = {}
+
 
 def ptf_collect(host, log_file, skip_pcap=False, dst_dir='./logs/ptf_collect/'):
     """
@@ -29,11 +41,11 @@ def ptf_collect(host, log_file, skip_pcap=False, dst_dir='./logs/ptf_collect/'):
     if skip_pcap:
         return
     pcap_file = filename_prefix + '.pcap'
-    output = host.shell("[ -f {} ] && echo exist || echo null".format(pcap_file))['stdout']
+    compressed_pcap_file = pcap_file + '.tar.gz'
+    # Check for and compress the file in one round trip
+    output = host.shell("[ -f {0} ] && gzip -c {0} > {1} && echo exist || echo null".format(
+        pipes.quote(pcap_file), pipes.quote(compressed_pcap_file)))['stdout']
     if output == 'exist':
-        # Compress the file
-        compressed_pcap_file = pcap_file + '.tar.gz'
-        host.archive(path=pcap_file, dest=compressed_pcap_file, format='gz')
         # Copy compressed file from ptf to sonic-mgmt
         filename_pcap = dst_dir + rename_prefix + '.' + suffix + '.pcap.tar.gz'
         host.fetch(src=compressed_pcap_file, dest=filename_pcap, flat=True, fail_on_missing=False)
@@ -79,6 +91,58 @@ def get_ptf_image_type(host):
     return "py3only"
 
 
+def get_ptf_host_facts(host):
+    """
+    Get the DUT type, ASIC type and PTF image type of a PTF host in one round trip, and cache them
+    for the session.
+
+    Returns:
+        dict with the dut_type, asic_type and ptf_img_type keys, with the same values as returned by
+        get_dut_type, get_asic_type and get_ptf_image_type.
+    """
+    facts = _ptf_host_facts.get(host.hostname)
+    if facts is not None:
+        return facts
+
+    cmd = ('echo "$(cat /sonic/dut_type.txt 2>/dev/null)"; '
+           'echo "$(cat /sonic/asic_type.txt 2>/dev/null)"; '
+           '[ -f /root/env-python3/pyvenv.cfg ] && echo mixed || echo py3only')
+    lines = host.shell(cmd)["stdout_lines"]
+    dut_type, asic_type, ptf_img_type = (lines + ["", "", ""])[:3]
+    facts = {
+        "dut_type": dut_type.strip().lower() or "Unknown",
+        "asic_type": asic_type.strip().lower() or "Unknown",
+        "ptf_img_type": ptf_img_type.strip() or "py3only",
+    }
+    logger.info("PTF host {} facts: {}".format(host.hostname, facts))
+    _ptf_host_facts[host.hostname] = facts
+    return facts
+
+
+def register_ptf_worker(host, ptf_cmd, python, socket_path):
+    """
+    Register the PTF worker running on a PTF host. ptf_runner sends the test cases run with ptf_cmd
+    to the worker instead of launching the ptf binary.
+    """
+    _ptf_workers[host.hostname] = {"ptf_cmd": ptf_cmd, "python": python, "socket": socket_path}
+
+
+def unregister_ptf_worker(host):
+    _ptf_workers.pop(host.hostname, None)
+
+
+def get_ptf_worker_cmd(host, ptf_cmd):
+    """
+    Returns:
+        The command running the test cases of ptf_cmd on the PTF worker of the host, None if there is no
+        such worker.
+    """
+    worker = _ptf_workers.get(host.hostname)
+    if not worker or worker["ptf_cmd"] != ptf_cmd:
+        return None
+    return "{} {} run --socket {} --".format(worker["python"], PTF_WORKER_PY, worker["socket"])
+
+
 def get_test_path(testdir, testname):
     """
     Returns two values
@@ -128,16 +192,17 @@ def ptf_runner(host, testdir, testname, platform_dir=None, params={},
                ptf_collect_dir="./logs/ptf_collect/",
                device_sockets=[], timeout=0, custom_options="",
                module_ignore_errors=False, is_python3=None, async_mode=False, pdb=False,
-               test_subdir='py3'):
-    dut_type = get_dut_type(host)
-    asic_type = get_asic_type(host)
+               test_subdir='py3', use_worker=True):
+    host_facts = get_ptf_host_facts(host)
+    dut_type = host_facts["dut_type"]
+    asic_type = host_facts["asic_type"]
     kvm_support = params.get("kvm_support", False)
     if dut_type == "kvm" and asic_type != "vpp" and kvm_support is False:
         logger.info("Skip test case {} for not support on KVM DUT".format(testname))
         return True
 
     cmd = ""
-    ptf_img_type = get_ptf_image_type(host)
+    ptf_img_type = host_facts["ptf_img_type"]
     logger.info('PTF image type: {}'.format(ptf_img_type))
     test_fpath, in_subdir = get_test_path(testdir, testname)
     logger.info('Test file path {}, in subdir: {}'.format(test_fpath, in_subdir))
@@ -207,6 +272,10 @@ def ptf_runner(host, testdir, testname, platform_dir=None, params={},
     if custom_options:
         cmd += " " + custom_options
 
+    worker_cmd = None
+    if use_worker and not pdb and not async_mode:
+        worker_cmd = get_ptf_worker_cmd(host, ptf_cmd)
+
     if hasattr(host, "macsec_enabled") and host.macsec_enabled:
         if not is_python3:
             logger.error("MACsec is only available in Python3")
@@ -223,8 +292,20 @@ def ptf_runner(host, testdir, testname, platform_dir=None, params={},
             print("Run command from ptf: sh {}".format(script_name))
             import pdb
             pdb.set_trace()
-        logger.info('ptf command: {}'.format(cmd))
-        result = host.shell(cmd, chdir="/root", module_ignore_errors=module_ignore_errors, module_async=async_mode)
+        result = None
+        if worker_cmd:
+            logger.info('ptf command (PTF worker): {}'.format(cmd))
+            result = host.shell(worker_cmd + cmd[len(ptf_cmd):], chdir="/root", module_ignore_errors=True)
+            if result["rc"] == PTF_WORKER_UNAVAILABLE_RC:
+                logger.warning("PTF worker is not available on {}, launching ptf".format(host.hostname))
+                unregister_ptf_worker(host)
+                result = None
+            elif result["rc"] != 0 and not module_ignore_errors:
+                raise RunAnsibleModuleFail("run module shell failed", result)
+        if result is None:
+            logger.info('ptf command: {}'.format(cmd))
+            result = host.shell(cmd, chdir="/root", module_ignore_errors=module_ignore_errors,
+                                module_async=async_mode)
         if not async_mode:
             if log_file:
                 ptf_collect(host, log_file, dst_dir=ptf_collect_dir)
@@ -258,3 +339,24 @@ def ptf_runner(host, testdir, testname, platform_dir=None, params={},
         logger.error("Exception caught while executing case: {}. Error message: {}".format(testname, traceback_msg))
         raise
     return True
+
+
+def benchmark_ptf_runner(host, testdir, testname, iterations=5, **kwargs):
+    """
+    Compare the per-case latency of running a test case by launching the ptf binary and on the PTF worker.
+
+    Args:
+        host: PTF host, with a PTF worker registered for the ptf binary of the test case
+        testdir, testname, kwargs: arguments of ptf_runner
+
+    Returns:
+        dict of "ptf" and "worker" to the average latency in seconds
+    """
+    latencies = {}
+    for name, use_worker in (("ptf", False), ("worker", True)):
+        start = time.time()
+        for _ in range(iterations):
+            ptf_runner(host, testdir, testname, use_worker=use_worker, **kwargs)
+        latencies[name] = (time.time() - start) / iterations
+    logger.info("PTF per-case latency of {}: {}".format(testname, latencies))
+    return latencies
@@ -5,7 +5,9 @@ from tests.common.cisco_data import is_cisco_device, copy_set_voq_watchdog_scrip
 import re
 import os
 import json
+import fnmatch
 import logging
+import time
 import requests
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,54 @@ PFC_GEN_REMOTE_PATH = '~/pfc_gen.py'
 WITHDRAW = 'withdraw'
 ANNOUNCE = 'announce'
 
+# Tables read by the QoS DB snapshot, by redis DB number
+QOS_DB_SNAPSHOT_TABLES = {
+    "0": ["BUFFER_PG_TABLE:*", "BUFFER_QUEUE_TABLE:*", "BUFFER_PROFILE_TABLE:*", "BUFFER_POOL_TABLE:*",
+          "BUFFER_PORT_INGRESS_PROFILE_LIST_TABLE:*", "BUFFER_PORT_EGRESS_PROFILE_LIST_TABLE:*"],
+    "2": ["COUNTERS_BUFFER_POOL_NAME_MAP"],
+    "4": ["BUFFER_PG|*", "BUFFER_QUEUE|*", "BUFFER_PROFILE|*", "BUFFER_POOL|*", "WRED_PROFILE|*",
+          "SCHEDULER|*", "QUEUE|*"],
+}
+
+# Reads the hashes matching the (db, pattern) pairs of ARGV, and the VIDTORID entries of the buffer pools,
+# in one redis round-trip
+QOS_DB_SNAPSHOT_SCRIPT = """
+local r = {}
+for i = 1, #ARGV, 2 do
+    redis.call('SELECT', ARGV[i])
+    local db = r[ARGV[i]] or {}
+    r[ARGV[i]] = db
+    local cursor = '0'
+    repeat
+        local s = redis.call('SCAN', cursor, 'MATCH', ARGV[i + 1], 'COUNT', 1000)
+        cursor = s[1]
+        for _, k in ipairs(s[2]) do
+            if redis.call('TYPE', k).ok == 'hash' then
+                local v = redis.call('HGETALL', k)
+                local h = {}
+                for j = 1, #v, 2 do h[v[j]] = v[j + 1] end
+                db[k] = h
+            end
+        end
+    until cursor == '0'
+end
+local pools = r['2'] and r['2']['COUNTERS_BUFFER_POOL_NAME_MAP']
+if pools then
+    local vids = {}
+    for _, vid in pairs(pools) do table.insert(vids, vid) end
+    if #vids > 0 then
+        redis.call('SELECT', 1)
+        local rids = redis.call('HMGET', 'VIDTORID', unpack(vids))
+        local h = {}
+        for j, vid in ipairs(vids) do
+            if rids[j] then h[vid] = rids[j] end
+        end
+        r['1'] = {VIDTORID = h}
+    end
+end
+return cjson.encode(r)
+"""
+
 
 def atoi(text):
     return int(text) if text.isdigit() else text
@@ -322,6 +372,62 @@ def dutBufferConfig(duthost, dut_asic=None):
     return bufferConfig
 
 
+class QosDbSnapshot(object):
+    """
+    Snapshot of the QoS tables of a DUT ASIC, read in one redis round-trip.
+
+    The HGET/HGETALL lookups of the keys matching the snapshot tables are answered from the snapshot, with the
+    same output as redis-cli. The lookups of other keys return None, the caller reads them from redis.
+    """
+
+    def __init__(self, dut_asic, generation=None, tables=QOS_DB_SNAPSHOT_TABLES):
+        self.generation = generation
+        self.tables = tables
+        self.dbs = {}
+        self.lookups = 0
+        self.misses = 0
+        start = time.time()
+        args = []
+        for db, patterns in tables.items():
+            for pattern in patterns:
+                args += [db, pattern]
+        if args:
+            out = dut_asic.run_redis_cmd(argv=["redis-cli", "EVAL", QOS_DB_SNAPSHOT_SCRIPT, "0"] + args)
+            self.dbs = json.loads("\n".join(out))
+        self.elapsed = time.time() - start
+
+    def _covers(self, db, key):
+        return any(fnmatch.fnmatchcase(key, pattern) for pattern in self.tables.get(db, []))
+
+    def hget(self, db, key, field):
+        """
+        Returns the output lines of HGET, or None if the key is not in the snapshot tables
+        """
+        fields = self.dbs.get(db, {}).get(key)
+        if fields is not None and field in fields:
+            result = fields[field].splitlines()
+        elif self._covers(db, key):
+            result = []
+        else:
+            self.misses += 1
+            return None
+        self.lookups += 1
+        return result
+
+    def hgetall(self, db, key):
+        """
+        Returns the output lines of HGETALL, or None if the key is not in the snapshot tables
+        """
+        if not self._covers(db, key):
+            self.misses += 1
+            return None
+        self.lookups += 1
+        result = []
+        for field, value in self.dbs.get(db, {}).get(key, {}).items():
+            result += [field, value]
+        return result
+
+
 def voq_watchdog_enabled(get_src_dst_asic_and_duts):
     dst_dut = get_src_dst_asic_and_duts['dst_dut']
     if not is_cisco_device(dst_dut):
@@ -32,11 +32,12 @@ from tests.common.system_utils import docker  # noqa: F401
 from tests.common.errors import RunAnsibleModuleFail
 from tests.common import config_reload
 from tests.common.devices.eos import EosHost
-from .qos_helpers import dutBufferConfig, disable_voq_watchdog
+from .qos_helpers import dutBufferConfig, disable_voq_watchdog, QosDbSnapshot
 from tests.common.snappi_tests.qos_fixtures import get_pfcwd_config, reapply_pfcwd
 from tests.common.snappi_tests.common_helpers import \
         stop_pfcwd, disable_packet_aging, enable_packet_aging
 from tests.common.utilities import is_ipv6_only_topology
+from tests.common.helpers.sonic_db import get_sonic_db_generation
 
 
 logger = logging.getLogger(__name__)
@@ -198,6 +199,76 @@ class QosSaiBase(QosBase):
         QosSaiBase contains collection of pytest fixtures that ready the
         testbed for QoS SAI test cases.
     """
+    # QoS DB snapshots by (hostname, namespace), used while the fixtures of a test case are set up
+    qos_db_snapshots = {}
+
+    def __getQosDbSnapshot(self, dut_asic):
+        """
+            Get the QoS DB snapshot of a DUT ASIC, taken again if the DUT was reloaded since it was taken
+
+            Args:
+                dut_asic (SonicAsic): Device ASIC Under Test (DUT)
+
+            Returns:
+                snapshot (QosDbSnapshot): QoS DB snapshot of the ASIC
+        """
+        key = (dut_asic.sonichost.hostname, dut_asic.namespace)
+        generation = get_sonic_db_generation(dut_asic.sonichost.hostname)
+        snapshot = self.qos_db_snapshots.get(key)
+        if snapshot is None or snapshot.generation != generation:
+            try:
+                snapshot = QosDbSnapshot(dut_asic, generation)
+                logger.info("Took QoS DB snapshot of {} {} in {:.2f} seconds".format(
+                    dut_asic.sonichost.hostname, dut_asic.namespace or "", snapshot.elapsed))
+            except Exception as e:
+                logger.warning("Failed to take QoS DB snapshot of {} {}, reading Redis db instead: {}".format(
+                    dut_asic.sonichost.hostname, dut_asic.namespace or "", repr(e)))
+                snapshot = QosDbSnapshot(dut_asic, generation, tables={})
+            self.qos_db_snapshots[key] = snapshot
+        return snapshot
+
+    def __releaseQosDbSnapshots(self):
+        for (hostname, namespace), snapshot in self.qos_db_snapshots.items():
+            logger.info("QoS DB snapshot of {} {} answered {} Redis lookups, {} lookups read from Redis db".format(
+                hostname, namespace or "", snapshot.lookups, snapshot.misses))
+        self.qos_db_snapshots.clear()
+
+    def __redisHget(self, dut_asic, db, key, field):
+        """
+            Get a field of a Redis hash from the QoS DB snapshot, or from Redis db if the snapshot doesn't have it
+
+            Returns:
+                stdout (list): Output lines of redis-cli HGET
+        """
+        result = self.__getQosDbSnapshot(dut_asic).hget(db, key, field)
+        if result is None:
+            result = dut_asic.run_redis_cmd(argv=["redis-cli", "-n", db, "HGET", key, field])
+        return result
+
+    def __redisHgetall(self, dut_asic, db, key):
+        """
+            Get a Redis hash from the QoS DB snapshot, or from Redis db if the snapshot doesn't have it
+
+            Returns:
+                stdout (list): Output lines of redis-cli HGETALL
+        """
+        result = self.__getQosDbSnapshot(dut_asic).hgetall(db, key)
+        if result is None:
+            result = dut_asic.run_redis_cmd(argv=["redis-cli", "-n", db, "HGETALL", key])
+        return result
+
+    @pytest.fixture(autouse=True)
+    def releaseQosDbSnapshots(self):
+        """
+            Releases the QoS DB snapshots once the class fixtures of a test case are set up, and again once the
+            test case is done, so that the changes made by the test cases are read by the fixtures set up later
+
+            Class scoped fixtures are set up before this fixture, the QoS DB lookups they make while they are
+            set up are answered from one snapshot per DUT ASIC instead of one Redis command per lookup.
+        """
+        self.__releaseQosDbSnapshots()
+        yield
+        self.__releaseQosDbSnapshots()
 
     def __computeBufferThreshold(self, dut_asic, bufferProfile):
         """
@@ -223,11 +294,7 @@ class QosSaiBase(QosBase):
                 pool = bufferProfile["pool"].translate({ord(i): None for i in '[]'})
         else:
             pool = keystr + bufferProfile["pool"]
-        bufferSize = int(
-            dut_asic.run_redis_cmd(
-                argv=["redis-cli", "-n", db, "HGET", pool, "size"]
-            )[0]
-        )
+        bufferSize = int(self.__redisHget(dut_asic, db, pool, "size")[0])
         bufferScale = 2 ** float(bufferProfile["dynamic_th"])
         bufferScale /= (bufferScale + 1)
         bufferProfile.update(
@@ -252,22 +319,18 @@ class QosSaiBase(QosBase):
         port_table_name = "BUFFER_PORT_EGRESS_PROFILE_LIST_TABLE" if \
             table == "BUFFER_QUEUE_TABLE" else "BUFFER_PORT_INGRESS_PROFILE_LIST_TABLE"
         db = "0"
-        port_profile_res = dut_asic.run_redis_cmd(
-            argv=["redis-cli", "-n", db, "HGET", f"{port_table_name}: {port}", "profile_list"]
-        )[0]
+        port_profile_res = self.__redisHget(dut_asic, db, f"{port_table_name}: {port}", "profile_list")[0]
         port_profile_list = port_profile_res.split(",")
 
         port_dynamic_th = ''
         for port_profile in port_profile_list:
-            buffer_pool_name = dut_asic.run_redis_cmd(
-                argv=["redis-cli", "-n", db, "HGET", f'BUFFER_PROFILE_TABLE:{port_profile}', "pool"]
-            )[0]
+            buffer_pool_name = self.__redisHget(dut_asic, db, f'BUFFER_PROFILE_TABLE:{port_profile}', "pool")[0]
             if buffer_pool_name == pg_q_buffer_profile["pool"]:
-                port_dynamic_th = dut_asic.run_redis_cmd(
-                    argv=["redis-cli", "-n", db, "HGET", f'BUFFER_PROFILE_TABLE:{port_profile}', "dynamic_th"]
+                port_dynamic_th = self.__redisHget(
+                    dut_asic, db, f'BUFFER_PROFILE_TABLE:{port_profile}', "dynamic_th"
                 )[0]
-                port_profile_reserved_size = dut_asic.run_redis_cmd(
-                    argv=["redis-cli", "-n", db, "HGET", f'BUFFER_PROFILE_TABLE:{port_profile}', "size"]
+                port_profile_reserved_size = self.__redisHget(
+                    dut_asic, db, f'BUFFER_PROFILE_TABLE:{port_profile}', "size"
                 )[0]
                 break
         if port_dynamic_th:
@@ -282,11 +345,7 @@ class QosSaiBase(QosBase):
             pg_q_alpha = calculate_alpha(pg_q_buffer_profile['dynamic_th'])
             port_alpha = calculate_alpha(port_dynamic_th)
             pool = f'BUFFER_POOL_TABLE: {pg_q_buffer_profile["pool"]}'
-            buffer_size = int(
-                dut_asic.run_redis_cmd(
-                    argv=["redis-cli", "-n", db, "HGET", pool, "size"]
-                )[0]
-            )
+            buffer_size = int(self.__redisHget(dut_asic, db, pool, "size")[0])
 
             pg_q_reserved_size = int(port_profile_reserved_size) * pg_q_alpha / (1 + pg_q_alpha)
             reserved_size = pg_q_reserved_size if pg_q_reserved_size > int(pg_q_buffer_profile["size"]) \
@@ -338,16 +397,13 @@ class QosSaiBase(QosBase):
         else:
             bufferPoolName = six.text_type(bufferProfile["pool"])
 
-        bufferPoolVoid = six.text_type(dut_asic.run_redis_cmd(
-            argv=[
-                "redis-cli", "-n", "2", "HGET",
-                "COUNTERS_BUFFER_POOL_NAME_MAP", bufferPoolName
-            ]
+        bufferPoolVoid = six.text_type(self.__redisHget(
+            dut_asic, "2", "COUNTERS_BUFFER_POOL_NAME_MAP", bufferPoolName
         )[0])
         bufferProfile.update({"bufferPoolVoid": bufferPoolVoid})
 
-        bufferPoolRoid = six.text_type(dut_asic.run_redis_cmd(
-            argv=["redis-cli", "-n", "1", "HGET", "VIDTORID", bufferPoolVoid]
+        bufferPoolRoid = six.text_type(self.__redisHget(
+            dut_asic, "1", "VIDTORID", bufferPoolVoid
         )[0]).replace("oid:", '')
         bufferProfile.update({"bufferPoolRoid": bufferPoolRoid})
 
@@ -383,13 +439,13 @@ class QosSaiBase(QosBase):
             bufkeystr = "BUFFER_PROFILE|"
 
         if check_qos_db_fv_reference_with_table(dut_asic):
-            out = dut_asic.run_redis_cmd(argv=["redis-cli", "-n", db, "HGET", keystr, "profile"])[0]
+            out = self.__redisHget(dut_asic, db, keystr, "profile")[0]
             if six.PY2:
                 bufferProfileName = out.encode("utf-8").translate(None, "[]")
             else:
                 bufferProfileName = out.translate({ord(i): None for i in '[]'})
         else:
-            profile_content = dut_asic.run_redis_cmd(argv=["redis-cli", "-n", db, "HGET", keystr, "profile"])
+            profile_content = self.__redisHget(dut_asic, db, keystr, "profile")
             if profile_content:
                 bufferProfileName = bufkeystr + profile_content[0]
             else:
@@ -408,9 +464,7 @@ class QosSaiBase(QosBase):
                 }
                 return dump_buffer_profile
 
-        result = dut_asic.run_redis_cmd(
-            argv=["redis-cli", "-n", db, "HGETALL", bufferProfileName]
-        )
+        result = self.__redisHgetall(dut_asic, db, bufferProfileName)
         it = iter(result)
         bufferProfile = dict(list(zip(it, it)))
         bufferProfile.update({"profileName": bufferProfileName})
@@ -458,9 +512,7 @@ class QosSaiBase(QosBase):
         else:
             db = "4"
             keystr = "BUFFER_POOL|ingress_lossless_pool"
-        result = dut_asic.run_redis_cmd(
-            argv=["redis-cli", "-n", db, "HGETALL", keystr]
-        )
+        result = self.__redisHgetall(dut_asic, db, keystr)
         it = iter(result)
         ingressLosslessPool = dict(list(zip(it, it)))
         return ingressLosslessPool.get("xoff")
@@ -485,29 +537,19 @@ class QosSaiBase(QosBase):
             else:
                 port = "{}|Asic0|{}".format(dut_asic.sonichost.hostname, port)
         if check_qos_db_fv_reference_with_table(dut_asic):
-            out = dut_asic.run_redis_cmd(
-                argv=[
-                    "redis-cli", "-n", "4", "HGET",
-                    "{0}|{1}|{2}".format(table, port, self.TARGET_QUEUE_WRED),
-                    "wred_profile"
-                ]
+            out = self.__redisHget(
+                dut_asic, "4", "{0}|{1}|{2}".format(table, port, self.TARGET_QUEUE_WRED), "wred_profile"
             )[0]
             if six.PY2:
                 wredProfileName = out.encode("utf-8").translate(None, "[]")
             else:
                 wredProfileName = out.translate({ord(i): None for i in '[]'})
         else:
-            wredProfileName = "WRED_PROFILE|" + six.text_type(dut_asic.run_redis_cmd(
-                argv=[
-                    "redis-cli", "-n", "4", "HGET",
-                    "{0}|{1}|{2}".format(table, port, self.TARGET_QUEUE_WRED),
-                    "wred_profile"
-                ]
+            wredProfileName = "WRED_PROFILE|" + six.text_type(self.__redisHget(
+                dut_asic, "4", "{0}|{1}|{2}".format(table, port, self.TARGET_QUEUE_WRED), "wred_profile"
             )[0])
 
-        result = dut_asic.run_redis_cmd(
-            argv=["redis-cli", "-n", "4", "HGETALL", wredProfileName]
-        )
+        result = self.__redisHgetall(dut_asic, "4", wredProfileName)
         it = iter(result)
         wredProfile = dict(list(zip(it, it)))
 
@@ -523,11 +565,8 @@ class QosSaiBase(QosBase):
             Returns:
                 watermarkStatus (str): Watermark status
         """
-        watermarkStatus = six.text_type(dut_asic.run_redis_cmd(
-            argv=[
-                "redis-cli", "-n", "4", "HGET",
-                "FLEX_COUNTER_TABLE|QUEUE_WATERMARK", "FLEX_COUNTER_STATUS"
-            ]
+        watermarkStatus = six.text_type(self.__redisHget(
+            dut_asic, "4", "FLEX_COUNTER_TABLE|QUEUE_WATERMARK", "FLEX_COUNTER_STATUS"
         )[0])
 
         return watermarkStatus
@@ -545,12 +584,7 @@ class QosSaiBase(QosBase):
                 SchedulerParam (dict): Map of scheduler parameters
         """
         if check_qos_db_fv_reference_with_table(dut_asic):
-            out = dut_asic.run_redis_cmd(
-                argv=[
-                    "redis-cli", "-n", "4", "HGET",
-                    "QUEUE|{0}|{1}".format(port, queue), "scheduler"
-                ]
-            )[0]
+            out = self.__redisHget(dut_asic, "4", "QUEUE|{0}|{1}".format(port, queue), "scheduler")[0]
             if six.PY2:
                 schedProfile = out.encode("utf-8").translate(None, "[]")
             else:
@@ -559,31 +593,21 @@ class QosSaiBase(QosBase):
             if dut_asic.sonichost.facts['switch_type'] == 'voq':
                 # For VoQ chassis, the scheduler queues config is based on system port
                 if dut_asic.sonichost.is_multi_asic:
-                    schedProfile = "SCHEDULER|" + six.text_type(dut_asic.run_redis_cmd(
-                        argv=[
-                            "redis-cli", "-n", "4", "HGET",
-                            "QUEUE|{0}|{1}|{2}|{3}"
-                            .format(dut_asic.sonichost.hostname, dut_asic.namespace, port, queue), "scheduler"
-                        ]
+                    schedProfile = "SCHEDULER|" + six.text_type(self.__redisHget(
+                        dut_asic, "4",
+                        "QUEUE|{0}|{1}|{2}|{3}".format(dut_asic.sonichost.hostname, dut_asic.namespace, port, queue),
+                        "scheduler"
                     )[0])
                 else:
-                    schedProfile = "SCHEDULER|" + six.text_type(dut_asic.run_redis_cmd(
-                        argv=[
-                            "redis-cli", "-n", "4", "HGET",
-                            "QUEUE|{0}|Asic0|{1}|{2}"
-                            .format(dut_asic.sonichost.hostname, port, queue), "scheduler"
-                        ]
+                    schedProfile = "SCHEDULER|" + six.text_type(self.__redisHget(
+                        dut_asic, "4", "QUEUE|{0}|Asic0|{1}|{2}".format(dut_asic.sonichost.hostname, port, queue),
+                        "scheduler"
                     )[0])
             else:
-                schedProfile = "SCHEDULER|" + six.text_type(dut_asic.run_redis_cmd(
-                    argv=[
-                        "redis-cli", "-n", "4", "HGET",
-                        "QUEUE|{0}|{1}".format(port, queue), "scheduler"
-                    ]
+                schedProfile = "SCHEDULER|" + six.text_type(self.__redisHget(
+                    dut_asic, "4", "QUEUE|{0}|{1}".format(port, queue), "scheduler"
                 )[0])
-        schedWeight = six.text_type(dut_asic.run_redis_cmd(
-            argv=["redis-cli", "-n", "4", "HGET", schedProfile, "weight"]
-        )[0])
+        schedWeight = six.text_type(self.__redisHget(dut_asic, "4", schedProfile, "weight")[0])
 
         return {"schedProfile": schedProfile, "schedWeight": schedWeight}
 
@@ -874,6 +898,8 @@ class QosSaiBase(QosBase):
                 with SafeThreadPoolExecutor(max_workers=8) as executor:
                     for duthost in dut_list:
                         executor.submit(docker.swap_syncd, duthost, new_creds)
+                # The SAI objects were recreated by the new syncd, their OIDs changed
+                self.__releaseQosDbSnapshots()
 
             yield
 
@@ -882,6 +908,7 @@ class QosSaiBase(QosBase):
                 with SafeThreadPoolExecutor(max_workers=8) as executor:
                     for duthost in dut_list:
                         executor.submit(docker.restore_default_syncd, duthost, new_creds)
+                self.__releaseQosDbSnapshots()
 
     @pytest.fixture(scope='class', name="select_src_dst_dut_and_asic",
                     params=["single_asic", "single_dut_multi_asic",
@@ -2649,6 +2676,7 @@ class QosSaiBase(QosBase):
                 Returns:
                     None
             """
+            self.__releaseQosDbSnapshots()
             for a_asic in get_src_dst_asic_and_duts['all_asics']:
                 a_asic.run_redis_cmd(
                     argv=[
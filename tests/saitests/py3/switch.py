@@ -20,6 +20,7 @@ Thrift SAI interface basic tests
 import time
 import sys
 import os
+import weakref
 
 from sai_base_test import interface_to_front_mapping
 from ptf.thriftutils import *       # noqa F403
@@ -79,6 +80,8 @@ port_list = {}
 sai_port_list = {}
 front_port_list = {}
 table_attr_list = {}
+# Per client cache of the queue and PG OIDs of the ports, they don't change during a test
+port_oid_cache = weakref.WeakKeyDictionary()
 router_mac = '00:77:66:55:44:00'
 rewrite_mac1 = '00:77:66:55:45:01'
 rewrite_mac2 = '00:77:66:55:46:01'
@@ -796,7 +799,41 @@ def sai_thrift_credit_wd_enable(client):
     return status
 
 
-def sai_thrift_read_port_counters(client, asic_type, port):
+def sai_thrift_get_port_oids(client, port):
+    """
+    Get the queue and PG OIDs of a port, from the cache of the client if already read.
+
+    Returns:
+        dict with the 'queues' and 'pgs' keys, to the lists of queue and PG OIDs of the port
+    """
+    client_cache = port_oid_cache.setdefault(client, {})
+    oids = client_cache.get(port)
+    if oids is not None:
+        return oids
+
+    oids = {'queues': [], 'pgs': []}
+    port_attr_list = client.sai_thrift_get_port_attribute(port)
+    attr_list = port_attr_list.attr_list
+    for attribute in attr_list:
+        if attribute.id == SAI_PORT_ATTR_QOS_QUEUE_LIST:
+            oids['queues'].extend(attribute.value.objlist.object_id_list)
+        elif attribute.id == SAI_PORT_ATTR_INGRESS_PRIORITY_GROUP_LIST:
+            oids['pgs'].extend(attribute.value.objlist.object_id_list)
+    client_cache[port] = oids
+    return oids
+
+
+def sai_thrift_clear_port_oid_cache(client=None):
+    """
+    Clear the cached queue and PG OIDs of the ports of a client, of all the clients if client is None.
+    """
+    if client is None:
+        port_oid_cache.clear()
+    else:
+        port_oid_cache.pop(client, None)
+
+
+def get_port_cnt_ids(asic_type):
     port_cnt_ids = []
     port_cnt_ids.append(SAI_PORT_STAT_IF_OUT_DISCARDS)
     port_cnt_ids.append(SAI_PORT_STAT_IF_IN_DISCARDS)
@@ -824,6 +861,11 @@ def sai_thrift_read_port_counters(client, asic_type, port):
     port_cnt_ids.append(SAI_PORT_STAT_IF_OUT_NON_UCAST_PKTS)
     if asic_type != 'mellanox':
         port_cnt_ids.append(SAI_PORT_STAT_IF_OUT_QLEN)
+    return port_cnt_ids
+
+
+def sai_thrift_read_port_counters(client, asic_type, port):
+    port_cnt_ids = get_port_cnt_ids(asic_type)
 
     counters_results = []
     counters_results = client.sai_thrift_get_port_stats(
@@ -839,13 +881,7 @@ def sai_thrift_read_port_counters(client, asic_type, port):
             port, in_drop_pkts_cnt_id, 1)
         counters_results.insert(12, in_drop_pkts_cnt_result[0])
 
-    queue_list = []
-    port_attr_list = client.sai_thrift_get_port_attribute(port)
-    attr_list = port_attr_list.attr_list
-    for attribute in attr_list:
-        if attribute.id == SAI_PORT_ATTR_QOS_QUEUE_LIST:
-            for queue_id in attribute.value.objlist.object_id_list:
-                queue_list.append(queue_id)
+    queue_list = sai_thrift_get_port_oids(client, port)['queues']
     cnt_ids = []
     thrift_results = []
     queue_counters_results = []
@@ -860,6 +896,76 @@ def sai_thrift_read_port_counters(client, asic_type, port):
     return (counters_results, queue_counters_results)
 
 
+def sai_thrift_read_counter_snapshot(client, asic_type, ports, port_cnt_ids=None, queue_cnt_ids=None,
+                                     pg_cnt_ids=None, num_queues=8):
+    """
+    Read the port, queue and PG counters of a set of ports in the fewest RPCs: one RPC per port, per
+    queue and per PG for all the requested counters of the object, with the queue and PG OIDs from
+    the per client cache.
+
+    Args:
+        client: SAI thrift client
+        asic_type: ASIC type, used for the counters to read separately
+        ports: list of port OIDs
+        port_cnt_ids: list of port counter IDs to read, none if None
+        queue_cnt_ids: list of queue counter IDs to read on the first num_queues queues, none if None
+        pg_cnt_ids: list of PG counter IDs to read, none if None
+        num_queues: number of (unicast) queues of a port to read
+
+    Returns:
+        dict with:
+            'ports': dict of port OID to dict of counter ID to value
+            'queues': dict of port OID to list, per queue, of dict of counter ID to value
+            'pgs': dict of port OID to list, per PG, of dict of counter ID to value
+            'rpc_count': number of RPCs made for the snapshot
+            'duration': time taken by the snapshot in seconds
+    """
+    start = time.time()
+    rpc_count = 0
+    snapshot = {'ports': {}, 'queues': {}, 'pgs': {}}
+
+    # See get_port_cnt_ids, SAI_PORT_STAT_IN_DROPPED_PKTS is read separately on broadcom
+    port_cnt_ids = list(port_cnt_ids or [])
+    separate_cnt_ids = []
+    if asic_type == 'broadcom' and SAI_PORT_STAT_IN_DROPPED_PKTS in port_cnt_ids:
+        port_cnt_ids.remove(SAI_PORT_STAT_IN_DROPPED_PKTS)
+        separate_cnt_ids.append(SAI_PORT_STAT_IN_DROPPED_PKTS)
+
+    for port in ports:
+        if queue_cnt_ids or pg_cnt_ids:
+            if port not in port_oid_cache.get(client, {}):
+                rpc_count += 1
+            oids = sai_thrift_get_port_oids(client, port)
+
+        port_cntrs = {}
+        for cnt_ids in (port_cnt_ids, separate_cnt_ids):
+            if cnt_ids:
+                port_cntrs.update(zip(cnt_ids, client.sai_thrift_get_port_stats(port, cnt_ids, len(cnt_ids))))
+                rpc_count += 1
+        snapshot['ports'][port] = port_cntrs
+
+        if queue_cnt_ids:
+            snapshot['queues'][port] = []
+            for queue in oids['queues'][:num_queues]:
+                snapshot['queues'][port].append(
+                    dict(zip(queue_cnt_ids, client.sai_thrift_get_queue_stats(queue, queue_cnt_ids,
+                                                                              len(queue_cnt_ids)))))
+                rpc_count += 1
+
+        if pg_cnt_ids:
+            snapshot['pgs'][port] = []
+            for pg in oids['pgs']:
+                snapshot['pgs'][port].append(
+                    dict(zip(pg_cnt_ids, client.sai_thrift_get_pg_stats(pg, pg_cnt_ids, len(pg_cnt_ids)))))
+                rpc_count += 1
+
+    snapshot['rpc_count'] = rpc_count
+    snapshot['duration'] = time.time() - start
+    print("Counter snapshot of {} ports: {} RPCs in {:.3f} seconds".format(
+        len(ports), rpc_count, snapshot['duration']), file=sys.stderr)
+    return snapshot
+
+
 def sai_thrift_get_voq_port_id(client, system_port_id):
     object_id = client.sai_thrift_get_sys_port_obj_id_by_port_id(system_port_id)
     voq_list = []
@@ -895,17 +1001,9 @@ def sai_thrift_read_port_watermarks(client, port):
     pg_wm_ids.append(SAI_INGRESS_PRIORITY_GROUP_STAT_XOFF_ROOM_WATERMARK_BYTES)
     pg_wm_ids.append(SAI_INGRESS_PRIORITY_GROUP_STAT_SHARED_WATERMARK_BYTES)
 
-    queue_list = []
-    pg_list = []
-    port_attr_list = client.sai_thrift_get_port_attribute(port)
-    attr_list = port_attr_list.attr_list
-    for attribute in attr_list:
-        if attribute.id == SAI_PORT_ATTR_QOS_QUEUE_LIST:
-            for queue_id in attribute.value.objlist.object_id_list:
-                queue_list.append(queue_id)
-        elif attribute.id == SAI_PORT_ATTR_INGRESS_PRIORITY_GROUP_LIST:
-            for pg_id in attribute.value.objlist.object_id_list:
-                pg_list.append(pg_id)
+    oids = sai_thrift_get_port_oids(client, port)
+    queue_list = oids['queues']
+    pg_list = oids['pgs']
 
     thrift_results = []
     queue_res = []
@@ -933,13 +1031,7 @@ def sai_thrift_read_pg_counters(client, port_id):
     ]
 
     # fetch pg ids under port id
-    pg_ids = []
-    port_attrs = client.sai_thrift_get_port_attribute(port_id)
-    attrs = port_attrs.attr_list
-    for attr in attrs:
-        if attr.id == SAI_PORT_ATTR_INGRESS_PRIORITY_GROUP_LIST:
-            for pg_id in attr.value.objlist.object_id_list:
-                pg_ids.append(pg_id)
+    pg_ids = sai_thrift_get_port_oids(client, port_id)['pgs']
 
     # get counter values of counter ids of interest under each pg
     pg_cntrs = []
@@ -957,13 +1049,7 @@ def sai_thrift_read_pg_occupancy(client, port_id):
     ]
 
     # fetch pg ids under port id
-    pg_ids = []
-    port_attrs = client.sai_thrift_get_port_attribute(port_id)
-    attrs = port_attrs.attr_list
-    for attr in attrs:
-        if attr.id == SAI_PORT_ATTR_INGRESS_PRIORITY_GROUP_LIST:
-            for pg_id in attr.value.objlist.object_id_list:
-                pg_ids.append(pg_id)
+    pg_ids = sai_thrift_get_port_oids(client, port_id)['pgs']
 
     # get counter values of counter ids of interest under each pg
     pg_cntrs = []
@@ -981,13 +1067,7 @@ def sai_thrift_read_pg_drop_counters(client, port_id):
     ]
 
     # fetch pg ids under port id
-    pg_ids = []
-    port_attrs = client.sai_thrift_get_port_attribute(port_id)
-    attrs = port_attrs.attr_list
-    for attr in attrs:
-        if attr.id == SAI_PORT_ATTR_INGRESS_PRIORITY_GROUP_LIST:
-            for pg_id in attr.value.objlist.object_id_list:
-                pg_ids.append(pg_id)
+    pg_ids = sai_thrift_get_port_oids(client, port_id)['pgs']
 
     # get counter values of counter ids of interest under each pg
     pg_cntrs = []
@@ -1003,13 +1083,7 @@ def sai_thrift_read_pg_shared_watermark(client, asic_type, port_id):
     pg_cntr_ids = [SAI_INGRESS_PRIORITY_GROUP_STAT_SHARED_WATERMARK_BYTES]
 
     # fetch pg ids under port id
-    pg_ids = []
-    port_attrs = client.sai_thrift_get_port_attribute(port_id)
-    attrs = port_attrs.attr_list
-    for attr in attrs:
-        if attr.id == SAI_PORT_ATTR_INGRESS_PRIORITY_GROUP_LIST:
-            for pg_id in attr.value.objlist.object_id_list:
-                pg_ids.append(pg_id)
+    pg_ids = sai_thrift_get_port_oids(client, port_id)['pgs']
 
     # get counter values of counter ids of interest under each pg
     pg_cntrs = []
@@ -1058,13 +1132,7 @@ def sai_thrift_read_headroom_pool_watermark(client, buffer_pool_id):
 
 
 def sai_thrift_read_queue_occupancy(client, target, port_id):
-    queue_list = []
-    port_attr_list = client.sai_thrift_get_port_attribute(port_list[target][port_id])
-    attr_list = port_attr_list.attr_list
-    for attribute in attr_list:
-        if attribute.id == SAI_PORT_ATTR_QOS_QUEUE_LIST:
-            for queue_id in attribute.value.objlist.object_id_list:
-                queue_list.append(queue_id)
+    queue_list = sai_thrift_get_port_oids(client, port_list[target][port_id])['queues']
     cnt_ids = [SAI_QUEUE_STAT_CURR_OCCUPANCY_BYTES]
     queue_counters_results = []
     queue1 = 0
@@ -0,0 +1,230 @@
+"""
+Warm PTF worker.
+
+Launching the ptf binary for every test case imports ptf, scapy and the test dependencies again,
+which takes seconds and dominates short test cases. This worker imports them once and serves
+test case requests over a local unix socket. For each request it forks a child with the modules
+already imported, which runs the ptf binary with the requested arguments. Each test case still
+runs in its own process, so test cases can't affect each other.
+
+The output of the test case is streamed back to the client while it runs, followed by its exit code.
+
+Server:
+    python ptf_worker.py serve --socket /tmp/ptf_worker.sock --ptf /root/env-python3/bin/ptf
+Client (same arguments as the ptf binary):
+    python ptf_worker.py run --socket /tmp/ptf_worker.sock -- --test-dir ptftests/py3 hash_test.HashTest ...
+Readiness check (exit code 0 once the worker accepts requests):
+    python ptf_worker.py ping --socket /tmp/ptf_worker.sock
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import runpy
+import signal
+import socket
+import sys
+
+DEFAULT_SOCKET = '/tmp/ptf_worker.sock'
+DEFAULT_PRELOAD = ['ptf', 'ptf.dataplane', 'ptf.mask', 'ptf.packet', 'ptf.testutils', 'scapy.all']
+RC_MARKER = b'\n__PTF_WORKER_RC__='
+# Exit code of the client when the worker can't be reached, the caller may fall back to the ptf binary
+RC_WORKER_UNAVAILABLE = 250
+
+logger = logging.getLogger('ptf_worker')
+
+
+def preload_modules(modules):
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning('Failed to preload module {}: {}'.format(module, repr(e)))
+
+
+def read_request(conn):
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return json.loads(data.decode('utf-8'))
+
+
+def run_ptf(ptf_path, request, conn):
+    """
+    Run the ptf binary in the current (forked) process, with its output sent to the client.
+    Does not return.
+    """
+    rc = 1
+    try:
+        os.dup2(conn.fileno(), 1)
+        os.dup2(conn.fileno(), 2)
+        os.chdir(request.get('cwd', '/root'))
+        os.environ.update(request.get('env', {}))
+        sys.argv = [ptf_path] + request['args']
+        try:
+            runpy.run_path(ptf_path, run_name='__main__')
+            rc = 0
+        except SystemExit as e:
+            if e.code is None:
+                rc = 0
+            elif isinstance(e.code, int):
+                rc = e.code
+            else:
+                sys.stderr.write('{}\n'.format(e.code))
+                rc = 1
+    except Exception:
+        logging.exception('PTF run failed')
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(rc)
+
+
+def handle_connection(ptf_path, conn):
+    """
+    Serve one test case request in a forked session process. Does not return.
+    """
+    rc = 1
+    try:
+        request = read_request(conn)
+        if request.get('ping'):
+            rc = 0
+        else:
+            pid = os.fork()
+            if pid == 0:
+                run_ptf(ptf_path, request, conn)
+            _, status = os.waitpid(pid, 0)
+            if os.WIFEXITED(status):
+                rc = os.WEXITSTATUS(status)
+            else:
+                rc = 128 + os.WTERMSIG(status)
+    except Exception:
+        logger.exception('Failed to handle request')
+    finally:
+        try:
+            conn.sendall(RC_MARKER + str(rc).encode('utf-8') + b'\n')
+            conn.close()
+        finally:
+            os._exit(0)
+
+
+def serve(socket_path, ptf_path, preload):
+    preload_modules(preload)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    # Reap the session processes automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    logger.info('PTF worker listening on {}, running {}'.format(socket_path, ptf_path))
+
+    while True:
+        conn, _ = server.accept()
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            handle_connection(ptf_path, conn)
+        conn.close()
+
+
+def run(socket_path, args):
+    """
+    Send a test case request to the worker and stream its output to stdout.
+
+    Returns:
+        The exit code of the test case.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except (IOError, OSError) as e:
+        sys.stderr.write('PTF worker is not available on {}: {}\n'.format(socket_path, repr(e)))
+        return RC_WORKER_UNAVAILABLE
+
+    request = {'args': args, 'cwd': os.getcwd()}
+    client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+
+    out = getattr(sys.stdout, 'buffer', sys.stdout)
+    # Keep the tail of the output, the exit code marker may be split across reads
+    tail = b''
+    while True:
+        chunk = client.recv(65536)
+        if not chunk:
+            break
+        data = tail + chunk
+        keep = len(RC_MARKER) + 8
+        out.write(data[:-keep])
+        out.flush()
+        tail = data[-keep:]
+    client.close()
+
+    pos = tail.rfind(RC_MARKER)
+    if pos < 0:
+        out.write(tail)
+        sys.stderr.write('PTF worker closed the connection without an exit code\n')
+        return 1
+    out.write(tail[:pos])
+    out.flush()
+    return int(tail[pos + len(RC_MARKER):].strip())
+
+
+def ping(socket_path):
+    """
+    Check that the worker accepts requests.
+
+    Returns:
+        0 if the worker answered, RC_WORKER_UNAVAILABLE otherwise.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    data = b''
+    try:
+        client.connect(socket_path)
+        client.sendall(json.dumps({'ping': True}).encode('utf-8') + b'\n')
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    except (IOError, OSError) as e:
+        sys.stderr.write('PTF worker is not available on {}: {}\n'.format(socket_path, repr(e)))
+        return RC_WORKER_UNAVAILABLE
+    finally:
+        client.close()
+    return 0 if data.strip() == RC_MARKER.strip() + b'0' else RC_WORKER_UNAVAILABLE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm PTF worker')
+    subparsers = parser.add_subparsers(dest='command')
+    serve_parser = subparsers.add_parser('serve', help='Serve test case requests')
+    serve_parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket to listen on')
+    serve_parser.add_argument('--ptf', required=True, help='Path of the ptf binary')
+    serve_parser.add_argument('--preload', nargs='*', default=DEFAULT_PRELOAD, help='Modules to import once')
+    run_parser = subparsers.add_parser('run', help='Run a test case on the worker')
+    run_parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket of the worker')
+    run_parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments of the ptf binary')
+    ping_parser = subparsers.add_parser('ping', help='Check that the worker accepts requests')
+    ping_parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket of the worker')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+        serve(args.socket, args.ptf, args.preload)
+    elif args.command == 'run':
+        ptf_args = args.args[1:] if args.args and args.args[0] == '--' else args.args
+        sys.exit(run(args.socket, ptf_args))
+    elif args.command == 'ping':
+        sys.exit(ping(args.socket))
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()